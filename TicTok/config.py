@@ -32,3 +32,11 @@ def get_record_dir() -> str:
     return os.environ.get(
         "TICTOK_RECORD_DIR", str(Path(__file__).resolve().parent / "recordings")
     )
+
+
+def get_event_batch_size() -> int:
+    return int(os.environ.get("TICTOK_EVENT_BATCH_SIZE", "500"))
+
+
+def get_event_flush_interval() -> float:
+    return float(os.environ.get("TICTOK_EVENT_FLUSH_INTERVAL", "0.5"))
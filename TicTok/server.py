@@ -13,7 +13,15 @@ from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
-from config import get_db_path, get_host, get_log_level, get_port, get_record_dir
+from config import (
+    get_db_path,
+    get_event_batch_size,
+    get_event_flush_interval,
+    get_host,
+    get_log_level,
+    get_port,
+    get_record_dir,
+)
 from manager import CollectorManager
 from recorder import ffmpeg_available
 from settings import Settings
@@ -68,7 +76,7 @@ class EventHub:
 
 
 hub = EventHub()
-storage = Storage(get_db_path())
+storage = Storage(get_db_path(), get_event_batch_size(), get_event_flush_interval())
 storage.cleanup_stale_sessions()
 storage.mark_stale_recordings()
 settings = Settings(storage)
@@ -345,6 +353,11 @@ async def delete_recording(recording_id: int) -> dict:
     return {"deleted": recording_id}
 
 
+@app.get("/api/storage")
+async def storage_stats() -> dict:
+    return {"events": storage.write_stats()}
+
+
 @app.get("/api/dashboard")
 async def aggregate_dashboard() -> dict:
     return storage.aggregate_dashboard()
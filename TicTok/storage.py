@@ -3,6 +3,7 @@ import logging
 import sqlite3
 import threading
 import time
+from collections import deque
 from typing import Optional
 
 logger = logging.getLogger("tictok.storage")
@@ -70,8 +71,106 @@ CREATE TABLE IF NOT EXISTS recordings (
     bytes INTEGER NOT NULL DEFAULT 0
 );
 CREATE INDEX IF NOT EXISTS idx_recordings_session ON recordings(session_id);
+CREATE TABLE IF NOT EXISTS session_totals (
+    session_id INTEGER PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+    events INTEGER NOT NULL DEFAULT 0,
+    comments INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    gifts INTEGER NOT NULL DEFAULT 0,
+    diamonds INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS session_gifters (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    user_key TEXT NOT NULL,
+    unique_id TEXT,
+    nickname TEXT,
+    gifts INTEGER NOT NULL DEFAULT 0,
+    diamonds INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, user_key)
+);
+CREATE TABLE IF NOT EXISTS session_gifter_items (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    user_key TEXT NOT NULL,
+    gift_name TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, user_key, gift_name)
+);
+CREATE TABLE IF NOT EXISTS session_gifts (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    gift_name TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    diamonds INTEGER NOT NULL DEFAULT 0,
+    diamonds_each INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, gift_name)
+);
 """
 
+# Bump when the summary tables above change shape; _migrate rebuilds them from events.
+AGGREGATES_VERSION = 1
+
+
+EVENT_INSERT_SQL = (
+    "INSERT INTO events (session_id, time, kind, user_unique_id, user_nickname, text, comment, gift_name, gift_count, diamonds, count)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DEFAULT_EVENT_BATCH_SIZE = 500
+DEFAULT_EVENT_FLUSH_INTERVAL = 0.5
+FLUSH_LATENCY_SAMPLES = 200
+
+
+def _event_row(session_id: int, entry: dict) -> tuple:
+    user = entry.get("user") or {}
+    return (
+        session_id,
+        entry["time"],
+        entry["kind"],
+        user.get("unique_id"),
+        user.get("nickname"),
+        entry.get("text"),
+        entry.get("comment"),
+        entry.get("gift_name"),
+        entry.get("repeat_count"),
+        entry.get("diamonds"),
+        entry.get("count"),
+    )
+
+
+def _aggregate_deltas(rows: list) -> tuple:
+    """Fold event rows into per-session totals / gifter / gift deltas."""
+    totals: dict = {}
+    gifters: dict = {}
+    items: dict = {}
+    gifts: dict = {}
+    for session_id, _, kind, unique_id, nickname, _, _, gift_name, gift_count, diamonds, count in rows:
+        total = totals.setdefault(session_id, [0, 0, 0, 0, 0])
+        total[0] += 1
+        if kind == "comment":
+            total[1] += 1
+        elif kind == "like":
+            total[2] += count or 0
+        elif kind == "gift":
+            gift_count = gift_count or 0
+            diamonds = diamonds or 0
+            gift_name = gift_name or ""
+            total[3] += gift_count
+            total[4] += diamonds
+            user_key = unique_id or nickname or ""
+            gifter = gifters.setdefault((session_id, user_key), [None, None, 0, 0])
+            if unique_id is not None and (gifter[0] is None or unique_id > gifter[0]):
+                gifter[0] = unique_id
+            if nickname is not None and (gifter[1] is None or nickname > gifter[1]):
+                gifter[1] = nickname
+            gifter[2] += gift_count
+            gifter[3] += diamonds
+            key = (session_id, user_key, gift_name)
+            items[key] = items.get(key, 0) + gift_count
+            gift = gifts.setdefault((session_id, gift_name), [0, 0, 0])
+            gift[0] += gift_count
+            gift[1] += diamonds
+            if gift_count > 0:
+                gift[2] = max(gift[2], diamonds // gift_count)
+    return totals, gifters, items, gifts
+
 
 def _session_row_to_dict(row: sqlite3.Row) -> dict:
     item = dict(row)
@@ -80,10 +179,25 @@ def _session_row_to_dict(row: sqlite3.Row) -> dict:
 
 
 class Storage:
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        event_batch_size: int = DEFAULT_EVENT_BATCH_SIZE,
+        event_flush_interval: float = DEFAULT_EVENT_FLUSH_INTERVAL,
+    ) -> None:
         self._conn = sqlite3.connect(db_path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
         self._lock = threading.Lock()
+        self._event_batch_size = max(1, event_batch_size)
+        self._event_flush_interval = event_flush_interval
+        self._pending_lock = threading.Lock()
+        self._pending: list = []
+        self._pending_since: Optional[float] = None
+        self._flush_lock = threading.Lock()
+        self._flush_wakeup = threading.Event()
+        self._writer_running = True
+        self._write_stats = {"queued": 0, "written": 0, "failed": 0, "batches": 0}
+        self._flush_latency: deque = deque(maxlen=FLUSH_LATENCY_SAMPLES)
         with self._lock:
             self._conn.execute("PRAGMA journal_mode=WAL")
             self._conn.execute("PRAGMA synchronous=NORMAL")
@@ -92,6 +206,10 @@ class Storage:
             self._conn.executescript(SCHEMA)
             self._migrate()
             self._conn.commit()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="tictok-storage-writer", daemon=True
+        )
+        self._writer.start()
         logger.info("storage initialized: %s", db_path)
 
     def _migrate(self) -> None:
@@ -102,12 +220,169 @@ class Storage:
         if "count" not in columns:
             self._conn.execute("ALTER TABLE events ADD COLUMN count INTEGER")
             logger.info("migrated events table: added count column")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < AGGREGATES_VERSION:
+            self._rebuild_aggregates()
+            self._conn.execute(f"PRAGMA user_version = {AGGREGATES_VERSION}")
+            logger.info("migrated summary tables to version %d", AGGREGATES_VERSION)
+
+    def rebuild_aggregates(self) -> None:
+        self.flush_events()
+        with self._lock:
+            self._rebuild_aggregates()
+            self._conn.commit()
+
+    def _rebuild_aggregates(self) -> None:
+        user_key = "COALESCE(NULLIF(user_unique_id, ''), user_nickname, '')"
+        self._conn.execute("DELETE FROM session_totals")
+        self._conn.execute("DELETE FROM session_gifters")
+        self._conn.execute("DELETE FROM session_gifter_items")
+        self._conn.execute("DELETE FROM session_gifts")
+        self._conn.execute(
+            "INSERT INTO session_totals (session_id, events, comments, likes, gifts, diamonds)"
+            " SELECT session_id, COUNT(*),"
+            " COALESCE(SUM(CASE WHEN kind = 'comment' THEN 1 ELSE 0 END), 0),"
+            " COALESCE(SUM(CASE WHEN kind = 'like' THEN count ELSE 0 END), 0),"
+            " COALESCE(SUM(CASE WHEN kind = 'gift' THEN gift_count ELSE 0 END), 0),"
+            " COALESCE(SUM(CASE WHEN kind = 'gift' THEN diamonds ELSE 0 END), 0)"
+            " FROM events GROUP BY session_id"
+        )
+        self._conn.execute(
+            "INSERT INTO session_gifters (session_id, user_key, unique_id, nickname, gifts, diamonds)"
+            f" SELECT session_id, {user_key} AS key, MAX(user_unique_id), MAX(user_nickname),"
+            " COALESCE(SUM(gift_count), 0), COALESCE(SUM(diamonds), 0)"
+            " FROM events WHERE kind = 'gift' GROUP BY session_id, key"
+        )
+        self._conn.execute(
+            "INSERT INTO session_gifter_items (session_id, user_key, gift_name, count)"
+            f" SELECT session_id, {user_key} AS key, COALESCE(gift_name, '') AS name,"
+            " COALESCE(SUM(gift_count), 0)"
+            " FROM events WHERE kind = 'gift' GROUP BY session_id, key, name"
+        )
+        self._conn.execute(
+            "INSERT INTO session_gifts (session_id, gift_name, count, diamonds, diamonds_each)"
+            " SELECT session_id, COALESCE(gift_name, '') AS name,"
+            " COALESCE(SUM(gift_count), 0), COALESCE(SUM(diamonds), 0),"
+            " COALESCE(MAX(CASE WHEN gift_count > 0 THEN diamonds / gift_count ELSE 0 END), 0)"
+            " FROM events WHERE kind = 'gift' GROUP BY session_id, name"
+        )
+
+    def _apply_aggregates(self, rows: list) -> None:
+        totals, gifters, items, gifts = _aggregate_deltas(rows)
+        self._conn.executemany(
+            "INSERT INTO session_totals (session_id, events, comments, likes, gifts, diamonds)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(session_id) DO UPDATE SET"
+            " events = events + excluded.events, comments = comments + excluded.comments,"
+            " likes = likes + excluded.likes, gifts = gifts + excluded.gifts,"
+            " diamonds = diamonds + excluded.diamonds",
+            [(session_id, *values) for session_id, values in totals.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO session_gifters (session_id, user_key, unique_id, nickname, gifts, diamonds)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(session_id, user_key) DO UPDATE SET"
+            " unique_id = CASE WHEN unique_id IS NULL OR excluded.unique_id > unique_id"
+            "   THEN COALESCE(excluded.unique_id, unique_id) ELSE unique_id END,"
+            " nickname = CASE WHEN nickname IS NULL OR excluded.nickname > nickname"
+            "   THEN COALESCE(excluded.nickname, nickname) ELSE nickname END,"
+            " gifts = gifts + excluded.gifts, diamonds = diamonds + excluded.diamonds",
+            [(*key, *values) for key, values in gifters.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO session_gifter_items (session_id, user_key, gift_name, count)"
+            " VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(session_id, user_key, gift_name) DO UPDATE SET count = count + excluded.count",
+            [(*key, count) for key, count in items.items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO session_gifts (session_id, gift_name, count, diamonds, diamonds_each)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(session_id, gift_name) DO UPDATE SET"
+            " count = count + excluded.count, diamonds = diamonds + excluded.diamonds,"
+            " diamonds_each = MAX(diamonds_each, excluded.diamonds_each)",
+            [(*key, *values) for key, values in gifts.items()],
+        )
 
     def close(self) -> None:
+        self._writer_running = False
+        self._flush_wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush_events()
         with self._lock:
             self._conn.close()
 
+    def _writer_loop(self) -> None:
+        while self._writer_running:
+            self._flush_wakeup.wait(self._event_flush_interval)
+            self._flush_wakeup.clear()
+            try:
+                self.flush_events()
+            except Exception:
+                logger.exception("background event flush failed")
+
+    def flush_events(self) -> int:
+        """Write all queued events; returns the number of rows inserted."""
+        with self._flush_lock:
+            with self._pending_lock:
+                rows = self._pending
+                since = self._pending_since
+                self._pending = []
+                self._pending_since = None
+            if not rows:
+                return 0
+            written = self._insert_events(rows)
+            with self._pending_lock:
+                self._write_stats["written"] += written
+                self._write_stats["failed"] += len(rows) - written
+                self._write_stats["batches"] += 1
+                self._flush_latency.append(time.monotonic() - since)
+            return written
+
+    def _insert_events(self, rows: list) -> int:
+        with self._lock:
+            try:
+                self._conn.executemany(EVENT_INSERT_SQL, rows)
+                self._apply_aggregates(rows)
+                self._conn.commit()
+                return len(rows)
+            except sqlite3.Error:
+                self._conn.rollback()
+                logger.warning("batch insert of %d events failed; retrying row by row", len(rows))
+            written = []
+            for row in rows:
+                try:
+                    self._conn.execute(EVENT_INSERT_SQL, row)
+                    written.append(row)
+                except sqlite3.Error:
+                    logger.exception("dropping event for session %s", row[0])
+            try:
+                self._apply_aggregates(written)
+            except sqlite3.Error:
+                logger.exception("summary update for %d events failed; rebuilding from events", len(written))
+                try:
+                    self._rebuild_aggregates()
+                except sqlite3.Error:
+                    self._conn.rollback()
+                    logger.exception("summary rebuild failed; dropping %d events", len(written))
+                    return 0
+            self._conn.commit()
+            return len(written)
+
+    def write_stats(self) -> dict:
+        with self._pending_lock:
+            samples = sorted(self._flush_latency)
+            return {
+                **self._write_stats,
+                "queue_depth": len(self._pending),
+                "batch_size": self._event_batch_size,
+                "flush_interval": self._event_flush_interval,
+                "flush_latency_avg_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0,
+                "flush_latency_max_ms": round(samples[-1] * 1000, 1) if samples else 0.0,
+            }
+
     def cleanup_stale_sessions(self) -> int:
+        self.flush_events()
         with self._lock:
             rows = self._conn.execute(
                 "SELECT id FROM sessions WHERE status IN ('connecting', 'connected', 'reconnecting')"
@@ -178,30 +453,21 @@ class Storage:
             self._conn.commit()
 
     def add_event(self, session_id: int, entry: dict) -> None:
-        user = entry.get("user") or {}
-        with self._lock:
-            self._conn.execute(
-                "INSERT INTO events (session_id, time, kind, user_unique_id, user_nickname, text, comment, gift_name, gift_count, diamonds, count)"
-                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    session_id,
-                    entry["time"],
-                    entry["kind"],
-                    user.get("unique_id"),
-                    user.get("nickname"),
-                    entry.get("text"),
-                    entry.get("comment"),
-                    entry.get("gift_name"),
-                    entry.get("repeat_count"),
-                    entry.get("diamonds"),
-                    entry.get("count"),
-                ),
-            )
-            self._conn.commit()
+        """Queue an event for the background writer (write-behind)."""
+        row = _event_row(session_id, entry)
+        with self._pending_lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(row)
+            self._write_stats["queued"] += 1
+            full = len(self._pending) >= self._event_batch_size
+        if full:
+            self._flush_wakeup.set()
 
     def finalize_session(
         self, session_id: int, status: str, stats: dict, timeline: list, markers: list
     ) -> None:
+        self.flush_events()
         with self._lock:
             self._conn.execute(
                 "UPDATE sessions SET status = ?, ended_at = ?, stats_json = ? WHERE id = ?",
@@ -258,6 +524,7 @@ class Storage:
             return cursor.rowcount > 0
 
     def delete_session(self, session_id: int) -> bool:
+        self.flush_events()
         with self._lock:
             cursor = self._conn.execute(
                 "DELETE FROM sessions WHERE id = ?", (session_id,)
@@ -282,27 +549,23 @@ class Storage:
         }
 
     def session_summary(self, session_id: int) -> dict:
+        self.flush_events()
         with self._lock:
             user_rows = self._conn.execute(
-                "SELECT COALESCE(NULLIF(user_unique_id, ''), user_nickname) AS key,"
-                " MAX(user_unique_id) AS unique_id, MAX(user_nickname) AS nickname,"
-                " SUM(gift_count) AS gifts, SUM(diamonds) AS diamonds"
-                " FROM events WHERE session_id = ? AND kind = 'gift'"
-                " GROUP BY key ORDER BY diamonds DESC, gifts DESC LIMIT 100",
+                "SELECT user_key AS key, unique_id, nickname, gifts, diamonds"
+                " FROM session_gifters WHERE session_id = ?"
+                " ORDER BY diamonds DESC, gifts DESC LIMIT 100",
                 (session_id,),
             ).fetchall()
             item_rows = self._conn.execute(
-                "SELECT COALESCE(NULLIF(user_unique_id, ''), user_nickname) AS key,"
-                " gift_name, SUM(gift_count) AS count"
-                " FROM events WHERE session_id = ? AND kind = 'gift'"
-                " GROUP BY key, gift_name",
+                "SELECT user_key AS key, gift_name, count"
+                " FROM session_gifter_items WHERE session_id = ?",
                 (session_id,),
             ).fetchall()
             gift_rows = self._conn.execute(
-                "SELECT gift_name AS name, SUM(gift_count) AS count, SUM(diamonds) AS diamonds,"
-                " MAX(CASE WHEN gift_count > 0 THEN diamonds / gift_count ELSE 0 END) AS diamonds_each"
-                " FROM events WHERE session_id = ? AND kind = 'gift'"
-                " GROUP BY gift_name ORDER BY diamonds DESC, count DESC LIMIT 100",
+                "SELECT gift_name AS name, count, diamonds, diamonds_each"
+                " FROM session_gifts WHERE session_id = ?"
+                " ORDER BY diamonds DESC, count DESC LIMIT 100",
                 (session_id,),
             ).fetchall()
         items_by_user: dict = {}
@@ -322,6 +585,7 @@ class Storage:
         return {"users": users, "gifts": [dict(g) for g in gift_rows]}
 
     def iter_events(self, session_id: int) -> list:
+        self.flush_events()
         with self._lock:
             rows = self._conn.execute(
                 "SELECT time, kind, user_unique_id, user_nickname, text, comment, gift_name, gift_count, diamonds, count"
@@ -405,15 +669,15 @@ class Storage:
             self._conn.commit()
 
     def session_rankings(self, limit: int) -> dict:
+        self.flush_events()
         with self._lock:
             rows = self._conn.execute(
                 "SELECT s.id, s.unique_id, s.started_at, s.ended_at,"
-                " COALESCE(json_extract(s.stats_json, '$.likes_total'),"
-                "   (SELECT SUM(e.count) FROM events e WHERE e.session_id = s.id AND e.kind = 'like'), 0) AS likes,"
-                " (SELECT COUNT(*) FROM events e WHERE e.session_id = s.id AND e.kind = 'comment') AS comments,"
-                " (SELECT COALESCE(SUM(e.diamonds), 0) FROM events e WHERE e.session_id = s.id AND e.kind = 'gift') AS diamonds,"
+                " COALESCE(json_extract(s.stats_json, '$.likes_total'), t.likes, 0) AS likes,"
+                " COALESCE(t.comments, 0) AS comments,"
+                " COALESCE(t.diamonds, 0) AS diamonds,"
                 " COALESCE(json_extract(s.stats_json, '$.battle_points'), 0) AS battle_points"
-                " FROM sessions s",
+                " FROM sessions s LEFT JOIN session_totals t ON t.session_id = s.id",
             ).fetchall()
         sessions = [dict(row) for row in rows]
 
@@ -438,37 +702,37 @@ class Storage:
         }
 
     def aggregate_dashboard(self) -> dict:
+        self.flush_events()
         with self._lock:
             totals = self._conn.execute(
                 "SELECT"
                 " (SELECT COUNT(*) FROM sessions) AS sessions,"
-                " COALESCE(SUM(CASE WHEN kind = 'gift' THEN gift_count ELSE 0 END), 0) AS gifts,"
-                " COALESCE(SUM(CASE WHEN kind = 'gift' THEN diamonds ELSE 0 END), 0) AS diamonds,"
-                " COALESCE(SUM(CASE WHEN kind = 'comment' THEN 1 ELSE 0 END), 0) AS comments,"
+                " COALESCE(SUM(gifts), 0) AS gifts,"
+                " COALESCE(SUM(diamonds), 0) AS diamonds,"
+                " COALESCE(SUM(comments), 0) AS comments,"
                 " (SELECT COALESCE(SUM(json_extract(stats_json, '$.likes_total')), 0) FROM sessions) AS likes,"
                 " (SELECT COALESCE(SUM(CASE WHEN ended_at IS NOT NULL THEN ended_at - started_at ELSE 0 END), 0) FROM sessions) AS duration"
-                " FROM events"
+                " FROM session_totals"
             ).fetchone()
             streamer_rows = self._conn.execute(
-                "SELECT s.unique_id, COUNT(DISTINCT s.id) AS sessions,"
-                " COALESCE(SUM(CASE WHEN e.kind = 'gift' THEN e.gift_count ELSE 0 END), 0) AS gifts,"
-                " COALESCE(SUM(CASE WHEN e.kind = 'gift' THEN e.diamonds ELSE 0 END), 0) AS diamonds,"
-                " COALESCE(SUM(CASE WHEN e.kind = 'comment' THEN 1 ELSE 0 END), 0) AS comments,"
+                "SELECT s.unique_id, COUNT(s.id) AS sessions,"
+                " COALESCE(SUM(t.gifts), 0) AS gifts,"
+                " COALESCE(SUM(t.diamonds), 0) AS diamonds,"
+                " COALESCE(SUM(t.comments), 0) AS comments,"
                 " MAX(s.started_at) AS last_started_at"
-                " FROM sessions s LEFT JOIN events e ON e.session_id = s.id"
+                " FROM sessions s LEFT JOIN session_totals t ON t.session_id = s.id"
                 " GROUP BY s.unique_id ORDER BY diamonds DESC",
             ).fetchall()
             gifter_rows = self._conn.execute(
-                "SELECT COALESCE(NULLIF(user_unique_id, ''), user_nickname) AS key,"
-                " MAX(user_unique_id) AS unique_id, MAX(user_nickname) AS nickname,"
-                " SUM(gift_count) AS gifts, SUM(diamonds) AS diamonds,"
+                "SELECT user_key AS key, MAX(unique_id) AS unique_id, MAX(nickname) AS nickname,"
+                " SUM(gifts) AS gifts, SUM(diamonds) AS diamonds,"
                 " COUNT(DISTINCT session_id) AS sessions"
-                " FROM events WHERE kind = 'gift'"
+                " FROM session_gifters"
                 " GROUP BY key ORDER BY diamonds DESC, gifts DESC LIMIT 50",
             ).fetchall()
             gift_rows = self._conn.execute(
-                "SELECT gift_name AS name, SUM(gift_count) AS count, SUM(diamonds) AS diamonds"
-                " FROM events WHERE kind = 'gift'"
+                "SELECT gift_name AS name, SUM(count) AS count, SUM(diamonds) AS diamonds"
+                " FROM session_gifts"
                 " GROUP BY gift_name ORDER BY diamonds DESC, count DESC LIMIT 50",
             ).fetchall()
             session_rows = self._conn.execute(
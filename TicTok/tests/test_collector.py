@@ -1,4 +1,5 @@
 import asyncio
+import sqlite3
 import sys
 import tempfile
 from pathlib import Path
@@ -290,6 +291,112 @@ async def test_recording_metadata_persistence():
     print("OK 録画metadataの永続化 (作成/更新/stale回収/削除)")
 
 
+async def test_event_write_behind():
+    storage = Storage(tempfile.mktemp(suffix=".db"), event_batch_size=3, event_flush_interval=60)
+    sid = storage.create_session("batched", 10)
+    user = {"unique_id": "u", "nickname": "U"}
+
+    def stored():
+        return storage._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    storage.add_event(sid, {"time": 1.0, "kind": "comment", "user": user, "text": "a"})
+    storage.add_event(sid, {"time": 2.0, "kind": "comment", "user": user, "text": "b"})
+    assert stored() == 0 and storage.write_stats()["queue_depth"] == 2
+    storage.add_event(sid, {"time": 3.0, "kind": "comment", "user": user, "text": "c"})
+    assert await wait_for(lambda: stored() == 3), stored()
+    storage.add_event(sid, {"time": 4.0, "kind": "like", "user": user, "count": 5, "text": "d"})
+    storage.finalize_session(sid, STATE_DISCONNECTED, {}, [], [])
+    assert stored() == 4
+    stats = storage.write_stats()
+    assert stats["queue_depth"] == 0 and stats["written"] == 4 and stats["batches"] == 2, stats
+    storage.add_event(sid, {"time": 5.0, "kind": "comment", "user": user, "text": "e"})
+    storage.add_event(999, {"time": 6.0, "kind": "comment", "user": user, "text": "orphan"})
+    assert len(storage.iter_events(sid)) == 5
+    assert storage.write_stats()["failed"] == 1
+    storage.close()
+    print("OK event書き込みのbatch化 (size/finalize時flush/FK違反行のみ破棄)")
+
+
+async def test_aggregate_failure_in_row_fallback():
+    storage = Storage(tempfile.mktemp(suffix=".db"), event_flush_interval=60)
+    sid = storage.create_session("fallback", 10)
+    user = {"unique_id": "u", "nickname": "U"}
+
+    def broken(*args):
+        raise sqlite3.OperationalError("summary table locked")
+
+    storage._apply_aggregates = broken
+    storage.add_event(sid, {"time": 1.0, "kind": "like", "user": user, "count": 4, "text": "x"})
+    storage.add_event(999, {"time": 2.0, "kind": "comment", "user": user, "text": "orphan"})
+    assert storage.flush_events() == 1
+    assert not storage._conn.in_transaction
+    assert storage.session_rankings(10)["likes"][0]["value"] == 4
+
+    storage._rebuild_aggregates = broken
+    storage.add_event(sid, {"time": 3.0, "kind": "like", "user": user, "count": 2, "text": "x"})
+    storage.add_event(999, {"time": 4.0, "kind": "comment", "user": user, "text": "orphan"})
+    assert storage.flush_events() == 0
+    assert not storage._conn.in_transaction
+    assert len(storage.iter_events(sid)) == 1
+    assert storage.write_stats()["failed"] == 3
+    storage.close()
+    print("OK row単位fallback時の集計失敗 (再構築/rollback)")
+
+
+async def test_incremental_aggregates():
+    db_path = tempfile.mktemp(suffix=".db")
+    storage = Storage(db_path, event_flush_interval=60)
+    alice = {"unique_id": "alice", "nickname": "Alice"}
+    bob = {"unique_id": "", "nickname": "Bob"}
+    s1 = storage.create_session("streamer_a", 10)
+    s2 = storage.create_session("streamer_a", 10)
+    s3 = storage.create_session("streamer_b", 10)
+    storage.add_event(s1, {"time": 1.0, "kind": "gift", "user": alice, "gift_name": "Rose", "repeat_count": 5, "diamonds": 5, "text": "x"})
+    storage.add_event(s1, {"time": 2.0, "kind": "gift", "user": bob, "gift_name": "Lion", "repeat_count": 1, "diamonds": 500, "text": "x"})
+    storage.add_event(s1, {"time": 3.0, "kind": "comment", "user": bob, "comment": "hi", "text": "x"})
+    storage.add_event(s1, {"time": 4.0, "kind": "like", "user": bob, "count": 7, "text": "x"})
+    storage.flush_events()
+    storage.add_event(s1, {"time": 5.0, "kind": "gift", "user": alice, "gift_name": "Rose", "repeat_count": 2, "diamonds": 2, "text": "x"})
+    storage.add_event(s2, {"time": 6.0, "kind": "gift", "user": alice, "gift_name": "Rose", "repeat_count": 1, "diamonds": 1, "text": "x"})
+    storage.add_event(s3, {"time": 7.0, "kind": "comment", "user": alice, "comment": "yo", "text": "x"})
+
+    summary = storage.session_summary(s1)
+    assert [(u["nickname"], u["gifts"], u["diamonds"]) for u in summary["users"]] == [("Bob", 1, 500), ("Alice", 7, 7)]
+    assert summary["users"][1]["items"] == {"Rose": 7}
+    assert [(g["name"], g["count"], g["diamonds_each"]) for g in summary["gifts"]] == [("Lion", 1, 500), ("Rose", 7, 1)]
+
+    rankings = storage.session_rankings(10)
+    assert rankings["likes"][0] == {**rankings["likes"][0], "session_id": s1, "value": 7}
+    assert rankings["gifts"][0]["session_id"] == s1 and rankings["gifts"][0]["value"] == 507
+
+    dashboard = storage.aggregate_dashboard()
+    assert dashboard["totals"]["gifts"] == 9 and dashboard["totals"]["diamonds"] == 508
+    assert dashboard["totals"]["comments"] == 2 and dashboard["totals"]["sessions"] == 3
+    streamers = {row["unique_id"]: row for row in dashboard["streamers"]}
+    assert streamers["streamer_a"]["sessions"] == 2 and streamers["streamer_a"]["diamonds"] == 508
+    assert streamers["streamer_b"]["comments"] == 1
+    gifters = {g["nickname"]: g for g in dashboard["top_gifters"]}
+    assert gifters["Alice"]["gifts"] == 8 and gifters["Alice"]["sessions"] == 2
+    assert [(g["name"], g["count"]) for g in dashboard["top_gifts"]] == [("Lion", 1), ("Rose", 8)]
+
+    # migration rebuild: summary tables are recomputed from events
+    with storage._lock:
+        storage._conn.execute("DELETE FROM session_totals")
+        storage._conn.execute("DELETE FROM session_gifters")
+        storage._conn.execute("PRAGMA user_version = 0")
+        storage._conn.commit()
+    storage.close()
+    storage = Storage(db_path)
+    assert storage.aggregate_dashboard() == dashboard
+    assert storage.session_summary(s1) == summary
+
+    storage.delete_session(s1)
+    assert storage.session_summary(s1) == {"users": [], "gifts": []}
+    assert storage.aggregate_dashboard()["totals"]["diamonds"] == 1
+    storage.close()
+    print("OK 集計tableの差分更新 (dashboard/ranking/summary) とmigration時の再構築")
+
+
 async def main():
     collector_mod.asyncio.sleep = fast_sleep
     collector_mod.TikTokLiveClient = FakeProbeFactory
@@ -305,6 +412,9 @@ async def main():
     await test_recovered_session_stats_shape()
     await test_stream_url_quality_selection()
     await test_recording_metadata_persistence()
+    await test_event_write_behind()
+    await test_aggregate_failure_in_row_fallback()
+    await test_incremental_aggregates()
     print("ALL TESTS PASSED")
 
 
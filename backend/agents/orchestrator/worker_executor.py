@@ -47,15 +47,20 @@ class WorkerExecutor:
         workflow_run_id:str="",
         completed_worker_ids:Optional[Set[str]]=None,
     )->Dict[str,Any]:
-        from ..task_dispatcher import TaskDAG,execute_dag_parallel
+        from config_loaders.workflow_config import get_dag_execution_settings
+        from ..task_dispatcher import TaskDAG,DagTimeline,SCHEDULER_READY_QUEUE,execute_dag
 
         _completed=completed_worker_ids or set()
         total_workers=len(worker_tasks)
         dag=TaskDAG(worker_tasks)
         layers=dag.get_execution_layers()
         layer_count=len(layers)
+        advanced=(leader_context.config or {}).get("advancedSettings",{})
+        dag_settings={**get_dag_execution_settings(),**(advanced.get("dagExecution") or {})}
+        scheduler=dag_settings.get("scheduler",SCHEDULER_READY_QUEUE)
+        max_parallel=int(dag_settings.get("max_parallel",0) or 0)
         get_logger().info(
-            f"DAG構築完了: {total_workers}タスク, {layer_count}レイヤー, レイヤー構成={[len(l) for l in layers]}"
+            f"DAG構築完了: {total_workers}タスク, {layer_count}レイヤー, レイヤー構成={[len(l) for l in layers]}, scheduler={scheduler}, max_parallel={max_parallel or '無制限'}"
         )
         self._emit_progress(
             leader_context.agent_type.value,
@@ -112,7 +117,29 @@ class WorkerExecutor:
                 f"Layer {layer_idx + 1}/{layer_count} ({parallel_label}): {', '.join(task_names)}",
             )
 
-        dag_results=await execute_dag_parallel(dag,_exec_single,on_layer_start=_on_layer_start)
+        def _on_task_start(task_id:str,started:int,total:int)->None:
+            task_data=dag.get_task(task_id) or {}
+            progress=30+int(((started-1)/max(total,1))*50)
+            self._emit_progress(
+                leader_context.agent_type.value,
+                progress,
+                f"Worker開始 {started}/{total}: {task_data.get('worker','?')}",
+            )
+
+        timeline=DagTimeline(scheduler)
+        dag_results=await execute_dag(
+            dag,
+            _exec_single,
+            scheduler=scheduler,
+            max_parallel=max_parallel,
+            on_layer_start=_on_layer_start,
+            on_task_start=_on_task_start,
+            timeline=timeline,
+        )
+        results["dag_timeline"]=timeline.to_dict()
+        get_logger().info(
+            f"DAG実行完了: scheduler={scheduler}, makespan={timeline.makespan_ms}ms, 最大同時実行={timeline.max_concurrency()}"
+        )
 
         for tid,result in dag_results:
             if isinstance(result,Exception):
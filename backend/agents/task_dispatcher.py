@@ -1,18 +1,27 @@
 import asyncio
+import heapq
+import itertools
+import time
 from collections import defaultdict,deque
 from typing import Any,Callable,Coroutine,Dict,List,Optional,Set,Tuple
 from middleware.logger import get_logger
 
+SCHEDULER_READY_QUEUE="ready_queue"
+SCHEDULER_LAYERED="layered"
+DAG_SCHEDULERS=(SCHEDULER_READY_QUEUE,SCHEDULER_LAYERED)
+
 
 class TaskDAG:
  def __init__(self,tasks:List[Dict[str,Any]]):
   self._tasks={t["id"]:t for t in tasks}
   self._adj:Dict[str,Set[str]]=defaultdict(set)
+  self._deps:Dict[str,Set[str]]={t["id"]:set() for t in tasks}
   self._in_degree:Dict[str,int]={t["id"]:0 for t in tasks}
   for t in tasks:
    for dep in t.get("depends_on",[]):
-    if dep in self._tasks:
+    if dep in self._tasks and dep not in self._deps[t["id"]]:
      self._adj[dep].add(t["id"])
+     self._deps[t["id"]].add(dep)
      self._in_degree[t["id"]]+=1
 
  def get_execution_layers(self)->List[List[str]]:
@@ -38,11 +47,81 @@ class TaskDAG:
  def get_task(self,task_id:str)->Optional[Dict[str,Any]]:
   return self._tasks.get(task_id)
 
+ def get_dependencies(self,task_id:str)->Set[str]:
+  return set(self._deps.get(task_id,()))
+
+ def get_dependents(self,task_id:str)->Set[str]:
+  return set(self._adj.get(task_id,()))
+
+ @property
+ def task_ids(self)->List[str]:
+  return list(self._tasks.keys())
+
+ def get_critical_path_lengths(self,weight_fn:Optional[Callable[[Dict[str,Any]],float]]=None)->Dict[str,float]:
+  weight=weight_fn or(lambda task:1.0)
+  order=[tid for layer in self.get_execution_layers() for tid in layer]
+  lengths:Dict[str,float]={}
+  for tid in reversed(order):
+   downstream=[lengths[c] for c in self._adj[tid] if c in lengths]
+   lengths[tid]=weight(self._tasks[tid])+(max(downstream) if downstream else 0.0)
+  return lengths
+
  @property
  def task_count(self)->int:
   return len(self._tasks)
 
 
+class DagTimeline:
+ def __init__(self,scheduler:str):
+  self.scheduler=scheduler
+  self._origin=time.perf_counter()
+  self._spans:Dict[str,List[Any]]={}
+
+ def start(self,task_id:str)->None:
+  self._spans[task_id]=[time.perf_counter()-self._origin,None,"running"]
+
+ def finish(self,task_id:str,status:str)->None:
+  span=self._spans.get(task_id)
+  if span:
+   span[1]=time.perf_counter()-self._origin
+   span[2]=status
+
+ @property
+ def makespan_ms(self)->float:
+  ends=[span[1] for span in self._spans.values() if span[1] is not None]
+  return round(max(ends)*1000,1) if ends else 0.0
+
+ def max_concurrency(self)->int:
+  points=[]
+  for start,end,_ in self._spans.values():
+   points.append((start,1))
+   if end is not None:
+    points.append((end,-1))
+  peak=0
+  current=0
+  for _,delta in sorted(points):
+   current+=delta
+   peak=max(peak,current)
+  return peak
+
+ def to_dict(self)->Dict[str,Any]:
+  tasks=[]
+  for task_id,(start,end,status) in sorted(self._spans.items(),key=lambda item:item[1][0]):
+   tasks.append({
+    "taskId":task_id,
+    "startMs":round(start*1000,1),
+    "endMs":round(end*1000,1) if end is not None else None,
+    "durationMs":round((end-start)*1000,1) if end is not None else None,
+    "status":status,
+   })
+  return {
+   "scheduler":self.scheduler,
+   "makespanMs":self.makespan_ms,
+   "maxConcurrency":self.max_concurrency(),
+   "tasks":tasks,
+  }
+
+
 def normalize_worker_tasks(raw_tasks:List[Dict[str,Any]])->List[Dict[str,Any]]:
  normalized=[]
  for i,t in enumerate(raw_tasks):
@@ -56,10 +135,24 @@ def normalize_worker_tasks(raw_tasks:List[Dict[str,Any]])->List[Dict[str,Any]]:
  return normalized
 
 
+async def _run_timed(tid:str,coro:Coroutine[Any,Any,Any],timeline:Optional[DagTimeline])->Any:
+ if timeline:
+  timeline.start(tid)
+ status="failed"
+ try:
+  result=await coro
+  status="completed"
+  return result
+ finally:
+  if timeline:
+   timeline.finish(tid,status)
+
+
 async def execute_dag_parallel(
  dag:TaskDAG,
  execute_fn:Callable[[Dict[str,Any]],Coroutine[Any,Any,Any]],
  on_layer_start:Optional[Callable[[int,List[str]],None]]=None,
+ timeline:Optional[DagTimeline]=None,
 )->List[Tuple[str,Any]]:
  layers=dag.get_execution_layers()
  all_results:List[Tuple[str,Any]]=[]
@@ -72,7 +165,7 @@ async def execute_dag_parallel(
   for tid in layer:
    task_data=dag.get_task(tid)
    if task_data:
-    tasks_to_run.append((tid,execute_fn(task_data)))
+    tasks_to_run.append((tid,_run_timed(tid,execute_fn(task_data),timeline)))
   if len(tasks_to_run)==1:
    tid,coro=tasks_to_run[0]
    result=await coro
@@ -85,3 +178,77 @@ async def execute_dag_parallel(
      logger.error(f"DAGタスク例外: {tid}: {result}",exc_info=True)
     all_results.append((tid,result))
  return all_results
+
+
+async def execute_dag_ready_queue(
+ dag:TaskDAG,
+ execute_fn:Callable[[Dict[str,Any]],Coroutine[Any,Any,Any]],
+ max_parallel:int=0,
+ on_task_start:Optional[Callable[[str,int,int],None]]=None,
+ timeline:Optional[DagTimeline]=None,
+)->List[Tuple[str,Any]]:
+ logger=get_logger()
+ priority=dag.get_critical_path_lengths()
+ remaining={tid:len(dag.get_dependencies(tid)) for tid in dag.task_ids}
+ pending=set(remaining)
+ ready:List[Tuple[float,int,str]]=[]
+ seq=itertools.count()
+ limit=max_parallel if max_parallel>0 else max(dag.task_count,1)
+ running:Dict[asyncio.Future,str]={}
+ results:Dict[str,Any]={}
+ started=0
+
+ def push(tid:str)->None:
+  pending.discard(tid)
+  heapq.heappush(ready,(-priority.get(tid,0.0),next(seq),tid))
+
+ for tid,count in remaining.items():
+  if count==0:
+   push(tid)
+ try:
+  while ready or running or pending:
+   if not ready and not running:
+    logger.warning(f"DAG循環検出、残タスクを依存関係を無視して実行: {pending}")
+    for tid in list(pending):
+     push(tid)
+   while ready and len(running)<limit:
+    _,_,tid=heapq.heappop(ready)
+    started+=1
+    if on_task_start:
+     on_task_start(tid,started,dag.task_count)
+    logger.info(f"DAGタスク開始: {tid} (実行中{len(running)+1}/{limit}, 待機{len(ready)})")
+    running[asyncio.ensure_future(_run_timed(tid,execute_fn(dag.get_task(tid)),timeline))]=tid
+   done,_=await asyncio.wait(running,return_when=asyncio.FIRST_COMPLETED)
+   for fut in done:
+    tid=running.pop(fut)
+    try:
+     results[tid]=fut.result()
+    except Exception as e:
+     logger.error(f"DAGタスク例外: {tid}: {e}",exc_info=True)
+     results[tid]=e
+    for child in dag.get_dependents(tid):
+     if child in pending:
+      remaining[child]-=1
+      if remaining[child]==0:
+       push(child)
+ finally:
+  for fut in running:
+   fut.cancel()
+ order=[tid for layer in dag.get_execution_layers() for tid in layer]
+ return [(tid,results[tid]) for tid in order if tid in results]
+
+
+async def execute_dag(
+ dag:TaskDAG,
+ execute_fn:Callable[[Dict[str,Any]],Coroutine[Any,Any,Any]],
+ scheduler:str=SCHEDULER_READY_QUEUE,
+ max_parallel:int=0,
+ on_layer_start:Optional[Callable[[int,List[str]],None]]=None,
+ on_task_start:Optional[Callable[[str,int,int],None]]=None,
+ timeline:Optional[DagTimeline]=None,
+)->List[Tuple[str,Any]]:
+ if scheduler==SCHEDULER_LAYERED:
+  return await execute_dag_parallel(dag,execute_fn,on_layer_start=on_layer_start,timeline=timeline)
+ if scheduler!=SCHEDULER_READY_QUEUE:
+  get_logger().warning(f"不明なDAGスケジューラ: {scheduler}, {SCHEDULER_READY_QUEUE}を使用")
+ return await execute_dag_ready_queue(dag,execute_fn,max_parallel=max_parallel,on_task_start=on_task_start,timeline=timeline)
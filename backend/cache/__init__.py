@@ -3,6 +3,8 @@ from .file_manager import FileManager,get_file_manager
 from .content_cache import ProjectFileCache,FileEntry,DirEntry
 from .metadata_store import FileMetadataStore
 from .watcher import FileWatcher
+from .trigram_index import TrigramIndex
+from .eviction import ContentBudget,get_content_budget
 __all__=[
     "FileCacheConfig",
     "get_file_cache_config",
@@ -13,4 +15,7 @@ __all__=[
     "DirEntry",
     "FileMetadataStore",
     "FileWatcher",
+    "TrigramIndex",
+    "ContentBudget",
+    "get_content_budget",
 ]
@@ -26,10 +26,10 @@ class FileCacheConfig:
     def _get_defaults(self)->Dict[str,Any]:
         return {
             "enabled":True,
-            "content_cache":{"max_size_mb":1024,"max_file_size_mb":10},
+            "content_cache":{"max_size_mb":1024,"global_max_size_mb":2048,"max_file_size_mb":10,"eviction_policy":"lru","load_mode":"lazy","preload_workers":4},
             "tree_cache":{"persist_to_db":True},
             "metadata":{"track_access_stats":True},
-            "watcher":{"enabled":True,"debounce_ms":300},
+            "watcher":{"enabled":True,"debounce_ms":300,"max_batch_ms":2000,"reload_workers":4},
             "binary_extensions":[".png",".jpg",".jpeg",".gif",".mp3",".wav",".mp4",".zip",".exe",".dll",".pdf"],
             "ignore_dirs":["node_modules","__pycache__",".git",".venv","dist","build"],
         }
@@ -43,6 +43,21 @@ class FileCacheConfig:
     def content_max_size_bytes(self)->int:
         return self.content_max_size_mb*1024*1024
     @property
+    def global_max_size_mb(self)->int:
+        return self._config.get("content_cache",{}).get("global_max_size_mb",2048)
+    @property
+    def global_max_size_bytes(self)->int:
+        return self.global_max_size_mb*1024*1024
+    @property
+    def eviction_policy(self)->str:
+        return self._config.get("content_cache",{}).get("eviction_policy","lru")
+    @property
+    def load_mode(self)->str:
+        return self._config.get("content_cache",{}).get("load_mode","lazy")
+    @property
+    def preload_workers(self)->int:
+        return self._config.get("content_cache",{}).get("preload_workers",4)
+    @property
     def max_file_size_mb(self)->int:
         return self._config.get("content_cache",{}).get("max_file_size_mb",10)
     @property
@@ -61,6 +76,12 @@ class FileCacheConfig:
     def watcher_debounce_ms(self)->int:
         return self._config.get("watcher",{}).get("debounce_ms",300)
     @property
+    def watcher_max_batch_ms(self)->int:
+        return self._config.get("watcher",{}).get("max_batch_ms",2000)
+    @property
+    def watcher_reload_workers(self)->int:
+        return self._config.get("watcher",{}).get("reload_workers",4)
+    @property
     def binary_extensions(self)->Set[str]:
         exts=self._config.get("binary_extensions",[])
         return set(exts)
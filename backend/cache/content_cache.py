@@ -1,11 +1,18 @@
-from typing import Any,Dict,List,Optional,Set
+from typing import Any,Dict,List,Optional,Set,Tuple
+from collections import OrderedDict
 from dataclasses import dataclass,field
 from datetime import datetime
+from itertools import islice
+import queue
 import threading
+import time
 import os
 import re
 import fnmatch
 from .config import FileCacheConfig
+from .eviction import ContentBudget,get_content_budget
+from .trigram_index import TrigramIndex
+_LFU_SAMPLE_SIZE=16
 @dataclass
 class FileEntry:
     path:str
@@ -16,6 +23,7 @@ class FileEntry:
     created_at:datetime=field(default_factory=datetime.now)
     last_accessed_at:datetime=field(default_factory=datetime.now)
     access_count:int=0
+    evicted:bool=False
     def touch(self)->None:
         self.last_accessed_at=datetime.now()
         self.access_count+=1
@@ -25,7 +33,7 @@ class DirEntry:
     children:List[str]=field(default_factory=list)
     mtime:float=0
 class ProjectFileCache:
-    def __init__(self,config:FileCacheConfig,project_id:str,working_dir:str):
+    def __init__(self,config:FileCacheConfig,project_id:str,working_dir:str,budget:Optional[ContentBudget]=None):
         self._config=config
         self._project_id=project_id
         self._working_dir=os.path.normpath(working_dir)
@@ -33,12 +41,84 @@ class ProjectFileCache:
         self._dirs:Dict[str,DirEntry]={}
         self._lock=threading.RLock()
         self._current_size_bytes=0
+        self._resident:"OrderedDict[str,int]"=OrderedDict()
+        self._evictions=0
+        self._reloads=0
         self._hits=0
         self._misses=0
         self._loaded=False
+        self._cond=threading.Condition(self._lock)
+        self._index=TrigramIndex()
+        self._index_state="idle"
+        self._index_generation=0
+        self._searches=0
+        self._indexed_searches=0
+        self._candidate_files=0
+        self._budget=budget if budget is not None else get_content_budget()
+        self._budget.register(self)
+        self._load_mode="eager"
+        self._scan_ms=0.0
+        self._preload_generation=0
+        self._preload_state="idle"
+        self._preload_total=0
+        self._preload_done=0
+        self._preload_workers=0
+        self._preload_started_at:Optional[float]=None
+        self._preload_finished_at:Optional[float]=None
     @property
     def is_loaded(self)->bool:
         return self._loaded
+    @property
+    def size_bytes(self)->int:
+        return self._current_size_bytes
+    @property
+    def _max_size_bytes(self)->int:
+        return self._config.content_max_size_bytes
+    def _set_resident(self,rel_path:str,size:int)->None:
+        self._drop_resident(rel_path)
+        self._resident[rel_path]=size
+        self._current_size_bytes+=size
+    def _drop_resident(self,rel_path:str)->int:
+        size=self._resident.pop(rel_path,0)
+        self._current_size_bytes-=size
+        return size
+    def _select_victim(self,protect:Optional[str]=None)->Optional[str]:
+        if self._config.eviction_policy=="lfu":
+            sample=[p for p in islice(self._resident,_LFU_SAMPLE_SIZE+1) if p!=protect][:_LFU_SAMPLE_SIZE]
+            if not sample:
+                return None
+            return min(sample,key=lambda p:(self._files[p].access_count,self._files[p].last_accessed_at))
+        for path in self._resident:
+            if path!=protect:
+                return path
+        return None
+    def _evict_locked(self,rel_path:str)->int:
+        entry=self._files.get(rel_path)
+        freed=self._drop_resident(rel_path)
+        if entry is not None:
+            entry.content=None
+            entry.evicted=True
+        self._evictions+=1
+        return freed
+    def _enforce_budget_locked(self,protect:Optional[str]=None)->None:
+        max_bytes=self._max_size_bytes
+        while self._current_size_bytes>max_bytes:
+            victim=self._select_victim(protect)
+            if victim is None:
+                break
+            self._evict_locked(victim)
+    def evict_one(self)->int:
+        with self._lock:
+            victim=self._select_victim()
+            if victim is None:
+                return 0
+            return self._evict_locked(victim)
+    def oldest_access(self)->Optional[datetime]:
+        with self._lock:
+            victim=self._select_victim()
+            if victim is None:
+                return None
+            return self._files[victim].last_accessed_at
     def _is_binary_content(self,data:bytes,sample_size:int=8192)->bool:
         if data.startswith((
             b'\xef\xbb\xbf',
@@ -51,13 +131,19 @@ class ProjectFileCache:
         sample=data[:sample_size]
         return b'\x00' in sample
     def load_all(self)->Dict[str,Any]:
+        started=time.perf_counter()
         with self._lock:
+            self._cancel_preload_locked()
             self._files.clear()
             self._dirs.clear()
             self._current_size_bytes=0
-            stats={"files":0,"dirs":0,"binary":0,"skipped":0,"total_size":0}
+            self._resident.clear()
+            self._reset_index_locked()
+            stats={"files":0,"dirs":0,"binary":0,"skipped":0,"deferred":0,"total_size":0}
             ignore_dirs=self._config.ignore_dirs
+            binary_extensions=self._config.binary_extensions
             max_file_size=self._config.max_file_size_bytes
+            content_limit=min(self._max_size_bytes,self._budget.available_bytes())
             for root,dirs,files in os.walk(self._working_dir):
                 dirs[:]=[d for d in dirs if d not in ignore_dirs and not d.startswith(".")]
                 rel_root=os.path.relpath(root,self._working_dir)
@@ -89,6 +175,10 @@ class ProjectFileCache:
                         if file_stat.st_size>max_file_size:
                             entry.is_binary=True
                             stats["skipped"]+=1
+                        elif self._current_size_bytes+file_stat.st_size>content_limit:
+                            entry.is_binary=os.path.splitext(filename)[1].lower() in binary_extensions
+                            entry.evicted=not entry.is_binary
+                            stats["deferred"]+=1
                         else:
                             with open(filepath,"rb") as f:
                                 data=f.read()
@@ -98,34 +188,195 @@ class ProjectFileCache:
                             else:
                                 entry.content=data.decode("utf-8",errors="replace")
                                 entry.is_binary=False
-                                self._current_size_bytes+=len(data)
+                                self._set_resident(rel_path,len(data))
                         self._files[rel_path]=entry
                         stats["files"]+=1
                         stats["total_size"]+=file_stat.st_size
                     except OSError:
                         pass
             self._loaded=True
+            self._load_mode="eager"
+            self._scan_ms=(time.perf_counter()-started)*1000
             return stats
-    def get_file(self,rel_path:str)->Optional[FileEntry]:
+    def scan_tree(self)->Dict[str,Any]:
+        started=time.perf_counter()
+        with self._lock:
+            self._cancel_preload_locked()
+            self._files.clear()
+            self._dirs.clear()
+            self._current_size_bytes=0
+            self._resident.clear()
+            self._reset_index_locked()
+            stats={"files":0,"dirs":0,"binary":0,"skipped":0,"deferred":0,"total_size":0}
+            ignore_dirs=self._config.ignore_dirs
+            binary_extensions=self._config.binary_extensions
+            max_file_size=self._config.max_file_size_bytes
+            stack=[""]
+            while stack:
+                rel_root=stack.pop()
+                full_root=os.path.join(self._working_dir,rel_root) if rel_root else self._working_dir
+                try:
+                    with os.scandir(full_root) as it:
+                        dir_entries=list(it)
+                    dir_stat=os.stat(full_root)
+                except OSError:
+                    continue
+                subdirs=[]
+                files=[]
+                for de in dir_entries:
+                    try:
+                        is_dir=de.is_dir()
+                    except OSError:
+                        is_dir=False
+                    if not is_dir:
+                        files.append(de)
+                    elif de.name not in ignore_dirs and not de.name.startswith("."):
+                        subdirs.append(de)
+                children=[os.path.join(rel_root,de.name) if rel_root else de.name for de in subdirs+files]
+                self._dirs[rel_root]=DirEntry(path=rel_root,children=children,mtime=dir_stat.st_mtime)
+                stats["dirs"]+=1
+                for de in files:
+                    rel_path=os.path.join(rel_root,de.name) if rel_root else de.name
+                    try:
+                        file_stat=de.stat()
+                    except OSError:
+                        continue
+                    entry=FileEntry(path=rel_path,size=file_stat.st_size,mtime=file_stat.st_mtime)
+                    if file_stat.st_size>max_file_size:
+                        entry.is_binary=True
+                        stats["skipped"]+=1
+                    elif os.path.splitext(de.name)[1].lower() in binary_extensions:
+                        entry.is_binary=True
+                        stats["binary"]+=1
+                    else:
+                        entry.evicted=True
+                        stats["deferred"]+=1
+                    self._files[rel_path]=entry
+                    stats["files"]+=1
+                    stats["total_size"]+=file_stat.st_size
+                for de in reversed(subdirs):
+                    stack.append(os.path.join(rel_root,de.name) if rel_root else de.name)
+            self._loaded=True
+            self._load_mode="lazy"
+            self._scan_ms=(time.perf_counter()-started)*1000
+            return stats
+    def start_preload(self,max_workers:int=4)->int:
+        with self._lock:
+            generation=self._preload_generation
+            pending=[p for p,e in self._files.items() if e.evicted]
+            self._preload_total=len(pending)
+            self._preload_done=0
+            self._preload_started_at=time.perf_counter()
+            self._preload_finished_at=None
+            if not pending:
+                self._preload_state="done"
+                self._preload_finished_at=self._preload_started_at
+                return 0
+            self._preload_state="running"
+            self._preload_workers=max(1,min(max_workers,len(pending)))
+            workers=self._preload_workers
+        work:"queue.Queue[str]"=queue.Queue()
+        for rel_path in pending:
+            work.put(rel_path)
+        for i in range(workers):
+            threading.Thread(target=self._preload_worker,args=(work,generation),daemon=True,name=f"file-preload-{self._project_id}-{i}").start()
+        return len(pending)
+    def _preload_worker(self,work:"queue.Queue[str]",generation:int)->None:
+        while self._preload_generation==generation:
+            try:
+                rel_path=work.get_nowait()
+            except queue.Empty:
+                break
+            if self._current_size_bytes>=self._max_size_bytes or self._budget.available_bytes()<=0:
+                with self._lock:
+                    if self._preload_generation==generation:
+                        self._preload_state="budget_limited"
+                        self._cond.notify_all()
+                break
+            with self._lock:
+                entry=self._files.get(rel_path)
+                pending=entry is not None and entry.evicted
+            if pending:
+                data=self._read_disk_bytes(rel_path)
+                if data is not None:
+                    self._install_content(rel_path,entry,data)
+            with self._lock:
+                if self._preload_generation==generation:
+                    self._preload_done+=1
+        with self._lock:
+            if self._preload_generation!=generation:
+                return
+            self._preload_workers-=1
+            if self._preload_workers<=0:
+                if self._preload_state=="running":
+                    self._preload_state="done"
+                self._preload_finished_at=time.perf_counter()
+                self._cond.notify_all()
+    def wait_for_preload(self,timeout:Optional[float]=None)->bool:
+        with self._lock:
+            return self._cond.wait_for(lambda:self._preload_state!="running",timeout)
+    def _cancel_preload_locked(self)->None:
+        self._preload_generation+=1
+        if self._preload_state=="running":
+            self._preload_state="cancelled"
+        self._preload_workers=0
+        self._cond.notify_all()
+    def _read_disk_bytes(self,rel_path:str)->Optional[bytes]:
+        try:
+            with open(os.path.join(self._working_dir,rel_path),"rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    def _read_disk_text(self,rel_path:str)->Optional[str]:
+        data=self._read_disk_bytes(rel_path)
+        if data is None or self._is_binary_content(data):
+            return None
+        return data.decode("utf-8",errors="replace")
+    def _lookup(self,rel_path:str)->Tuple[Optional[FileEntry],Optional[str]]:
         with self._lock:
             entry=self._files.get(rel_path)
-            if entry:
-                entry.touch()
-                self._hits+=1
-            else:
+            if not entry:
                 self._misses+=1
-            return entry
+                return None,None
+            entry.touch()
+            if not entry.evicted:
+                self._hits+=1
+                if rel_path in self._resident:
+                    self._resident.move_to_end(rel_path)
+                return entry,entry.content
+        data=self._read_disk_bytes(rel_path)
+        if data is None:
+            return entry,entry.content
+        with self._lock:
+            self._reloads+=1
+        return entry,self._install_content(rel_path,entry,data)
+    def _install_content(self,rel_path:str,entry:FileEntry,data:bytes)->Optional[str]:
+        with self._lock:
+            if self._files.get(rel_path) is not entry or not entry.evicted:
+                return entry.content
+            entry.evicted=False
+            entry.size=len(data)
+            if self._is_binary_content(data):
+                entry.is_binary=True
+                self._index.remove(rel_path)
+                return None
+            content=data.decode("utf-8",errors="replace")
+            entry.content=content
+            self._index.add(rel_path,content)
+            self._set_resident(rel_path,len(data))
+            self._enforce_budget_locked(protect=rel_path)
+        self._budget.enforce()
+        return content
+    def get_file(self,rel_path:str)->Optional[FileEntry]:
+        entry,_=self._lookup(rel_path)
+        return entry
     def get_file_content(self,rel_path:str)->Optional[str]:
-        entry=self.get_file(rel_path)
+        entry,content=self._lookup(rel_path)
         if entry and not entry.is_binary:
-            return entry.content
+            return content
         return None
     def put_file(self,rel_path:str,content:str,mtime:float=None)->None:
         with self._lock:
-            if rel_path in self._files:
-                old_entry=self._files[rel_path]
-                if old_entry.content:
-                    self._current_size_bytes-=len(old_entry.content.encode("utf-8"))
             entry=FileEntry(
                 path=rel_path,
                 content=content,
@@ -134,50 +385,68 @@ class ProjectFileCache:
                 is_binary=False,
             )
             self._files[rel_path]=entry
-            self._current_size_bytes+=entry.size
+            self._set_resident(rel_path,entry.size)
+            self._index.add(rel_path,content)
             dir_path=os.path.dirname(rel_path)
             self._update_dir_children(dir_path,rel_path,add=True)
+            self._enforce_budget_locked(protect=rel_path)
+        self._budget.enforce()
     def remove_file(self,rel_path:str)->None:
         with self._lock:
             if rel_path in self._files:
-                entry=self._files.pop(rel_path)
-                if entry.content:
-                    self._current_size_bytes-=len(entry.content.encode("utf-8"))
+                self._files.pop(rel_path)
+                self._drop_resident(rel_path)
+                self._index.remove(rel_path)
                 dir_path=os.path.dirname(rel_path)
                 self._update_dir_children(dir_path,rel_path,add=False)
     def update_file_from_disk(self,rel_path:str)->bool:
-        full_path=os.path.join(self._working_dir,rel_path)
-        if not os.path.exists(full_path):
-            self.remove_file(rel_path)
+        entry=self.load_entry_from_disk(rel_path)
+        if entry is None:
+            if not os.path.exists(os.path.join(self._working_dir,rel_path)):
+                self.remove_file(rel_path)
             return False
+        self.install_entries([entry])
+        return True
+    def load_entry_from_disk(self,rel_path:str)->Optional[FileEntry]:
+        full_path=os.path.join(self._working_dir,rel_path)
         try:
             file_stat=os.stat(full_path)
-            ext=os.path.splitext(rel_path)[1].lower()
-            is_binary=ext in self._config.binary_extensions
-            with self._lock:
-                if rel_path in self._files:
-                    old_entry=self._files[rel_path]
-                    if old_entry.content:
-                        self._current_size_bytes-=len(old_entry.content.encode("utf-8"))
-                entry=FileEntry(
-                    path=rel_path,
-                    size=file_stat.st_size,
-                    mtime=file_stat.st_mtime,
-                    is_binary=is_binary,
-                )
-                if not is_binary and file_stat.st_size<=self._config.max_file_size_bytes:
-                    try:
-                        with open(full_path,"r",encoding="utf-8",errors="replace") as f:
-                            entry.content=f.read()
-                        self._current_size_bytes+=len(entry.content.encode("utf-8"))
-                    except Exception:
-                        entry.is_binary=True
+        except OSError:
+            return None
+        ext=os.path.splitext(rel_path)[1].lower()
+        is_binary=ext in self._config.binary_extensions
+        entry=FileEntry(
+            path=rel_path,
+            size=file_stat.st_size,
+            mtime=file_stat.st_mtime,
+            is_binary=is_binary,
+        )
+        if not is_binary and file_stat.st_size<=self._config.max_file_size_bytes:
+            try:
+                with open(full_path,"r",encoding="utf-8",errors="replace") as f:
+                    entry.content=f.read()
+            except Exception:
+                entry.is_binary=True
+        return entry
+    def install_entries(self,entries:List[FileEntry],removed:Optional[List[str]]=None)->None:
+        with self._lock:
+            for rel_path in removed or []:
+                self.remove_file(rel_path)
+            for entry in entries:
+                rel_path=entry.path
+                self._drop_resident(rel_path)
+                if entry.content is not None:
+                    self._set_resident(rel_path,len(entry.content.encode("utf-8")))
                 self._files[rel_path]=entry
+                if entry.content is not None:
+                    self._index.add(rel_path,entry.content)
+                else:
+                    self._index.remove(rel_path)
                 dir_path=os.path.dirname(rel_path)
                 self._update_dir_children(dir_path,rel_path,add=True)
-            return True
-        except OSError:
-            return False
+            if entries:
+                self._enforce_budget_locked(protect=entries[-1].path)
+        self._budget.enforce()
     def get_dir(self,rel_path:str)->Optional[DirEntry]:
         with self._lock:
             return self._dirs.get(rel_path)
@@ -201,6 +470,8 @@ class ProjectFileCache:
             files_to_remove=[p for p in self._files.keys() if p==rel_path or p.startswith(prefix)]
             for f in files_to_remove:
                 del self._files[f]
+                self._drop_resident(f)
+                self._index.remove(f)
                 removed_files.append(f)
             dirs_to_remove=[p for p in self._dirs.keys() if p==rel_path or p.startswith(prefix)]
             for d in dirs_to_remove:
@@ -244,32 +515,81 @@ class ProjectFileCache:
                 if fnmatch.fnmatch(filename,pattern):
                     results.append(path)
             return results
+    def _reset_index_locked(self)->None:
+        self._index_generation+=1
+        self._index.clear()
+        self._index_state="idle"
+        self._cond.notify_all()
+    def _ensure_index_locked(self)->None:
+        if self._index_state!="idle":
+            return
+        self._index_state="building"
+        snapshot=[(p,e) for p,e in self._files.items() if not e.is_binary and p not in self._index]
+        threading.Thread(target=self._build_index,args=(snapshot,self._index_generation),daemon=True,name=f"file-index-{self._project_id}").start()
+    def _build_index(self,snapshot:List[Tuple[str,FileEntry]],generation:int)->None:
+        for path,entry in snapshot:
+            if self._index_generation!=generation:
+                return
+            content=entry.content
+            if content is None:
+                content=self._read_disk_text(path)
+            if content is None:
+                continue
+            with self._lock:
+                if self._index_generation!=generation:
+                    return
+                if self._files.get(path) is entry and path not in self._index:
+                    self._index.add(path,content)
+        with self._lock:
+            if self._index_generation==generation:
+                self._index_state="ready"
+                self._cond.notify_all()
+    def wait_for_index(self,timeout:Optional[float]=None)->bool:
+        with self._lock:
+            self._ensure_index_locked()
+            return self._cond.wait_for(lambda:self._index_state!="building",timeout)
     def search_content(self,pattern:str,file_pattern:str="*",case_sensitive:bool=True,max_results:int=100,context_lines:int=2)->List[Dict[str,Any]]:
+        flags=0 if case_sensitive else re.IGNORECASE
+        try:
+            regex=re.compile(pattern,flags)
+        except re.error:
+            regex=re.compile(re.escape(pattern),flags)
         with self._lock:
-            flags=0 if case_sensitive else re.IGNORECASE
-            try:
-                regex=re.compile(pattern,flags)
-            except re.error:
-                regex=re.compile(re.escape(pattern),flags)
-            results=[]
+            self._ensure_index_locked()
+            candidates=self._index.candidates(regex.pattern,flags) if self._index_state=="ready" else None
+            self._searches+=1
+            if candidates is not None:
+                self._indexed_searches+=1
+            targets=[]
             for path,entry in self._files.items():
-                if len(results)>=max_results:
-                    break
-                if entry.is_binary or entry.content is None:
+                if candidates is not None and path not in candidates:
                     continue
-                filename=os.path.basename(path)
-                if not fnmatch.fnmatch(filename,file_pattern):
+                if entry.is_binary or (entry.content is None and not entry.evicted):
                     continue
-                lines=entry.content.split("\n")
-                for i,line in enumerate(lines):
-                    if len(results)>=max_results:
-                        break
-                    if regex.search(line):
-                        start=max(0,i-context_lines)
-                        end=min(len(lines),i+context_lines+1)
-                        context=[{"line_no":j+1,"content":lines[j],"is_match":j==i} for j in range(start,end)]
-                        results.append({"file":path,"line_no":i+1,"line":line,"context":context})
-            return results
+                if not fnmatch.fnmatch(os.path.basename(path),file_pattern):
+                    continue
+                targets.append((path,entry.content))
+            self._candidate_files+=len(targets)
+        return self._scan_content(targets,regex,max_results,context_lines)
+    def _scan_content(self,targets:List[Tuple[str,Optional[str]]],regex:re.Pattern,max_results:int,context_lines:int)->List[Dict[str,Any]]:
+        results=[]
+        for path,content in targets:
+            if len(results)>=max_results:
+                break
+            if content is None:
+                content=self._read_disk_text(path)
+                if content is None:
+                    continue
+            lines=content.split("\n")
+            for i,line in enumerate(lines):
+                if len(results)>=max_results:
+                    break
+                if regex.search(line):
+                    start=max(0,i-context_lines)
+                    end=min(len(lines),i+context_lines+1)
+                    context=[{"line_no":j+1,"content":lines[j],"is_match":j==i} for j in range(start,end)]
+                    results.append({"file":path,"line_no":i+1,"line":line,"context":context})
+        return results
     def get_all_files(self)->Dict[str,FileEntry]:
         with self._lock:
             return dict(self._files)
@@ -300,15 +620,21 @@ class ProjectFileCache:
         return items
     def clear(self)->None:
         with self._lock:
+            self._cancel_preload_locked()
             self._files.clear()
             self._dirs.clear()
             self._current_size_bytes=0
+            self._resident.clear()
+            self._reset_index_locked()
             self._loaded=False
     def get_stats(self)->Dict[str,Any]:
         with self._lock:
             total_requests=self._hits+self._misses
             hit_rate=self._hits/total_requests if total_requests>0 else 0.0
             binary_count=sum(1 for f in self._files.values() if f.is_binary)
+            evicted_count=sum(1 for f in self._files.values() if f.evicted)
+            preload_end=self._preload_finished_at or time.perf_counter()
+            preload_ms=(preload_end-self._preload_started_at)*1000 if self._preload_started_at else 0.0
             text_count=len(self._files)-binary_count
             return {
                 "loaded":self._loaded,
@@ -319,7 +645,29 @@ class ProjectFileCache:
                 "size_bytes":self._current_size_bytes,
                 "size_mb":round(self._current_size_bytes/(1024*1024),2),
                 "max_size_mb":self._config.content_max_size_mb,
+                "resident_files":len(self._resident),
+                "evicted_files":evicted_count,
+                "evictions":self._evictions,
+                "reloads":self._reloads,
+                "eviction_policy":self._config.eviction_policy,
                 "hits":self._hits,
                 "misses":self._misses,
                 "hit_rate":round(hit_rate,4),
+                "load":{
+                    "mode":self._load_mode,
+                    "scan_ms":round(self._scan_ms,2),
+                    "preload_state":self._preload_state,
+                    "preload_total":self._preload_total,
+                    "preload_done":self._preload_done,
+                    "preload_progress":round(self._preload_done/self._preload_total,4) if self._preload_total else 1.0,
+                    "preload_ms":round(preload_ms,2),
+                },
+                "search_index":{
+                    "built":self._index_state=="ready",
+                    "state":self._index_state,
+                    **self._index.get_stats(),
+                    "searches":self._searches,
+                    "indexed_searches":self._indexed_searches,
+                    "candidate_files":self._candidate_files,
+                },
             }
@@ -0,0 +1,73 @@
+from typing import Any,Dict,Optional,TYPE_CHECKING
+import threading
+import weakref
+from .config import get_file_cache_config
+if TYPE_CHECKING:
+    from .content_cache import ProjectFileCache
+class ContentBudget:
+    def __init__(self,max_bytes:int):
+        self._max_bytes=max_bytes
+        self._caches:"weakref.WeakSet[ProjectFileCache]"=weakref.WeakSet()
+        self._lock=threading.Lock()
+        self._evictions=0
+        self._evicted_bytes=0
+    @property
+    def max_bytes(self)->int:
+        return self._max_bytes
+    def register(self,cache:"ProjectFileCache")->None:
+        self._caches.add(cache)
+    def unregister(self,cache:"ProjectFileCache")->None:
+        self._caches.discard(cache)
+    def total_bytes(self)->int:
+        return sum(c.size_bytes for c in list(self._caches))
+    def available_bytes(self)->int:
+        return max(0,self._max_bytes-self.total_bytes())
+    def enforce(self)->int:
+        with self._lock:
+            total=self.total_bytes()
+            freed=0
+            while total>self._max_bytes:
+                victim=self._select_victim_cache()
+                if victim is None:
+                    break
+                released=victim.evict_one()
+                if released<=0:
+                    break
+                total-=released
+                freed+=released
+                self._evictions+=1
+                self._evicted_bytes+=released
+            return freed
+    def _select_victim_cache(self)->Optional["ProjectFileCache"]:
+        oldest=None
+        victim=None
+        for cache in list(self._caches):
+            accessed=cache.oldest_access()
+            if accessed is None:
+                continue
+            if oldest is None or accessed<oldest:
+                oldest=accessed
+                victim=cache
+        return victim
+    def get_stats(self)->Dict[str,Any]:
+        total=self.total_bytes()
+        return {
+            "projects":len(self._caches),
+            "size_bytes":total,
+            "size_mb":round(total/(1024*1024),2),
+            "max_size_mb":round(self._max_bytes/(1024*1024),2),
+            "evictions":self._evictions,
+            "evicted_bytes":self._evicted_bytes,
+        }
+_content_budget:Optional[ContentBudget]=None
+_content_budget_lock=threading.Lock()
+def get_content_budget()->ContentBudget:
+    global _content_budget
+    if _content_budget is None:
+        with _content_budget_lock:
+            if _content_budget is None:
+                _content_budget=ContentBudget(get_file_cache_config().global_max_size_bytes)
+    return _content_budget
+def reset_content_budget()->None:
+    global _content_budget
+    _content_budget=None
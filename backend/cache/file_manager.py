@@ -1,9 +1,13 @@
-from typing import Any,Dict,List,Optional,TYPE_CHECKING
+from typing import Any,Callable,Dict,List,Optional,Tuple,TYPE_CHECKING
+import atexit
 import os
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from .config import FileCacheConfig,get_file_cache_config
-from .content_cache import ProjectFileCache
+from .content_cache import FileEntry,ProjectFileCache
+from .eviction import get_content_budget
 from middleware.logger import get_logger
 if TYPE_CHECKING:
     from .watcher import FileWatcher
@@ -11,6 +15,33 @@ if TYPE_CHECKING:
 _project_caches:Dict[str,ProjectFileCache]={}
 _project_watchers:Dict[str,"FileWatcher"]={}
 _project_metadata_stores:Dict[str,"FileMetadataStore"]={}
+_project_change_stats:Dict[str,Dict[str,Any]]={}
+_change_listeners:List[Callable[[str,str,bool],None]]=[]
+def add_change_listener(listener:Callable[[str,str,bool],None])->None:
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+def remove_change_listener(listener:Callable[[str,str,bool],None])->None:
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+def _notify_change(full_path:str,event_type:str,is_directory:bool)->None:
+    for listener in list(_change_listeners):
+        try:
+            listener(full_path,event_type,is_directory)
+        except Exception as e:
+            get_logger().error(f"File change listener failed for {full_path}: {e}",exc_info=True)
+def flush_access_stats()->int:
+    flushed=0
+    for store in list(_project_metadata_stores.values()):
+        flushed+=store.flush_access()
+    return flushed
+atexit.register(flush_access_stats)
+def is_path_watched(path:str)->bool:
+    path=os.path.normpath(path)
+    for watcher in list(_project_watchers.values()):
+        watch_path=watcher.watch_path
+        if watcher.is_watching and watch_path and (path==watch_path or path.startswith(os.path.normpath(watch_path)+os.sep)):
+            return True
+    return False
 class FileManager:
     def __init__(self,project_id:str,working_dir:str):
         self._config=get_file_cache_config()
@@ -29,7 +60,7 @@ class FileManager:
         global _project_watchers
         if self._project_id not in _project_watchers:
             from .watcher import FileWatcher
-            _project_watchers[self._project_id]=FileWatcher(self._config,self._on_file_changed)
+            _project_watchers[self._project_id]=FileWatcher(self._config,self._on_file_changed,self._on_files_changed)
         return _project_watchers[self._project_id]
     def _get_metadata_store(self)->"FileMetadataStore":
         global _project_metadata_stores
@@ -43,34 +74,84 @@ class FileManager:
         if not os.path.exists(self._working_dir):
             os.makedirs(self._working_dir,exist_ok=True)
         cache=self._get_cache()
-        stats=cache.load_all()
+        if self._config.load_mode=="lazy":
+            stats=cache.scan_tree()
+            cache.start_preload(self._config.preload_workers)
+        else:
+            stats=cache.load_all()
         self._logger.info(f"FileManager initialized for project {self._project_id}: {stats}")
         if self._config.watcher_enabled:
             watcher=self._get_watcher()
             watcher.start(self._working_dir)
         return stats
     def _on_file_changed(self,full_path:str,event_type:str,is_directory:bool)->None:
-        rel_path=os.path.relpath(full_path,self._working_dir)
-        self._logger.debug(f"File changed: {rel_path} ({event_type}, is_dir={is_directory})")
+        self._on_files_changed([(full_path,event_type,is_directory)])
+    def _on_files_changed(self,events:List[Tuple[str,str,bool]])->None:
+        started=time.perf_counter()
         cache=self._get_cache()
-        if is_directory:
-            if event_type=="created":
-                cache.add_dir(rel_path)
-            elif event_type=="deleted":
-                removed_files=cache.remove_dir(rel_path)
-                store=self._get_metadata_store()
-                for rf in removed_files:
-                    store.delete(os.path.join(self._working_dir,rf))
-        else:
-            if event_type=="deleted":
-                cache.remove_file(rel_path)
-                self._get_metadata_store().delete(full_path)
-            else:
-                cache.update_file_from_disk(rel_path)
-                entry=cache.get_file(rel_path)
-                if entry and entry.content:
-                    metadata=self._build_metadata(full_path,entry.content,None)
-                    self._get_metadata_store().upsert(metadata)
+        deletes=[]
+        removed=[]
+        changed=[]
+        for full_path,event_type,is_directory in events:
+            rel_path=os.path.relpath(full_path,self._working_dir)
+            self._logger.debug(f"File changed: {rel_path} ({event_type}, is_dir={is_directory})")
+            _notify_change(full_path,event_type,is_directory)
+            try:
+                if is_directory:
+                    if event_type=="created":
+                        cache.add_dir(rel_path)
+                    elif event_type=="deleted":
+                        deletes.extend(os.path.join(self._working_dir,rf) for rf in cache.remove_dir(rel_path))
+                elif event_type=="deleted":
+                    removed.append(rel_path)
+                    deletes.append(full_path)
+                else:
+                    changed.append((full_path,rel_path))
+            except Exception as e:
+                self._logger.error(f"Failed to apply file change for {rel_path}: {e}",exc_info=True)
+        loaded=self._reload_files(cache,changed)
+        entries=[entry for entry,_ in loaded if entry is not None]
+        upserts=[metadata for _,metadata in loaded if metadata is not None]
+        removed.extend(rel_path for (full_path,rel_path),(entry,_) in zip(changed,loaded) if entry is None and not os.path.exists(full_path))
+        cache.install_entries(entries,removed)
+        if deletes or upserts:
+            self._get_metadata_store().apply_changes(upserts,deletes)
+        self._record_batch(len(events),len(changed),time.perf_counter()-started)
+    def _reload_files(self,cache:ProjectFileCache,changed:List[Tuple[str,str]])->List[Tuple[Optional[FileEntry],Optional[Dict[str,Any]]]]:
+        def load(item:Tuple[str,str])->Tuple[Optional[FileEntry],Optional[Dict[str,Any]]]:
+            full_path,rel_path=item
+            try:
+                entry=cache.load_entry_from_disk(rel_path)
+                if entry is None or not entry.content:
+                    return entry,None
+                return entry,self._build_metadata(full_path,entry.content,None)
+            except Exception as e:
+                self._logger.error(f"Failed to reload {rel_path}: {e}",exc_info=True)
+                return None,None
+        workers=min(len(changed),max(1,self._config.watcher_reload_workers))
+        if workers<=1:
+            return [load(item) for item in changed]
+        with ThreadPoolExecutor(max_workers=workers,thread_name_prefix="file-reload") as pool:
+            return list(pool.map(load,changed))
+    def _record_batch(self,size:int,files:int,elapsed:float)->None:
+        stats=_project_change_stats.setdefault(self._project_id,{"batches":0,"events":0,"files":0,"lastBatchSize":0,"maxBatchSize":0,"lastApplyMs":0.0,"maxApplyMs":0.0,"totalApplyMs":0.0})
+        elapsed_ms=elapsed*1000
+        stats["batches"]+=1
+        stats["events"]+=size
+        stats["files"]+=files
+        stats["lastBatchSize"]=size
+        stats["maxBatchSize"]=max(stats["maxBatchSize"],size)
+        stats["lastApplyMs"]=round(elapsed_ms,3)
+        stats["maxApplyMs"]=round(max(stats["maxApplyMs"],elapsed_ms),3)
+        stats["totalApplyMs"]+=elapsed_ms
+        if size>1:
+            self._logger.debug(f"Applied {size} file change(s) for project {self._project_id} in {elapsed_ms:.1f}ms")
+    def get_change_stats(self)->Dict[str,Any]:
+        stats=dict(_project_change_stats.get(self._project_id) or {})
+        if stats:
+            stats["avgApplyMs"]=round(stats["totalApplyMs"]/stats["batches"],3)
+            stats["totalApplyMs"]=round(stats["totalApplyMs"],3)
+        return stats
     def _to_rel_path(self,path:str)->str:
         if os.path.isabs(path):
             return os.path.relpath(path,self._working_dir)
@@ -132,6 +213,7 @@ class FileManager:
                 cache.put_file(rel_path,content)
                 metadata=self._build_metadata(full_path,content,agent_id)
                 self._get_metadata_store().upsert(metadata)
+            _notify_change(full_path,"modified",False)
             return {"success":True,"path":full_path,"size":len(content.encode(encoding))}
         except Exception as e:
             return {"success":False,"path":full_path,"error":str(e)}
@@ -163,6 +245,7 @@ class FileManager:
                 cache.put_file(rel_path,result["content"])
                 metadata=self._build_metadata(full_path,result["content"],agent_id)
                 self._get_metadata_store().upsert(metadata)
+            _notify_change(full_path,"modified",False)
             return {"success":True,"path":full_path,"replacements":result["count"]}
         except Exception as e:
             return {"success":False,"path":full_path,"error":str(e)}
@@ -194,6 +277,7 @@ class FileManager:
                 else:
                     cache.remove_file(rel_path)
                     store.delete(full_path)
+            _notify_change(full_path,"deleted",is_dir)
             return {"success":True,"path":full_path,"type":"directory" if is_dir else"file"}
         except OSError as e:
             if is_dir and not recursive and"not empty" in str(e).lower():
@@ -333,6 +417,8 @@ class FileManager:
         return self._get_metadata_store().get(full_path)
     def stop(self)->None:
         global _project_watchers
+        if self._project_id in _project_metadata_stores:
+            _project_metadata_stores[self._project_id].flush_access()
         if self._project_id in _project_watchers:
             _project_watchers[self._project_id].stop()
             del _project_watchers[self._project_id]
@@ -341,9 +427,14 @@ class FileManager:
         if self._config.enabled:
             cache=self._get_cache()
             stats["cache"]=cache.get_stats()
+            stats["budget"]=get_content_budget().get_stats()
             watcher=self._get_watcher() if self._project_id in _project_watchers else None
             if watcher:
-                stats["watcher"]={"watching":watcher.is_watching,"path":watcher.watch_path}
+                stats["watcher"]={"watching":watcher.is_watching,"path":watcher.watch_path,**watcher.get_stats()}
+            if self._project_id in _project_change_stats:
+                stats["changes"]=self.get_change_stats()
+            if self._project_id in _project_metadata_stores:
+                stats["accessStats"]=_project_metadata_stores[self._project_id].get_access_stats()
         return stats
     @classmethod
     def clear_project(cls,project_id:str)->None:
@@ -355,6 +446,7 @@ class FileManager:
             _project_caches[project_id].clear()
             del _project_caches[project_id]
         if project_id in _project_metadata_stores:
-            del _project_metadata_stores[project_id]
+            _project_metadata_stores.pop(project_id).close()
+        _project_change_stats.pop(project_id,None)
 def get_file_manager(project_id:str,working_dir:str)->FileManager:
     return FileManager(project_id,working_dir)
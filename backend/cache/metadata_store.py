@@ -1,9 +1,19 @@
-from typing import Any,Dict,List,Optional
+import threading
+from typing import Any,Dict,List,Optional,Tuple
 from datetime import datetime
+from middleware.logger import get_logger
+ACCESS_FLUSH_INTERVAL=5.0
+UPSERT_CHUNK_SIZE=500
 class FileMetadataStore:
- def __init__(self,project_id:str):
+ def __init__(self,project_id:str,flush_interval:float=ACCESS_FLUSH_INTERVAL):
   self._project_id=project_id
+  self._flush_interval=flush_interval
+  self._access_lock=threading.Lock()
+  self._pending_access:Dict[str,Tuple[int,datetime]]={}
+  self._flush_timer:Optional[threading.Timer]=None
+  self._stats={"recorded":0,"flushes":0,"flushedRows":0,"flushErrors":0}
  def get(self,path:str)->Optional[Dict[str,Any]]:
+  self.flush_access()
   try:
    from models.database import session_scope
    from models.tables import FileMetadata
@@ -50,6 +60,8 @@ class FileMetadataStore:
    return True
   except Exception:
    return False
+ def upsert_many(self,items:List[Dict[str,Any]])->int:
+  return self.apply_changes(items,[])["upserted"]
  def delete(self,path:str)->bool:
   try:
    from models.database import session_scope
@@ -59,17 +71,97 @@ class FileMetadataStore:
    return True
   except Exception:
    return False
+ def delete_many(self,paths:List[str])->int:
+  return self.apply_changes([],paths)["deleted"]
+ def apply_changes(self,upserts:List[Dict[str,Any]],deletes:List[str])->Dict[str,int]:
+  latest={m["path"]:m for m in upserts if m.get("path")}
+  removed=[p for p in dict.fromkeys(deletes) if p not in latest]
+  if not latest and not removed:
+   return {"upserted":0,"deleted":0}
+  try:
+   from models.database import session_scope
+   with session_scope() as session:
+    deleted=self._delete_rows(session,removed)
+    self._upsert_rows(session,latest)
+   return {"upserted":len(latest),"deleted":deleted}
+  except Exception:
+   return {"upserted":0,"deleted":0}
+ def _upsert_rows(self,session,latest:Dict[str,Dict[str,Any]])->None:
+  from models.tables import FileMetadata
+  paths=list(latest)
+  now=datetime.now()
+  for start in range(0,len(paths),UPSERT_CHUNK_SIZE):
+   chunk=paths[start:start+UPSERT_CHUNK_SIZE]
+   existing={row.path:row for row in session.query(FileMetadata).filter(FileMetadata.project_id==self._project_id,FileMetadata.path.in_(chunk))}
+   for path in chunk:
+    row=existing.get(path)
+    if row is None:
+     row=FileMetadata(project_id=self._project_id,path=path,access_count=0)
+     session.add(row)
+    for key,value in latest[path].items():
+     if key!="path" and hasattr(FileMetadata,key):
+      setattr(row,key,value)
+    row.modified_at=now
+ def _delete_rows(self,session,paths:List[str])->int:
+  from models.tables import FileMetadata
+  deleted=0
+  for start in range(0,len(paths),UPSERT_CHUNK_SIZE):
+   chunk=paths[start:start+UPSERT_CHUNK_SIZE]
+   deleted+=session.query(FileMetadata).filter(FileMetadata.project_id==self._project_id,FileMetadata.path.in_(chunk)).delete(synchronize_session=False)
+  return deleted
  def record_access(self,path:str)->None:
+  now=datetime.now()
+  with self._access_lock:
+   count,_=self._pending_access.get(path,(0,now))
+   self._pending_access[path]=(count+1,now)
+   self._stats["recorded"]+=1
+   self._schedule_flush_locked()
+ def _schedule_flush_locked(self)->None:
+  if self._flush_timer is None and self._flush_interval>0:
+   self._flush_timer=threading.Timer(self._flush_interval,self.flush_access)
+   self._flush_timer.daemon=True
+   self._flush_timer.start()
+ def flush_access(self)->int:
+  with self._access_lock:
+   pending=self._pending_access
+   self._pending_access={}
+   if self._flush_timer is not None and self._flush_timer is not threading.current_thread():
+    self._flush_timer.cancel()
+   self._flush_timer=None
+  if not pending:
+   return 0
   try:
+   from sqlalchemy import and_,bindparam,func,update
    from models.database import session_scope
    from models.tables import FileMetadata
+   table=FileMetadata.__table__
+   stmt=update(table).where(and_(table.c.project_id==bindparam("p_project_id"),table.c.path==bindparam("p_path"))).values(
+    access_count=func.coalesce(table.c.access_count,0)+bindparam("p_count"),
+    last_accessed_at=bindparam("p_accessed_at"),
+   )
+   params=[{"p_project_id":self._project_id,"p_path":path,"p_count":count,"p_accessed_at":accessed_at} for path,(count,accessed_at) in pending.items()]
    with session_scope() as session:
-    row=session.query(FileMetadata).filter_by(project_id=self._project_id,path=path).first()
-    if row:
-     row.access_count=(row.access_count or 0)+1
-     row.last_accessed_at=datetime.now()
-  except Exception:
-   pass
+    session.connection().execute(stmt,params)
+   self._stats["flushes"]+=1
+   self._stats["flushedRows"]+=len(params)
+   return len(params)
+  except Exception as e:
+   get_logger().error(f"Failed to flush {len(pending)} access count(s) for project {self._project_id}: {e}",exc_info=True)
+   with self._access_lock:
+    self._stats["flushErrors"]+=1
+    for path,(count,accessed_at) in pending.items():
+     newer=self._pending_access.get(path)
+     if newer is not None:
+      count+=newer[0]
+      accessed_at=max(accessed_at,newer[1])
+     self._pending_access[path]=(count,accessed_at)
+    self._schedule_flush_locked()
+   return 0
+ def close(self)->None:
+  self.flush_access()
+ def get_access_stats(self)->Dict[str,Any]:
+  with self._access_lock:
+   return {**self._stats,"pending":len(self._pending_access)}
  def search(self,file_type:str=None,language:str=None,tags:List[str]=None,description:str=None,limit:int=100)->List[Dict[str,Any]]:
   try:
    from models.database import session_scope
@@ -94,6 +186,7 @@ class FileMetadataStore:
   except Exception:
    return []
  def get_most_accessed(self,limit:int=20)->List[Dict[str,Any]]:
+  self.flush_access()
   try:
    from models.database import session_scope
    from models.tables import FileMetadata
@@ -168,6 +261,8 @@ class FileMetadataStore:
   except Exception:
    return False
  def clear_all(self)->bool:
+  with self._access_lock:
+   self._pending_access.clear()
   try:
    from models.database import session_scope
    from models.tables import FileMetadata
@@ -0,0 +1,121 @@
+from typing import Dict,FrozenSet,List,Optional,Set
+import re
+try:
+    import re._parser as _sre_parse
+    import re._constants as _sre_constants
+except ImportError:
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_constants
+_ASCII_WORD_RE=re.compile(r"[a-z0-9_]+")
+_FOLD_MAP={"\u0130":"i","\u0131":"i","\u017f":"s","\u212a":"k"}
+_FOLD_TABLE=str.maketrans(_FOLD_MAP)
+_TOKENIZE_TABLE=str.maketrans({**{chr(c):" " for c in range(128) if not (chr(c).isalnum() or chr(c)=="_")},**_FOLD_MAP})
+_MAX_ALTERNATIVES=16
+_MAX_MEMO_WORDS=200000
+def _fold(text:str)->str:
+    return text.translate(_FOLD_TABLE).lower()
+def _word_trigrams(word:str)->FrozenSet[str]:
+    return frozenset(word[i:i+3] for i in range(len(word)-2))
+class TrigramIndex:
+    def __init__(self):
+        self._postings:Dict[str,Set[str]]={}
+        self._file_trigrams:Dict[str,Set[str]]={}
+        self._word_memo:Dict[str,FrozenSet[str]]={}
+    def __len__(self)->int:
+        return len(self._file_trigrams)
+    def __contains__(self,path:str)->bool:
+        return path in self._file_trigrams
+    def add(self,path:str,content:str)->None:
+        self.remove(path)
+        trigrams=self._content_trigrams(content)
+        self._file_trigrams[path]=trigrams
+        for t in trigrams:
+            posting=self._postings.get(t)
+            if posting is None:
+                self._postings[t]={path}
+            else:
+                posting.add(path)
+    def _content_trigrams(self,content:str)->Set[str]:
+        memo=self._word_memo
+        if len(memo)>_MAX_MEMO_WORDS:
+            memo.clear()
+        trigrams=set()
+        for word in set(content.translate(_TOKENIZE_TABLE).lower().split()):
+            if len(word)<3:
+                continue
+            grams=memo.get(word)
+            if grams is None:
+                grams=memo[word]=_word_trigrams(word)
+            trigrams|=grams
+        return trigrams
+    def remove(self,path:str)->None:
+        trigrams=self._file_trigrams.pop(path,None)
+        if not trigrams:
+            return
+        for t in trigrams:
+            posting=self._postings.get(t)
+            if posting is None:
+                continue
+            posting.discard(path)
+            if not posting:
+                del self._postings[t]
+    def clear(self)->None:
+        self._postings.clear()
+        self._file_trigrams.clear()
+        self._word_memo.clear()
+    def candidates(self,pattern:str,flags:int=0)->Optional[Set[str]]:
+        alternatives=self._required_literals(pattern,flags)
+        if alternatives is None:
+            return None
+        result:Set[str]=set()
+        for literals in alternatives:
+            trigrams=set()
+            for literal in literals:
+                for segment in _ASCII_WORD_RE.findall(_fold(literal)):
+                    if len(segment)>=3:
+                        trigrams|=_word_trigrams(segment)
+            if not trigrams:
+                return None
+            postings=sorted((self._postings.get(t,set()) for t in trigrams),key=len)
+            matched=set(postings[0])
+            for posting in postings[1:]:
+                if not matched:
+                    break
+                matched&=posting
+            result|=matched
+        return result
+    def _required_literals(self,pattern:str,flags:int)->Optional[List[List[str]]]:
+        try:
+            parsed=_sre_parse.parse(pattern,flags)
+        except Exception:
+            return None
+        items=list(parsed)
+        if len(items)==1 and items[0][0]==_sre_constants.BRANCH:
+            branches=items[0][1][1]
+            if len(branches)>_MAX_ALTERNATIVES:
+                return None
+            return [self._sequence_literals(list(b)) for b in branches]
+        return [self._sequence_literals(items)]
+    def _sequence_literals(self,items:list)->List[str]:
+        literals=[]
+        run=[]
+        for op,av in items:
+            if op==_sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            if run:
+                literals.append("".join(run))
+                run=[]
+            if op==_sre_constants.SUBPATTERN:
+                literals.extend(self._nested_literals(list(av[-1])))
+            elif op in (_sre_constants.MAX_REPEAT,_sre_constants.MIN_REPEAT) and av[0]>=1:
+                literals.extend(self._nested_literals(list(av[2])))
+        if run:
+            literals.append("".join(run))
+        return literals
+    def _nested_literals(self,items:list)->List[str]:
+        if any(op==_sre_constants.BRANCH for op,_ in items):
+            return []
+        return self._sequence_literals(items)
+    def get_stats(self)->Dict[str,int]:
+        return {"files":len(self._file_trigrams),"trigrams":len(self._postings)}
@@ -1,13 +1,21 @@
 import os
 import threading
-from typing import Callable,Optional
+import time
+from typing import Callable,List,Optional,Tuple
 from datetime import datetime
 from middleware.logger import get_logger
 from .config import FileCacheConfig
+def collapse_event_type(previous:Optional[str],current:str)->str:
+    if previous=="created" and current=="modified":
+        return"created"
+    if previous=="deleted" and current in ("created","modified"):
+        return"modified"
+    return current
 class FileWatcher:
-    def __init__(self,config:FileCacheConfig,callback:Callable[[str,str,bool],None]):
+    def __init__(self,config:FileCacheConfig,callback:Callable[[str,str,bool],None],batch_callback:Optional[Callable[[List[Tuple[str,str,bool]]],None]]=None):
         self._config=config
         self._callback=callback
+        self._batch_callback=batch_callback
         self._logger=get_logger()
         self._observer=None
         self._watching=False
@@ -15,9 +23,14 @@ class FileWatcher:
         self._debounce_events:dict={}
         self._debounce_lock=threading.Lock()
         self._debounce_timer:Optional[threading.Timer]=None
+        self._window_started:Optional[float]=None
+        self._stats={"received":0,"collapsed":0,"batches":0,"delivered":0}
     @property
     def _debounce_seconds(self)->float:
         return self._config.watcher_debounce_ms/1000.0
+    @property
+    def _max_batch_seconds(self)->float:
+        return max(self._config.watcher_max_batch_ms/1000.0,self._debounce_seconds)
     def start(self,path:str)->bool:
         if self._watching:
             self._logger.warning(f"FileWatcher already watching: {self._watch_path}")
@@ -80,21 +93,44 @@ class FileWatcher:
         self._logger.info("FileWatcher stopped")
     def _handle_event(self,path:str,event_type:str,is_directory:bool)->None:
         with self._debounce_lock:
+            self._stats["received"]+=1
+            previous=self._debounce_events.pop(path,None)
+            if previous is not None:
+                self._stats["collapsed"]+=1
+                event_type=collapse_event_type(previous["event_type"],event_type)
             self._debounce_events[path]={"event_type":event_type,"is_directory":is_directory,"time":datetime.now()}
+            now=time.monotonic()
+            if self._window_started is None:
+                self._window_started=now
+            delay=min(self._debounce_seconds,max(0.0,self._window_started+self._max_batch_seconds-now))
             if self._debounce_timer:
                 self._debounce_timer.cancel()
-            self._debounce_timer=threading.Timer(self._debounce_seconds,self._flush_events)
+            self._debounce_timer=threading.Timer(delay,self._flush_events)
+            self._debounce_timer.daemon=True
             self._debounce_timer.start()
     def _flush_events(self)->None:
         with self._debounce_lock:
             events=dict(self._debounce_events)
             self._debounce_events.clear()
             self._debounce_timer=None
+            self._window_started=None
+            if events:
+                self._stats["batches"]+=1
+                self._stats["delivered"]+=len(events)
+        if self._batch_callback and events:
+            try:
+                self._batch_callback([(path,data["event_type"],data["is_directory"]) for path,data in events.items()])
+            except Exception as e:
+                self._logger.error(f"Error in FileWatcher batch callback for {len(events)} event(s): {e}",exc_info=True)
+            return
         for path,data in events.items():
             try:
                 self._callback(path,data["event_type"],data["is_directory"])
             except Exception as e:
                 self._logger.error(f"Error in FileWatcher callback for {path}: {e}",exc_info=True)
+    def get_stats(self)->dict:
+        with self._debounce_lock:
+            return {**self._stats,"pending":len(self._debounce_events)}
     @property
     def is_watching(self)->bool:
         return self._watching
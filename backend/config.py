@@ -17,12 +17,15 @@ class ServerConfig:
  port:int=5000
  debug:bool=True
  cors_origins:str="*"
+ rate_limit_store:str="memory"
 
 
 @dataclass
 class DatabaseConfig:
  db_name:str="testdata.db"
  data_dir:str="data"
+ backup_mode:str="full"
+ backup_compress:bool=False
 
  @property
  def db_path(self)->str:
@@ -55,10 +58,13 @@ def load_config()->Config:
    port=int(os.environ.get("SERVER_PORT","5000")),
    debug=os.environ.get("DEBUG","true").lower()=="true",
    cors_origins=os.environ.get("CORS_ORIGINS","*"),
+   rate_limit_store=os.environ.get("RATE_LIMIT_STORE","memory"),
   ),
   database=DatabaseConfig(
    db_name=db_name,
    data_dir=os.path.join(os.path.dirname(__file__),"data"),
+   backup_mode=os.environ.get("BACKUP_MODE","full"),
+   backup_compress=os.environ.get("BACKUP_COMPRESS","false").lower()=="true",
   ),
  )
 
@@ -4,6 +4,7 @@ from events.event_bus import EventBus
 from events.websocket_emitter import WebSocketEmitter
 from services.project_service import ProjectService
 from services.agent_service import AgentService
+from services.agent import AgentReadModel
 from services.workflow_service import WorkflowService
 from services.simulation import SimulationService
 from services.intervention_service import InterventionService
@@ -26,14 +27,21 @@ class Container(containers.DeclarativeContainer):
         event_bus=event_bus,
     )
 
+    agent_read_model=providers.Singleton(
+        AgentReadModel,
+        event_bus=event_bus,
+    )
+
     project_service=providers.Singleton(
         ProjectService,
         event_bus=event_bus,
+        read_model=agent_read_model,
     )
 
     agent_service=providers.Singleton(
         AgentService,
         event_bus=event_bus,
+        read_model=agent_read_model,
     )
 
     workflow_service=providers.Singleton(
@@ -73,7 +81,7 @@ class Container(containers.DeclarativeContainer):
 
     recovery_service=providers.Singleton(
         RecoveryService,
-        sio=sio,
+        websocket_emitter=websocket_emitter,
     )
 
     agent_execution_service=providers.Singleton(
@@ -84,5 +92,5 @@ class Container(containers.DeclarativeContainer):
         intervention_service=intervention_service,
         trace_service=trace_service,
         event_bus=event_bus,
-        sio=sio,
+        websocket_emitter=websocket_emitter,
     )
@@ -1,23 +1,195 @@
 import threading
-from typing import Dict,List,Callable,Type,Any
+import time
+from collections import OrderedDict,deque
+from typing import Dict,List,Callable,Type,Any,Optional
 from middleware.logger import get_logger
 
+DISPATCH_SYNC="sync"
+DISPATCH_ASYNC="async"
+OVERFLOW_BLOCK="block"
+OVERFLOW_DROP_OLDEST="drop_oldest"
+OVERFLOW_COALESCE="coalesce"
+OVERFLOW_POLICIES=(OVERFLOW_BLOCK,OVERFLOW_DROP_OLDEST,OVERFLOW_COALESCE)
+DEFAULT_QUEUE_SIZE=1000
+TIMING_SAMPLE_SIZE=500
+
+
+class _SubscriberQueue:
+    def __init__(self,name:str,max_size:int,overflow:str):
+        self.name=name
+        self.max_size=max(1,max_size)
+        self.overflow=overflow
+        self.cond=threading.Condition()
+        self.items:OrderedDict=OrderedDict()
+        self.handlers:Dict[Type,List[Callable]]={}
+        self.coalesce_keys:Dict[Type,Callable[[Any],Any]]={}
+        self.seq=0
+        self.running=True
+        self.busy=False
+        self.thread:Optional[threading.Thread]=None
+        self.enqueued=0
+        self.processed=0
+        self.dropped=0
+        self.coalesced=0
+        self.overflowed=0
+        self.errors=0
+        self.max_depth=0
+        self.timings:deque=deque(maxlen=TIMING_SAMPLE_SIZE)
+
+    def put(self,event:Any)->None:
+        event_type=type(event)
+        with self.cond:
+            if not self.running:
+                return
+            self.enqueued+=1
+            key=None
+            key_func=self.coalesce_keys.get(event_type) if self.overflow==OVERFLOW_COALESCE else None
+            if key_func is not None:
+                key=(event_type,key_func(event))
+                if self.items.pop(key,None) is not None:
+                    self.coalesced+=1
+            if key is None:
+                self.seq+=1
+                key=self.seq
+            while len(self.items)>=self.max_size:
+                if self.overflow==OVERFLOW_COALESCE and self._evict_coalescible():
+                    continue
+                if self.overflow!=OVERFLOW_DROP_OLDEST and threading.current_thread() is not self.thread:
+                    self.cond.wait()
+                    if not self.running:
+                        return
+                    continue
+                if self.overflow==OVERFLOW_COALESCE:
+                    self.overflowed+=1
+                    get_logger().error(f"EventBus queue {self.name} is full of non-coalescible events; enqueueing {event_type.__name__} past max_queue={self.max_size}")
+                    break
+                self.items.popitem(last=False)
+                self.dropped+=1
+            self.items[key]=event
+            self.max_depth=max(self.max_depth,len(self.items))
+            self.cond.notify_all()
+
+    def _evict_coalescible(self)->bool:
+        for key in self.items:
+            if isinstance(key,tuple):
+                del self.items[key]
+                self.dropped+=1
+                return True
+        return False
+
+    def run(self)->None:
+        while True:
+            with self.cond:
+                while not self.items and self.running:
+                    self.cond.wait()
+                if not self.items:
+                    return
+                _,event=self.items.popitem(last=False)
+                handlers=list(self.handlers.get(type(event),[]))
+                self.busy=True
+                self.cond.notify_all()
+            for handler in handlers:
+                started=time.perf_counter()
+                try:
+                    handler(event)
+                except Exception as e:
+                    with self.cond:
+                        self.errors+=1
+                    get_logger().error(
+                        f"EventBus handler error for {type(event).__name__} in {self.name}: {e}",
+                        exc_info=True,
+                    )
+                finally:
+                    self.timings.append(time.perf_counter()-started)
+            with self.cond:
+                self.processed+=1
+                self.busy=False
+                self.cond.notify_all()
+
+    def wait_idle(self,deadline:float)->bool:
+        with self.cond:
+            while self.items or self.busy:
+                remaining=deadline-time.monotonic()
+                if remaining<=0:
+                    return False
+                self.cond.wait(remaining)
+            return True
+
+    def stop(self)->None:
+        with self.cond:
+            self.running=False
+            self.cond.notify_all()
+
+    def get_stats(self)->Dict[str,Any]:
+        with self.cond:
+            samples=sorted(self.timings)
+            return {
+                "overflow":self.overflow,
+                "maxQueue":self.max_size,
+                "depth":len(self.items),
+                "maxDepth":self.max_depth,
+                "enqueued":self.enqueued,
+                "processed":self.processed,
+                "dropped":self.dropped,
+                "coalesced":self.coalesced,
+                "overflowed":self.overflowed,
+                "errors":self.errors,
+                "handlerAvgMs":round(sum(samples)/len(samples)*1000,3) if samples else 0.0,
+                "handlerP95Ms":round(samples[min(len(samples)-1,int(len(samples)*0.95))]*1000,3) if samples else 0.0,
+                "handlerMaxMs":round(samples[-1]*1000,3) if samples else 0.0,
+            }
+
 
 class EventBus:
     def __init__(self):
         self._subscribers:Dict[Type,List[Callable]]={}
+        self._queues:Dict[str,_SubscriberQueue]={}
+        self._queues_by_type:Dict[Type,List[_SubscriberQueue]]={}
         self._lock=threading.Lock()
 
-    def subscribe(self,event_type:Type,handler:Callable)->None:
+    def subscribe(
+        self,
+        event_type:Type,
+        handler:Callable,
+        dispatch:str=DISPATCH_SYNC,
+        subscriber:Optional[str]=None,
+        overflow:str=OVERFLOW_BLOCK,
+        max_queue:int=DEFAULT_QUEUE_SIZE,
+        coalesce_key:Optional[Callable[[Any],Any]]=None,
+    )->None:
+        if dispatch==DISPATCH_ASYNC:
+            self._subscribe_async(event_type,handler,subscriber or _subscriber_name(handler),overflow,max_queue,coalesce_key)
+            return
         with self._lock:
             if event_type not in self._subscribers:
                 self._subscribers[event_type]=[]
             self._subscribers[event_type].append(handler)
 
+    def _subscribe_async(self,event_type:Type,handler:Callable,name:str,overflow:str,max_queue:int,coalesce_key:Optional[Callable[[Any],Any]])->None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        with self._lock:
+            queue=self._queues.get(name)
+            if queue is None:
+                queue=_SubscriberQueue(name,max_queue,overflow)
+                queue.thread=threading.Thread(target=queue.run,daemon=True,name=f"eventbus-{name}")
+                self._queues[name]=queue
+                queue.thread.start()
+            with queue.cond:
+                queue.handlers.setdefault(event_type,[]).append(handler)
+                if coalesce_key is not None:
+                    queue.coalesce_keys[event_type]=coalesce_key
+            queues=self._queues_by_type.setdefault(event_type,[])
+            if queue not in queues:
+                queues.append(queue)
+
     def publish(self,event:Any)->None:
         event_type=type(event)
         with self._lock:
             handlers=list(self._subscribers.get(event_type,[]))
+            queues=list(self._queues_by_type.get(event_type,[]))
+        for queue in queues:
+            queue.put(event)
         for handler in handlers:
             try:
                 handler(event)
@@ -33,7 +205,42 @@ class EventBus:
                 self._subscribers[event_type]=[
                     h for h in self._subscribers[event_type] if h!=handler
                 ]
+            for queue in list(self._queues_by_type.get(event_type,[])):
+                with queue.cond:
+                    remaining=[h for h in queue.handlers.get(event_type,[]) if h!=handler]
+                    if remaining:
+                        queue.handlers[event_type]=remaining
+                        continue
+                    queue.handlers.pop(event_type,None)
+                    queue.coalesce_keys.pop(event_type,None)
+                self._queues_by_type[event_type].remove(queue)
+                if not queue.handlers:
+                    queue.stop()
+                    del self._queues[queue.name]
+
+    def wait_idle(self,timeout:float=5.0)->bool:
+        deadline=time.monotonic()+timeout
+        with self._lock:
+            queues=list(self._queues.values())
+        return all(queue.wait_idle(deadline) for queue in queues)
+
+    def get_stats(self)->Dict[str,Dict[str,Any]]:
+        with self._lock:
+            queues=list(self._queues.values())
+        return {queue.name:queue.get_stats() for queue in queues}
 
     def clear(self)->None:
         with self._lock:
             self._subscribers.clear()
+            queues=list(self._queues.values())
+            self._queues.clear()
+            self._queues_by_type.clear()
+        for queue in queues:
+            queue.stop()
+
+
+def _subscriber_name(handler:Callable)->str:
+    owner=getattr(handler,"__self__",None)
+    if owner is not None:
+        return f"{type(owner).__name__}@{id(owner):x}"
+    return getattr(handler,"__qualname__",repr(handler))
@@ -1,5 +1,10 @@
-from typing import Dict,Any
-from events.event_bus import EventBus
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from collections import OrderedDict,deque
+from typing import Dict,Any,Iterator,List,Optional,Tuple
+from events.event_bus import EventBus,DISPATCH_ASYNC,OVERFLOW_COALESCE
 from events.events import (
     SystemLogCreated,
     AgentStarted,
@@ -33,54 +38,275 @@ from events.events import (
 )
 from middleware.logger import get_logger
 
+FLUSH_INTERVAL=0.05
+MAX_BATCH_SIZE=200
+MAX_PENDING_PER_ROOM=1000
+LATENCY_SAMPLE_SIZE=500
+REPLAY_BUFFER_SIZE=1000
+COALESCE_KEYS={
+    "agent:progress":"agentId",
+    "metrics:update":"projectId",
+}
+
+
+EVENT_COALESCE_KEYS={
+    AgentProgress:lambda e:e.agent_id,
+    MetricsUpdated:lambda e:e.project_id,
+}
+
 
 class WebSocketEmitter:
-    def __init__(self,event_bus:EventBus):
+    def __init__(self,event_bus:EventBus,flush_interval:float=FLUSH_INTERVAL,max_batch_size:int=MAX_BATCH_SIZE,max_pending:int=MAX_PENDING_PER_ROOM,replay_size:int=REPLAY_BUFFER_SIZE):
         self._sio=None
         self._event_bus=event_bus
         self._logger=get_logger()
+        self._flush_interval=flush_interval
+        self._max_batch_size=max(1,max_batch_size)
+        self._max_pending=max(1,max_pending)
+        self._buffer_lock=threading.Lock()
+        self._buffers:Dict[str,OrderedDict]={}
+        self._pending_event=threading.Event()
+        self._flush_lock=threading.Lock()
+        self._flusher:Optional[threading.Thread]=None
+        self._running=False
+        self._seq=0
+        self._epoch=uuid.uuid4().hex
+        self._replay_size=max(1,replay_size)
+        self._replay_lock=threading.Lock()
+        self._project_seq:Dict[str,int]={}
+        self._delivered_seq:Dict[str,int]={}
+        self._replay:Dict[str,deque]={}
+        self._stats={"enqueued":0,"coalesced":0,"dropped":0,"emitted":0,"frames":0,"batches":0,"errors":0,"overflowFlushes":0,"replayed":0,"replayMisses":0}
+        self._flush_latency:deque=deque(maxlen=LATENCY_SAMPLE_SIZE)
         self._register_handlers()
 
     def set_sio(self,sio)->None:
         self._sio=sio
+        if sio and self._flush_interval>0:
+            self.start()
+
+    def start(self)->None:
+        if self._running:
+            return
+        self._running=True
+        self._flusher=threading.Thread(target=self._flush_loop,daemon=True,name="ws-emitter-flush")
+        self._flusher.start()
+
+    def stop(self)->None:
+        self._running=False
+        self._pending_event.set()
+        if self._flusher:
+            self._flusher.join(timeout=5)
+            self._flusher=None
+        self.flush()
+
+    @property
+    def epoch(self)->str:
+        return self._epoch
+
+    @contextmanager
+    def hold_delivery(self)->Iterator[None]:
+        with self._flush_lock:
+            yield
+
+    def emit(self,event:str,data:Dict[str,Any],project_id:str)->None:
+        self._emit(event,data,project_id)
+
+    def get_sequence(self,project_id:str)->int:
+        with self._replay_lock:
+            return self._project_seq.get(project_id,0)
+
+    def get_events_since(self,project_id:str,last_seq:int,epoch:Optional[str]=None)->Optional[Tuple[int,List[Dict[str,Any]]]]:
+        with self._replay_lock:
+            current=self._project_seq.get(project_id,0)
+            if (epoch is not None and epoch!=self._epoch) or last_seq<0 or last_seq>current:
+                self._stats["replayMisses"]+=1
+                return None
+            delivered=self._delivered_seq.get(project_id,0)
+            if last_seq>=delivered:
+                return last_seq,[]
+            replay=self._replay.get(project_id)
+            if not replay or replay[0][0]>last_seq+1:
+                self._stats["replayMisses"]+=1
+                return None
+            missed=[entry for entry in replay if last_seq<entry[0]<=delivered]
+        latest:Dict[Tuple[str,Any],int]={}
+        for index,(_,event,data) in enumerate(missed):
+            coalesce_field=COALESCE_KEYS.get(event)
+            if coalesce_field:
+                latest[(event,data.get(coalesce_field))]=index
+        events=[]
+        for index,(_,event,data) in enumerate(missed):
+            coalesce_field=COALESCE_KEYS.get(event)
+            if coalesce_field and latest[(event,data.get(coalesce_field))]!=index:
+                continue
+            events.append({"event":event,"data":data})
+        self._stats["replayed"]+=len(events)
+        return delivered,events
+
+    def _sequence(self,event:str,data:Dict[str,Any],project_id:str)->Dict[str,Any]:
+        with self._replay_lock:
+            seq=self._project_seq.get(project_id,0)+1
+            self._project_seq[project_id]=seq
+            data={**data,"seq":seq}
+            replay=self._replay.get(project_id)
+            if replay is None:
+                replay=self._replay[project_id]=deque(maxlen=self._replay_size)
+            replay.append((seq,event,data))
+        return data
 
     def _emit(self,event:str,data:Dict[str,Any],project_id:str)->None:
-        if self._sio:
+        if not self._sio:
+            return
+        room=f"project:{project_id}"
+        if not self._running:
+            with self._flush_lock:
+                data=self._sequence(event,data,project_id)
+                self._send(room,[(event,data)])
+                self._mark_delivered(project_id,data["seq"])
+            return
+        coalesce_field=COALESCE_KEYS.get(event)
+        key=(event,data.get(coalesce_field)) if coalesce_field else None
+        while True:
+            with self._buffer_lock:
+                buffer=self._buffers.get(room)
+                if buffer is None:
+                    buffer=self._buffers[room]=OrderedDict()
+                if len(buffer)<self._max_pending or key in buffer or self._drop_oldest_coalescible(buffer):
+                    self._enqueue_locked(buffer,key,event,self._sequence(event,data,project_id))
+                    break
+                self._stats["overflowFlushes"]+=1
+            self.flush()
+        self._pending_event.set()
+
+    def _enqueue_locked(self,buffer:OrderedDict,key:Optional[Tuple[str,Any]],event:str,data:Dict[str,Any])->None:
+        now=time.perf_counter()
+        self._stats["enqueued"]+=1
+        if key is not None:
+            previous=buffer.pop(key,None)
+            if previous is not None:
+                self._stats["coalesced"]+=1
+                now=previous[2]
+        else:
+            self._seq+=1
+            key=self._seq
+        buffer[key]=(event,data,now)
+
+    def _drop_oldest_coalescible(self,buffer:OrderedDict)->bool:
+        for key in buffer:
+            if isinstance(key,tuple):
+                del buffer[key]
+                self._stats["dropped"]+=1
+                return True
+        return False
+
+    def _flush_loop(self)->None:
+        while self._running:
+            self._pending_event.wait()
+            if not self._running:
+                break
+            time.sleep(self._flush_interval)
+            self._pending_event.clear()
             try:
-                self._sio.emit(event,data,room=f"project:{project_id}")
+                self.flush()
             except Exception as e:
-                self._logger.warning(f"WebSocketEmitter error emitting {event}: {e}")
+                self._logger.error(f"WebSocketEmitter flush error: {e}",exc_info=True)
+
+    def flush(self)->int:
+        with self._flush_lock:
+            with self._buffer_lock:
+                buffers=self._buffers
+                self._buffers={}
+            sent=0
+            now=time.perf_counter()
+            for room,buffer in buffers.items():
+                if not buffer:
+                    continue
+                items=list(buffer.values())
+                self._flush_latency.append(now-min(queued_at for _,_,queued_at in items))
+                sent+=self._send(room,[(event,data) for event,data,_ in items])
+                self._mark_delivered(room[len("project:"):],max(data["seq"] for _,data,_ in items))
+            return sent
+
+    def _mark_delivered(self,project_id:str,seq:int)->None:
+        with self._replay_lock:
+            if seq>self._delivered_seq.get(project_id,0):
+                self._delivered_seq[project_id]=seq
+
+    def _send(self,room:str,events:List[Tuple[str,Dict[str,Any]]])->int:
+        sent=0
+        for start in range(0,len(events),self._max_batch_size):
+            chunk=events[start:start+self._max_batch_size]
+            try:
+                if len(chunk)==1:
+                    self._sio.emit(chunk[0][0],chunk[0][1],room=room)
+                else:
+                    self._sio.emit("events:batch",{"events":[{"event":event,"data":data} for event,data in chunk]},room=room)
+                    self._stats["batches"]+=1
+                self._stats["frames"]+=1
+                self._stats["emitted"]+=len(chunk)
+                sent+=len(chunk)
+            except Exception as e:
+                self._stats["errors"]+=1
+                self._stats["dropped"]+=len(chunk)
+                self._logger.warning(f"WebSocketEmitter error emitting {len(chunk)} event(s) to {room}: {e}")
+        return sent
+
+    def get_stats(self)->Dict[str,Any]:
+        with self._buffer_lock:
+            pending=sum(len(b) for b in self._buffers.values())
+            stats=dict(self._stats)
+        samples=sorted(self._flush_latency)
+        with self._replay_lock:
+            stats["replayProjects"]=len(self._replay)
+            stats["replayBuffered"]=sum(len(r) for r in self._replay.values())
+        stats["pending"]=pending
+        stats["flushIntervalMs"]=round(self._flush_interval*1000,3)
+        stats["flushLatencyAvgMs"]=round(sum(samples)/len(samples)*1000,3) if samples else 0.0
+        stats["flushLatencyP95Ms"]=round(samples[min(len(samples)-1,int(len(samples)*0.95))]*1000,3) if samples else 0.0
+        stats["flushLatencyMaxMs"]=round(samples[-1]*1000,3) if samples else 0.0
+        return stats
+
+    def _subscribe(self,event_type,handler)->None:
+        self._event_bus.subscribe(
+            event_type,
+            handler,
+            dispatch=DISPATCH_ASYNC,
+            subscriber="websocket_emitter",
+            overflow=OVERFLOW_COALESCE,
+            coalesce_key=EVENT_COALESCE_KEYS.get(event_type),
+        )
 
     def _register_handlers(self)->None:
-        self._event_bus.subscribe(SystemLogCreated,self._on_system_log_created)
-        self._event_bus.subscribe(AgentStarted,self._on_agent_started)
-        self._event_bus.subscribe(AgentProgress,self._on_agent_progress)
-        self._event_bus.subscribe(AgentCompleted,self._on_agent_completed)
-        self._event_bus.subscribe(AgentFailed,self._on_agent_failed)
-        self._event_bus.subscribe(AgentResumed,self._on_agent_resumed)
-        self._event_bus.subscribe(AgentRetried,self._on_agent_retried)
-        self._event_bus.subscribe(CheckpointCreated,self._on_checkpoint_created)
-        self._event_bus.subscribe(CheckpointResolved,self._on_checkpoint_resolved)
-        self._event_bus.subscribe(AssetCreated,self._on_asset_created)
-        self._event_bus.subscribe(AssetUpdated,self._on_asset_updated)
-        self._event_bus.subscribe(PhaseChanged,self._on_phase_changed)
-        self._event_bus.subscribe(MetricsUpdated,self._on_metrics_updated)
-        self._event_bus.subscribe(ProjectUpdated,self._on_project_updated)
-        self._event_bus.subscribe(ProjectStatusChanged,self._on_project_status_changed)
-        self._event_bus.subscribe(ProjectInitialized,self._on_project_initialized)
-        self._event_bus.subscribe(ProjectPaused,self._on_project_paused)
-        self._event_bus.subscribe(AgentPaused,self._on_agent_paused)
-        self._event_bus.subscribe(AgentActivated,self._on_agent_activated)
-        self._event_bus.subscribe(AgentCreated,self._on_agent_created)
-        self._event_bus.subscribe(AgentWaitingResponse,self._on_agent_waiting_response)
-        self._event_bus.subscribe(AgentSnapshotRestored,self._on_agent_snapshot_restored)
-        self._event_bus.subscribe(InterventionCreated,self._on_intervention_created)
-        self._event_bus.subscribe(InterventionAcknowledged,self._on_intervention_acknowledged)
-        self._event_bus.subscribe(InterventionProcessed,self._on_intervention_processed)
-        self._event_bus.subscribe(InterventionDeleted,self._on_intervention_deleted)
-        self._event_bus.subscribe(InterventionResponseAdded,self._on_intervention_response_added)
-        self._event_bus.subscribe(AssetBulkUpdated,self._on_asset_bulk_updated)
-        self._event_bus.subscribe(AssetRegenerationRequested,self._on_asset_regeneration_requested)
+        self._subscribe(SystemLogCreated,self._on_system_log_created)
+        self._subscribe(AgentStarted,self._on_agent_started)
+        self._subscribe(AgentProgress,self._on_agent_progress)
+        self._subscribe(AgentCompleted,self._on_agent_completed)
+        self._subscribe(AgentFailed,self._on_agent_failed)
+        self._subscribe(AgentResumed,self._on_agent_resumed)
+        self._subscribe(AgentRetried,self._on_agent_retried)
+        self._subscribe(CheckpointCreated,self._on_checkpoint_created)
+        self._subscribe(CheckpointResolved,self._on_checkpoint_resolved)
+        self._subscribe(AssetCreated,self._on_asset_created)
+        self._subscribe(AssetUpdated,self._on_asset_updated)
+        self._subscribe(PhaseChanged,self._on_phase_changed)
+        self._subscribe(MetricsUpdated,self._on_metrics_updated)
+        self._subscribe(ProjectUpdated,self._on_project_updated)
+        self._subscribe(ProjectStatusChanged,self._on_project_status_changed)
+        self._subscribe(ProjectInitialized,self._on_project_initialized)
+        self._subscribe(ProjectPaused,self._on_project_paused)
+        self._subscribe(AgentPaused,self._on_agent_paused)
+        self._subscribe(AgentActivated,self._on_agent_activated)
+        self._subscribe(AgentCreated,self._on_agent_created)
+        self._subscribe(AgentWaitingResponse,self._on_agent_waiting_response)
+        self._subscribe(AgentSnapshotRestored,self._on_agent_snapshot_restored)
+        self._subscribe(InterventionCreated,self._on_intervention_created)
+        self._subscribe(InterventionAcknowledged,self._on_intervention_acknowledged)
+        self._subscribe(InterventionProcessed,self._on_intervention_processed)
+        self._subscribe(InterventionDeleted,self._on_intervention_deleted)
+        self._subscribe(InterventionResponseAdded,self._on_intervention_response_added)
+        self._subscribe(AssetBulkUpdated,self._on_asset_bulk_updated)
+        self._subscribe(AssetRegenerationRequested,self._on_asset_regeneration_requested)
 
     def _on_system_log_created(self,event:SystemLogCreated)->None:
         self._emit(
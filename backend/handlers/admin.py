@@ -8,7 +8,7 @@ from providers import get_provider,list_providers,AIProviderConfig
 from providers.health_monitor import get_health_monitor
 
 
-def register_admin_routes(app:Flask,backup_service,archive_service):
+def register_admin_routes(app:Flask,backup_service,archive_service,websocket_emitter=None,event_bus=None):
 
  @app.route('/admin-api/auth/verify',methods=['POST'])
  def admin_verify():
@@ -48,6 +48,9 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
    repo=ApiKeyRepository(session)
    key_store=repo.save(provider_id,api_key)
    session.commit()
+   from services.llm_job_queue import get_llm_job_queue
+   get_llm_job_queue().reset_providers(provider_id)
+   get_health_monitor().reset_provider(provider_id)
    return jsonify({"success":True,"hint":key_store.key_hint,"message":"APIキーが保存されました"})
   except Exception as e:
    get_logger().error(f"Failed to save API key for {provider_id}: {e}",exc_info=True)
@@ -67,6 +70,9 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
    deleted=repo.delete(provider_id)
    session.commit()
    if deleted:
+    from services.llm_job_queue import get_llm_job_queue
+    get_llm_job_queue().reset_providers(provider_id)
+    get_health_monitor().reset_provider(provider_id)
     return jsonify({"success":True,"message":"APIキーが削除されました"})
    else:
     return jsonify({"error":"APIキーが見つかりません"}),404
@@ -127,7 +133,7 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
  @require_admin_auth
  def admin_restore_backup(backup_name:str):
   import re
-  if not re.match(r'^[\w\-\.]+\.db$',backup_name):
+  if not re.match(r'^[\w\-\.]+\.(db|db\.gz|manifest)$',backup_name):
    raise ValidationError("不正なバックアップ名です","backup_name")
   success=backup_service.restore_backup(backup_name)
   if success:
@@ -139,7 +145,7 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
  @require_admin_auth
  def admin_delete_backup(backup_name:str):
   import re
-  if not re.match(r'^[\w\-\.]+\.db$',backup_name):
+  if not re.match(r'^[\w\-\.]+\.(db|db\.gz|manifest)$',backup_name):
    raise ValidationError("不正なバックアップ名です","backup_name")
   success=backup_service.delete_backup(backup_name)
   if success:
@@ -258,6 +264,7 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
  @require_admin_auth
  def admin_system_status():
   from middleware.rate_limiter import get_limiter
+  from services.summary_service import get_summary_service
   db_path=app.config.get('DB_PATH','')
   db_size=0
   if db_path and os.path.exists(db_path):
@@ -268,6 +275,10 @@ def register_admin_routes(app:Flask,backup_service,archive_service):
    "backup_info":backup_service.get_backup_info(),
    "archive_stats":archive_service.get_data_statistics(),
    "rate_limiter":limiter.get_stats() if limiter else{},
+   "websocket":websocket_emitter.get_stats() if websocket_emitter else{},
+   "event_bus":event_bus.get_stats() if event_bus else{},
+   "summary_cache":get_summary_service().get_cache_stats(),
+   "provider_health":get_health_monitor().get_latency_stats(),
   })
 
  @app.route('/admin-api/providers/health',methods=['GET'])
@@ -307,9 +307,13 @@ def register_ai_provider_routes(app:Flask):
   try:
    repo=LlmJobRepository(session)
    job_stats=repo.get_stats_by_provider()
+   from services.llm_job_queue import get_llm_job_queue
+   pool_stats=get_llm_job_queue().get_pool_stats()
+   latency_stats=monitor.get_latency_stats()
    result={}
    for provider_id,health in health_status.items():
     stats=job_stats.get(provider_id,{"running":0,"failed":0})
+    pool=pool_stats.get(provider_id,{})
     status="connected"
     if not health.get("available",False):
      error_msg=(health.get("error")or"").lower()
@@ -328,6 +332,13 @@ def register_ai_provider_routes(app:Flask):
      "lastChecked":health.get("checked_at"),
      "latency":health.get("latency_ms"),
      "errorMessage":health.get("error"),
+     "queueDepth":pool.get("queueDepth",0)+pool.get("pending",0),
+     "activeWorkers":pool.get("activeWorkers",0),
+     "maxWorkers":pool.get("maxWorkers",0),
+     "queueWaitMs":pool.get("waitAvgMs",0.0),
+     "checkIntervalSec":latency_stats.get(provider_id,{}).get("checkIntervalSec"),
+     "probeLatency":latency_stats.get(provider_id,{}).get("probeLatency"),
+     "jobLatency":latency_stats.get(provider_id,{}).get("jobLatency"),
     }
    return jsonify(result)
   finally:
@@ -404,6 +415,9 @@ def register_ai_provider_routes(app:Flask):
    repo=ApiKeyRepository(session)
    key_store=repo.save(provider_id,api_key)
    session.commit()
+   from services.llm_job_queue import get_llm_job_queue
+   get_llm_job_queue().reset_providers(provider_id)
+   get_health_monitor().reset_provider(provider_id)
    return jsonify({
     "success":True,
     "hint":key_store.key_hint,
@@ -427,6 +441,9 @@ def register_ai_provider_routes(app:Flask):
    deleted=repo.delete(provider_id)
    session.commit()
    if deleted:
+    from services.llm_job_queue import get_llm_job_queue
+    get_llm_job_queue().reset_providers(provider_id)
+    get_health_monitor().reset_provider(provider_id)
     return jsonify({"success":True,"message":"APIキーが削除されました"})
    else:
     return jsonify({"error":"APIキーが見つかりません"}),404
@@ -24,7 +24,7 @@ def register_backup_routes(app:Flask,backup_service:BackupService,archive_servic
  @app.route('/api/backups/<backup_name>/restore',methods=['POST'])
  def restore_backup(backup_name:str):
   import re
-  if not re.match(r'^[\w\-\.]+\.db$',backup_name):
+  if not re.match(r'^[\w\-\.]+\.(db|db\.gz|manifest)$',backup_name):
    raise ValidationError("不正なバックアップ名です","backup_name")
   success=backup_service.restore_backup(backup_name)
   if success:
@@ -35,7 +35,7 @@ def register_backup_routes(app:Flask,backup_service:BackupService,archive_servic
  @app.route('/api/backups/<backup_name>',methods=['DELETE'])
  def delete_backup(backup_name:str):
   import re
-  if not re.match(r'^[\w\-\.]+\.db$',backup_name):
+  if not re.match(r'^[\w\-\.]+\.(db|db\.gz|manifest)$',backup_name):
    raise ValidationError("不正なバックアップ名です","backup_name")
   success=backup_service.delete_backup(backup_name)
   if success:
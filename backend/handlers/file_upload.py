@@ -4,6 +4,7 @@ import uuid
 import shutil
 from flask import Flask,request,jsonify,send_from_directory
 from werkzeug.utils import secure_filename
+from services.chunked_upload_service import ChunkedUploadService,UploadError
 
 ALLOWED_EXTENSIONS={
 
@@ -86,8 +87,15 @@ def get_mime_type(filename:str)->str:
     return mime_types.get(ext,'application/octet-stream')
 
 
+def make_stored_filename(original_filename:str)->str:
+    file_id=uuid.uuid4().hex[:12]
+    ext=original_filename.rsplit('.',1)[1].lower() if'.' in original_filename else''
+    return f"{file_id}.{ext}" if ext else file_id
+
+
 def register_file_upload_routes(app:Flask,project_service,intervention_service,upload_folder:str):
     os.makedirs(upload_folder,exist_ok=True)
+    chunked_uploads=ChunkedUploadService(upload_folder)
 
     @app.route('/api/projects/<project_id>/files',methods=['GET'])
     def list_uploaded_files(project_id:str):
@@ -124,9 +132,7 @@ def register_file_upload_routes(app:Flask,project_service,intervention_service,u
 
 
         original_filename=secure_filename(file.filename)
-        file_id=uuid.uuid4().hex[:12]
-        ext=original_filename.rsplit('.',1)[1].lower() if'.' in original_filename else''
-        stored_filename=f"{file_id}.{ext}" if ext else file_id
+        stored_filename=make_stored_filename(original_filename)
 
 
         project_folder=os.path.join(upload_folder,project_id)
@@ -202,9 +208,7 @@ def register_file_upload_routes(app:Flask,project_service,intervention_service,u
 
 
             original_filename=secure_filename(file.filename)
-            file_id=uuid.uuid4().hex[:12]
-            ext=original_filename.rsplit('.',1)[1].lower() if'.' in original_filename else''
-            stored_filename=f"{file_id}.{ext}" if ext else file_id
+            stored_filename=make_stored_filename(original_filename)
 
 
             project_folder=os.path.join(upload_folder,project_id)
@@ -244,6 +248,103 @@ def register_file_upload_routes(app:Flask,project_service,intervention_service,u
             "totalErrors":len(errors)
         }),201 if results else 400
 
+    @app.route('/api/projects/<project_id>/uploads',methods=['POST'])
+    def init_chunked_upload(project_id:str):
+        project=project_service.get_project(project_id)
+        if not project:
+            return jsonify({"error":"Project not found"}),404
+
+        data=request.get_json() or {}
+        filename=data.get('filename','')
+        if not filename:
+            return jsonify({"error":"filename is required"}),400
+
+        if not allowed_file(filename):
+            return jsonify({"error":f"File type not allowed. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"}),400
+
+        file_size=data.get('size')
+        if not isinstance(file_size,int) or file_size<0:
+            return jsonify({"error":"size must be a non-negative integer"}),400
+
+        if file_size>MAX_FILE_SIZE:
+            return jsonify({"error":f"File too large. Max size: {MAX_FILE_SIZE // (1024 * 1024)}MB"}),400
+
+        project_folder=os.path.join(upload_folder,project_id)
+        os.makedirs(project_folder,exist_ok=True)
+        if not check_disk_space(project_folder,file_size):
+            return jsonify({"error":"ディスク容量が不足しています"}),507
+
+        original_filename=secure_filename(filename)
+        try:
+            upload=chunked_uploads.init_upload(
+                project_id=project_id,
+                original_filename=original_filename,
+                stored_filename=make_stored_filename(original_filename),
+                size=file_size,
+                chunk_size=data.get('chunkSize'),
+                checksum=data.get('checksum'),
+                metadata={"description":data.get('description','')}
+            )
+        except UploadError as e:
+            return jsonify({"error":e.message}),e.status_code
+        except OSError as e:
+            if e.errno==errno.ENOSPC:
+                return jsonify({"error":"ディスク容量が不足しています"}),507
+            return jsonify({"error":f"ファイル保存に失敗しました: {e.strerror}"}),500
+        return jsonify(upload),201
+
+    @app.route('/api/uploads/<upload_id>',methods=['GET'])
+    def get_chunked_upload(upload_id:str):
+        upload=chunked_uploads.get_upload(upload_id)
+        if not upload:
+            return jsonify({"error":"Upload not found"}),404
+        return jsonify(upload)
+
+    @app.route('/api/uploads/<upload_id>/chunks/<int:offset>',methods=['PUT'])
+    def upload_chunk(upload_id:str,offset:int):
+        if request.content_length is None:
+            return jsonify({"error":"Content-Length is required"}),411
+        try:
+            upload=chunked_uploads.write_chunk(
+                upload_id,
+                offset,
+                request.stream,
+                request.content_length,
+                checksum=request.headers.get('X-Chunk-Checksum')
+            )
+        except UploadError as e:
+            return jsonify({"error":e.message}),e.status_code
+        except OSError as e:
+            if e.errno==errno.ENOSPC:
+                return jsonify({"error":"ディスク容量が不足しています"}),507
+            return jsonify({"error":f"ファイル保存に失敗しました: {e.strerror}"}),500
+        return jsonify(upload)
+
+    @app.route('/api/uploads/<upload_id>/complete',methods=['POST'])
+    def complete_chunked_upload(upload_id:str):
+        def register(upload:dict):
+            return intervention_service.create_uploaded_file(
+                project_id=upload["projectId"],
+                filename=upload["storedFilename"],
+                original_filename=upload["originalFilename"],
+                mime_type=get_mime_type(upload["originalFilename"]),
+                category=get_category(upload["originalFilename"]),
+                size_bytes=upload["size"],
+                description=upload["metadata"].get("description","")
+            )
+
+        try:
+            uploaded_file=chunked_uploads.complete_upload(upload_id,register)
+        except UploadError as e:
+            return jsonify({"error":e.message}),e.status_code
+        return jsonify(uploaded_file),201
+
+    @app.route('/api/uploads/<upload_id>',methods=['DELETE'])
+    def abort_chunked_upload(upload_id:str):
+        if not chunked_uploads.abort_upload(upload_id):
+            return jsonify({"error":"Upload not found"}),404
+        return jsonify({"success":True})
+
     @app.route('/api/files/<file_id>',methods=['GET'])
     def get_uploaded_file_info(file_id:str):
         file_record=intervention_service.get_uploaded_file(file_id)
@@ -12,20 +12,15 @@ def register_metrics_routes(app:Flask,project_service,agent_service,workflow_ser
             return jsonify({"error":"Project not found"}),404
 
 
-        agents=agent_service.get_agents_by_project(project_id)
-
-        total=len(agents)
-        processing=len([a for a in agents if a["status"]=="running"])
-        pending=len([a for a in agents if a["status"]=="pending"])
-        completed=len([a for a in agents if a["status"]=="completed"])
-        failed=len([a for a in agents if a["status"]=="failed"])
+        summary=agent_service.get_agent_summary(project_id)
+        counts=summary["statusCounts"]
 
         return jsonify({
-            "total":total,
-            "processing":processing,
-            "pending":pending,
-            "completed":completed,
-            "failed":failed
+            "total":summary["total"],
+            "processing":counts.get("running",0),
+            "pending":counts.get("pending",0),
+            "completed":counts.get("completed",0),
+            "failed":counts.get("failed",0)
         })
 
     @app.route('/api/projects/<project_id>/metrics',methods=['GET'])
@@ -2,7 +2,7 @@ from flask import request,jsonify
 from handlers.websocket import broadcast_navigator_message
 
 
-def register_navigator_routes(app,sio):
+def register_navigator_routes(app,sio,websocket_emitter=None):
     """Register navigator message routes."""
 
     @app.route('/api/navigator/message',methods=['POST'])
@@ -34,7 +34,7 @@ def register_navigator_routes(app,sio):
         if priority not in ('low','normal','high','critical'):
             return jsonify({"error":"Invalid priority. Must be: low, normal, high, critical"}),400
 
-        broadcast_navigator_message(sio,project_id,speaker,text,priority)
+        broadcast_navigator_message(sio,project_id,speaker,text,priority,websocket_emitter)
 
         return jsonify({
             "success":True,
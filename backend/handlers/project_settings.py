@@ -28,6 +28,7 @@ from config_loaders.principle_config import (
 from config_loaders.ai_provider_config import get_usage_categories
 from models.database import session_scope
 from repositories.project_ai_config import ProjectAiConfigRepository
+from services.llm_resolver import invalidate_llm_resolution
 from repositories.global_execution_settings import GlobalExecutionSettingsRepository
 from middleware.logger import get_logger
 
@@ -250,11 +251,13 @@ def register_project_settings_routes(app:Flask,project_service:ProjectService):
    with session_scope() as session:
     repo=ProjectAiConfigRepository(session)
     config=repo.save(project_id,category_id,provider,model)
-    return jsonify({
+    result={
      "id":config.usage_category,
      "provider":config.provider_id,
      "model":config.model_id
-    })
+    }
+   invalidate_llm_resolution(project_id)
+   return jsonify(result)
   except Exception as e:
    get_logger().error(f"Failed to update usage category: {e}",exc_info=True)
    return jsonify({"error":str(e)}),500
@@ -268,16 +271,17 @@ def register_project_settings_routes(app:Flask,project_service:ProjectService):
    with session_scope() as session:
     repo=ProjectAiConfigRepository(session)
     repo.delete(project_id,category_id)
-    defaults=get_usage_categories()
-    for cat in defaults:
-     if cat.get("id")==category_id:
-      default=cat.get("default",{})
-      return jsonify({
-       "id":category_id,
-       "provider":default.get("provider",""),
-       "model":default.get("model","")
-      })
-    return jsonify({"id":category_id,"provider":"","model":""})
+   invalidate_llm_resolution(project_id)
+   defaults=get_usage_categories()
+   for cat in defaults:
+    if cat.get("id")==category_id:
+     default=cat.get("default",{})
+     return jsonify({
+      "id":category_id,
+      "provider":default.get("provider",""),
+      "model":default.get("model","")
+     })
+   return jsonify({"id":category_id,"provider":"","model":""})
   except Exception as e:
    get_logger().error(f"Failed to reset usage category: {e}",exc_info=True)
    return jsonify({"error":str(e)}),500
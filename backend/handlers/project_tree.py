@@ -1,13 +1,31 @@
 """Project Tree API - プロジェクトのファイルツリー管理"""
 import os
-import io
-import zipfile
-from flask import Flask,jsonify,request,send_file
+from pathlib import Path
+from urllib.parse import quote
+from flask import Flask,Response,jsonify,request,send_file,stream_with_context
 from werkzeug.utils import secure_filename
 from services.project_service import ProjectService
+from services.archive import iter_zip
 from middleware.logger import get_logger
 
 
+def _iter_project_files(project_path:str):
+    """Yield (arcname, path) for every visible file under the project folder"""
+    for root,dirs,files in os.walk(project_path):
+        dirs[:]=[d for d in dirs if not d.startswith('.') and d!='__pycache__']
+        for file in files:
+            if file.startswith('.'):
+                continue
+            file_path=os.path.join(root,file)
+            yield os.path.relpath(file_path,project_path),Path(file_path)
+
+
+def _attachment_disposition(download_name:str)->str:
+    """Build a Content-Disposition header that survives non-ASCII names"""
+    fallback=download_name.encode('ascii','ignore').decode('ascii').replace('"','') or'project.zip'
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(download_name)}"
+
+
 def register_project_tree_routes(app:Flask,project_service:ProjectService,output_folder:str):
     """Register project tree related routes"""
 
@@ -190,28 +208,10 @@ def register_project_tree_routes(app:Flask,project_service:ProjectService,output
         if not os.path.exists(project_path):
             return jsonify({"error":"Project folder not found"}),404
 
-                                   
-        memory_file=io.BytesIO()
-
-        with zipfile.ZipFile(memory_file,'w',zipfile.ZIP_DEFLATED) as zf:
-            for root,dirs,files in os.walk(project_path):
-                                                         
-                dirs[:]=[d for d in dirs if not d.startswith('.') and d!='__pycache__']
-
-                for file in files:
-                    if file.startswith('.'):
-                        continue
-                    file_path=os.path.join(root,file)
-                    arcname=os.path.relpath(file_path,project_path)
-                    zf.write(file_path,arcname)
-
-        memory_file.seek(0)
-
         project_name=project.get('name','project').replace(' ','_')
-
-        return send_file(
-            memory_file,
-            mimetype='application/zip',
-            as_attachment=True,
-            download_name=f"{project_name}.zip"
+        response=Response(
+            stream_with_context(iter_zip(_iter_project_files(project_path))),
+            mimetype='application/zip'
         )
+        response.headers['Content-Disposition']=_attachment_disposition(f"{project_name}.zip")
+        return response
@@ -1,12 +1,14 @@
+from typing import Optional
 from middleware.logger import get_logger
 from services.project_service import ProjectService
 from services.agent_service import AgentService
 from services.workflow_service import WorkflowService
 from services.intervention_service import InterventionService
 from services.subscription_manager import SubscriptionManager
+from events.websocket_emitter import WebSocketEmitter
 
 
-def broadcast_navigator_message(sio,project_id:str,speaker:str,text:str,priority:str="normal"):
+def broadcast_navigator_message(sio,project_id:str,speaker:str,text:str,priority:str="normal",websocket_emitter:Optional[WebSocketEmitter]=None):
     """
     Send a navigator message to all clients subscribed to a project.
 
@@ -16,6 +18,7 @@ def broadcast_navigator_message(sio,project_id:str,speaker:str,text:str,priority
         speaker:Speaker name (e.g.,"オペレーター","システム")
         text:Message text
         priority:Message priority ("low","normal","high","critical")
+        websocket_emitter:Emitter that sequences project messages for replay
     """
     message_data={
         "speaker":speaker,
@@ -26,13 +29,15 @@ def broadcast_navigator_message(sio,project_id:str,speaker:str,text:str,priority
 
     if project_id=="global":
         sio.emit('navigator:message',message_data)
+    elif websocket_emitter:
+        websocket_emitter.emit('navigator:message',message_data,project_id)
     else:
         sio.emit('navigator:message',message_data,room=f"project:{project_id}")
 
     get_logger().info(f"Navigator message sent to {project_id}: {text[:50]}...")
 
 
-def register_websocket_handlers(sio,project_service:ProjectService,agent_service:AgentService,workflow_service:WorkflowService,intervention_service:InterventionService,subscription_manager:SubscriptionManager):
+def register_websocket_handlers(sio,project_service:ProjectService,agent_service:AgentService,workflow_service:WorkflowService,intervention_service:InterventionService,subscription_manager:SubscriptionManager,websocket_emitter:Optional[WebSocketEmitter]=None):
 
     @sio.event
     def connect(sid,environ):
@@ -47,9 +52,22 @@ def register_websocket_handlers(sio,project_service:ProjectService,agent_service
         get_logger().info(f"WebSocket client disconnected: {sid}")
         subscription_manager.remove_all_subscriptions(sid)
 
+    def _load_state(project_id,project,epoch,seq):
+        return {
+            "project":project,
+            "agents":agent_service.get_agents_by_project(project_id),
+            "checkpoints":workflow_service.get_checkpoints_by_project(project_id),
+            "interventions":intervention_service.get_interventions_by_project(project_id),
+            "metrics":project_service.get_project_metrics(project_id),
+            "logs":project_service.get_system_logs(project_id),
+            "epoch":epoch,
+            "seq":seq
+        }
+
     @sio.on('subscribe:project')
     def subscribe_project(sid,data):
         project_id=data.get('projectId') if isinstance(data,dict) else data
+        last_seq=data.get('lastSeq') if isinstance(data,dict) else None
         get_logger().debug(f"WebSocket client {sid} subscribing to project: {project_id}")
 
         project=project_service.get_project(project_id)
@@ -61,21 +79,44 @@ def register_websocket_handlers(sio,project_service:ProjectService,agent_service
             return
 
         subscription_manager.add_subscription(project_id,sid)
-        sio.enter_room(sid,f"project:{project_id}")
-        agents=agent_service.get_agents_by_project(project_id)
-        checkpoints=workflow_service.get_checkpoints_by_project(project_id)
-        interventions=intervention_service.get_interventions_by_project(project_id)
-        metrics=project_service.get_project_metrics(project_id)
-        logs=project_service.get_system_logs(project_id)
+        room=f"project:{project_id}"
 
-        sio.emit('connection:state_sync',{
-            "project":project,
-            "agents":agents,
-            "checkpoints":checkpoints,
-            "interventions":interventions,
-            "metrics":metrics,
-            "logs":logs
-        },room=sid)
+        if not websocket_emitter:
+            sio.enter_room(sid,room)
+            sio.emit('connection:state_sync',_load_state(project_id,project,None,None),room=sid)
+            get_logger().debug(f"WebSocket sent state sync to {sid} for project {project_id}")
+            return
+
+        if isinstance(last_seq,int):
+            with websocket_emitter.hold_delivery():
+                missed=websocket_emitter.get_events_since(project_id,last_seq,data.get('epoch'))
+                if missed is not None:
+                    sio.enter_room(sid,room)
+                    seq,events=missed
+                    sio.emit('connection:delta_sync',{
+                        "projectId":project_id,
+                        "project":project,
+                        "epoch":websocket_emitter.epoch,
+                        "seq":seq,
+                        "events":events
+                    },room=sid)
+            if missed is not None:
+                get_logger().debug(f"WebSocket sent {len(missed[1])} missed event(s) to {sid} for project {project_id}")
+                return
+
+        seq=websocket_emitter.get_sequence(project_id)
+        state=_load_state(project_id,project,websocket_emitter.epoch,seq)
+        with websocket_emitter.hold_delivery():
+            sio.enter_room(sid,room)
+            sio.emit('connection:state_sync',state,room=sid)
+            missed=websocket_emitter.get_events_since(project_id,seq)
+            if missed and missed[1]:
+                sio.emit('connection:delta_sync',{
+                    "projectId":project_id,
+                    "epoch":websocket_emitter.epoch,
+                    "seq":missed[0],
+                    "events":missed[1]
+                },room=sid)
 
         get_logger().debug(f"WebSocket sent state sync to {sid} for project {project_id}")
 
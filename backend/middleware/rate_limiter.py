@@ -1,21 +1,113 @@
+import math
+import os
+import sqlite3
 import time
 from functools import wraps
-from typing import Dict,Optional,Callable
+from typing import Dict,Optional,Callable,Tuple
 from flask import Flask,request,jsonify
-from collections import defaultdict
 import threading
+from middleware.logger import get_logger
+
+
+def gcra(tat:Optional[float],now:float,limit:int,window:float)->Tuple[bool,float,int,float]:
+ interval=window/max(1,limit)
+ tat=now if tat is None or tat<now else tat
+ new_tat=tat+interval
+ allow_at=new_tat-window
+ if now<allow_at:
+  return False,tat,0,allow_at-now
+ return True,new_tat,int((window-(new_tat-now))/interval+1e-9),0.0
+
+
+class MemoryRateStore:
+ name="memory"
+
+ def __init__(self):
+  self._tats:Dict[str,float]={}
+  self._lock=threading.Lock()
+
+ def update(self,key:str,now:float,limit:int,window:float)->Tuple[bool,int,float]:
+  with self._lock:
+   allowed,tat,remaining,retry_after=gcra(self._tats.get(key),now,limit,window)
+   if allowed:
+    self._tats[key]=tat
+  return allowed,remaining,retry_after
+
+ def cleanup(self,now:float)->int:
+  with self._lock:
+   stale=[key for key,tat in self._tats.items() if tat<=now]
+   for key in stale:
+    del self._tats[key]
+  return len(stale)
+
+ def __len__(self)->int:
+  return len(self._tats)
+
+
+class SqliteRateStore:
+ name="sqlite"
+
+ def __init__(self,path:str,timeout:float=5.0):
+  self._path=path
+  self._timeout=timeout
+  self._local=threading.local()
+  directory=os.path.dirname(path)
+  if directory:
+   os.makedirs(directory,exist_ok=True)
+  self._connect().execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY,tat REAL NOT NULL)")
+
+ def _connect(self)->sqlite3.Connection:
+  conn=getattr(self._local,"conn",None)
+  if conn is None:
+   conn=sqlite3.connect(self._path,timeout=self._timeout,isolation_level=None,check_same_thread=False)
+   conn.execute("PRAGMA journal_mode=WAL")
+   conn.execute("PRAGMA synchronous=NORMAL")
+   self._local.conn=conn
+  return conn
+
+ def update(self,key:str,now:float,limit:int,window:float)->Tuple[bool,int,float]:
+  conn=self._connect()
+  conn.execute("BEGIN IMMEDIATE")
+  try:
+   row=conn.execute("SELECT tat FROM rate_limits WHERE key=?",(key,)).fetchone()
+   allowed,tat,remaining,retry_after=gcra(row[0] if row else None,now,limit,window)
+   if allowed:
+    conn.execute("INSERT INTO rate_limits (key,tat) VALUES (?,?) ON CONFLICT(key) DO UPDATE SET tat=excluded.tat",(key,tat))
+   conn.execute("COMMIT")
+  except Exception:
+   if conn.in_transaction:
+    conn.execute("ROLLBACK")
+   raise
+  return allowed,remaining,retry_after
+
+ def cleanup(self,now:float)->int:
+  return self._connect().execute("DELETE FROM rate_limits WHERE tat<=?",(now,)).rowcount
+
+ def __len__(self)->int:
+  return self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+def create_rate_store(kind:str="memory",path:Optional[str]=None):
+ if kind=="sqlite":
+  if not path:
+   from config import get_config
+   path=os.path.join(get_config().database.data_dir,"rate_limits.db")
+  return SqliteRateStore(path)
+ if kind!="memory":
+  raise ValueError(f"Unknown rate limit store: {kind}")
+ return MemoryRateStore()
 
 
 class RateLimiter:
- def __init__(self,default_limit:int=60,default_window:int=60,cleanup_interval:int=300):
+ def __init__(self,default_limit:int=60,default_window:int=60,cleanup_interval:int=300,store=None):
   self._default_limit=default_limit
   self._default_window=default_window
-  self._requests:Dict[str,list]=defaultdict(list)
-  self._lock=threading.Lock()
+  self._store=store if store is not None else MemoryRateStore()
   self._endpoint_limits:Dict[str,tuple]={}
   self._cleanup_interval=cleanup_interval
-  self._last_cleanup=time.time()
   self._cleanup_thread:Optional[threading.Thread]=None
+  self._stats={"checks":0,"rejected":0,"storeErrors":0}
+  self._stats_lock=threading.Lock()
 
  def start_cleanup_thread(self)->None:
   if self._cleanup_thread is None or not self._cleanup_thread.is_alive():
@@ -25,21 +117,16 @@ class RateLimiter:
  def _cleanup_loop(self)->None:
   while True:
    time.sleep(self._cleanup_interval)
-   self._global_cleanup()
+   try:
+    self._global_cleanup()
+   except sqlite3.Error as e:
+    get_logger().error(f"Rate limit store cleanup failed: {e}",exc_info=True)
 
- def _global_cleanup(self)->None:
-  with self._lock:
-   now=time.time()
-   max_window=max((w for _,w in self._endpoint_limits.values()),default=self._default_window)
-   stale_clients=[
-    cid for cid,timestamps in self._requests.items()
-    if not timestamps or now-max(timestamps)>max_window*2
-   ]
-   for cid in stale_clients:
-    del self._requests[cid]
+ def _global_cleanup(self)->int:
+  return self._store.cleanup(time.time())
 
  def set_limit(self,endpoint:str,limit:int,window:int=60)->None:
-  self._endpoint_limits[endpoint]=( limit,window)
+  self._endpoint_limits[endpoint]=(limit,window)
 
  def _get_client_id(self)->str:
   return request.remote_addr or"unknown"
@@ -47,38 +134,46 @@ class RateLimiter:
  def _get_limit_for_endpoint(self,endpoint:str)->tuple:
   return self._endpoint_limits.get(endpoint,(self._default_limit,self._default_window))
 
- def _cleanup_old_requests(self,client_id:str,window:int)->None:
-  now=time.time()
-  self._requests[client_id]=[t for t in self._requests[client_id] if now-t<window]
+ def check(self,client_id:str,endpoint:str="")->tuple:
+  limit,window=self._get_limit_for_endpoint(endpoint)
+  try:
+   allowed,remaining,retry_after=self._store.update(f"{client_id}|{endpoint}",time.time(),limit,window)
+  except sqlite3.Error as e:
+   get_logger().error(f"Rate limit store failed for {endpoint}, allowing request: {e}",exc_info=True)
+   with self._stats_lock:
+    self._stats["checks"]+=1
+    self._stats["storeErrors"]+=1
+   return True,{"limit":limit,"remaining":limit,"retry_after":0}
+  with self._stats_lock:
+   self._stats["checks"]+=1
+   if not allowed:
+    self._stats["rejected"]+=1
+  if not allowed:
+   return False,{"limit":limit,"remaining":0,"retry_after":max(1,math.ceil(retry_after))}
+  return True,{"limit":limit,"remaining":remaining,"retry_after":0}
 
  def is_allowed(self,endpoint:Optional[str]=None)->tuple:
-  client_id=self._get_client_id()
-  limit,window=self._get_limit_for_endpoint(endpoint or"")
-  with self._lock:
-   self._cleanup_old_requests(client_id,window)
-   current_count=len(self._requests[client_id])
-   if current_count>=limit:
-    retry_after=int(window-(time.time()-self._requests[client_id][0]))
-    return False,{"limit":limit,"remaining":0,"retry_after":max(1,retry_after)}
-   self._requests[client_id].append(time.time())
-   return True,{"limit":limit,"remaining":limit-current_count-1,"retry_after":0}
+  return self.check(self._get_client_id(),endpoint or"")
 
  def get_stats(self)->Dict[str,any]:
-  with self._lock:
-   return {
-    "total_clients":len(self._requests),
-    "endpoint_limits":dict(self._endpoint_limits),
-    "default_limit":self._default_limit,
-    "default_window":self._default_window,
-   }
+  with self._stats_lock:
+   stats=dict(self._stats)
+  return {
+   "store":self._store.name,
+   "total_clients":len(self._store),
+   "endpoint_limits":dict(self._endpoint_limits),
+   "default_limit":self._default_limit,
+   "default_window":self._default_window,
+   **stats,
+  }
 
 
 _limiter:Optional[RateLimiter]=None
 
 
-def create_limiter(default_limit:int=60,default_window:int=60)->RateLimiter:
+def create_limiter(default_limit:int=60,default_window:int=60,store=None)->RateLimiter:
  global _limiter
- _limiter=RateLimiter(default_limit,default_window)
+ _limiter=RateLimiter(default_limit,default_window,store=store)
  return _limiter
 
 
@@ -118,8 +213,8 @@ def rate_limit(limit:Optional[int]=None,window:Optional[int]=None)->Callable:
  return decorator
 
 
-def init_rate_limiter(app:Flask,default_limit:int=60,default_window:int=60)->RateLimiter:
- limiter=create_limiter(default_limit,default_window)
+def init_rate_limiter(app:Flask,default_limit:int=60,default_window:int=60,store_kind:str="memory",store_path:Optional[str]=None)->RateLimiter:
+ limiter=create_limiter(default_limit,default_window,create_rate_store(store_kind,store_path))
  limiter.set_limit("/api/ai/chat",30,60)
  limiter.set_limit("/api/ai/chat/stream",30,60)
  limiter.set_limit("/api/projects/<project_id>/start",10,60)
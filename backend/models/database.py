@@ -60,18 +60,39 @@ MIGRATIONS=[
  (5,"api_key_store","latency_ms","ALTER TABLE api_key_store ADD COLUMN latency_ms INTEGER"),
  (6,"assets","agent_id","ALTER TABLE assets ADD COLUMN agent_id VARCHAR(50)"),
  (7,"llm_jobs","tools_json","ALTER TABLE llm_jobs ADD COLUMN tools_json TEXT"),
+ (8,"agents","ix_agents_project_parent","CREATE INDEX IF NOT EXISTS ix_agents_project_parent ON agents (project_id, parent_agent_id)"),
+ (9,"agents","ix_agents_parent_agent_id","CREATE INDEX IF NOT EXISTS ix_agents_parent_agent_id ON agents (parent_agent_id)"),
+ (10,"agent_logs","ix_agent_logs_agent_created","CREATE INDEX IF NOT EXISTS ix_agent_logs_agent_created ON agent_logs (agent_id, created_at)"),
+ (11,"system_logs","ix_system_logs_project_created","CREATE INDEX IF NOT EXISTS ix_system_logs_project_created ON system_logs (project_id, created_at)"),
+ (12,"agent_traces","ix_agent_traces_project_started","CREATE INDEX IF NOT EXISTS ix_agent_traces_project_started ON agent_traces (project_id, started_at)"),
+ (13,"agent_traces","ix_agent_traces_agent_started","CREATE INDEX IF NOT EXISTS ix_agent_traces_agent_started ON agent_traces (agent_id, started_at)"),
+ (14,"llm_jobs","ix_llm_jobs_status_priority_created","CREATE INDEX IF NOT EXISTS ix_llm_jobs_status_priority_created ON llm_jobs (status, priority DESC, created_at)"),
+ (15,"llm_jobs","ix_llm_jobs_project_status","CREATE INDEX IF NOT EXISTS ix_llm_jobs_project_status ON llm_jobs (project_id, status)"),
+ (16,"llm_jobs","ix_llm_jobs_agent_created","CREATE INDEX IF NOT EXISTS ix_llm_jobs_agent_created ON llm_jobs (agent_id, created_at)"),
+ (17,"llm_jobs","ix_llm_jobs_provider_status","CREATE INDEX IF NOT EXISTS ix_llm_jobs_provider_status ON llm_jobs (provider_id, status)"),
+ (18,"llm_jobs","ix_llm_jobs_external_job_id","CREATE INDEX IF NOT EXISTS ix_llm_jobs_external_job_id ON llm_jobs (external_job_id)"),
+ (19,"checkpoints","ix_checkpoints_project_status","CREATE INDEX IF NOT EXISTS ix_checkpoints_project_status ON checkpoints (project_id, status)"),
+ (20,"checkpoints","ix_checkpoints_agent_status","CREATE INDEX IF NOT EXISTS ix_checkpoints_agent_status ON checkpoints (agent_id, status)"),
+ (21,"assets","ix_assets_project_status","CREATE INDEX IF NOT EXISTS ix_assets_project_status ON assets (project_id, approval_status)"),
+ (22,"assets","ix_assets_agent_status","CREATE INDEX IF NOT EXISTS ix_assets_agent_status ON assets (agent_id, approval_status)"),
+ (23,"interventions","ix_interventions_project","CREATE INDEX IF NOT EXISTS ix_interventions_project ON interventions (project_id)"),
 ]
 
-def _run_migrations():
+def _is_index_migration(sql:str)->bool:
+ return sql.lstrip().upper().startswith("CREATE INDEX")
+
+def _run_migrations(bind=None):
  from sqlalchemy import inspect,text
  from middleware.logger import get_logger
  logger=get_logger()
- inspector=inspect(engine)
+ bind=bind or engine
+ inspector=inspect(bind)
  table_names=set(inspector.get_table_names())
  if"schema_version" not in table_names:
-  with engine.begin() as conn:
+  with bind.begin() as conn:
    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"))
- with engine.begin() as conn:
+ with bind.begin() as conn:
+  inspector=inspect(conn)
   current_version=_get_schema_version(conn,text)
   applied=0
   for version,table,column,sql in MIGRATIONS:
@@ -80,10 +101,16 @@ def _run_migrations():
    if table not in table_names:
     _set_schema_version(conn,text,version)
     continue
-   columns={c["name"] for c in inspector.get_columns(table)}
-   if column not in columns:
-    conn.execute(text(sql))
-    logger.info(f"Migration v{version}: Added {column} to {table}")
+   if _is_index_migration(sql):
+    indexes={i["name"] for i in inspector.get_indexes(table)}
+    if column not in indexes:
+     conn.execute(text(sql))
+     logger.info(f"Migration v{version}: Created index {column} on {table}")
+   else:
+    columns={c["name"] for c in inspector.get_columns(table)}
+    if column not in columns:
+     conn.execute(text(sql))
+     logger.info(f"Migration v{version}: Added {column} to {table}")
    _set_schema_version(conn,text,version)
    applied+=1
   if applied>0:
@@ -233,6 +233,26 @@ class LlmJob(Base):
  completed_at=Column(DateTime)
 
 
+class ProjectTokenUsage(Base):
+ __tablename__="project_token_usage"
+ project_id=Column(String(50),ForeignKey("projects.id"),primary_key=True)
+ tokens_used=Column(Integer,default=0,nullable=False)
+ updated_at=Column(DateTime,default=datetime.now,onupdate=datetime.now)
+ reconciled_at=Column(DateTime)
+
+
+class SummaryCacheEntry(Base):
+ __tablename__="summary_cache"
+ cache_key=Column(String(64),primary_key=True)
+ agent_type=Column(String(50))
+ model=Column(String(100))
+ summary=Column(Text,nullable=False)
+ size_bytes=Column(Integer,default=0,nullable=False)
+ hit_count=Column(Integer,default=0,nullable=False)
+ created_at=Column(DateTime,default=datetime.now)
+ last_accessed_at=Column(DateTime,default=datetime.now,index=True)
+
+
 class LocalProviderConfig(Base):
  __tablename__="local_provider_configs"
  provider_id=Column(String(50),primary_key=True)
@@ -1,15 +1,52 @@
 """AIプロバイダーヘルスモニター"""
 import threading
 import time
-from typing import Dict,Optional,Callable,Any,Set
+from collections import deque
+from concurrent.futures import Future,ThreadPoolExecutor
+from typing import Deque,Dict,Optional,Callable,Any,Set
 from datetime import datetime
 from middleware.logger import get_logger
-from .base import HealthCheckResult
+from .base import AIProvider,HealthCheckResult
 from .registry import ProviderRegistry
 
+CHECK_TIMEOUT=15.0
+MIN_CHECK_INTERVAL=5
+MAX_CHECK_INTERVAL=120
+MAX_CONCURRENT_CHECKS=8
+LATENCY_SAMPLE_SIZE=200
+PASSIVE_FAILURE_THRESHOLD=3
+TICK_INTERVAL=1.0
+
+
+def _percentiles(samples:Deque[float])->Dict[str,Any]:
+ ordered=sorted(samples)
+ if not ordered:
+  return {"count":0,"p50Ms":None,"p95Ms":None,"p99Ms":None}
+ pick=lambda q:round(ordered[min(len(ordered)-1,int(len(ordered)*q))],1)
+ return {"count":len(ordered),"p50Ms":pick(0.5),"p95Ms":pick(0.95),"p99Ms":pick(0.99)}
+
+
+class _ProviderState:
+ """プロバイダーごとの監視状態（チェック間隔・実行中チェック・レイテンシ）"""
+
+ def __init__(self,interval:float):
+  self.interval=interval
+  self.next_check=0.0
+  self.in_flight:Optional[Future]=None
+  self.started_at=0.0
+  self.timed_out=False
+  self.probe_id=0
+  self.provider:Optional[AIProvider]=None
+  self.consecutive_failures=0
+  self.job_failures=0
+  self.last_job_success=0.0
+  self.probe_latency:Deque[float]=deque(maxlen=LATENCY_SAMPLE_SIZE)
+  self.job_latency:Deque[float]=deque(maxlen=LATENCY_SAMPLE_SIZE)
+  self.counts={"checks":0,"checkFailures":0,"timeouts":0,"skipped":0,"jobsCompleted":0,"jobsFailed":0}
+
 
 class ProviderHealthMonitor:
- """プロバイダーのヘルス状態を定期監視"""
+ """プロバイダーのヘルス状態を監視（並行アクティブチェック＋ジョブ結果によるパッシブ判定）"""
  _instance:Optional["ProviderHealthMonitor"]=None
  _lock=threading.Lock()
 
@@ -26,6 +63,10 @@ class ProviderHealthMonitor:
    return
   self._health_states:Dict[str,HealthCheckResult]={}
   self._check_interval=10
+  self._check_timeout=CHECK_TIMEOUT
+  self._states:Dict[str,_ProviderState]={}
+  self._state_lock=threading.RLock()
+  self._executor:Optional[ThreadPoolExecutor]=None
   self._running=False
   self._thread:Optional[threading.Thread]=None
   self._on_health_change:Optional[Callable[[str,HealthCheckResult],None]]=None
@@ -33,7 +74,10 @@ class ProviderHealthMonitor:
   self._initialized=True
 
  def set_check_interval(self,seconds:int)->None:
-  self._check_interval=max(5,seconds)
+  self._check_interval=max(MIN_CHECK_INTERVAL,seconds)
+
+ def set_check_timeout(self,seconds:float)->None:
+  self._check_timeout=max(1.0,seconds)
 
  def set_socketio(self,sio)->None:
   self._sio=sio
@@ -45,6 +89,7 @@ class ProviderHealthMonitor:
   if self._running:
    return
   self._running=True
+  self._executor=ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CHECKS,thread_name_prefix="provider-health")
   self._thread=threading.Thread(target=self._monitor_loop,daemon=True)
   self._thread.start()
 
@@ -53,34 +98,89 @@ class ProviderHealthMonitor:
   if self._thread:
    self._thread.join(timeout=2)
    self._thread=None
+  if self._executor:
+   self._executor.shutdown(wait=False,cancel_futures=True)
+   self._executor=None
 
  def get_health_status(self,provider_id:str)->Optional[HealthCheckResult]:
   return self._health_states.get(provider_id)
 
  def get_all_health_status(self)->Dict[str,Dict[str,Any]]:
+  with self._state_lock:
+   states=dict(self._health_states)
   return {
-   pid:state.to_dict() for pid,state in self._health_states.items()
+   pid:state.to_dict() for pid,state in states.items()
   }
 
+ def get_latency_stats(self)->Dict[str,Dict[str,Any]]:
+  """プロバイダーごとのレイテンシ分位数とチェック間隔"""
+  with self._state_lock:
+   return {
+    pid:{
+     "checkIntervalSec":state.interval,
+     "consecutiveFailures":state.consecutive_failures,
+     "checking":state.in_flight is not None,
+     "probeLatency":_percentiles(state.probe_latency),
+     "jobLatency":_percentiles(state.job_latency),
+     **state.counts,
+    }
+    for pid,state in self._states.items()
+   }
+
  def check_provider_now(self,provider_id:str)->HealthCheckResult:
   provider=ProviderRegistry.get_fresh(provider_id)
-  if not provider:
-   result=HealthCheckResult(
-    available=False,
-    error=f"プロバイダーが見つかりません: {provider_id}",
-    checked_at=datetime.now(),
-   )
-  elif not provider.validate_config():
-   result=HealthCheckResult(
-    available=False,
-    error="APIキーが設定されていません",
-    checked_at=datetime.now(),
-   )
-  else:
-   result=provider.health_check()
-  self._update_health_state(provider_id,result)
+  with self._state_lock:
+   state=self._get_state(provider_id)
+   state.provider=provider
+   state.probe_id+=1
+  result=self._run_check(provider_id,provider)
+  self._record_check(provider_id,result)
   return result
 
+ def reset_provider(self,provider_id:str)->None:
+  """APIキー変更時にキャッシュ済みのプローブ用プロバイダーを破棄し、次のチェックを即時実行させる"""
+  with self._state_lock:
+   state=self._states.get(provider_id)
+   if state is None:
+    return
+   state.provider=None
+   state.probe_id+=1
+   state.next_check=0.0
+
+ def record_job_outcome(self,provider_id:str,success:bool,latency_ms:Optional[float]=None,error:Optional[str]=None)->None:
+  """LlmJobQueueの実ジョブ結果からパッシブにヘルス状態を更新"""
+  now=time.monotonic()
+  result=None
+  with self._state_lock:
+   state=self._get_state(provider_id)
+   current=self._health_states.get(provider_id)
+   if success:
+    state.counts["jobsCompleted"]+=1
+    state.job_failures=0
+    state.last_job_success=now
+    if latency_ms is not None:
+     state.job_latency.append(latency_ms)
+    if current is None or not current.available:
+     state.consecutive_failures=0
+     state.interval=self._check_interval
+     state.next_check=now+state.interval
+     result=HealthCheckResult(available=True,latency_ms=int(latency_ms) if latency_ms is not None else None,checked_at=datetime.now())
+   else:
+    state.counts["jobsFailed"]+=1
+    state.job_failures+=1
+    if state.job_failures>=PASSIVE_FAILURE_THRESHOLD:
+     state.next_check=now
+     if current is None or current.available:
+      result=HealthCheckResult(available=False,error=f"ジョブが連続で失敗しています ({state.job_failures}回): {error or 'unknown'}",checked_at=datetime.now())
+  if result:
+   self._update_health_state(provider_id,result)
+
+ def _get_state(self,provider_id:str)->_ProviderState:
+  state=self._states.get(provider_id)
+  if state is None:
+   state=self._states[provider_id]=_ProviderState(self._check_interval)
+  return state
+
  def _get_active_provider_ids(self)->Set[str]:
   from config_loaders.ai_provider_config import get_usage_categories
   ids=set()
@@ -93,31 +193,131 @@ class ProviderHealthMonitor:
 
  def _monitor_loop(self)->None:
   while self._running:
-   self._check_all_providers()
-   time.sleep(self._check_interval)
+   try:
+    self._check_all_providers()
+   except Exception as e:
+    get_logger().error(f"ProviderHealthMonitor loop error: {e}",exc_info=True)
+   time.sleep(TICK_INTERVAL)
 
  def _check_all_providers(self)->None:
-  active_ids=self._get_active_provider_ids()
-  for provider_id in active_ids:
+  now=time.monotonic()
+  timed_out=[]
+  due=[]
+  for provider_id in self._get_active_provider_ids():
    if provider_id=="mock":
     continue
    if not ProviderRegistry.is_registered(provider_id):
     continue
-   try:
-    self.check_provider_now(provider_id)
-   except Exception:
-    self._update_health_state(
-     provider_id,
-     HealthCheckResult(
-      available=False,
-      error="ヘルスチェック中に例外が発生しました",
-      checked_at=datetime.now(),
-     )
-    )
+   with self._state_lock:
+    state=self._get_state(provider_id)
+    if state.in_flight is not None:
+     if not state.timed_out and now-state.started_at>self._check_timeout:
+      state.timed_out=True
+      state.counts["timeouts"]+=1
+      timed_out.append(provider_id)
+     continue
+    if now<state.next_check:
+     continue
+    current=self._health_states.get(provider_id)
+    if current and current.available and state.last_job_success and now-state.last_job_success<state.interval:
+     state.counts["skipped"]+=1
+     state.next_check=now+state.interval
+     continue
+    state.started_at=now
+    state.timed_out=False
+    state.probe_id+=1
+    due.append((provider_id,state))
+  for provider_id in timed_out:
+   self._record_check(provider_id,HealthCheckResult(
+    available=False,
+    error=f"ヘルスチェックがタイムアウトしました ({self._check_timeout:.0f}s)",
+    checked_at=datetime.now(),
+   ))
+  for provider_id,state in due:
+   self._submit_check(provider_id,state)
+
+ def _submit_check(self,provider_id:str,state:_ProviderState)->None:
+  if self._executor is None:
+   self._record_check(provider_id,self._run_check(provider_id,self._provider_for(provider_id)))
+   return
+  future=self._executor.submit(lambda:self._run_check(provider_id,self._provider_for(provider_id)))
+  with self._state_lock:
+   state.in_flight=future
+   probe_id=state.probe_id
+  future.add_done_callback(lambda f:self._on_check_done(provider_id,state,probe_id,f))
+
+ def _on_check_done(self,provider_id:str,state:_ProviderState,probe_id:int,future:Future)->None:
+  with self._state_lock:
+   state.in_flight=None
+   superseded=state.probe_id!=probe_id
+  if superseded or future.cancelled():
+   return
+  try:
+   result=future.result()
+  except Exception as e:
+   result=HealthCheckResult(available=False,error=f"ヘルスチェック中に例外が発生しました: {e}",checked_at=datetime.now())
+  self._record_check(provider_id,result)
+
+ def _provider_for(self,provider_id:str)->Optional[AIProvider]:
+  with self._state_lock:
+   state=self._get_state(provider_id)
+   if state.provider is None:
+    state.provider=ProviderRegistry.get_fresh(provider_id)
+   return state.provider
+
+ def _run_check(self,provider_id:str,provider:Optional[AIProvider])->HealthCheckResult:
+  if not provider:
+   return HealthCheckResult(
+    available=False,
+    error=f"プロバイダーが見つかりません: {provider_id}",
+    checked_at=datetime.now(),
+   )
+  if not provider.validate_config():
+   return HealthCheckResult(
+    available=False,
+    error="APIキーが設定されていません",
+    checked_at=datetime.now(),
+   )
+  started=time.perf_counter()
+  try:
+   result=provider.health_check()
+  except Exception:
+   return HealthCheckResult(
+    available=False,
+    error="ヘルスチェック中に例外が発生しました",
+    checked_at=datetime.now(),
+   )
+  if result.available and result.latency_ms is None:
+   result.latency_ms=int((time.perf_counter()-started)*1000)
+  return result
+
+ def _record_check(self,provider_id:str,result:HealthCheckResult)->None:
+  now=time.monotonic()
+  with self._state_lock:
+   state=self._get_state(provider_id)
+   state.counts["checks"]+=1
+   if result.available:
+    if result.latency_ms is not None:
+     state.probe_latency.append(result.latency_ms)
+    previous=self._health_states.get(provider_id)
+    if previous and previous.available and not state.consecutive_failures:
+     state.interval=min(MAX_CHECK_INTERVAL,max(self._check_interval,state.interval*2))
+    else:
+     state.interval=self._check_interval
+    state.consecutive_failures=0
+    state.job_failures=0
+   else:
+    state.counts["checkFailures"]+=1
+    state.consecutive_failures+=1
+    state.interval=MIN_CHECK_INTERVAL
+    state.provider=None
+   state.next_check=now+state.interval
+  self._update_health_state(provider_id,result)
 
  def _update_health_state(self,provider_id:str,result:HealthCheckResult)->None:
-  previous=self._health_states.get(provider_id)
-  self._health_states[provider_id]=result
+  with self._state_lock:
+   previous=self._health_states.get(provider_id)
+   self._health_states[provider_id]=result
   state_changed=(
    previous is None or
    previous.available!=result.available
@@ -16,3 +16,4 @@ from .local_provider_config import LocalProviderConfigRepository
 from .cost_history import CostHistoryRepository
 from .global_cost_settings import GlobalCostSettingsRepository
 from .global_execution_settings import GlobalExecutionSettingsRepository
+from .summary_cache import SummaryCacheRepository
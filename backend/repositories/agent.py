@@ -35,6 +35,19 @@ class AgentRepository(BaseRepository[Agent]):
   agents=query.all()
   return [self.to_dict(a) for a in agents]
 
+ def get_summary_rows(self,project_id:str)->List[Dict]:
+  rows=self.session.query(Agent.id,Agent.type,Agent.status,Agent.progress,Agent.input_tokens,Agent.output_tokens,Agent.tokens_used,Agent.started_at).filter(Agent.project_id==project_id).all()
+  return [{
+   "id":r.id,
+   "type":r.type,
+   "status":r.status,
+   "progress":r.progress or 0,
+   "inputTokens":r.input_tokens or 0,
+   "outputTokens":r.output_tokens or 0,
+   "tokensUsed":r.tokens_used or 0,
+   "startedAt":r.started_at.isoformat() if r.started_at else None,
+  } for r in rows]
+
  def get_leaders_only(self,project_id:str)->List[Dict]:
   return self.get_by_project(project_id,include_workers=False)
 
@@ -3,8 +3,9 @@ from datetime import datetime
 from typing import Optional,List,Dict,Any
 from sqlalchemy.orm import Session
 from sqlalchemy import and_,update,func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from .base import BaseRepository
-from models.tables import LlmJob
+from models.tables import LlmJob,ProjectTokenUsage
 
 
 class LlmJobRepository(BaseRepository[LlmJob]):
@@ -50,6 +51,12 @@ class LlmJobRepository(BaseRepository[LlmJob]):
    LlmJob.status=="pending"
   ).order_by(LlmJob.priority.desc(),LlmJob.created_at.asc()).limit(limit).all()
 
+ def get_pending_counts_by_provider(self)->Dict[str,int]:
+  rows=self.session.query(LlmJob.provider_id,func.count(LlmJob.id)).filter(
+   LlmJob.status=="pending"
+  ).group_by(LlmJob.provider_id).all()
+  return {provider_id:count for provider_id,count in rows}
+
  def get_running_count(self)->int:
   return self.session.query(LlmJob).filter(LlmJob.status=="running").count()
 
@@ -73,12 +80,14 @@ class LlmJobRepository(BaseRepository[LlmJob]):
   job=self.get(job_id)
   if not job:
    return None
+  previous=(job.tokens_input or 0)+(job.tokens_output or 0) if job.status=="completed" else 0
   job.status="completed"
   job.response_content=response_content
   job.tokens_input=tokens_input
   job.tokens_output=tokens_output
   job.completed_at=datetime.now()
   self.session.flush()
+  self._add_token_usage(job.project_id,tokens_input+tokens_output-previous)
   return self.to_dict(job)
 
  def fail_job(self,job_id:str,error_message:str)->Optional[Dict[str,Any]]:
@@ -120,6 +129,14 @@ class LlmJobRepository(BaseRepository[LlmJob]):
   return [self.to_dict(j) for j in jobs]
 
  def get_project_token_usage(self,project_id:str)->int:
+  tokens=self.session.query(ProjectTokenUsage.tokens_used).filter(
+   ProjectTokenUsage.project_id==project_id
+  ).scalar()
+  if tokens is None:
+   tokens=self._seed_token_usage(project_id)
+  return int(tokens)
+
+ def compute_project_token_usage(self,project_id:str)->int:
   result=self.session.query(
    func.coalesce(func.sum(LlmJob.tokens_input+LlmJob.tokens_output),0)
   ).filter(
@@ -127,6 +144,55 @@ class LlmJobRepository(BaseRepository[LlmJob]):
   ).scalar()
   return int(result)
 
+ def _add_token_usage(self,project_id:str,delta:int)->None:
+  if delta==0:
+   return
+  result=self.session.execute(
+   update(ProjectTokenUsage).where(ProjectTokenUsage.project_id==project_id).values(
+    tokens_used=ProjectTokenUsage.tokens_used+delta,updated_at=datetime.now()
+   )
+  )
+  if result.rowcount==0:
+   self._seed_token_usage(project_id)
+
+ def _seed_token_usage(self,project_id:str)->int:
+  now=datetime.now()
+  self.session.execute(
+   sqlite_insert(ProjectTokenUsage).values(
+    project_id=project_id,tokens_used=self.compute_project_token_usage(project_id),updated_at=now,reconciled_at=now
+   ).on_conflict_do_nothing(index_elements=["project_id"])
+  )
+  return self.session.query(ProjectTokenUsage.tokens_used).filter(
+   ProjectTokenUsage.project_id==project_id
+  ).scalar()
+
+ def reconcile_token_usage(self,project_id:Optional[str]=None,fix:bool=False)->List[Dict[str,Any]]:
+  actual_query=self.session.query(
+   LlmJob.project_id,func.coalesce(func.sum(LlmJob.tokens_input+LlmJob.tokens_output),0)
+  ).filter(LlmJob.status=="completed")
+  cached_query=self.session.query(ProjectTokenUsage)
+  if project_id:
+   actual_query=actual_query.filter(LlmJob.project_id==project_id)
+   cached_query=cached_query.filter(ProjectTokenUsage.project_id==project_id)
+  actual={pid:int(total) for pid,total in actual_query.group_by(LlmJob.project_id).all()}
+  mismatches=[]
+  now=datetime.now()
+  for row in cached_query.order_by(ProjectTokenUsage.project_id).all():
+   expected=actual.get(row.project_id,0)
+   if row.tokens_used!=expected:
+    mismatches.append({
+     "projectId":row.project_id,
+     "cached":row.tokens_used,
+     "actual":expected,
+     "difference":row.tokens_used-expected,
+    })
+    if fix:
+     row.tokens_used=expected
+   if fix:
+    row.reconciled_at=now
+  self.session.flush()
+  return mismatches
+
  def cleanup_project_jobs(self,project_id:str)->int:
   incomplete_jobs=self.session.query(LlmJob).filter(
    and_(LlmJob.project_id==project_id,LlmJob.status.in_(["pending","running"]))
@@ -0,0 +1,73 @@
+from typing import Dict,List,Optional
+from datetime import datetime,timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.tables import SummaryCacheEntry
+
+EVICTION_DELETE_BATCH=500
+
+class SummaryCacheRepository:
+ def __init__(self,session:Session):
+  self.session=session
+
+ def get(self,cache_key:str,ttl_seconds:Optional[float]=None)->Optional[SummaryCacheEntry]:
+  entry=self.session.query(SummaryCacheEntry).filter(SummaryCacheEntry.cache_key==cache_key).first()
+  if entry is None:
+   return None
+  now=datetime.now()
+  if ttl_seconds is not None and entry.created_at<now-timedelta(seconds=ttl_seconds):
+   self.session.delete(entry)
+   self.session.flush()
+   return None
+  entry.hit_count=(entry.hit_count or 0)+1
+  entry.last_accessed_at=now
+  self.session.flush()
+  return entry
+
+ def put(self,cache_key:str,summary:str,agent_type:Optional[str]=None,model:Optional[str]=None)->SummaryCacheEntry:
+  now=datetime.now()
+  entry=self.session.merge(SummaryCacheEntry(
+   cache_key=cache_key,
+   agent_type=agent_type,
+   model=model,
+   summary=summary,
+   size_bytes=len(summary.encode("utf-8")),
+   hit_count=0,
+   created_at=now,
+   last_accessed_at=now,
+  ))
+  self.session.flush()
+  return entry
+
+ def evict(self,ttl_seconds:Optional[float]=None,max_entries:Optional[int]=None,max_bytes:Optional[int]=None)->int:
+  removed=0
+  if ttl_seconds is not None:
+   cutoff=datetime.now()-timedelta(seconds=ttl_seconds)
+   removed+=self.session.query(SummaryCacheEntry).filter(
+    SummaryCacheEntry.created_at<cutoff
+   ).delete(synchronize_session=False)
+  if max_entries is None and max_bytes is None:
+   self.session.flush()
+   return removed
+  rows=self.session.query(SummaryCacheEntry.cache_key,SummaryCacheEntry.size_bytes).order_by(
+   SummaryCacheEntry.last_accessed_at.desc()
+  ).all()
+  victims:List[str]=[]
+  kept=0
+  kept_bytes=0
+  for cache_key,size_bytes in rows:
+   if (max_entries is not None and kept>=max_entries) or (max_bytes is not None and kept_bytes+(size_bytes or 0)>max_bytes):
+    victims.append(cache_key)
+    continue
+   kept+=1
+   kept_bytes+=size_bytes or 0
+  for i in range(0,len(victims),EVICTION_DELETE_BATCH):
+   removed+=self.session.query(SummaryCacheEntry).filter(
+    SummaryCacheEntry.cache_key.in_(victims[i:i+EVICTION_DELETE_BATCH])
+   ).delete(synchronize_session=False)
+  self.session.flush()
+  return removed
+
+ def get_stats(self)->Dict[str,int]:
+  count,size=self.session.query(func.count(SummaryCacheEntry.cache_key),func.coalesce(func.sum(SummaryCacheEntry.size_bytes),0)).one()
+  return {"entries":count,"sizeBytes":int(size)}
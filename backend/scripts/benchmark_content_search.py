@@ -0,0 +1,107 @@
+import os
+import re
+import sys
+import time
+import fnmatch
+import random
+import argparse
+import tempfile
+from pathlib import Path
+sys.path.insert(0,str(Path(__file__).parent.parent))
+from cache.config import FileCacheConfig
+from cache.content_cache import ProjectFileCache
+
+WORDS=["player","enemy","update","render","physics","sprite","sound","input","camera","scene","level","score","health","damage","weapon","inventory","dialog","quest","network","save"]
+PATTERNS=[
+    ("literal","PlayerInventoryController"),
+    ("literal_common","self"),
+    ("regex","class\\s+Quest\\w+Manager"),
+    ("regex_alt","handle_network_timeout|on_save_corrupted"),
+    ("case_insensitive","DAMAGE_MULTIPLIER"),
+]
+
+def generate_project(root:str,file_count:int,lines_per_file:int,seed:int)->None:
+    rng=random.Random(seed)
+    for i in range(file_count):
+        sub=os.path.join(root,f"module_{i%50}")
+        os.makedirs(sub,exist_ok=True)
+        lines=[]
+        for _ in range(lines_per_file):
+            a,b,c=rng.choice(WORDS),rng.choice(WORDS),rng.choice(WORDS)
+            lines.append(f"    def {a}_{b}(self,{c}):return self.{c}_{a}+{rng.randint(0,999)}")
+        if i%97==0:
+            lines.append("class PlayerInventoryController:")
+        if i%113==0:
+            lines.append("class QuestLogManager:")
+        if i%211==0:
+            lines.append("def handle_network_timeout(self):")
+        if i%307==0:
+            lines.append("damage_multiplier=1.5")
+        with open(os.path.join(sub,f"file_{i}.py"),"w",encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+def linear_search(cache:ProjectFileCache,pattern:str,case_sensitive:bool,max_results:int)->list:
+    flags=0 if case_sensitive else re.IGNORECASE
+    regex=re.compile(pattern,flags)
+    results=[]
+    for path,entry in cache.get_all_files().items():
+        if len(results)>=max_results:
+            break
+        if entry.is_binary or entry.content is None:
+            continue
+        if not fnmatch.fnmatch(os.path.basename(path),"*"):
+            continue
+        for i,line in enumerate(entry.content.split("\n")):
+            if len(results)>=max_results:
+                break
+            if regex.search(line):
+                results.append((path,i+1))
+    return results
+
+def measure(func,repeat:int)->float:
+    start=time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter()-start)*1000/repeat
+
+def main()->None:
+    parser=argparse.ArgumentParser(description="ProjectFileCache.search_content benchmark (trigram index vs linear scan)")
+    parser.add_argument("--dir",help="Existing project directory (default: generate synthetic files)")
+    parser.add_argument("--files",type=int,default=5000)
+    parser.add_argument("--lines",type=int,default=200)
+    parser.add_argument("--repeat",type=int,default=5)
+    parser.add_argument("--max-results",type=int,default=100)
+    args=parser.parse_args()
+    tmp=None
+    root=args.dir
+    if root is None:
+        tmp=tempfile.TemporaryDirectory()
+        root=tmp.name
+        print(f"Generating {args.files} files x {args.lines} lines ...")
+        generate_project(root,args.files,args.lines,seed=42)
+    try:
+        cache=ProjectFileCache(FileCacheConfig(),"benchmark",root)
+        load_ms=measure(cache.load_all,1)
+        stats=cache.get_stats()
+        print(f"load_all: {load_ms:.1f} ms ({stats['text_files']} text files, {stats['size_mb']} MB)")
+        start=time.perf_counter()
+        cache.search_content("warmup_index_build")
+        print(f"index build: {(time.perf_counter()-start)*1000:.1f} ms ({cache.get_stats()['search_index']['trigrams']} trigrams)")
+        print()
+        print(f"{'case':<18}{'linear ms':>12}{'indexed ms':>12}{'speedup':>10}{'results':>10}")
+        for name,pattern in PATTERNS:
+            case_sensitive=name!="case_insensitive"
+            linear=linear_search(cache,pattern,case_sensitive,args.max_results)
+            indexed=cache.search_content(pattern,case_sensitive=case_sensitive,max_results=args.max_results)
+            if [(r["file"],r["line_no"]) for r in indexed]!=linear:
+                print(f"  MISMATCH for {name}: linear={len(linear)} indexed={len(indexed)}")
+            linear_ms=measure(lambda:linear_search(cache,pattern,case_sensitive,args.max_results),args.repeat)
+            indexed_ms=measure(lambda:cache.search_content(pattern,case_sensitive=case_sensitive,max_results=args.max_results),args.repeat)
+            speedup=linear_ms/indexed_ms if indexed_ms>0 else float("inf")
+            print(f"{name:<18}{linear_ms:>12.2f}{indexed_ms:>12.2f}{speedup:>9.1f}x{len(indexed):>10}")
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,50 @@
+import sys
+import random
+import asyncio
+import argparse
+from pathlib import Path
+sys.path.insert(0,str(Path(__file__).parent.parent))
+from agents.task_dispatcher import TaskDAG,DagTimeline,SCHEDULER_LAYERED,SCHEDULER_READY_QUEUE,execute_dag
+
+def build_tasks(count:int,max_deps:int,rng:random.Random)->list:
+    tasks=[]
+    for i in range(count):
+        candidates=[f"task_{j}" for j in range(i)]
+        deps=rng.sample(candidates,min(len(candidates),rng.randint(0,max_deps)))
+        tasks.append({"id":f"task_{i}","worker":f"worker_{i}","task":"","depends_on":deps})
+    return tasks
+
+async def run(tasks:list,durations:dict,scheduler:str,max_parallel:int)->DagTimeline:
+    async def execute(task):
+        await asyncio.sleep(durations[task["id"]])
+        return task["id"]
+    timeline=DagTimeline(scheduler)
+    await execute_dag(TaskDAG(tasks),execute,scheduler=scheduler,max_parallel=max_parallel,timeline=timeline)
+    return timeline
+
+def main()->None:
+    parser=argparse.ArgumentParser(description="DAG scheduler makespan benchmark (ready-queue vs layered)")
+    parser.add_argument("--tasks",type=int,default=12)
+    parser.add_argument("--max-deps",type=int,default=2)
+    parser.add_argument("--max-parallel",type=int,default=0)
+    parser.add_argument("--min-ms",type=int,default=20)
+    parser.add_argument("--max-ms",type=int,default=400)
+    parser.add_argument("--runs",type=int,default=5)
+    parser.add_argument("--seed",type=int,default=1)
+    args=parser.parse_args()
+    rng=random.Random(args.seed)
+    print(f"{'run':<5}{'layered':>12}{'ready_queue':>14}{'speedup':>10}")
+    totals={SCHEDULER_LAYERED:0.0,SCHEDULER_READY_QUEUE:0.0}
+    for i in range(args.runs):
+        tasks=build_tasks(args.tasks,args.max_deps,rng)
+        durations={t["id"]:rng.randint(args.min_ms,args.max_ms)/1000 for t in tasks}
+        makespans={}
+        for scheduler in (SCHEDULER_LAYERED,SCHEDULER_READY_QUEUE):
+            makespans[scheduler]=asyncio.run(run(tasks,durations,scheduler,args.max_parallel)).makespan_ms
+            totals[scheduler]+=makespans[scheduler]
+        speedup=makespans[SCHEDULER_LAYERED]/max(makespans[SCHEDULER_READY_QUEUE],0.001)
+        print(f"{i:<5}{makespans[SCHEDULER_LAYERED]:>9.1f} ms{makespans[SCHEDULER_READY_QUEUE]:>11.1f} ms{speedup:>9.2f}x")
+    print(f"{'avg':<5}{totals[SCHEDULER_LAYERED]/args.runs:>9.1f} ms{totals[SCHEDULER_READY_QUEUE]/args.runs:>11.1f} ms")
+
+if __name__=="__main__":
+    main()
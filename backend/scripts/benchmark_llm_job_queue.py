@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+from unittest.mock import MagicMock,patch
+sys.path.insert(0,str(Path(__file__).parent.parent))
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from models.tables import Base
+from services.llm_job_queue import LlmJobQueue,TERMINAL_JOB_STATUSES
+
+class LegacyPollingQueue(LlmJobQueue):
+    def _worker_loop(self)->None:
+        while self._running:
+            self._process_pending_jobs()
+            time.sleep(1.0)
+
+    def wait_for_job(self,job_id:str,timeout:float=300.0):
+        start=time.time()
+        while time.time()-start<timeout:
+            job=self.get_job_status(job_id)
+            if job and job["status"] in TERMINAL_JOB_STATUSES:
+                return job
+            time.sleep(0.5)
+        return None
+
+def make_scope(db_path:str):
+    engine=create_engine(f"sqlite:///{db_path}",connect_args={"check_same_thread":False})
+    Base.metadata.create_all(engine)
+    SessionLocal=sessionmaker(bind=engine)
+    @contextmanager
+    def scope():
+        session=SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    return engine,scope
+
+def run(queue_cls,jobs:int,db_path:str)->dict:
+    engine,scope=make_scope(db_path)
+    executor=MagicMock()
+    executor.return_value.execute_stream.return_value=("ok",1,1,[])
+    concurrency=MagicMock()
+    concurrency.can_start_job.return_value=True
+    concurrency.get_max_concurrent.return_value=2
+    with patch("services.llm_job_queue.session_scope",scope),patch("services.llm_job_queue.get_provider",return_value=MagicMock()),patch("services.llm_job_queue.LlmStreamExecutor",executor):
+        queue=queue_cls(concurrency_controller=concurrency,token_validator=MagicMock(),_skip_singleton=True)
+        queue.start()
+        time.sleep(0.1)
+        round_trips=[]
+        for _ in range(jobs):
+            started=time.perf_counter()
+            job=queue.submit_job(project_id="bench",agent_id="agent",provider_id="mock",model="m",prompt="ping")
+            queue.wait_for_job(job["id"],timeout=30)
+            round_trips.append((time.perf_counter()-started)*1000)
+        queue.stop()
+    engine.dispose()
+    round_trips.sort()
+    return {
+        "round_trip_avg_ms":sum(round_trips)/len(round_trips),
+        "round_trip_p95_ms":round_trips[min(len(round_trips)-1,int(len(round_trips)*0.95))],
+        "latency":queue.get_latency_stats(),
+    }
+
+def main()->None:
+    parser=argparse.ArgumentParser(description="LlmJobQueue latency benchmark (event-driven vs legacy polling)")
+    parser.add_argument("--jobs",type=int,default=20)
+    parser.add_argument("--legacy-jobs",type=int,default=5)
+    args=parser.parse_args()
+    with tempfile.TemporaryDirectory() as d:
+        event_driven=run(LlmJobQueue,args.jobs,os.path.join(d,"event.db"))
+        legacy=run(LegacyPollingQueue,args.legacy_jobs,os.path.join(d,"legacy.db"))
+    print(f"{'mode':<14}{'round trip avg':>16}{'p95':>10}{'submit->start p50':>20}{'complete->wake p50':>20}")
+    for name,result in (("event-driven",event_driven),("legacy-poll",legacy)):
+        latency=result["latency"]
+        wake=latency["complete_to_wake"]
+        wake_text=f"{wake['p50Ms']:.2f} ms" if wake["count"] else"n/a"
+        print(f"{name:<14}{result['round_trip_avg_ms']:>13.2f} ms{result['round_trip_p95_ms']:>7.1f} ms{latency['submit_to_start']['p50Ms']:>17.2f} ms{wake_text:>20}")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from collections import defaultdict
+sys.path.insert(0,str(Path(__file__).parent.parent))
+from middleware.rate_limiter import RateLimiter,MemoryRateStore,SqliteRateStore
+
+class LegacySlidingWindowLimiter:
+    def __init__(self,limit:int,window:int):
+        self._limit=limit
+        self._window=window
+        self._requests=defaultdict(list)
+        self._lock=threading.Lock()
+
+    def check(self,client_id:str,endpoint:str="")->tuple:
+        with self._lock:
+            now=time.time()
+            self._requests[client_id]=[t for t in self._requests[client_id] if now-t<self._window]
+            current_count=len(self._requests[client_id])
+            if current_count>=self._limit:
+                return False,{}
+            self._requests[client_id].append(time.time())
+            return True,{}
+
+def run(limiter,calls:int,clients:int,endpoints:int)->dict:
+    keys=[(f"10.0.0.{c}",f"/api/e{e}") for c in range(clients) for e in range(endpoints)]
+    allowed=0
+    started=time.perf_counter()
+    for i in range(calls):
+        client_id,endpoint=keys[i%len(keys)]
+        ok,_=limiter.check(client_id,endpoint)
+        allowed+=ok
+    elapsed=time.perf_counter()-started
+    return {"us_per_call":elapsed/calls*1e6,"allowed":allowed}
+
+def main()->None:
+    parser=argparse.ArgumentParser(description="RateLimiter microbenchmark (GCRA vs legacy sliding window)")
+    parser.add_argument("--calls",type=int,default=50000)
+    parser.add_argument("--clients",type=int,default=4)
+    parser.add_argument("--endpoints",type=int,default=2)
+    parser.add_argument("--limits",type=int,nargs="+",default=[60,1000,10000])
+    args=parser.parse_args()
+    print(f"{'limit/60s':>10}{'legacy':>14}{'gcra memory':>14}{'gcra sqlite':>14}")
+    with tempfile.TemporaryDirectory() as d:
+        for limit in args.limits:
+            legacy=run(LegacySlidingWindowLimiter(limit,60),args.calls,args.clients,args.endpoints)
+            memory=run(RateLimiter(limit,60,store=MemoryRateStore()),args.calls,args.clients,args.endpoints)
+            sqlite=run(RateLimiter(limit,60,store=SqliteRateStore(os.path.join(d,f"rl{limit}.db"))),max(1,args.calls//10),args.clients,args.endpoints)
+            print(f"{limit:>10}{legacy['us_per_call']:>11.2f} us{memory['us_per_call']:>11.2f} us{sqlite['us_per_call']:>11.2f} us")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,29 @@
+import sys
+import argparse
+from pathlib import Path
+sys.path.insert(0,str(Path(__file__).parent.parent))
+from models.database import init_db,session_scope
+from repositories.llm_job import LlmJobRepository
+
+def main()->int:
+    parser=argparse.ArgumentParser(description="Check cached project token usage against the llm_jobs aggregate")
+    parser.add_argument("--project",help="Check a single project id")
+    parser.add_argument("--fix",action="store_true",help="Overwrite mismatched counters with the aggregate")
+    args=parser.parse_args()
+    init_db()
+    with session_scope() as session:
+        mismatches=LlmJobRepository(session).reconcile_token_usage(project_id=args.project,fix=args.fix)
+    if not mismatches:
+        print("Token usage counters are consistent")
+        return 0
+    print(f"{'project':<40}{'cached':>14}{'actual':>14}{'diff':>12}")
+    for m in mismatches:
+        print(f"{m['projectId']:<40}{m['cached']:>14}{m['actual']:>14}{m['difference']:>12}")
+    if args.fix:
+        print(f"Fixed {len(mismatches)} counter(s)")
+        return 0
+    print(f"{len(mismatches)} counter(s) out of sync (run with --fix to repair)")
+    return 1
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -52,7 +52,7 @@ def create_app():
     logger.info("Starting server initialization...")
 
     register_error_handlers(app)
-    init_rate_limiter(app,default_limit=120,default_window=60)
+    init_rate_limiter(app,default_limit=120,default_window=60,store_kind=config.server.rate_limit_store)
 
     sio=socketio.Server(
         cors_allowed_origins=config.server.cors_origins,
@@ -115,8 +115,8 @@ def create_app():
     register_static_config_routes(app)
     register_auto_approval_routes(app,container.project_service(),container.workflow_service())
     register_intervention_routes(app,container.project_service(),container.agent_service(),container.intervention_service(),event_bus)
-    register_websocket_handlers(sio,container.project_service(),container.agent_service(),container.workflow_service(),container.intervention_service(),container.subscription_manager())
-    register_navigator_routes(app,sio)
+    register_websocket_handlers(sio,container.project_service(),container.agent_service(),container.workflow_service(),container.intervention_service(),container.subscription_manager(),websocket_emitter)
+    register_navigator_routes(app,sio,websocket_emitter)
 
 
     upload_folder=os.path.join(os.path.dirname(__file__),'uploads')
@@ -127,7 +127,7 @@ def create_app():
     register_ai_service_routes(app)
     register_language_routes(app)
     register_backup_routes(app,backup_service,archive_service)
-    register_admin_routes(app,backup_service,archive_service)
+    register_admin_routes(app,backup_service,archive_service,websocket_emitter,event_bus)
 
     register_all_providers()
     health_monitor=get_health_monitor()
@@ -1,3 +1,4 @@
+from services.agent.read_model import AgentReadModel
 from services.agent.query_service import AgentQueryService
 from services.agent.lifecycle_manager import AgentLifecycleManager
 from services.agent.scheduler import AgentScheduler
@@ -5,6 +6,7 @@ from services.agent.memory_manager import AgentMemoryManager
 from services.agent.facade import AgentService
 
 __all__=[
+    "AgentReadModel",
     "AgentQueryService",
     "AgentLifecycleManager",
     "AgentScheduler",
@@ -6,12 +6,13 @@ from services.agent.query_service import AgentQueryService
 from services.agent.lifecycle_manager import AgentLifecycleManager
 from services.agent.scheduler import AgentScheduler
 from services.agent.memory_manager import AgentMemoryManager
+from services.agent.read_model import AgentReadModel
 
 
 class AgentService(BaseService):
-    def __init__(self,event_bus:EventBus):
+    def __init__(self,event_bus:EventBus,read_model:Optional[AgentReadModel]=None):
         super().__init__(event_bus)
-        self._query=AgentQueryService(event_bus)
+        self._query=AgentQueryService(event_bus,read_model)
         self._lifecycle=AgentLifecycleManager(event_bus)
         self._scheduler=AgentScheduler(event_bus)
         self._memory=AgentMemoryManager(event_bus)
@@ -24,6 +25,13 @@ class AgentService(BaseService):
     def get_workers_by_parent(self,parent_agent_id:str)->List[Dict]:
         return self._query.get_workers_by_parent(parent_agent_id)
 
+    def get_agent_summary(self,project_id:str)->Dict:
+        return self._query.get_agent_summary(project_id)
+
+    @property
+    def read_model(self)->AgentReadModel:
+        return self._query.read_model
+
     def get_agent(self,agent_id:str)->Optional[Dict]:
         return self._query.get_agent(agent_id)
 
@@ -4,11 +4,20 @@ from models.database import session_scope
 from repositories import AgentRepository,AgentLogRepository
 from events.event_bus import EventBus
 from services.base_service import BaseService
+from services.agent.read_model import AgentReadModel
 
 
 class AgentQueryService(BaseService):
-    def __init__(self,event_bus:EventBus):
+    def __init__(self,event_bus:EventBus,read_model:Optional[AgentReadModel]=None):
         super().__init__(event_bus)
+        self._read_model=read_model or AgentReadModel(event_bus)
+
+    @property
+    def read_model(self)->AgentReadModel:
+        return self._read_model
+
+    def get_agent_summary(self,project_id:str)->Dict:
+        return self._read_model.get_summary(project_id)
 
     def get_agents_by_project(
         self,project_id:str,include_workers:bool=True
@@ -35,7 +44,9 @@ class AgentQueryService(BaseService):
     def create_agent(self,project_id:str,agent_type:str)->Dict:
         with session_scope() as session:
             repo=AgentRepository(session)
-            return repo.create_from_dict(project_id,{"type":agent_type})
+            agent=repo.create_from_dict(project_id,{"type":agent_type})
+        self._read_model.apply_agent(project_id,agent)
+        return agent
 
     def create_worker_agent(
         self,
@@ -46,14 +57,19 @@ class AgentQueryService(BaseService):
     )->Dict:
         with session_scope() as session:
             repo=AgentRepository(session)
-            return repo.create_worker(
+            worker=repo.create_worker(
                 project_id,parent_agent_id,worker_type,task
             )
+        self._read_model.apply_agent(project_id,worker)
+        return worker
 
     def update_agent(self,agent_id:str,data:Dict)->Optional[Dict]:
         with session_scope() as session:
             repo=AgentRepository(session)
-            return repo.update_from_dict(agent_id,data)
+            agent=repo.update_from_dict(agent_id,data)
+        if agent:
+            self._read_model.apply_agent(agent["projectId"],agent)
+        return agent
 
     def add_agent_log(
         self,
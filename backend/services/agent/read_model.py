@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import Counter
+from typing import Any,Callable,Dict,List,Optional,Tuple
+
+from config_loaders.agent_config import get_generation_type_for_agent
+from events.event_bus import EventBus
+from events.events import (
+    AgentStarted,
+    AgentProgress,
+    AgentCompleted,
+    AgentFailed,
+    AgentResumed,
+    AgentRetried,
+    AgentPaused,
+    AgentActivated,
+    AgentCreated,
+    AgentWaitingResponse,
+    AgentSnapshotRestored,
+    ProjectInitialized,
+    ProjectStatusChanged,
+)
+from models.database import session_scope
+from repositories import AgentRepository
+
+RECONCILE_INTERVAL=30.0
+SNAPSHOT_FIELDS=("type","status","progress","inputTokens","outputTokens","tokensUsed","startedAt")
+
+
+class _ProjectView:
+    def __init__(self):
+        self.agents:Dict[str,Dict[str,Any]]={}
+        self.status_counts:Counter=Counter()
+        self.running:Dict[str,None]={}
+        self.input_tokens=0
+        self.output_tokens=0
+        self.tokens_used=0
+        self.progress_sum=0
+        self.tokens_by_type:Dict[str,Dict[str,int]]={}
+        self.reconciled_at=time.monotonic()
+        self.stale=False
+
+    def apply(self,agent_id:str,changes:Dict[str,Any])->None:
+        previous=self.agents.get(agent_id)
+        if previous is None:
+            if"type" not in changes:
+                return
+            current={"type":"","status":"pending","progress":0,"inputTokens":0,"outputTokens":0,"tokensUsed":0,"startedAt":None}
+        else:
+            current=dict(previous)
+            self._account(agent_id,previous,-1)
+        for key in SNAPSHOT_FIELDS:
+            if key in changes and changes[key] is not None:
+                current[key]=changes[key]
+        self.agents[agent_id]=current
+        self._account(agent_id,current,1)
+
+    def _account(self,agent_id:str,snapshot:Dict[str,Any],sign:int)->None:
+        status=snapshot["status"]
+        self.status_counts[status]+=sign
+        if self.status_counts[status]<=0:
+            del self.status_counts[status]
+        if status=="running":
+            if sign>0:
+                self.running[agent_id]=None
+            else:
+                self.running.pop(agent_id,None)
+        self.input_tokens+=sign*(snapshot["inputTokens"] or 0)
+        self.output_tokens+=sign*(snapshot["outputTokens"] or 0)
+        self.tokens_used+=sign*(snapshot.get("tokensUsed") or 0)
+        self.progress_sum+=sign*(snapshot["progress"] or 0)
+        gen_type=get_generation_type_for_agent(snapshot["type"])
+        bucket=self.tokens_by_type.setdefault(gen_type,{"input":0,"output":0})
+        bucket["input"]+=sign*(snapshot["inputTokens"] or 0)
+        bucket["output"]+=sign*(snapshot["outputTokens"] or 0)
+
+    def summary(self,project_id:str)->Dict[str,Any]:
+        total=len(self.agents)
+        first_running=None
+        for agent_id in self.running:
+            snapshot=self.agents[agent_id]
+            first_running={"id":agent_id,"progress":snapshot["progress"],"startedAt":snapshot["startedAt"]}
+            break
+        return {
+            "projectId":project_id,
+            "total":total,
+            "statusCounts":dict(self.status_counts),
+            "inputTokens":self.input_tokens,
+            "outputTokens":self.output_tokens,
+            "tokensUsed":self.tokens_used,
+            "tokensByType":{k:dict(v) for k,v in self.tokens_by_type.items()},
+            "progressPercent":int(self.progress_sum/total) if total else 0,
+            "firstRunning":first_running,
+        }
+
+
+class AgentReadModel:
+    def __init__(
+        self,
+        event_bus:EventBus,
+        reconcile_interval:float=RECONCILE_INTERVAL,
+        loader:Optional[Callable[[str],List[Dict[str,Any]]]]=None,
+    ):
+        self._event_bus=event_bus
+        self._reconcile_interval=reconcile_interval
+        self._loader=loader or _load_summary_rows
+        self._views:Dict[str,_ProjectView]={}
+        self._generations:Dict[str,int]={}
+        self._journals:Dict[str,List[List[Tuple[str,Dict[str,Any]]]]]={}
+        self._lock=threading.Lock()
+        self._stats={"reads":0,"reconciles":0,"events":0}
+        self._register_handlers()
+
+    def _register_handlers(self)->None:
+        for event_type in (AgentStarted,AgentCompleted,AgentResumed,AgentRetried,AgentPaused,AgentActivated,AgentCreated,AgentWaitingResponse):
+            self._event_bus.subscribe(event_type,self._on_agent_event)
+        self._event_bus.subscribe(AgentProgress,self._on_agent_progress)
+        self._event_bus.subscribe(AgentFailed,self._on_agent_failed)
+        self._event_bus.subscribe(AgentSnapshotRestored,self._on_project_reset)
+        self._event_bus.subscribe(ProjectInitialized,self._on_project_reset)
+        self._event_bus.subscribe(ProjectStatusChanged,self._on_project_reset)
+
+    def _on_agent_event(self,event)->None:
+        if event.agent:
+            self.apply_agent(event.project_id,event.agent)
+        elif isinstance(event,AgentCompleted):
+            self.apply_changes(event.project_id,event.agent_id,{"status":"completed","progress":100})
+
+    def _on_agent_progress(self,event:AgentProgress)->None:
+        changes={"progress":event.progress}
+        if event.tokens_used:
+            changes["tokensUsed"]=event.tokens_used
+        self.apply_changes(event.project_id,event.agent_id,changes)
+
+    def _on_agent_failed(self,event:AgentFailed)->None:
+        self.apply_changes(event.project_id,event.agent_id,{"status":"failed"})
+
+    def _on_project_reset(self,event)->None:
+        self.invalidate(event.project_id)
+
+    def apply_agent(self,project_id:str,agent:Dict[str,Any])->None:
+        if not agent or not agent.get("id"):
+            return
+        self.apply_changes(project_id or agent.get("projectId"),agent["id"],agent)
+
+    def apply_changes(self,project_id:str,agent_id:str,changes:Dict[str,Any])->None:
+        with self._lock:
+            self._generations[project_id]=self._generations.get(project_id,0)+1
+            for journal in self._journals.get(project_id,()):
+                journal.append((agent_id,changes))
+            view=self._views.get(project_id)
+            if view is None:
+                return
+            self._stats["events"]+=1
+            self._apply_locked(view,agent_id,changes)
+
+    def _apply_locked(self,view:_ProjectView,agent_id:str,changes:Dict[str,Any])->None:
+        if agent_id in view.agents or"type" in changes:
+            view.apply(agent_id,changes)
+        else:
+            view.stale=True
+
+    def get_summary(self,project_id:str)->Dict[str,Any]:
+        with self._lock:
+            self._stats["reads"]+=1
+            view=self._views.get(project_id)
+            if view is not None and not view.stale and time.monotonic()-view.reconciled_at<self._reconcile_interval:
+                return view.summary(project_id)
+        return self.reconcile(project_id)
+
+    def reconcile(self,project_id:str)->Dict[str,Any]:
+        journal:List[Tuple[str,Dict[str,Any]]]=[]
+        with self._lock:
+            generation=self._generations.setdefault(project_id,0)
+            self._journals.setdefault(project_id,[]).append(journal)
+        try:
+            rows=self._loader(project_id)
+        except Exception:
+            with self._lock:
+                self._end_journal_locked(project_id,journal)
+            raise
+        view=_ProjectView()
+        for row in rows:
+            view.apply(row["id"],row)
+        with self._lock:
+            self._end_journal_locked(project_id,journal)
+            self._stats["reconciles"]+=1
+            moved=self._generations.get(project_id,0)-generation
+            for agent_id,changes in journal:
+                self._apply_locked(view,agent_id,changes)
+            if moved!=len(journal):
+                view.stale=True
+            self._views[project_id]=view
+            return view.summary(project_id)
+
+    def _end_journal_locked(self,project_id:str,journal:List[Tuple[str,Dict[str,Any]]])->None:
+        journals=[j for j in self._journals.get(project_id,()) if j is not journal]
+        if journals:
+            self._journals[project_id]=journals
+        else:
+            self._journals.pop(project_id,None)
+
+    def invalidate(self,project_id:Optional[str]=None)->None:
+        with self._lock:
+            if project_id is None:
+                self._views.clear()
+                for key in self._generations:
+                    self._generations[key]+=1
+            else:
+                self._views.pop(project_id,None)
+                self._generations[project_id]=self._generations.get(project_id,0)+1
+
+    def get_stats(self)->Dict[str,Any]:
+        with self._lock:
+            return {**self._stats,"projects":len(self._views),"agents":sum(len(v.agents) for v in self._views.values())}
+
+
+def _load_summary_rows(project_id:str)->List[Dict[str,Any]]:
+    with session_scope() as session:
+        return AgentRepository(session).get_summary_rows(project_id)
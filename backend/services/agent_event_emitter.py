@@ -15,19 +15,19 @@ class AgentEventEmitter:
         workflow_service,
         intervention_service,
         event_bus=None,
-        sio=None,
+        websocket_emitter=None,
     )->None:
         self._agent_service=agent_service
         self._workflow_service=workflow_service
         self._intervention_service=intervention_service
         self._event_bus=event_bus
-        self._sio=sio
+        self._websocket_emitter=websocket_emitter
         self._logger=get_logger()
 
     def _emit_socket(self,event:str,data:Dict,project_id:str)->None:
-        if self._sio:
+        if self._websocket_emitter:
             try:
-                self._sio.emit(event,data,room=f"project:{project_id}")
+                self._websocket_emitter.emit(event,data,project_id)
             except Exception as e:
                 self._logger.error(f"Error emitting {event}: {e}",exc_info=True)
 
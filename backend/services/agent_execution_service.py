@@ -18,14 +18,13 @@ class AgentExecutionService:
         intervention_service,
         trace_service,
         event_bus=None,
-        sio=None,
+        websocket_emitter=None,
     )->None:
         self._project_service=project_service
         self._agent_service=agent_service
         self._workflow_service=workflow_service
         self._trace_service=trace_service
         self._event_bus=event_bus
-        self._sio=sio
         self._agent_runner:Optional[ApiAgentRunner]=None
         self._running_agents:Dict[str,bool]={}
         self._lock=threading.Lock()
@@ -35,7 +34,7 @@ class AgentExecutionService:
             workflow_service,
             intervention_service,
             event_bus,
-            sio,
+            websocket_emitter,
         )
         self._context_builder=AgentExecutionContextBuilder(
             project_service,
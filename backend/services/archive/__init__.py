@@ -1,6 +1,7 @@
 from .retention_policy import DataRetentionPolicy
 from .database_cleaner import DatabaseCleaner
 from .zip_archiver import ZipArchiver
+from .zip_stream import iter_zip,iter_json_array,is_precompressed
 from .trace_serializer import (
     serialize_trace,
     serialize_traces,
@@ -12,6 +13,9 @@ __all__=[
     "DataRetentionPolicy",
     "DatabaseCleaner",
     "ZipArchiver",
+    "iter_zip",
+    "iter_json_array",
+    "is_precompressed",
     "serialize_trace",
     "serialize_traces",
     "serialize_log",
@@ -1,12 +1,13 @@
 import json
 import os
-import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import Dict,List
+from typing import Dict,Iterable,List
 
 from middleware.logger import get_logger
 
+from .zip_stream import iter_json_array,iter_zip
+
 
 class ZipArchiver:
     def __init__(self,archive_dir:str|None=None):
@@ -28,21 +29,38 @@ class ZipArchiver:
         files:Dict[str,any],
     )->str:
         zip_path=os.path.join(self._archive_dir,filename)
+        tmp_path=zip_path+".tmp"
 
-        with zipfile.ZipFile(
-            zip_path,"w",zipfile.ZIP_DEFLATED,compresslevel=9
-        ) as zf:
-            for name,content in files.items():
-                if isinstance(content,(dict,list)):
-                    zf.writestr(
-                        name,json.dumps(content,ensure_ascii=False,indent=2)
-                    )
-                else:
-                    zf.writestr(name,str(content))
+        try:
+            with open(tmp_path,"wb") as f:
+                for chunk in iter_zip(
+                    (name,self._encode_content(content))
+                    for name,content in files.items()
+                ):
+                    f.write(chunk)
+            os.replace(tmp_path,zip_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
         self._logger.info(f"ZipArchiver: created archive {zip_path}")
         return zip_path
 
+    def _encode_content(self,content:any)->Iterable[bytes]:
+        if callable(content):
+            content=content()
+        if isinstance(content,dict):
+            return json.dumps(content,ensure_ascii=False,indent=2).encode("utf-8")
+        if isinstance(content,list):
+            return iter_json_array(content)
+        if isinstance(content,(bytes,Path)):
+            return content
+        if isinstance(content,str):
+            return content.encode("utf-8")
+        if isinstance(content,Iterable):
+            return content
+        return str(content).encode("utf-8")
+
     def generate_filename(
         self,
         prefix:str,
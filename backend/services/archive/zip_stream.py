@@ -0,0 +1,101 @@
+import json
+import os
+import time
+import zipfile
+from pathlib import Path
+from typing import Any,Callable,Iterable,Iterator,Tuple
+
+STREAM_CHUNK_SIZE=256*1024
+STREAM_COMPRESS_LEVEL=6
+STORED_EXTENSIONS=frozenset({
+    ".png",".jpg",".jpeg",".gif",".webp",".avif",
+    ".ogg",".mp3",".m4a",".aac",".opus",".flac",
+    ".mp4",".webm",".mov",".mkv",
+    ".zip",".gz",".bz2",".xz",".7z",".br",".woff",".woff2",
+})
+
+
+class _StreamSink:
+    def __init__(self):
+        self._chunks=[]
+
+    def write(self,data)->int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self)->None:
+        pass
+
+    def drain(self)->bytes:
+        data=b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def is_precompressed(name:str)->bool:
+    return os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+
+
+def _read_file(path:Path,chunk_size:int)->Iterator[bytes]:
+    with open(path,"rb") as f:
+        while True:
+            chunk=f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_zip(
+    entries:Iterable[Tuple[str,Any]],
+    compresslevel:int=STREAM_COMPRESS_LEVEL,
+    chunk_size:int=STREAM_CHUNK_SIZE,
+)->Iterator[bytes]:
+    sink=_StreamSink()
+    with zipfile.ZipFile(sink,"w",zipfile.ZIP_DEFLATED,compresslevel=compresslevel) as zf:
+        for arcname,source in entries:
+            if isinstance(source,Path):
+                target=zipfile.ZipInfo.from_file(source,arcname)
+                chunks=_read_file(source,chunk_size)
+            else:
+                target=arcname
+                chunks=[source] if isinstance(source,bytes) else source
+            if is_precompressed(arcname):
+                if not isinstance(target,zipfile.ZipInfo):
+                    target=zipfile.ZipInfo(arcname,date_time=time.localtime()[:6])
+                    target.external_attr=0o600<<16
+                target.compress_type=zipfile.ZIP_STORED
+            elif isinstance(target,zipfile.ZipInfo):
+                target.compress_type=zipfile.ZIP_DEFLATED
+                if hasattr(target,"compress_level"):
+                    target.compress_level=compresslevel
+            with zf.open(target,"w",force_zip64=not isinstance(source,(Path,bytes))) as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    data=sink.drain()
+                    if data:
+                        yield data
+            data=sink.drain()
+            if data:
+                yield data
+    data=sink.drain()
+    if data:
+        yield data
+
+
+def iter_json_array(
+    rows:Iterable[Any],
+    serialize:Callable[[Any],Any]=lambda row:row,
+    batch_size:int=100,
+)->Iterator[bytes]:
+    yield b"["
+    batch=[]
+    first=True
+    for row in rows:
+        batch.append(json.dumps(serialize(row),ensure_ascii=False))
+        if len(batch)>=batch_size:
+            yield(("\n" if first else",\n")+",\n".join(batch)).encode("utf-8")
+            first=False
+            batch.clear()
+    if batch:
+        yield(("\n" if first else",\n")+",\n".join(batch)).encode("utf-8")
+    yield b"\n]"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict,List
+from typing import Dict,Iterable,Iterator,List
 
 from models.database import session_scope
 from models.tables import AgentLog,AgentTrace
@@ -9,10 +9,19 @@ from .archive import (
     DataRetentionPolicy,
     DatabaseCleaner,
     ZipArchiver,
-    serialize_logs,
-    serialize_traces,
+    iter_json_array,
+    serialize_log,
+    serialize_trace,
 )
 
+ARCHIVE_BATCH_SIZE=500
+
+
+def _counted(rows:Iterable,counts:Dict[str,int],key:str)->Iterator:
+    for row in rows:
+        counts[key]+=1
+        yield row
+
 
 class ArchiveService:
     def __init__(
@@ -64,34 +73,37 @@ class ArchiveService:
             )
             if agent_id:
                 query=query.filter(AgentTrace.agent_id==agent_id)
-            traces=query.all()
 
-            if not traces:
+            if not session.query(query.exists()).scalar():
                 return None
 
-            trace_data=serialize_traces(traces)
+            counts={"traces":0,"logs":0}
+            files={
+                "traces.json":iter_json_array(
+                    _counted(query.yield_per(ARCHIVE_BATCH_SIZE),counts,"traces"),
+                    serialize_trace,
+                ),
+            }
 
-            log_data=[]
             if include_logs:
-                agent_ids=list(set(t.agent_id for t in traces))
-                for aid in agent_ids:
-                    logs=(
-                        session.query(AgentLog)
-                        .filter(AgentLog.agent_id==aid)
-                        .all()
+                agent_ids=query.with_entities(AgentTrace.agent_id).distinct()
+                log_query=(
+                    session.query(AgentLog)
+                    .filter(AgentLog.agent_id.in_(agent_ids))
+                    .order_by(AgentLog.agent_id,AgentLog.created_at)
+                )
+                if session.query(log_query.exists()).scalar():
+                    files["agent_logs.json"]=iter_json_array(
+                        _counted(log_query.yield_per(ARCHIVE_BATCH_SIZE),counts,"logs"),
+                        serialize_log,
                     )
-                    log_data.extend(serialize_logs(logs))
 
-            files={"traces.json":trace_data}
-            if log_data:
-                files["agent_logs.json"]=log_data
-
-            files["metadata.json"]={
+            files["metadata.json"]=lambda:{
                 "projectId":project_id,
                 "agentId":agent_id,
                 "exportedAt":datetime.now().isoformat(),
-                "traceCount":len(trace_data),
-                "logCount":len(log_data),
+                "traceCount":counts["traces"],
+                "logCount":counts["logs"],
             }
 
             filename=self._archiver.generate_filename(
@@ -100,7 +112,7 @@ class ArchiveService:
             zip_path=self._archiver.create_archive(filename,files)
 
             self._logger.info(
-                f"ArchiveService: exported {len(trace_data)} traces to {zip_path}"
+                f"ArchiveService: exported {counts['traces']} traces to {zip_path}"
             )
             return zip_path
 
@@ -126,27 +138,27 @@ class ArchiveService:
         cutoff_date=self._policy.get_cutoff_date(days_old)
 
         with session_scope() as session:
-            traces=(
-                session.query(AgentTrace)
-                .filter(AgentTrace.started_at<cutoff_date)
-                .all()
+            query=session.query(AgentTrace).filter(
+                AgentTrace.started_at<cutoff_date
             )
 
-            if not traces:
+            if not session.query(query.exists()).scalar():
                 return {
                     "success":True,
                     "message":"No old traces to archive",
                     "archived":0,
                 }
 
-            trace_data=serialize_traces(traces)
-
+            counts={"traces":0}
             files={
-                "traces.json":trace_data,
-                "metadata.json":{
+                "traces.json":iter_json_array(
+                    _counted(query.yield_per(ARCHIVE_BATCH_SIZE),counts,"traces"),
+                    serialize_trace,
+                ),
+                "metadata.json":lambda:{
                     "archivedAt":datetime.now().isoformat(),
                     "cutoffDate":cutoff_date.isoformat(),
-                    "traceCount":len(trace_data),
+                    "traceCount":counts["traces"],
                 },
             }
 
@@ -164,7 +176,7 @@ class ArchiveService:
             "success":True,
             "zipPath":zip_path,
             "zipSize":self._archiver.get_archive_size(zip_path),
-            "archived":len(trace_data),
+            "archived":counts["traces"],
             "deleted":deleted,
         }
 
@@ -1,21 +1,63 @@
 import os
+import gzip
+import json
 import shutil
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import time
 from datetime import datetime
-from typing import List,Optional
+from typing import Any,Dict,List,Optional,Set,Tuple
 from pathlib import Path
 from middleware.logger import get_logger
 
+MODE_FULL="full"
+MODE_INCREMENTAL="incremental"
+BACKUP_MODES=(MODE_FULL,MODE_INCREMENTAL)
+BACKUP_PAGES_PER_STEP=1024
+BACKUP_STEP_SLEEP=0.005
+PAGE_STORE_DIR="pages"
+MANIFEST_SUFFIX=".manifest"
+GZIP_SUFFIX=".db.gz"
+BACKUP_SUFFIXES=(".db",GZIP_SUFFIX,MANIFEST_SUFFIX)
+COPY_CHUNK_SIZE=1024*1024
+
 
 class BackupService:
- def __init__(self,db_path:str,backup_dir:Optional[str]=None,max_backups:int=10):
+ def __init__(
+  self,
+  db_path:str,
+  backup_dir:Optional[str]=None,
+  max_backups:int=10,
+  mode:Optional[str]=None,
+  compress:Optional[bool]=None,
+  pages_per_step:int=BACKUP_PAGES_PER_STEP,
+  step_sleep:float=BACKUP_STEP_SLEEP,
+ ):
+  from config import get_config
+  database=get_config().database
   self._db_path=db_path
   self._backup_dir=backup_dir or os.path.join(os.path.dirname(db_path),"backups")
   self._max_backups=max_backups
+  self._mode=mode or database.backup_mode
+  if self._mode not in BACKUP_MODES:
+   raise ValueError(f"Unknown backup mode: {self._mode}")
+  self._compress=database.backup_compress if compress is None else compress
+  self._pages_per_step=max(1,pages_per_step)
+  self._step_sleep=step_sleep
+  self._lock=threading.RLock()
+  self._progress:Dict[str,int]={}
+  self._last_metrics:Optional[Dict[str,Any]]=None
   self._ensure_backup_dir()
 
  def _ensure_backup_dir(self)->None:
   Path(self._backup_dir).mkdir(parents=True,exist_ok=True)
 
+ @property
+ def _page_store(self)->str:
+  return os.path.join(self._backup_dir,PAGE_STORE_DIR)
+
  def create_backup(self,tag:Optional[str]=None)->Optional[str]:
   if not os.path.exists(self._db_path):
    get_logger().warning(f"BackupService: database not found: {self._db_path}")
@@ -23,19 +65,151 @@ class BackupService:
   timestamp=datetime.now().strftime("%Y%m%d_%H%M%S")
   tag_suffix=f"_{tag}" if tag else""
   db_name=os.path.basename(self._db_path)
-  backup_name=f"{os.path.splitext(db_name)[0]}_{timestamp}{tag_suffix}.db"
-  backup_path=os.path.join(self._backup_dir,backup_name)
+  base_name=f"{os.path.splitext(db_name)[0]}_{timestamp}{tag_suffix}"
+  with self._lock:
+   snapshot_path=None
+   try:
+    started=time.perf_counter()
+    snapshot_path=self._new_temp_path()
+    pages=self._online_copy(self._db_path,snapshot_path,track=True)
+    copied=time.perf_counter()
+    metrics={"mode":self._mode,"compressed":self._compress,"pages":pages,"db_bytes":os.path.getsize(snapshot_path)}
+    if self._mode==MODE_INCREMENTAL:
+     backup_path=os.path.join(self._backup_dir,base_name+MANIFEST_SUFFIX)
+     metrics.update(self._store_incremental(snapshot_path,backup_path))
+    elif self._compress:
+     backup_path=os.path.join(self._backup_dir,base_name+GZIP_SUFFIX)
+     self._gzip_file(snapshot_path,backup_path)
+     metrics.update({"pages_written":pages,"bytes_written":os.path.getsize(backup_path)})
+    else:
+     backup_path=os.path.join(self._backup_dir,base_name+".db")
+     os.replace(snapshot_path,backup_path)
+     snapshot_path=None
+     metrics.update({"pages_written":pages,"bytes_written":os.path.getsize(backup_path)})
+    finished=time.perf_counter()
+    metrics.update({
+     "name":os.path.basename(backup_path),
+     "copy_ms":round((copied-started)*1000,1),
+     "store_ms":round((finished-copied)*1000,1),
+     "duration_ms":round((finished-started)*1000,1),
+     "finished_at":datetime.now().isoformat(),
+    })
+    self._last_metrics=metrics
+    get_logger().info(f"BackupService: backup created: {backup_path} ({metrics['duration_ms']}ms, {metrics['pages_written']}/{pages} pages written)")
+    self._cleanup_old_backups()
+    return backup_path
+   except Exception as e:
+    get_logger().error(f"BackupService: backup failed: {e}",exc_info=True)
+    return None
+   finally:
+    self._progress={}
+    if snapshot_path and os.path.exists(snapshot_path):
+     os.remove(snapshot_path)
+
+ def create_backup_async(self,tag:Optional[str]=None)->threading.Thread:
+  thread=threading.Thread(target=self.create_backup,args=(tag,),daemon=True,name="backup-service")
+  thread.start()
+  return thread
+
+ def create_startup_backup(self,wait:bool=False)->Optional[str]:
+  if wait:
+   return self.create_backup(tag="startup")
+  self.create_backup_async(tag="startup")
+  return None
+
+ def _new_temp_path(self)->str:
+  fd,path=tempfile.mkstemp(suffix=".tmp",dir=self._backup_dir)
+  os.close(fd)
+  return path
+
+ def _online_copy(self,source_path:str,dest_path:str,track:bool=False)->int:
+  source=sqlite3.connect(source_path,timeout=30)
+  dest=sqlite3.connect(dest_path)
+  total=[0]
+
+  def progress(status:int,remaining:int,pages:int)->None:
+   total[0]=pages
+   if track:
+    self._progress={"remaining":remaining,"total":pages}
   try:
-   shutil.copy2(self._db_path,backup_path)
-   get_logger().info(f"BackupService: backup created: {backup_path}")
-   self._cleanup_old_backups()
-   return backup_path
-  except Exception as e:
-   get_logger().error(f"BackupService: backup failed: {e}",exc_info=True)
-   return None
+   source.backup(dest,pages=self._pages_per_step,progress=progress,sleep=self._step_sleep)
+  finally:
+   dest.close()
+   source.close()
+  return total[0]
+
+ def _store_incremental(self,snapshot_path:str,manifest_path:str)->Dict[str,Any]:
+  page_size=self._read_page_size(snapshot_path)
+  hashes=[]
+  written=0
+  bytes_written=0
+  with open(snapshot_path,"rb") as f:
+   while True:
+    page=f.read(page_size)
+    if not page:
+     break
+    digest=hashlib.sha256(page).hexdigest()
+    hashes.append(digest)
+    page_path=self._page_path(digest)
+    if os.path.exists(page_path):
+     continue
+    os.makedirs(os.path.dirname(page_path),exist_ok=True)
+    data=gzip.compress(page,compresslevel=6) if self._compress else page
+    tmp_path=page_path+".tmp"
+    with open(tmp_path,"wb") as out:
+     out.write(data)
+    os.replace(tmp_path,page_path)
+    written+=1
+    bytes_written+=len(data)
+  manifest={
+   "version":1,
+   "page_size":page_size,
+   "compressed":self._compress,
+   "source":os.path.basename(self._db_path),
+   "created_at":datetime.now().isoformat(),
+   "pages":hashes,
+  }
+  tmp_path=manifest_path+".tmp"
+  with open(tmp_path,"w",encoding="utf-8") as f:
+   json.dump(manifest,f)
+  os.replace(tmp_path,manifest_path)
+  return {"pages_written":written,"bytes_written":bytes_written+os.path.getsize(manifest_path)}
+
+ def _read_page_size(self,db_path:str)->int:
+  conn=sqlite3.connect(db_path)
+  try:
+   return conn.execute("PRAGMA page_size").fetchone()[0]
+  finally:
+   conn.close()
 
- def create_startup_backup(self)->Optional[str]:
-  return self.create_backup(tag="startup")
+ def _page_path(self,digest:str,compressed:Optional[bool]=None)->str:
+  compressed=self._compress if compressed is None else compressed
+  return os.path.join(self._page_store,digest[:2],digest+(".gz" if compressed else""))
+
+ def _gzip_file(self,source_path:str,dest_path:str)->None:
+  tmp_path=dest_path+".tmp"
+  with open(source_path,"rb") as src,gzip.open(tmp_path,"wb",compresslevel=6) as dst:
+   shutil.copyfileobj(src,dst,COPY_CHUNK_SIZE)
+  os.replace(tmp_path,dest_path)
+
+ def _materialize(self,backup_path:str)->Tuple[str,bool]:
+  if backup_path.endswith(GZIP_SUFFIX):
+   tmp_path=self._new_temp_path()
+   with gzip.open(backup_path,"rb") as src,open(tmp_path,"wb") as dst:
+    shutil.copyfileobj(src,dst,COPY_CHUNK_SIZE)
+   return tmp_path,True
+  if backup_path.endswith(MANIFEST_SUFFIX):
+   with open(backup_path,"r",encoding="utf-8") as f:
+    manifest=json.load(f)
+   compressed=manifest.get("compressed",False)
+   tmp_path=self._new_temp_path()
+   with open(tmp_path,"wb") as dst:
+    for digest in manifest["pages"]:
+     with open(self._page_path(digest,compressed),"rb") as src:
+      data=src.read()
+     dst.write(gzip.decompress(data) if compressed else data)
+   return tmp_path,True
+  return backup_path,False
 
  def _cleanup_old_backups(self)->None:
   try:
@@ -47,21 +221,63 @@ class BackupService:
       get_logger().info(f"BackupService: removed old backup: {old_backup['path']}")
      except Exception as e:
       get_logger().error(f"BackupService: failed to remove backup: {e}")
+    self._collect_unreferenced_pages()
   except Exception as e:
    get_logger().error(f"BackupService: cleanup failed: {e}",exc_info=True)
 
+ def _referenced_pages(self)->Set[str]:
+  referenced=set()
+  for backup in self.list_backups():
+   if backup["format"]!=MODE_INCREMENTAL:
+    continue
+   with open(backup["path"],"r",encoding="utf-8") as f:
+    referenced.update(json.load(f)["pages"])
+  return referenced
+
+ def _collect_unreferenced_pages(self)->int:
+  if not os.path.isdir(self._page_store):
+   return 0
+  referenced=self._referenced_pages()
+  removed=0
+  for entry in os.scandir(self._page_store):
+   if not entry.is_dir():
+    continue
+   for page in os.scandir(entry.path):
+    if page.name.split(".")[0] not in referenced:
+     os.remove(page.path)
+     removed+=1
+  if removed:
+   get_logger().info(f"BackupService: removed {removed} unreferenced pages")
+  return removed
+
+ def _page_store_size(self)->int:
+  if not os.path.isdir(self._page_store):
+   return 0
+  total=0
+  for entry in os.scandir(self._page_store):
+   if entry.is_dir():
+    total+=sum(page.stat().st_size for page in os.scandir(entry.path))
+  return total
+
  def list_backups(self)->List[dict]:
   if not os.path.exists(self._backup_dir):
    return []
   backups=[]
   for filename in os.listdir(self._backup_dir):
-   if filename.endswith(".db"):
+   if filename.endswith(BACKUP_SUFFIXES):
     filepath=os.path.join(self._backup_dir,filename)
     stat=os.stat(filepath)
+    if filename.endswith(MANIFEST_SUFFIX):
+     backup_format=MODE_INCREMENTAL
+    elif filename.endswith(GZIP_SUFFIX):
+     backup_format="gzip"
+    else:
+     backup_format=MODE_FULL
     backups.append({
      "name":filename,
      "path":filepath,
      "size":stat.st_size,
+     "format":backup_format,
      "created_at":datetime.fromtimestamp(stat.st_mtime).isoformat(),
     })
   backups.sort(key=lambda x:x["created_at"],reverse=True)
@@ -72,21 +288,31 @@ class BackupService:
   if not os.path.exists(backup_path):
    get_logger().warning(f"BackupService: backup not found: {backup_path}")
    return False
-  try:
-   self.create_backup(tag="pre_restore")
-   shutil.copy2(backup_path,self._db_path)
-   get_logger().info(f"BackupService: restored from: {backup_path}")
-   return True
-  except Exception as e:
-   get_logger().error(f"BackupService: restore failed: {e}",exc_info=True)
-   return False
+  with self._lock:
+   source_path=None
+   temporary=False
+   try:
+    self.create_backup(tag="pre_restore")
+    source_path,temporary=self._materialize(backup_path)
+    self._online_copy(source_path,self._db_path)
+    get_logger().info(f"BackupService: restored from: {backup_path}")
+    return True
+   except Exception as e:
+    get_logger().error(f"BackupService: restore failed: {e}",exc_info=True)
+    return False
+   finally:
+    if temporary and source_path and os.path.exists(source_path):
+     os.remove(source_path)
 
  def delete_backup(self,backup_name:str)->bool:
   backup_path=os.path.join(self._backup_dir,backup_name)
   if not os.path.exists(backup_path):
    return False
   try:
-   os.remove(backup_path)
+   with self._lock:
+    os.remove(backup_path)
+    if backup_name.endswith(MANIFEST_SUFFIX):
+     self._collect_unreferenced_pages()
    get_logger().info(f"BackupService: deleted backup: {backup_path}")
    return True
   except Exception as e:
@@ -96,11 +322,19 @@ class BackupService:
  def get_backup_info(self)->dict:
   backups=self.list_backups()
   total_size=sum(b["size"] for b in backups)
+  page_store_size=self._page_store_size()
+  progress=dict(self._progress)
   return {
    "backup_dir":self._backup_dir,
    "db_path":self._db_path,
    "max_backups":self._max_backups,
+   "mode":self._mode,
+   "compress":self._compress,
    "backup_count":len(backups),
-   "total_size_bytes":total_size,
+   "total_size_bytes":total_size+page_store_size,
+   "page_store_bytes":page_store_size,
    "latest_backup":backups[0] if backups else None,
+   "in_progress":bool(progress),
+   "progress":progress,
+   "last_backup_metrics":self._last_metrics,
   }
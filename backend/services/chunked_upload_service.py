@@ -0,0 +1,271 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+from typing import Any,BinaryIO,Callable,Dict,Optional
+from middleware.logger import get_logger
+
+UPLOAD_CHUNK_SIZE=8*1024*1024
+MAX_UPLOAD_CHUNK_SIZE=64*1024*1024
+MIN_UPLOAD_CHUNK_SIZE=64*1024
+UPLOAD_SESSION_TTL=24*60*60
+UPLOAD_SESSION_DIR=".chunked"
+PART_SUFFIX=".part"
+READ_BUFFER_SIZE=1024*1024
+UPLOAD_ID_PATTERN=re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadError(Exception):
+    def __init__(self,message:str,status_code:int=400):
+        super().__init__(message)
+        self.message=message
+        self.status_code=status_code
+
+
+class _UploadSession:
+    def __init__(self,state:Dict[str,Any]):
+        self.state=state
+        self.lock=threading.Lock()
+        self.received=set(state.get("received",[]))
+        self.completing=False
+        self.closed=False
+
+
+class ChunkedUploadService:
+    def __init__(self,upload_folder:str,session_ttl:float=UPLOAD_SESSION_TTL):
+        self._upload_folder=upload_folder
+        self._session_dir=os.path.join(upload_folder,UPLOAD_SESSION_DIR)
+        self._session_ttl=session_ttl
+        self._sessions:Dict[str,_UploadSession]={}
+        self._lock=threading.Lock()
+        os.makedirs(self._session_dir,exist_ok=True)
+
+    def init_upload(
+        self,
+        project_id:str,
+        original_filename:str,
+        stored_filename:str,
+        size:int,
+        chunk_size:Optional[int]=None,
+        checksum:Optional[str]=None,
+        metadata:Optional[Dict[str,Any]]=None,
+    )->Dict[str,Any]:
+        if size<0:
+            raise UploadError("size must be zero or greater")
+        chunk_size=UPLOAD_CHUNK_SIZE if chunk_size is None else chunk_size
+        if not isinstance(chunk_size,int) or isinstance(chunk_size,bool):
+            raise UploadError("chunkSize must be an integer")
+        if not MIN_UPLOAD_CHUNK_SIZE<=chunk_size<=MAX_UPLOAD_CHUNK_SIZE:
+            raise UploadError(f"chunkSize must be between {MIN_UPLOAD_CHUNK_SIZE} and {MAX_UPLOAD_CHUNK_SIZE}")
+        self.cleanup_expired()
+        upload_id=uuid.uuid4().hex
+        project_folder=os.path.join(self._upload_folder,project_id)
+        os.makedirs(project_folder,exist_ok=True)
+        state={
+            "uploadId":upload_id,
+            "projectId":project_id,
+            "originalFilename":original_filename,
+            "storedFilename":stored_filename,
+            "size":size,
+            "chunkSize":chunk_size,
+            "totalChunks":(size+chunk_size-1)//chunk_size,
+            "checksum":checksum.lower() if checksum else None,
+            "metadata":metadata or {},
+            "createdAt":time.time(),
+            "updatedAt":time.time(),
+            "received":[],
+        }
+        with open(self._part_path(state),"wb") as f:
+            f.truncate(size)
+        session=_UploadSession(state)
+        self._save(session)
+        with self._lock:
+            self._sessions[upload_id]=session
+        return self._describe(session)
+
+    def get_upload(self,upload_id:str)->Optional[Dict[str,Any]]:
+        session=self._get_session(upload_id)
+        if session is None:
+            return None
+        with session.lock:
+            return self._describe(session)
+
+    def write_chunk(self,upload_id:str,offset:int,stream:BinaryIO,length:int,checksum:Optional[str]=None)->Dict[str,Any]:
+        session=self._require_session(upload_id)
+        state=session.state
+        chunk_size=state["chunkSize"]
+        if offset<0 or offset>=state["size"] or offset%chunk_size:
+            raise UploadError(f"offset must be a multiple of {chunk_size} within the file")
+        expected=min(chunk_size,state["size"]-offset)
+        if length!=expected:
+            raise UploadError(f"chunk at offset {offset} must be {expected} bytes, got {length}")
+        with session.lock:
+            self._check_writable_locked(session)
+        digest=hashlib.sha256()
+        written=0
+        try:
+            f=open(self._part_path(state),"r+b")
+        except FileNotFoundError:
+            with session.lock:
+                self._check_writable_locked(session)
+            raise UploadError("Upload not found",404)
+        with f:
+            f.seek(offset)
+            while written<length:
+                data=stream.read(min(READ_BUFFER_SIZE,length-written))
+                if not data:
+                    break
+                f.write(data)
+                digest.update(data)
+                written+=len(data)
+        if written!=length:
+            raise UploadError(f"chunk at offset {offset} ended after {written} of {length} bytes")
+        if checksum and digest.hexdigest()!=checksum.lower():
+            raise UploadError(f"checksum mismatch for chunk at offset {offset}",422)
+        with session.lock:
+            self._check_writable_locked(session)
+            session.received.add(offset//chunk_size)
+            self._save(session)
+            return self._describe(session)
+
+    def complete_upload(self,upload_id:str,register:Callable[[Dict[str,Any]],Any])->Any:
+        session=self._require_session(upload_id)
+        state=session.state
+        with session.lock:
+            self._check_writable_locked(session)
+            missing=state["totalChunks"]-len(session.received)
+            if missing:
+                raise UploadError(f"{missing} chunks are still missing",409)
+            session.completing=True
+        part_path=self._part_path(state)
+        final_path=self._final_path(state)
+        try:
+            if state["checksum"] and self._file_checksum(part_path)!=state["checksum"]:
+                raise UploadError("checksum mismatch for completed file",422)
+            os.replace(part_path,final_path)
+        except Exception:
+            with session.lock:
+                session.completing=False
+            raise
+        try:
+            result=register(dict(state))
+        except Exception:
+            if os.path.exists(final_path):
+                os.remove(final_path)
+            self._discard(upload_id)
+            raise
+        self._discard(upload_id)
+        get_logger().info(f"ChunkedUploadService: completed {upload_id} ({state['size']} bytes)")
+        return result
+
+    def abort_upload(self,upload_id:str)->bool:
+        session=self._get_session(upload_id)
+        if session is None:
+            return False
+        part_path=self._part_path(session.state)
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        self._discard(upload_id)
+        return True
+
+    def cleanup_expired(self)->int:
+        cutoff=time.time()-self._session_ttl
+        removed=0
+        for filename in os.listdir(self._session_dir):
+            upload_id=filename[:-5]
+            if not filename.endswith(".json") or not UPLOAD_ID_PATTERN.match(upload_id):
+                continue
+            session=self._get_session(upload_id)
+            if session is None or session.completing or session.state["updatedAt"]>=cutoff:
+                continue
+            if self.abort_upload(upload_id):
+                removed+=1
+        if removed:
+            get_logger().info(f"ChunkedUploadService: removed {removed} expired uploads")
+        return removed
+
+    def _check_writable_locked(self,session:_UploadSession)->None:
+        if session.closed:
+            raise UploadError("Upload not found",404)
+        if session.completing:
+            raise UploadError("upload is already completing",409)
+
+    def _require_session(self,upload_id:str)->_UploadSession:
+        session=self._get_session(upload_id)
+        if session is None:
+            raise UploadError("Upload not found",404)
+        return session
+
+    def _get_session(self,upload_id:str)->Optional[_UploadSession]:
+        if not UPLOAD_ID_PATTERN.match(upload_id or""):
+            return None
+        with self._lock:
+            session=self._sessions.get(upload_id)
+            if session is not None:
+                return session
+            state_path=self._state_path(upload_id)
+            if not os.path.exists(state_path):
+                return None
+            try:
+                with open(state_path,"r",encoding="utf-8") as f:
+                    session=_UploadSession(json.load(f))
+            except (OSError,ValueError) as e:
+                get_logger().warning(f"ChunkedUploadService: unreadable upload state {upload_id}: {e}")
+                return None
+            if not os.path.exists(self._part_path(session.state)):
+                return None
+            self._sessions[upload_id]=session
+            return session
+
+    def _discard(self,upload_id:str)->None:
+        with self._lock:
+            session=self._sessions.pop(upload_id,None)
+        if session is not None:
+            with session.lock:
+                session.closed=True
+        state_path=self._state_path(upload_id)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+    def _save(self,session:_UploadSession)->None:
+        session.state["received"]=sorted(session.received)
+        session.state["updatedAt"]=time.time()
+        state_path=self._state_path(session.state["uploadId"])
+        tmp_path=state_path+".tmp"
+        with open(tmp_path,"w",encoding="utf-8") as f:
+            json.dump(session.state,f)
+        os.replace(tmp_path,state_path)
+
+    def _describe(self,session:_UploadSession)->Dict[str,Any]:
+        state=session.state
+        received=sorted(session.received)
+        return {
+            "uploadId":state["uploadId"],
+            "projectId":state["projectId"],
+            "originalFilename":state["originalFilename"],
+            "size":state["size"],
+            "chunkSize":state["chunkSize"],
+            "totalChunks":state["totalChunks"],
+            "receivedChunks":received,
+            "missingOffsets":[i*state["chunkSize"] for i in range(state["totalChunks"]) if i not in session.received],
+            "receivedBytes":sum(min(state["chunkSize"],state["size"]-i*state["chunkSize"]) for i in received),
+        }
+
+    def _state_path(self,upload_id:str)->str:
+        return os.path.join(self._session_dir,f"{upload_id}.json")
+
+    def _final_path(self,state:Dict[str,Any])->str:
+        return os.path.join(self._upload_folder,state["projectId"],state["storedFilename"])
+
+    def _part_path(self,state:Dict[str,Any])->str:
+        return self._final_path(state)+PART_SUFFIX
+
+    def _file_checksum(self,path:str)->str:
+        digest=hashlib.sha256()
+        with open(path,"rb") as f:
+            for data in iter(lambda:f.read(READ_BUFFER_SIZE),b""):
+                digest.update(data)
+        return digest.hexdigest()
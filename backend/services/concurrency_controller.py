@@ -33,6 +33,12 @@ class ConcurrencyController:
         self._active_jobs_by_group:Dict[str,Dict[str,bool]]={}
         self._lock=threading.Lock()
 
+    def get_max_concurrent(self,provider_id:str)->int:
+        group_id=self._config.get_provider_group(provider_id)
+        if group_id:
+            return self._config.get_group_max_concurrent(group_id)
+        return self._config.get_provider_max_concurrent(provider_id)
+
     def get_provider_active_count(self,provider_id:str)->int:
         with self._lock:
             provider_jobs=self._active_jobs_by_provider.get(provider_id,{})
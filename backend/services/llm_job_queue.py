@@ -1,17 +1,23 @@
 import asyncio
 import threading
 import time
-from typing import Optional,Dict,Any,Callable
+from collections import deque
+from typing import Optional,Dict,Any,Callable,List,Deque
 from models.database import session_scope
 from repositories.llm_job import LlmJobRepository
-from providers.registry import get_provider
+from providers.registry import ProviderRegistry,get_provider
+from providers.health_monitor import get_health_monitor
 from providers.base import AIProviderConfig
 from services.concurrency_controller import ConcurrencyController
+from services.llm_worker_pool import LlmWorkerPool
 from services.token_budget_validator import TokenBudgetValidator
 from services.llm_message_builder import LlmMessageBuilder,LlmStreamExecutor
 from middleware.logger import get_logger
 
 MAX_JOB_RETRIES=3
+TERMINAL_JOB_STATUSES=("completed","failed")
+LATENCY_SAMPLE_SIZE=1000
+MAX_TRACKED_SUBMISSIONS=10000
 
 
 class LlmJobQueue:
@@ -31,11 +37,23 @@ class LlmJobQueue:
     def __init__(self,concurrency_controller:Optional[ConcurrencyController]=None,token_validator:Optional[TokenBudgetValidator]=None,_skip_singleton:bool=False):
         if hasattr(self,"_initialized") and self._initialized:
             return
-        self._poll_interval=1.0
+        self._poll_interval=5.0
+        self._wait_fallback_interval=5.0
+        self._wakeup=threading.Event()
+        self._waiters_lock=threading.Lock()
+        self._job_waiters:Dict[str,List[Callable[[],None]]]={}
+        self._submitted_at:Dict[str,float]={}
+        self._completed_at:Dict[str,float]={}
+        self._latency_samples:Dict[str,Deque[float]]={
+            "submit_to_start":deque(maxlen=LATENCY_SAMPLE_SIZE),
+            "complete_to_wake":deque(maxlen=LATENCY_SAMPLE_SIZE),
+        }
         self._running=False
         self._thread:Optional[threading.Thread]=None
         self._concurrency=concurrency_controller or ConcurrencyController()
         self._token_validator=token_validator or TokenBudgetValidator()
+        self._provider_config=AIProviderConfig(timeout=120)
+        self._pool=LlmWorkerPool(self._execute_job,self._create_provider,self._concurrency.get_max_concurrent)
         self._job_callbacks:Dict[str,Callable[[Dict],None]]={}
         self._speech_callbacks:Dict[str,Callable[[str],None]]={}
         self._initialized=True
@@ -44,12 +62,15 @@ class LlmJobQueue:
         if self._running:
             return
         self._running=True
+        self._pool.start()
         self._thread=threading.Thread(target=self._worker_loop,daemon=True)
         self._thread.start()
         get_logger().info("LlmJobQueue started")
 
     def stop(self)->None:
         self._running=False
+        self._wakeup.set()
+        self._pool.stop()
         if self._thread:
             self._thread.join(timeout=5)
             self._thread=None
@@ -69,7 +90,12 @@ class LlmJobQueue:
                 self._job_callbacks[job["id"]]=callback
             if on_speech:
                 self._speech_callbacks[job["id"]]=on_speech
-            return job
+        with self._waiters_lock:
+            if len(self._submitted_at)>=MAX_TRACKED_SUBMISSIONS:
+                self._submitted_at.clear()
+            self._submitted_at[job["id"]]=time.perf_counter()
+        self._wakeup.set()
+        return job
 
     def get_job_status(self,job_id:str)->Optional[Dict[str,Any]]:
         with session_scope() as session:
@@ -78,30 +104,105 @@ class LlmJobQueue:
             return repo.to_dict(job) if job else None
 
     def wait_for_job(self,job_id:str,timeout:float=300.0)->Optional[Dict[str,Any]]:
-        start=time.time()
-        while time.time()-start<timeout:
-            job=self.get_job_status(job_id)
-            if job and job["status"] in ("completed","failed"):
-                return job
-            time.sleep(0.5)
-        return None
+        event=threading.Event()
+        self._add_waiter(job_id,event.set)
+        try:
+            deadline=time.monotonic()+timeout
+            while True:
+                job=self.get_job_status(job_id)
+                if job and job["status"] in TERMINAL_JOB_STATUSES:
+                    self._record_wake(job_id)
+                    return job
+                remaining=deadline-time.monotonic()
+                if remaining<=0:
+                    return None
+                event.wait(min(remaining,self._wait_fallback_interval))
+                event.clear()
+        finally:
+            self._remove_waiter(job_id,event.set)
 
     async def wait_for_job_async(self,job_id:str,timeout:float=300.0)->Optional[Dict[str,Any]]:
-        start=time.time()
-        while time.time()-start<timeout:
-            job=self.get_job_status(job_id)
-            if job and job["status"] in ("completed","failed"):
-                return job
-            await asyncio.sleep(0.5)
-        return None
+        loop=asyncio.get_running_loop()
+        event=asyncio.Event()
+        def wake()->None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass
+        self._add_waiter(job_id,wake)
+        try:
+            deadline=time.monotonic()+timeout
+            while True:
+                job=self.get_job_status(job_id)
+                if job and job["status"] in TERMINAL_JOB_STATUSES:
+                    self._record_wake(job_id)
+                    return job
+                remaining=deadline-time.monotonic()
+                if remaining<=0:
+                    return None
+                try:
+                    await asyncio.wait_for(event.wait(),timeout=min(remaining,self._wait_fallback_interval))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            self._remove_waiter(job_id,wake)
+
+    def _add_waiter(self,job_id:str,wake:Callable[[],None])->None:
+        with self._waiters_lock:
+            self._job_waiters.setdefault(job_id,[]).append(wake)
+
+    def _remove_waiter(self,job_id:str,wake:Callable[[],None])->None:
+        with self._waiters_lock:
+            waiters=self._job_waiters.get(job_id)
+            if not waiters:
+                return
+            if wake in waiters:
+                waiters.remove(wake)
+            if not waiters:
+                del self._job_waiters[job_id]
+
+    def _signal_waiters(self,job_id:str)->None:
+        with self._waiters_lock:
+            waiters=self._job_waiters.pop(job_id,[])
+            if waiters:
+                self._completed_at[job_id]=time.perf_counter()
+        for wake in waiters:
+            try:
+                wake()
+            except Exception as e:
+                get_logger().error(f"LlmJobQueue waiter wake error for job {job_id}: {e}",exc_info=True)
+
+    def _record_wake(self,job_id:str)->None:
+        with self._waiters_lock:
+            completed=self._completed_at.pop(job_id,None)
+        if completed is not None:
+            self._latency_samples["complete_to_wake"].append(time.perf_counter()-completed)
+
+    def get_latency_stats(self)->Dict[str,Dict[str,float]]:
+        stats={}
+        for name,samples in self._latency_samples.items():
+            values=sorted(samples)
+            if not values:
+                stats[name]={"count":0,"avgMs":0.0,"p50Ms":0.0,"p95Ms":0.0,"maxMs":0.0}
+                continue
+            stats[name]={
+                "count":len(values),
+                "avgMs":round(sum(values)/len(values)*1000,3),
+                "p50Ms":round(values[len(values)//2]*1000,3),
+                "p95Ms":round(values[min(len(values)-1,int(len(values)*0.95))]*1000,3),
+                "maxMs":round(values[-1]*1000,3),
+            }
+        return stats
 
     def _worker_loop(self)->None:
         while self._running:
+            self._wakeup.clear()
             try:
                 self._process_pending_jobs()
             except Exception as e:
                 get_logger().error(f"LlmJobQueue worker error: {e}",exc_info=True)
-            time.sleep(self._poll_interval)
+            self._wakeup.wait(self._poll_interval)
 
     def _process_pending_jobs(self)->None:
         with session_scope() as session:
@@ -110,33 +211,61 @@ class LlmJobQueue:
                 if not self._concurrency.can_start_job(job.provider_id,job.id):
                     continue
                 if repo.claim_job(job.id):
+                    with self._waiters_lock:
+                        submitted=self._submitted_at.pop(job.id,None)
+                    if submitted is not None:
+                        self._latency_samples["submit_to_start"].append(time.perf_counter()-submitted)
                     self._concurrency.register_job(job.id,job.provider_id)
-                    threading.Thread(target=self._execute_job,args=(job.id,job.provider_id),daemon=True).start()
+                    self._pool.submit(job.provider_id,job.id)
+
+    def _create_provider(self,provider_id:str):
+        return get_provider(provider_id,self._provider_config)
+
+    def reset_providers(self,provider_id:Optional[str]=None)->None:
+        ProviderRegistry.clear_cache()
+        self._pool.reset_providers(provider_id)
+
+    def get_pool_stats(self)->Dict[str,Dict[str,Any]]:
+        stats=self._pool.get_stats()
+        with session_scope() as session:
+            pending=LlmJobRepository(session).get_pending_counts_by_provider()
+        for provider_id,count in pending.items():
+            stats.setdefault(provider_id,{"queueDepth":0,"activeWorkers":0,"workers":0,"maxWorkers":self._concurrency.get_max_concurrent(provider_id),"completed":0,"failed":0,"waitAvgMs":0.0,"waitP95Ms":0.0,"waitMaxMs":0.0})
+        for provider_id,entry in stats.items():
+            entry["pending"]=pending.get(provider_id,0)
+        return stats
 
-    def _execute_job(self,job_id:str,provider_id:str)->None:
+    def _execute_job(self,job_id:str,provider_id:str,provider=None)->bool:
+        started=time.perf_counter()
+        error:Optional[Exception]=None
+        succeeded=False
         try:
-            self._execute_job_internal(job_id,provider_id)
+            succeeded=self._execute_job_internal(job_id,provider)
         except Exception as e:
+            error=e
             self._handle_job_error(job_id,e)
         finally:
             self._concurrency.unregister_job(job_id,provider_id)
+            self._wakeup.set()
+        if provider is not None:
+            get_health_monitor().record_job_outcome(provider_id,error is None,(time.perf_counter()-started)*1000,str(error) if error else None)
+        return succeeded
 
-    def _execute_job_internal(self,job_id:str,provider_id:str)->None:
+    def _execute_job_internal(self,job_id:str,provider)->bool:
         with session_scope() as session:
             repo=LlmJobRepository(session)
             job=repo.get(job_id)
             if not job:
-                return
-            provider=get_provider(job.provider_id,AIProviderConfig(timeout=120))
+                return False
             if not provider:
                 repo.fail_job(job_id,f"Provider not found: {job.provider_id}")
-                self._notify_completion(job_id)
-                return
-            messages=LlmMessageBuilder.build_messages(job)
-            chat_kwargs=LlmMessageBuilder.build_chat_kwargs(job,messages)
-            speech_cb=self._speech_callbacks.pop(job_id,None)
-            self._execute_with_streaming(repo,job_id,provider,chat_kwargs,speech_cb)
-            self._notify_completion(job_id)
+            else:
+                messages=LlmMessageBuilder.build_messages(job)
+                chat_kwargs=LlmMessageBuilder.build_chat_kwargs(job,messages)
+                speech_cb=self._speech_callbacks.pop(job_id,None)
+                self._execute_with_streaming(repo,job_id,provider,chat_kwargs,speech_cb)
+        self._notify_completion(job_id)
+        return provider is not None
 
     def _execute_with_streaming(self,repo:LlmJobRepository,job_id:str,provider,chat_kwargs:Dict[str,Any],speech_cb:Optional[Callable[[str],None]])->None:
         executor=LlmStreamExecutor(provider,chat_kwargs)
@@ -150,17 +279,23 @@ class LlmJobQueue:
 
     def _handle_job_error(self,job_id:str,error:Exception)->None:
         self._speech_callbacks.pop(job_id,None)
+        retried=False
         with session_scope() as session:
             repo=LlmJobRepository(session)
             job=repo.get(job_id)
             if job and job.retry_count<MAX_JOB_RETRIES:
                 repo.retry_job(job_id)
+                retried=True
                 get_logger().warning(f"LlmJobQueue job {job_id} retry ({job.retry_count+1}/{MAX_JOB_RETRIES}): {error}")
             else:
                 repo.fail_job(job_id,str(error))
-                self._notify_completion(job_id)
+        if retried:
+            self._wakeup.set()
+        else:
+            self._notify_completion(job_id)
 
     def _notify_completion(self,job_id:str)->None:
+        self._signal_waiters(job_id)
         job=self.get_job_status(job_id)
         if not job:
             return
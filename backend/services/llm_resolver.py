@@ -1,8 +1,30 @@
-from typing import Dict,Optional
+import threading
+from typing import Dict,Optional,Tuple
 from middleware.logger import get_logger
 
+_resolution_cache:Dict[Tuple[Optional[str],str],Dict[str,str]]={}
+_resolution_lock=threading.Lock()
+_resolution_generation=0
+_resolution_stats={"hits":0,"misses":0,"invalidations":0}
+
 
 def resolve_llm_for_project(project_id:Optional[str],usage_category:str)->Dict[str,str]:
+ key=(project_id or None,usage_category)
+ cached=_resolution_cache.get(key)
+ if cached is not None:
+  _resolution_stats["hits"]+=1
+  return dict(cached)
+ _resolution_stats["misses"]+=1
+ generation=_resolution_generation
+ resolved,cacheable=_resolve_uncached(project_id,usage_category)
+ if cacheable:
+  with _resolution_lock:
+   if generation==_resolution_generation:
+    _resolution_cache[key]=resolved
+ return dict(resolved)
+
+
+def _resolve_uncached(project_id:Optional[str],usage_category:str)->Tuple[Dict[str,str],bool]:
  if project_id:
   try:
    from models.database import session_scope
@@ -11,10 +33,28 @@ def resolve_llm_for_project(project_id:Optional[str],usage_category:str)->Dict[s
     repo=ProjectAiConfigRepository(session)
     config=repo.get(project_id,usage_category)
     if config:
-     return {"provider":config.provider_id,"model":config.model_id}
+     return {"provider":config.provider_id,"model":config.model_id},True
   except Exception as e:
    get_logger().error(f"llm_resolver: project config lookup failed: {e}",exc_info=True)
- return _get_usage_category_default(usage_category)
+   return _get_usage_category_default(usage_category),False
+ return _get_usage_category_default(usage_category),True
+
+
+def invalidate_llm_resolution(project_id:Optional[str]=None)->None:
+ global _resolution_generation
+ with _resolution_lock:
+  _resolution_generation+=1
+  _resolution_stats["invalidations"]+=1
+  if project_id is None:
+   _resolution_cache.clear()
+   return
+  for key in [k for k in _resolution_cache if k[0]==project_id]:
+   del _resolution_cache[key]
+
+
+def get_llm_resolution_stats()->Dict[str,int]:
+ with _resolution_lock:
+  return {**_resolution_stats,"entries":len(_resolution_cache)}
 
 
 def _get_usage_category_default(usage_category:str)->Dict[str,str]:
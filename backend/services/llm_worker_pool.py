@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import deque
+from typing import Any,Callable,Deque,Dict,Optional,Tuple
+from middleware.logger import get_logger
+
+WAIT_SAMPLE_SIZE=500
+WORKER_IDLE_TIMEOUT=60.0
+
+
+class _ProviderLane:
+    def __init__(self,provider_id:str,max_workers:int):
+        self.provider_id=provider_id
+        self.max_workers=max(1,max_workers)
+        self.cond=threading.Condition()
+        self.queue:Deque[Tuple[str,float]]=deque()
+        self.workers=0
+        self.active=0
+        self.completed=0
+        self.failed=0
+        self.wait_samples:Deque[float]=deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.provider:Optional[Any]=None
+        self.provider_created=False
+
+
+class LlmWorkerPool:
+    def __init__(self,execute:Callable[[str,str,Any],bool],provider_factory:Callable[[str],Any],max_workers_for:Callable[[str],int],idle_timeout:float=WORKER_IDLE_TIMEOUT):
+        self._execute=execute
+        self._provider_factory=provider_factory
+        self._max_workers_for=max_workers_for
+        self._idle_timeout=idle_timeout
+        self._lanes:Dict[str,_ProviderLane]={}
+        self._lanes_lock=threading.Lock()
+        self._running=True
+
+    def _get_lane(self,provider_id:str)->_ProviderLane:
+        with self._lanes_lock:
+            lane=self._lanes.get(provider_id)
+            if lane is None:
+                lane=_ProviderLane(provider_id,self._max_workers_for(provider_id))
+                self._lanes[provider_id]=lane
+            return lane
+
+    def start(self)->None:
+        self._running=True
+
+    def submit(self,provider_id:str,job_id:str)->None:
+        lane=self._get_lane(provider_id)
+        with lane.cond:
+            lane.queue.append((job_id,time.perf_counter()))
+            idle=lane.workers-lane.active
+            if idle<len(lane.queue) and lane.workers<lane.max_workers:
+                lane.workers+=1
+                threading.Thread(target=self._worker_loop,args=(lane,),daemon=True,name=f"llm-worker-{provider_id}").start()
+            lane.cond.notify()
+
+    def _worker_loop(self,lane:_ProviderLane)->None:
+        while True:
+            with lane.cond:
+                deadline=time.monotonic()+self._idle_timeout
+                while not lane.queue and self._running:
+                    remaining=deadline-time.monotonic()
+                    if remaining<=0:
+                        break
+                    lane.cond.wait(remaining)
+                if not lane.queue:
+                    lane.workers-=1
+                    return
+                job_id,enqueued_at=lane.queue.popleft()
+                lane.wait_samples.append(time.perf_counter()-enqueued_at)
+                lane.active+=1
+            succeeded=False
+            try:
+                succeeded=bool(self._execute(job_id,lane.provider_id,self._get_provider(lane)))
+            except Exception as e:
+                get_logger().error(f"LlmWorkerPool job {job_id} error: {e}",exc_info=True)
+            finally:
+                with lane.cond:
+                    lane.active-=1
+                    if succeeded:
+                        lane.completed+=1
+                    else:
+                        lane.failed+=1
+
+    def _get_provider(self,lane:_ProviderLane)->Optional[Any]:
+        with lane.cond:
+            if not lane.provider_created:
+                lane.provider=self._provider_factory(lane.provider_id)
+                lane.provider_created=lane.provider is not None
+            return lane.provider
+
+    def reset_providers(self,provider_id:Optional[str]=None)->None:
+        with self._lanes_lock:
+            if provider_id is None:
+                lanes=list(self._lanes.values())
+            else:
+                lanes=[self._lanes[provider_id]] if provider_id in self._lanes else []
+        for lane in lanes:
+            with lane.cond:
+                lane.provider=None
+                lane.provider_created=False
+                lane.max_workers=max(1,self._max_workers_for(lane.provider_id))
+
+    def stop(self)->None:
+        self._running=False
+        with self._lanes_lock:
+            lanes=list(self._lanes.values())
+        for lane in lanes:
+            with lane.cond:
+                lane.cond.notify_all()
+
+    def get_stats(self)->Dict[str,Dict[str,Any]]:
+        with self._lanes_lock:
+            lanes=list(self._lanes.values())
+        stats={}
+        for lane in lanes:
+            with lane.cond:
+                waits=sorted(lane.wait_samples)
+                stats[lane.provider_id]={
+                    "queueDepth":len(lane.queue),
+                    "activeWorkers":lane.active,
+                    "workers":lane.workers,
+                    "maxWorkers":lane.max_workers,
+                    "completed":lane.completed,
+                    "failed":lane.failed,
+                    "waitAvgMs":round(sum(waits)/len(waits)*1000,3) if waits else 0.0,
+                    "waitP95Ms":round(waits[min(len(waits)-1,int(len(waits)*0.95))]*1000,3) if waits else 0.0,
+                    "waitMaxMs":round(waits[-1]*1000,3) if waits else 0.0,
+                }
+        return stats
@@ -1,5 +1,5 @@
 from datetime import datetime,timedelta
-from typing import Dict,List,Any
+from typing import Dict,List,Any,Optional
 
 from config_loaders.agent_config import (
     get_generation_type_for_agent,
@@ -8,11 +8,13 @@ from config_loaders.agent_config import (
 from events.event_bus import EventBus
 from events.events import MetricsUpdated
 from repositories import MetricsRepository,AgentRepository,ProjectRepository
+from services.agent.read_model import AgentReadModel
 
 
 class MetricsCalculator:
-    def __init__(self,event_bus:EventBus):
+    def __init__(self,event_bus:EventBus,read_model:Optional[AgentReadModel]=None):
         self._event_bus=event_bus
+        self._read_model=read_model
 
     def calculate_token_totals(
         self,agents:List[Dict]
@@ -44,13 +46,12 @@ class MetricsCalculator:
             tokens_by_type[gen_type]["output"]+=agent.get("outputTokens",0)
         return tokens_by_type
 
-    def estimate_remaining_time(
-        self,agents:List[Dict]
-    )->float:
-        running_agent=next(
-            (a for a in agents if a["status"]=="running"),None
-        )
-        if not running_agent or running_agent["progress"]<=0:
+    def count_active_generations(self,agents:List[Dict])->int:
+        return len([a for a in agents if a["status"]=="running"])
+
+    def estimate_remaining_time(self,summary:Dict[str,Any])->float:
+        running_agent=summary.get("firstRunning")
+        if not running_agent or running_agent["progress"]<=0 or not running_agent["startedAt"]:
             return 0.0
         elapsed=(
             datetime.now()
@@ -60,33 +61,50 @@ class MetricsCalculator:
         if rate<=0:
             return 0.0
         remaining_progress=100-running_agent["progress"]
-        remaining_agents=len(
-            [a for a in agents if a["status"]=="pending"]
-        )
+        remaining_agents=summary["statusCounts"].get("pending",0)
         return (remaining_progress/rate)+(remaining_agents*100/rate)
 
-    def count_active_generations(self,agents:List[Dict])->int:
-        return len([a for a in agents if a["status"]=="running"])
+    def summarize(self,session,project_id:str)->Dict[str,Any]:
+        if self._read_model is not None:
+            return self._read_model.get_summary(project_id)
+        agents=AgentRepository(session).get_by_project(project_id)
+        total_input,total_output=self.calculate_token_totals(agents)
+        _,total_count,overall_progress=self.calculate_progress(agents)
+        statuses:Dict[str,int]={}
+        for agent in agents:
+            statuses[agent["status"]]=statuses.get(agent["status"],0)+1
+        running_agent=next((a for a in agents if a["status"]=="running"),None)
+        return {
+            "projectId":project_id,
+            "total":total_count,
+            "statusCounts":statuses,
+            "inputTokens":total_input,
+            "outputTokens":total_output,
+            "tokensUsed":sum(a.get("tokensUsed",0) or 0 for a in agents),
+            "tokensByType":self.calculate_tokens_by_type(agents),
+            "progressPercent":overall_progress,
+            "firstRunning":{"id":running_agent["id"],"progress":running_agent["progress"],"startedAt":running_agent["startedAt"]} if running_agent else None,
+        }
 
     def update_metrics(
         self,
         session,
         project_id:str,
     )->None:
-        agent_repo=AgentRepository(session)
         proj_repo=ProjectRepository(session)
         metrics_repo=MetricsRepository(session)
-        agents=agent_repo.get_by_project(project_id)
         project=proj_repo.get(project_id)
         if not project:
             return
-        total_input,total_output=self.calculate_token_totals(agents)
-        completed_count,total_count,overall_progress=self.calculate_progress(
-            agents
-        )
-        tokens_by_type=self.calculate_tokens_by_type(agents)
-        estimated_remaining=self.estimate_remaining_time(agents)
-        active_generations=self.count_active_generations(agents)
+        summary=self.summarize(session,project_id)
+        total_input=summary["inputTokens"]
+        total_output=summary["outputTokens"]
+        completed_count=summary["statusCounts"].get("completed",0)
+        total_count=summary["total"]
+        overall_progress=summary["progressPercent"]
+        tokens_by_type=summary["tokensByType"]
+        estimated_remaining=self.estimate_remaining_time(summary)
+        active_generations=summary["statusCounts"].get("running",0)
         existing_metrics=metrics_repo.get(project_id)
         generation_counts=(
             existing_metrics.get("generationCounts",{})
@@ -95,7 +113,7 @@ class MetricsCalculator:
         )
         metrics_data={
             "projectId":project_id,
-            "totalTokensUsed":total_input+total_output,
+            "totalTokensUsed":max(summary.get("tokensUsed",0),total_input+total_output),
             "totalInputTokens":total_input,
             "totalOutputTokens":total_output,
             "estimatedTotalTokens":50000,
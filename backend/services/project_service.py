@@ -12,14 +12,17 @@ from repositories import (
 from config_loaders.ai_provider_config import build_default_ai_services
 from events.event_bus import EventBus
 from services.base_service import BaseService
+from services.agent.read_model import AgentReadModel
+from services.llm_resolver import invalidate_llm_resolution
 from services.project.metrics_calculator import MetricsCalculator
 from services.project.state_manager import ProjectStateManager
 
 
 class ProjectService(BaseService):
-    def __init__(self,event_bus:EventBus):
+    def __init__(self,event_bus:EventBus,read_model:Optional[AgentReadModel]=None):
         super().__init__(event_bus)
-        self._metrics_calculator=MetricsCalculator(event_bus)
+        self._read_model=read_model
+        self._metrics_calculator=MetricsCalculator(event_bus,read_model)
         self._state_manager=ProjectStateManager(self._add_system_log)
 
     def init_sample_data_if_empty(self)->None:
@@ -153,7 +156,11 @@ class ProjectService(BaseService):
     def delete_project(self,project_id:str)->bool:
         with session_scope() as session:
             repo=ProjectRepository(session)
-            return repo.delete(project_id)
+            deleted=repo.delete(project_id)
+        invalidate_llm_resolution(project_id)
+        if self._read_model is not None:
+            self._read_model.invalidate(project_id)
+        return deleted
 
     def start_project(self,project_id:str)->Optional[Dict]:
         with session_scope() as session:
@@ -6,16 +6,13 @@ from middleware.logger import get_logger
 
 
 class RecoveryService:
- def __init__(self,sio=None):
-  self._sio=sio
-
- def set_sio(self,sio)->None:
-  self._sio=sio
+ def __init__(self,websocket_emitter=None):
+  self._websocket_emitter=websocket_emitter
 
  def _emit_event(self,event:str,data:Dict,project_id:str)->None:
-  if self._sio:
+  if self._websocket_emitter:
    try:
-    self._sio.emit(event,data,room=f"project:{project_id}")
+    self._websocket_emitter.emit(event,data,project_id)
    except Exception as e:
     get_logger().warning(f"RecoveryService: error emitting {event}: {e}")
 
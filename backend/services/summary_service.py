@@ -1,9 +1,32 @@
-from typing import Optional
+import json
+import hashlib
+import threading
+from typing import Any,Dict,Optional,Tuple
 from config_loaders.workflow_config import get_context_policy_settings,get_summary_directive
 from providers.registry import get_provider
 from providers.base import AIProviderConfig,ChatMessage,MessageRole
+from models.database import session_scope
+from repositories.summary_cache import SummaryCacheRepository
 from middleware.logger import get_logger
 
+SUMMARY_PROMPT_VERSION=1
+SUMMARY_CACHE_EVICT_INTERVAL=50
+
+
+def summary_cache_key(content:str,agent_type:str,focus:Optional[str],directive:str,provider_id:str,model:str,max_tokens:int)->str:
+ payload=json.dumps([SUMMARY_PROMPT_VERSION,agent_type,focus or"",directive,provider_id,model,max_tokens],ensure_ascii=False)
+ digest=hashlib.sha256(payload.encode("utf-8"))
+ digest.update(b"\0")
+ digest.update(content.encode("utf-8"))
+ return digest.hexdigest()
+
+
+class _InFlight:
+ def __init__(self):
+  self.event=threading.Event()
+  self.result:Optional[str]=None
+  self.error:Optional[BaseException]=None
+
 
 class SummaryService:
  _instance=None
@@ -18,6 +41,10 @@ class SummaryService:
   if self._initialized:
    return
   self._initialized=True
+  self._lock=threading.Lock()
+  self._inflight:Dict[str,_InFlight]={}
+  self._stats={"hits":0,"misses":0,"shared":0,"llmCalls":0,"errors":0,"evictions":0}
+  self._puts=0
 
  def generate_summary(self,content:str,agent_type:str,fallback_func=None,project_id:Optional[str]=None,focus:Optional[str]=None)->str:
   if not content:
@@ -32,7 +59,7 @@ class SummaryService:
   if len(content)<min_len and not focus:
    return content
   try:
-   return self._call_llm_summary(content,agent_type,llm_cfg,project_id,focus=focus)
+   return self._summarize(content,agent_type,llm_cfg,project_id,focus=focus)
   except Exception as e:
    get_logger().error(f"SummaryService LLM summary failed, using fallback: {e}",exc_info=True)
    if fallback_func:
@@ -44,8 +71,101 @@ class SummaryService:
    return""
   return self.generate_summary(content,agent_type,project_id=project_id,focus=focus)
 
- def _call_llm_summary(self,content:str,agent_type:str,llm_cfg:dict,project_id:Optional[str]=None,focus:Optional[str]=None)->str:
-  from services.llm_resolver import resolve_llm_for_project,resolve_with_env_key
+ def _summarize(self,content:str,agent_type:str,llm_cfg:dict,project_id:Optional[str]=None,focus:Optional[str]=None)->str:
+  provider_id,model=self._resolve_summary_llm(llm_cfg,project_id)
+  cache_cfg=llm_cfg.get("cache",{})
+  if not cache_cfg.get("enabled",True):
+   return self._call_llm_summary(content,agent_type,llm_cfg,provider_id,model,focus=focus)
+  ttl=cache_cfg.get("ttl_seconds",604800)
+  input_max=llm_cfg.get("input_max_length",30000)
+  directive="" if focus else get_summary_directive()
+  key=summary_cache_key(content[:input_max],agent_type,focus,directive,provider_id,model,llm_cfg.get("max_tokens",2048))
+  cached=self._cache_get(key,ttl)
+  if cached is not None:
+   return cached
+  with self._lock:
+   flight=self._inflight.get(key)
+   leader=flight is None
+   if leader:
+    flight=_InFlight()
+    self._inflight[key]=flight
+   else:
+    self._stats["shared"]+=1
+  if not leader:
+   flight.event.wait()
+   if flight.error is not None:
+    raise flight.error
+   return flight.result
+  try:
+   cached=self._cache_get(key,ttl,count=False)
+   if cached is not None:
+    flight.result=cached
+    return cached
+   with self._lock:
+    self._stats["misses"]+=1
+    self._stats["llmCalls"]+=1
+   flight.result=self._call_llm_summary(content,agent_type,llm_cfg,provider_id,model,focus=focus)
+   self._cache_put(key,flight.result,agent_type,model,cache_cfg)
+   return flight.result
+  except Exception as e:
+   flight.error=e
+   with self._lock:
+    self._stats["errors"]+=1
+   raise
+  finally:
+   with self._lock:
+    self._inflight.pop(key,None)
+   flight.event.set()
+
+ def _cache_get(self,key:str,ttl:float,count:bool=True)->Optional[str]:
+  try:
+   with session_scope() as session:
+    entry=SummaryCacheRepository(session).get(key,ttl)
+    summary=entry.summary if entry else None
+  except Exception as e:
+   get_logger().warning(f"SummaryService cache read failed: {e}")
+   return None
+  if summary is not None and count:
+   with self._lock:
+    self._stats["hits"]+=1
+  return summary
+
+ def _cache_put(self,key:str,summary:str,agent_type:str,model:str,cache_cfg:dict)->None:
+  if not summary:
+   return
+  with self._lock:
+   self._puts+=1
+   evict=self._puts%SUMMARY_CACHE_EVICT_INTERVAL==1
+  try:
+   with session_scope() as session:
+    repo=SummaryCacheRepository(session)
+    repo.put(key,summary,agent_type=agent_type,model=model)
+    if evict:
+     removed=repo.evict(
+      ttl_seconds=cache_cfg.get("ttl_seconds",604800),
+      max_entries=cache_cfg.get("max_entries",5000),
+      max_bytes=int(cache_cfg.get("max_size_mb",64)*1024*1024),
+     )
+     with self._lock:
+      self._stats["evictions"]+=removed
+  except Exception as e:
+   get_logger().warning(f"SummaryService cache write failed: {e}")
+
+ def get_cache_stats(self)->Dict[str,Any]:
+  with self._lock:
+   stats=dict(self._stats)
+   stats["inFlight"]=len(self._inflight)
+  lookups=stats["hits"]+stats["misses"]
+  stats["hitRate"]=round(stats["hits"]/lookups,3) if lookups else 0.0
+  try:
+   with session_scope() as session:
+    stats.update(SummaryCacheRepository(session).get_stats())
+  except Exception as e:
+   get_logger().warning(f"SummaryService cache stats failed: {e}")
+  return stats
+
+ def _resolve_summary_llm(self,llm_cfg:dict,project_id:Optional[str])->Tuple[str,str]:
+  from services.llm_resolver import resolve_llm_for_project
 
   usage_category=llm_cfg.get("usage_category","llm_low")
   resolved=resolve_llm_for_project(project_id,usage_category)
@@ -54,6 +174,10 @@ class SummaryService:
 
   if not provider_id or not model:
    raise RuntimeError(f"Summary LLM not resolved: usage_category={usage_category} project_id={project_id}")
+  return provider_id,model
+
+ def _call_llm_summary(self,content:str,agent_type:str,llm_cfg:dict,provider_id:str,model:str,focus:Optional[str]=None)->str:
+  from services.llm_resolver import resolve_with_env_key
 
   max_tokens=llm_cfg.get("max_tokens",2048)
   input_max=llm_cfg.get("input_max_length",30000)
@@ -1,9 +1,334 @@
 import os
 import re
+import json
+import time
 import asyncio
-from typing import Dict,List,Set,Tuple
+import hashlib
+import threading
+from collections import OrderedDict,deque
+from typing import Any,Dict,List,Optional,Set,Tuple
 from .base import Skill,SkillResult,SkillContext,SkillCategory,SkillParameter
 from .file_skills import FileSkillMixin
+from cache.file_manager import add_change_listener,is_path_watched
+from middleware.logger import get_logger
+
+LANGUAGE_EXTENSIONS={
+ "python":[".py"],
+ "javascript":[".js",".jsx",".mjs"],
+ "typescript":[".ts",".tsx"],
+}
+SKIP_DIRS=frozenset({"node_modules",".git","__pycache__",".venv","venv"})
+GRAPH_INDEX_VERSION=1
+GRAPH_RESCAN_INTERVAL=300
+MAX_GRAPH_INDEXES=16
+MAX_PERSISTED_GRAPHS=64
+PYTHON_IMPORT_RE=re.compile(r'^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))',re.MULTILINE)
+JS_IMPORT_RE=re.compile(r'''(?:import\s+.*?\s+from\s+['"](.*?)['"]|require\s*\(\s*['"](.*?)['"]\s*\))''',re.MULTILINE)
+
+_graph_indexes:"OrderedDict[Tuple[str,str],DependencyIndex]"=OrderedDict()
+_graph_lock=threading.Lock()
+
+
+def _graph_cache_dir()->Optional[str]:
+ from config import get_config
+ return os.path.join(get_config().database.data_dir,"dependency_graphs")
+
+
+def extract_imports(filepath:str,language:str)->List[str]:
+ try:
+  with open(filepath,"r",encoding="utf-8",errors="replace") as f:
+   content=f.read()
+ except Exception:
+  return []
+ imports=[]
+ if language=="python":
+  for match in PYTHON_IMPORT_RE.finditer(content):
+   module=match.group(1) or match.group(2)
+   if module:
+    imports.append(module)
+ else:
+  for match in JS_IMPORT_RE.finditer(content):
+   module=match.group(1) or match.group(2)
+   if module and module.startswith("."):
+    imports.append(module)
+ return imports
+
+
+class DependencyIndex:
+ def __init__(self,base_path:str,language:str,persist_dir:Optional[str]=None):
+  self.base_path=os.path.normpath(base_path)
+  self.language=language
+  self.extensions=tuple(LANGUAGE_EXTENSIONS.get(language,[".py"]))
+  self._persist_path=None
+  if persist_dir:
+   key=hashlib.sha1(f"{language}:{self.base_path}".encode("utf-8")).hexdigest()
+   self._persist_path=os.path.join(persist_dir,f"{key}.json")
+  self._lock=threading.RLock()
+  self._files:Dict[str,Tuple[float,int]]={}
+  self._imports:Dict[str,List[str]]={}
+  self._forward:Dict[str,List[str]]={}
+  self._reverse:Dict[str,Set[str]]={}
+  self._by_path:Dict[str,str]={}
+  self._by_suffix:Dict[str,str]={}
+  self._index_dirs:Dict[str,str]={}
+  self._dirty:Set[str]=set()
+  self._needs_scan=True
+  self._last_scan=0.0
+  self._loaded=False
+  self.stats={"scans":0,"incrementalUpdates":0,"parsedFiles":0,"reusedFiles":0}
+
+ def mark_dirty(self,full_path:str,is_directory:bool=False)->None:
+  rel=os.path.relpath(os.path.normpath(full_path),self.base_path)
+  if rel.startswith(".."):
+   return
+  with self._lock:
+   if is_directory or rel==".":
+    self._needs_scan=True
+   elif rel.endswith(self.extensions) and not self._is_skipped(rel):
+    self._dirty.add(rel)
+
+ def refresh(self,watched:bool=False)->None:
+  with self._lock:
+   if not self._loaded:
+    self._load()
+    self._loaded=True
+   now=time.monotonic()
+   if watched and not self._needs_scan and now-self._last_scan<GRAPH_RESCAN_INTERVAL:
+    changed=self._apply_dirty()
+   else:
+    changed=self._rescan()
+    self._needs_scan=False
+    self._last_scan=now
+   self._dirty.clear()
+   if changed:
+    self._save()
+
+ def nodes(self)->List[Dict[str,Any]]:
+  with self._lock:
+   return [{"id":rel,"path":rel,"size":self._files[rel][1]} for rel in sorted(self._files)]
+
+ def edges(self)->List[Dict[str,Any]]:
+  with self._lock:
+   return [{"source":src,"target":tgt,"type":"import"} for src in sorted(self._forward) for tgt in self._forward[src]]
+
+ def adjacency(self)->Dict[str,List[str]]:
+  with self._lock:
+   return {src:list(targets) for src,targets in self._forward.items() if targets}
+
+ def has_file(self,rel:str)->bool:
+  with self._lock:
+   return rel in self._files
+
+ def dependencies(self,rel:str)->List[str]:
+  with self._lock:
+   return sorted(set(self._forward.get(rel,[])))
+
+ def dependents(self,rel:str)->List[str]:
+  with self._lock:
+   return sorted(self._reverse.get(rel,()))
+
+ def impacted(self,rel:str)->List[str]:
+  with self._lock:
+   impacted:Set[str]=set()
+   queue=deque([rel])
+   while queue:
+    current=queue.popleft()
+    for dep in self._reverse.get(current,()):
+     if dep not in impacted:
+      impacted.add(dep)
+      queue.append(dep)
+   return sorted(impacted)
+
+ def resolve(self,imp:str,source:str)->str:
+  if self.language=="python":
+   path=imp.replace(".","/")
+   for candidate in (path+".py",path+"/__init__.py"):
+    hit=self._by_path.get(candidate) or self._by_suffix.get(candidate)
+    if hit:
+     return hit
+   return""
+  resolved=os.path.normpath(os.path.join(os.path.dirname(source),imp)).replace(os.sep,"/")
+  for ext in self.extensions:
+   hit=self._by_path.get(resolved+ext)
+   if hit:
+    return hit
+  return self._index_dirs.get(resolved,"")
+
+ def _is_skipped(self,rel:str)->bool:
+  return any(part in SKIP_DIRS for part in rel.split(os.sep)[:-1])
+
+ def _stat(self,rel:str)->Optional[Tuple[float,int]]:
+  try:
+   st=os.stat(os.path.join(self.base_path,rel))
+  except OSError:
+   return None
+  return (st.st_mtime,st.st_size)
+
+ def _rescan(self)->bool:
+  current:Dict[str,Tuple[float,int]]={}
+  for root,dirs,filenames in os.walk(self.base_path):
+   dirs[:]=[d for d in dirs if d not in SKIP_DIRS]
+   for fname in filenames:
+    if fname.endswith(self.extensions):
+     rel=os.path.relpath(os.path.join(root,fname),self.base_path)
+     stat=self._stat(rel)
+     if stat:
+      current[rel]=stat
+  updated={rel:stat for rel,stat in current.items() if self._files.get(rel)!=stat}
+  removed=set(self._files)-set(current)
+  self.stats["scans"]+=1
+  self.stats["reusedFiles"]+=len(current)-len(updated)
+  return self._update(updated,removed)
+
+ def _apply_dirty(self)->bool:
+  updated:Dict[str,Tuple[float,int]]={}
+  removed:Set[str]=set()
+  for rel in self._dirty:
+   stat=self._stat(rel)
+   if stat is None:
+    if rel in self._files:
+     removed.add(rel)
+   elif self._files.get(rel)!=stat:
+    updated[rel]=stat
+  if updated or removed:
+   self.stats["incrementalUpdates"]+=1
+  return self._update(updated,removed)
+
+ def _update(self,updated:Dict[str,Tuple[float,int]],removed:Set[str])->bool:
+  if not updated and not removed:
+   return False
+  structural=bool(removed) or any(rel not in self._files for rel in updated)
+  for rel in removed:
+   self._files.pop(rel,None)
+   self._imports.pop(rel,None)
+  for rel,stat in updated.items():
+   self._files[rel]=stat
+   self._imports[rel]=extract_imports(os.path.join(self.base_path,rel),self.language)
+  self.stats["parsedFiles"]+=len(updated)
+  if structural:
+   self._relink_all()
+  else:
+   for rel in updated:
+    self._link(rel)
+  return True
+
+ def _relink_all(self)->None:
+  self._by_path={}
+  self._by_suffix={}
+  self._index_dirs={}
+  for rel in sorted(self._files,key=lambda r:(r.count(os.sep),r)):
+   key=rel.replace(os.sep,"/")
+   self._by_path[key]=rel
+   parts=key.split("/")
+   for i in range(1,len(parts)):
+    self._by_suffix.setdefault("/".join(parts[i:]),rel)
+   if parts[-1].startswith("index"):
+    parent=os.path.dirname(key)
+    while parent:
+     self._index_dirs.setdefault(parent,rel)
+     parent=os.path.dirname(parent)
+  self._forward={}
+  self._reverse={}
+  for rel in self._files:
+   self._link(rel)
+
+ def _link(self,rel:str)->None:
+  for old in self._forward.get(rel,[]):
+   sources=self._reverse.get(old)
+   if sources:
+    sources.discard(rel)
+    if not sources:
+     del self._reverse[old]
+  targets=[t for t in (self.resolve(imp,rel) for imp in self._imports.get(rel,[])) if t]
+  self._forward[rel]=targets
+  for target in targets:
+   self._reverse.setdefault(target,set()).add(rel)
+
+ def _load(self)->None:
+  if not self._persist_path or not os.path.exists(self._persist_path):
+   return
+  try:
+   with open(self._persist_path,"r",encoding="utf-8") as f:
+    data=json.load(f)
+  except (OSError,ValueError) as e:
+   get_logger().warning(f"DependencyIndex: unreadable graph cache {self._persist_path}: {e}")
+   return
+  if data.get("version")!=GRAPH_INDEX_VERSION or data.get("basePath")!=self.base_path or data.get("language")!=self.language:
+   return
+  for rel,(mtime,size,imports) in data.get("files",{}).items():
+   self._files[rel]=(mtime,size)
+   self._imports[rel]=imports
+  self._relink_all()
+
+ def _save(self)->None:
+  if not self._persist_path:
+   return
+  data={
+   "version":GRAPH_INDEX_VERSION,
+   "basePath":self.base_path,
+   "language":self.language,
+   "files":{rel:[stat[0],stat[1],self._imports.get(rel,[])] for rel,stat in self._files.items()},
+  }
+  try:
+   os.makedirs(os.path.dirname(self._persist_path),exist_ok=True)
+   tmp_path=self._persist_path+".tmp"
+   with open(tmp_path,"w",encoding="utf-8") as f:
+    json.dump(data,f)
+   os.replace(tmp_path,self._persist_path)
+  except OSError as e:
+   get_logger().warning(f"DependencyIndex: failed to persist graph {self._persist_path}: {e}")
+   return
+  _prune_graph_cache(os.path.dirname(self._persist_path),keep=self._persist_path)
+
+
+def _prune_graph_cache(persist_dir:str,keep:str)->None:
+ try:
+  paths=[os.path.join(persist_dir,name) for name in os.listdir(persist_dir) if name.endswith(".json")]
+  if len(paths)<=MAX_PERSISTED_GRAPHS:
+   return
+  paths.sort(key=os.path.getmtime)
+ except OSError:
+  return
+ for path in paths[:len(paths)-MAX_PERSISTED_GRAPHS]:
+  if path==keep:
+   continue
+  try:
+   os.remove(path)
+  except OSError:
+   pass
+
+
+def get_dependency_index(base_path:str,language:str)->DependencyIndex:
+ base_path=os.path.normpath(base_path)
+ key=(base_path,language)
+ with _graph_lock:
+  index=_graph_indexes.get(key)
+  if index is None:
+   index=DependencyIndex(base_path,language,_graph_cache_dir())
+   _graph_indexes[key]=index
+   while len(_graph_indexes)>MAX_GRAPH_INDEXES:
+    _graph_indexes.popitem(last=False)
+  else:
+   _graph_indexes.move_to_end(key)
+ index.refresh(watched=is_path_watched(base_path))
+ return index
+
+
+def clear_dependency_indexes()->None:
+ with _graph_lock:
+  _graph_indexes.clear()
+
+
+def _on_file_changed(full_path:str,event_type:str,is_directory:bool)->None:
+ full_path=os.path.normpath(full_path)
+ with _graph_lock:
+  indexes=list(_graph_indexes.values())
+ for index in indexes:
+  if full_path==index.base_path or full_path.startswith(index.base_path+os.sep):
+   index.mark_dirty(full_path,is_directory)
+
+
+add_change_listener(_on_file_changed)
 
 
 class DependencyGraphSkill(FileSkillMixin,Skill):
@@ -16,9 +341,6 @@ class DependencyGraphSkill(FileSkillMixin,Skill):
   SkillParameter(name="language",type="string",description="言語: python, javascript, typescript",required=False,default="python"),
  ]
 
- PYTHON_IMPORT_RE=re.compile(r'^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w.]+))',re.MULTILINE)
- JS_IMPORT_RE=re.compile(r'''(?:import\s+.*?\s+from\s+['"](.*?)['"]|require\s*\(\s*['"](.*?)['"]\s*\))''',re.MULTILINE)
-
  def __init__(self):
   super().__init__()
 
@@ -29,109 +351,37 @@ class DependencyGraphSkill(FileSkillMixin,Skill):
   full_path=self._resolve_path(path,context)
   if not self._is_allowed(full_path,context):
    return SkillResult(success=False,error=f"Access denied: {path}")
+  base_path,target=self._split_target(full_path,context)
   if operation=="analyze":
-   return await asyncio.to_thread(self._analyze,full_path,language)
+   return await asyncio.to_thread(self._analyze,base_path,language,target)
   elif operation=="detect_cycles":
-   return await asyncio.to_thread(self._detect_cycles,full_path,language)
+   return await asyncio.to_thread(self._detect_cycles,base_path,language,target)
   elif operation=="impact_analysis":
-   return await asyncio.to_thread(self._impact_analysis,full_path,language)
+   return await asyncio.to_thread(self._impact_analysis,base_path,language,target)
   else:
    return SkillResult(success=False,error=f"Unknown operation: {operation}. Use: analyze, detect_cycles, impact_analysis")
 
- def _get_extensions(self,language:str)->List[str]:
-  ext_map={
-   "python":[".py"],
-   "javascript":[".js",".jsx",".mjs"],
-   "typescript":[".ts",".tsx"],
-  }
-  return ext_map.get(language,[".py"])
-
- def _scan_files(self,base_path:str,extensions:List[str])->List[str]:
-  files=[]
-  if os.path.isfile(base_path):
-   return [base_path]
-  for root,dirs,filenames in os.walk(base_path):
-   dirs[:]=[d for d in dirs if d not in ("node_modules",".git","__pycache__",".venv","venv")]
-   for fname in filenames:
-    if any(fname.endswith(ext) for ext in extensions):
-     files.append(os.path.join(root,fname))
-  return files
+ def _split_target(self,full_path:str,context:SkillContext)->Tuple[str,str]:
+  if not os.path.isfile(full_path):
+   return full_path,""
+  working_dir=os.path.normpath(context.working_dir)
+  if full_path.startswith(working_dir+os.sep):
+   return working_dir,os.path.relpath(full_path,working_dir)
+  return os.path.dirname(full_path),os.path.basename(full_path)
 
- def _extract_imports(self,filepath:str,language:str)->List[str]:
-  try:
-   with open(filepath,"r",encoding="utf-8",errors="replace") as f:
-    content=f.read()
-  except Exception:
-   return []
-  imports=[]
-  if language=="python":
-   for match in self.PYTHON_IMPORT_RE.finditer(content):
-    module=match.group(1) or match.group(2)
-    if module:
-     imports.append(module)
-  else:
-   for match in self.JS_IMPORT_RE.finditer(content):
-    module=match.group(1) or match.group(2)
-    if module and not module.startswith("."):
-     continue
-    if module:
-     imports.append(module)
-  return imports
-
- def _build_graph(self,base_path:str,language:str)->Tuple[List[Dict],List[Dict]]:
-  extensions=self._get_extensions(language)
-  files=self._scan_files(base_path,extensions)
-  nodes=[]
-  edges=[]
-  file_set=set()
-  for fp in files:
-   rel=os.path.relpath(fp,base_path)
-   file_set.add(rel)
-   nodes.append({"id":rel,"path":rel,"size":os.path.getsize(fp)})
-  for fp in files:
-   rel=os.path.relpath(fp,base_path)
-   imports=self._extract_imports(fp,language)
-   for imp in imports:
-    target=self._resolve_import(imp,rel,language,file_set)
-    if target:
-     edges.append({"source":rel,"target":target,"type":"import"})
-  return nodes,edges
-
- def _resolve_import(self,imp:str,source:str,language:str,file_set:Set[str])->str:
-  if language=="python":
-   path=imp.replace(".",os.sep)
-   candidates=[path+".py",os.path.join(path,"__init__.py")]
-   for c in candidates:
-    c_normalized=c.replace(os.sep,"/")
-    for f in file_set:
-     if f.replace(os.sep,"/")==c_normalized or f.replace(os.sep,"/").endswith("/"+c_normalized):
-      return f
-  else:
-   source_dir=os.path.dirname(source)
-   resolved=os.path.normpath(os.path.join(source_dir,imp))
-   resolved=resolved.replace(os.sep,"/")
-   for ext in self._get_extensions(language):
-    candidate=resolved+ext
-    for f in file_set:
-     if f.replace(os.sep,"/")==candidate:
-      return f
-   for f in file_set:
-    if f.replace(os.sep,"/").startswith(resolved+"/") and os.path.basename(f).startswith("index"):
-     return f
-  return""
-
- def _analyze(self,base_path:str,language:str)->SkillResult:
-  nodes,edges=self._build_graph(base_path,language)
+ def _analyze(self,base_path:str,language:str,target:str="")->SkillResult:
+  index=get_dependency_index(base_path,language)
+  nodes=index.nodes()
+  edges=index.edges()
+  if target:
+   edges=[e for e in edges if e["source"]==target]
+   related={target}|{e["target"] for e in edges}
+   nodes=[n for n in nodes if n["id"] in related]
   return SkillResult(success=True,output={"nodes":nodes,"edges":edges},metadata={"nodeCount":len(nodes),"edgeCount":len(edges)})
 
- def _detect_cycles(self,base_path:str,language:str)->SkillResult:
-  nodes,edges=self._build_graph(base_path,language)
-  adjacency:Dict[str,List[str]]={}
-  for edge in edges:
-   src=edge["source"]
-   if src not in adjacency:
-    adjacency[src]=[]
-   adjacency[src].append(edge["target"])
+ def _detect_cycles(self,base_path:str,language:str,target:str="")->SkillResult:
+  index=get_dependency_index(base_path,language)
+  adjacency=index.adjacency()
   cycles=[]
   visited:Set[str]=set()
   path:List[str]=[]
@@ -149,29 +399,20 @@ class DependencyGraphSkill(FileSkillMixin,Skill):
      cycles.append(cycle)
    path.pop()
    on_stack.discard(node)
-  for node_dict in nodes:
+  for node_dict in index.nodes():
    nid=node_dict["id"]
    if nid not in visited:
     dfs(nid)
+  if target:
+   cycles=[c for c in cycles if target in c]
   return SkillResult(success=True,output={"cycles":cycles,"hasCycles":len(cycles)>0},metadata={"cycleCount":len(cycles)})
 
- def _impact_analysis(self,base_path:str,language:str)->SkillResult:
-  nodes,edges=self._build_graph(base_path,language)
-  reverse_adj:Dict[str,List[str]]={}
-  for edge in edges:
-   tgt=edge["target"]
-   if tgt not in reverse_adj:
-    reverse_adj[tgt]=[]
-   reverse_adj[tgt].append(edge["source"])
-  target_file=base_path
-  if os.path.isfile(base_path):
-   target_file=os.path.basename(base_path)
-  impacted:Set[str]=set()
-  queue=[target_file]
-  while queue:
-   current=queue.pop(0)
-   for dep in reverse_adj.get(current,[]):
-    if dep not in impacted:
-     impacted.add(dep)
-     queue.append(dep)
-  return SkillResult(success=True,output={"file":target_file,"impactedFiles":sorted(impacted),"impactCount":len(impacted)},metadata={"impactCount":len(impacted)})
+ def _impact_analysis(self,base_path:str,language:str,target:str="")->SkillResult:
+  index=get_dependency_index(base_path,language)
+  target_file=target or base_path
+  impacted=index.impacted(target_file)
+  output={"file":target_file,"impactedFiles":impacted,"impactCount":len(impacted)}
+  if target:
+   output["directDependents"]=index.dependents(target_file)
+   output["dependencies"]=index.dependencies(target_file)
+  return SkillResult(success=True,output=output,metadata={"impactCount":len(impacted)})
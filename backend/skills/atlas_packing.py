@@ -0,0 +1,181 @@
+import math
+from dataclasses import dataclass,field
+from typing import Dict,List,Optional,Sequence,Tuple
+
+DEFAULT_ATLAS_MAX_SIZE=2048
+
+
+@dataclass
+class Placement:
+ key:str
+ page:int
+ x:int
+ y:int
+ width:int
+ height:int
+ rotated:bool=False
+
+
+@dataclass
+class AtlasPage:
+ width:int=0
+ height:int=0
+ placements:List[Placement]=field(default_factory=list)
+
+ @property
+ def used_area(self)->int:
+  return sum(p.width*p.height for p in self.placements)
+
+
+class MaxRectsBin:
+ def __init__(self,width:int,height:int,allow_rotation:bool=False):
+  self.width=width
+  self.height=height
+  self.allow_rotation=allow_rotation
+  self._free:List[Tuple[int,int,int,int]]=[(0,0,width,height)]
+
+ def insert(self,width:int,height:int)->Optional[Tuple[int,int,int,int,bool]]:
+  best=None
+  best_score=None
+  for fx,fy,fw,fh in self._free:
+   for w,h,rotated in ((width,height,False),(height,width,True)):
+    if rotated and (not self.allow_rotation or width==height):
+     continue
+    if w>fw or h>fh:
+     continue
+    leftover_w=fw-w
+    leftover_h=fh-h
+    score=(min(leftover_w,leftover_h),max(leftover_w,leftover_h),fy,fx)
+    if best_score is None or score<best_score:
+     best_score=score
+     best=(fx,fy,w,h,rotated)
+  if best is None:
+   return None
+  self._split_free(best[0],best[1],best[2],best[3])
+  return best
+
+ def _split_free(self,x:int,y:int,w:int,h:int)->None:
+  result=[]
+  for fx,fy,fw,fh in self._free:
+   if x>=fx+fw or x+w<=fx or y>=fy+fh or y+h<=fy:
+    result.append((fx,fy,fw,fh))
+    continue
+   if x>fx:
+    result.append((fx,fy,x-fx,fh))
+   if x+w<fx+fw:
+    result.append((x+w,fy,fx+fw-x-w,fh))
+   if y>fy:
+    result.append((fx,fy,fw,y-fy))
+   if y+h<fy+fh:
+    result.append((fx,y+h,fw,fy+fh-y-h))
+  self._free=[r for i,r in enumerate(result) if not any(i!=j and self._contains(o,r) and (o!=r or j<i) for j,o in enumerate(result))]
+
+ @staticmethod
+ def _contains(outer:Tuple[int,int,int,int],inner:Tuple[int,int,int,int])->bool:
+  return outer[0]<=inner[0] and outer[1]<=inner[1] and outer[0]+outer[2]>=inner[0]+inner[2] and outer[1]+outer[3]>=inner[1]+inner[3]
+
+
+def next_power_of_two(value:int)->int:
+ size=1
+ while size<value:
+  size<<=1
+ return size
+
+
+def previous_power_of_two(value:int)->int:
+ size=1
+ while size*2<=value:
+  size<<=1
+ return size
+
+
+def _fill_pages(order:Sequence[Tuple[str,int,int]],width:int,height:int,padding:int,allow_rotation:bool,max_pages:int=0)->Optional[List[AtlasPage]]:
+ bins:List[MaxRectsBin]=[]
+ pages:List[AtlasPage]=[]
+ for key,w,h in order:
+  placed=None
+  for page_index,bin_ in enumerate(bins):
+   placed=bin_.insert(w+padding,h+padding)
+   if placed:
+    break
+  if placed is None:
+   if max_pages and len(bins)>=max_pages:
+    return None
+   bins.append(MaxRectsBin(width+padding,height+padding,allow_rotation))
+   pages.append(AtlasPage())
+   page_index=len(bins)-1
+   placed=bins[page_index].insert(w+padding,h+padding)
+   if placed is None:
+    return None
+  x,y,pw,ph,rotated=placed
+  page=pages[page_index]
+  page.placements.append(Placement(key,page_index,x,y,pw-padding,ph-padding,rotated))
+  page.width=max(page.width,x+pw-padding)
+  page.height=max(page.height,y+ph-padding)
+ return pages
+
+
+def pack_rects(
+ sizes:Sequence[Tuple[str,int,int]],
+ max_width:int=DEFAULT_ATLAS_MAX_SIZE,
+ max_height:int=DEFAULT_ATLAS_MAX_SIZE,
+ padding:int=0,
+ allow_rotation:bool=False,
+ power_of_two:bool=False,
+)->List[AtlasPage]:
+ if power_of_two:
+  max_width=previous_power_of_two(max_width)
+  max_height=previous_power_of_two(max_height)
+ order=sorted(sizes,key=lambda s:(max(s[1],s[2]),s[1]*s[2],s[0]),reverse=True)
+ for key,w,h in order:
+  if not ((w<=max_width and h<=max_height) or (allow_rotation and h<=max_width and w<=max_height)):
+   raise ValueError(f"{key} ({w}x{h}) does not fit in a {max_width}x{max_height} atlas")
+ pages=None
+ if order:
+  area=sum((w+padding)*(h+padding) for _,w,h in order)
+  side=max(1,int(math.sqrt(area)))
+  width=min(max_width,max(side,min(w for _,w,h in order) if allow_rotation else max(w for _,w,h in order)))
+  height=min(max_height,max(side,max(min(w,h) if allow_rotation else h for _,w,h in order)))
+  while pages is None:
+   if power_of_two:
+    width=min(max_width,next_power_of_two(width))
+    height=min(max_height,next_power_of_two(height))
+   pages=_fill_pages(order,width,height,padding,allow_rotation,max_pages=1)
+   if pages is None:
+    if width>=max_width and height>=max_height:
+     break
+    if (width<=height or height>=max_height) and width<max_width:
+     width=min(max_width,width+max(8,width//8))
+    else:
+     height=min(max_height,height+max(8,height//8))
+ if pages is None:
+  pages=_fill_pages(order,max_width,max_height,padding,allow_rotation) or []
+ if power_of_two:
+  for page in pages:
+   page.width=next_power_of_two(page.width)
+   page.height=next_power_of_two(page.height)
+ return pages
+
+
+def atlas_frame_map(pages:List[AtlasPage],frames:Dict[str,Dict],page_images:List[str])->Dict:
+ entries={}
+ for page in pages:
+  for p in page.placements:
+   info=frames[p.key]
+   width,height=(p.height,p.width) if p.rotated else (p.width,p.height)
+   entries[p.key]={
+    "frame":{"x":p.x,"y":p.y,"w":width,"h":height},
+    "rotated":p.rotated,
+    "trimmed":info["trimmed"],
+    "spriteSourceSize":{"x":info["offsetX"],"y":info["offsetY"],"w":info["width"],"h":info["height"]},
+    "sourceSize":{"w":info["sourceWidth"],"h":info["sourceHeight"]},
+    "page":p.page,
+   }
+ return {
+  "frames":dict(sorted(entries.items())),
+  "meta":{
+   "format":"RGBA8888",
+   "scale":1,
+   "pages":[{"image":image,"size":{"w":page.width,"h":page.height}} for image,page in zip(page_images,pages)],
+  },
+ }
@@ -4,6 +4,7 @@ import os
 from typing import Dict,Optional
 from .base import Skill,SkillResult,SkillContext,SkillCategory,SkillParameter
 from .file_skills import FileSkillMixin
+from .atlas_packing import DEFAULT_ATLAS_MAX_SIZE,atlas_frame_map,pack_rects
 from middleware.logger import get_logger
 
 
@@ -110,6 +111,12 @@ class SpriteSheetSkill(FileSkillMixin,Skill):
   SkillParameter(name="output_dir",type="string",description="出力ディレクトリ（split時）",required=False),
   SkillParameter(name="input_dir",type="string",description="入力ディレクトリ（pack時）",required=False),
   SkillParameter(name="columns",type="integer",description="列数（pack時）",required=False,default=4),
+  SkillParameter(name="layout",type="string",description="配置方式（pack時）: grid, maxrects",required=False,default="grid"),
+  SkillParameter(name="trim",type="boolean",description="透明な余白を除去（maxrects時）",required=False,default=False),
+  SkillParameter(name="allow_rotation",type="boolean",description="90度回転を許可（maxrects時）",required=False,default=False),
+  SkillParameter(name="power_of_two",type="boolean",description="2のべき乗サイズに揃える（maxrects時）",required=False,default=False),
+  SkillParameter(name="max_size",type="integer",description="1ページの最大サイズ（maxrects時）",required=False,default=DEFAULT_ATLAS_MAX_SIZE),
+  SkillParameter(name="padding",type="integer",description="フレーム間の余白（maxrects時）",required=False,default=0),
  ]
 
  def __init__(self):
@@ -144,6 +151,16 @@ class SpriteSheetSkill(FileSkillMixin,Skill):
    full_output=self._resolve_path(path or"spritesheet.png",context)
    if not self._is_allowed(full_input,context) or not self._is_allowed(full_output,context):
     return SkillResult(success=False,error="Access denied")
+   layout=kwargs.get("layout","grid")
+   if layout=="maxrects":
+    max_size=min(int(kwargs.get("max_size") or DEFAULT_ATLAS_MAX_SIZE),context.restrictions.get("max_atlas_size",4096))
+    return await asyncio.to_thread(
+     self._pack_atlas,full_input,full_output,
+     bool(kwargs.get("trim",False)),bool(kwargs.get("allow_rotation",False)),bool(kwargs.get("power_of_two",False)),
+     max_size,max(0,int(kwargs.get("padding") or 0)),context.restrictions.get("max_frame_count"),
+    )
+   if layout!="grid":
+    return SkillResult(success=False,error=f"Unknown layout: {layout}. Use: grid, maxrects")
    columns=kwargs.get("columns",4)
    return await asyncio.to_thread(self._pack,full_input,full_output,columns)
   else:
@@ -186,7 +203,7 @@ class SpriteSheetSkill(FileSkillMixin,Skill):
  def _pack(self,input_dir:str,output_path:str,columns:int)->SkillResult:
   try:
    from PIL import Image
-   files=sorted([f for f in os.listdir(input_dir) if f.lower().endswith((".png",".jpg",".jpeg",".bmp"))])
+   files=self._list_images(input_dir)
    if not files:
     return SkillResult(success=False,error="No image files found in input directory")
    images=[Image.open(os.path.join(input_dir,f)) for f in files]
@@ -208,3 +225,66 @@ class SpriteSheetSkill(FileSkillMixin,Skill):
    return SkillResult(success=False,error="Pillow is not installed. Install with: pip install Pillow")
   except Exception as e:
    return SkillResult(success=False,error=f"Failed to pack sprite sheet: {e}")
+
+ def _list_images(self,input_dir:str)->list:
+  return sorted([f for f in os.listdir(input_dir) if f.lower().endswith((".png",".jpg",".jpeg",".bmp"))])
+
+ def _measure_frame(self,path:str,trim:bool)->Dict:
+  from PIL import Image
+  with Image.open(path) as img:
+   width,height=img.size
+   box=(0,0,width,height)
+   if trim and (img.mode in ("RGBA","LA","PA") or"transparency" in img.info):
+    box=img.convert("RGBA").getchannel("A").getbbox() or (0,0,1,1)
+  return {
+   "sourceWidth":width,"sourceHeight":height,
+   "offsetX":box[0],"offsetY":box[1],"width":box[2]-box[0],"height":box[3]-box[1],
+   "trimmed":box!=(0,0,width,height),
+  }
+
+ def _pack_atlas(self,input_dir:str,output_path:str,trim:bool,allow_rotation:bool,power_of_two:bool,max_size:int,padding:int,max_frames:Optional[int]=None)->SkillResult:
+  try:
+   from PIL import Image
+   files=self._list_images(input_dir)
+   if not files:
+    return SkillResult(success=False,error="No image files found in input directory")
+   if max_frames and len(files)>max_frames:
+    return SkillResult(success=False,error=f"Too many frames: {len(files)} (max {max_frames})")
+   frames={f:self._measure_frame(os.path.join(input_dir,f),trim) for f in files}
+   try:
+    pages=pack_rects([(f,info["width"],info["height"]) for f,info in frames.items()],max_size,max_size,padding,allow_rotation,power_of_two)
+   except ValueError as e:
+    return SkillResult(success=False,error=str(e))
+   stem,ext=os.path.splitext(output_path)
+   ext=ext or".png"
+   page_paths=[stem+ext] if len(pages)==1 else [f"{stem}_{i}{ext}" for i in range(len(pages))]
+   os.makedirs(os.path.dirname(output_path) or".",exist_ok=True)
+   for page,page_path in zip(pages,page_paths):
+    sheet=Image.new("RGBA",(page.width,page.height),(0,0,0,0))
+    for p in page.placements:
+     info=frames[p.key]
+     with Image.open(os.path.join(input_dir,p.key)) as img:
+      frame=img.convert("RGBA")
+     if info["trimmed"]:
+      frame=frame.crop((info["offsetX"],info["offsetY"],info["offsetX"]+info["width"],info["offsetY"]+info["height"]))
+     if p.rotated:
+      frame=frame.rotate(-90,expand=True)
+     sheet.paste(frame,(p.x,p.y))
+     frame.close()
+    sheet.save(page_path)
+    sheet.close()
+   frame_map=atlas_frame_map(pages,frames,[os.path.basename(pp) for pp in page_paths])
+   map_path=stem+".json"
+   with open(map_path,"w",encoding="utf-8") as f:
+    json.dump(frame_map,f,ensure_ascii=False,indent=2)
+   atlas_area=sum(page.width*page.height for page in pages)
+   used_area=sum(page.used_area for page in pages)
+   return SkillResult(success=True,output=f"Packed {len(files)} images into {len(pages)} atlas page(s)",metadata={
+    "outputPaths":page_paths,"mapPath":map_path,"frameCount":len(files),"pageCount":len(pages),
+    "pages":[{"width":page.width,"height":page.height} for page in pages],
+    "occupancy":round(used_area/atlas_area,4) if atlas_area else 0,
+   })
+  except ImportError:
+   return SkillResult(success=False,error="Pillow is not installed. Install with: pip install Pillow")
+  except Exception as e:
+   return SkillResult(success=False,error=f"Failed to pack sprite atlas: {e}")
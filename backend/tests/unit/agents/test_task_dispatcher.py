@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+from agents.task_dispatcher import (
+ TaskDAG,
+ DagTimeline,
+ execute_dag,
+ execute_dag_parallel,
+ execute_dag_ready_queue,
+)
+
+
+def _tasks(spec):
+ return [{"id":tid,"worker":tid,"task":"","depends_on":deps} for tid,deps in spec.items()]
+
+
+def _sleeper(durations,log=None):
+ async def run(task):
+  if log is not None:
+   log.append(("start",task["id"]))
+  await asyncio.sleep(durations.get(task["id"],0.0))
+  if log is not None:
+   log.append(("end",task["id"]))
+  return task["id"]
+ return run
+
+
+SLOW_LAYER={"slow":[],"fast":[],"after_fast":["fast"],"after_slow":["slow"]}
+SLOW_DURATIONS={"slow":0.3,"fast":0.01,"after_fast":0.2,"after_slow":0.01}
+
+
+class TestCriticalPath:
+ def test_lengths_follow_longest_chain(self):
+  dag=TaskDAG(_tasks({"a":[],"b":["a"],"c":["b"],"d":[]}))
+  assert dag.get_critical_path_lengths()=={"a":3.0,"b":2.0,"c":1.0,"d":1.0}
+
+ def test_duplicate_dependencies_counted_once(self):
+  dag=TaskDAG(_tasks({"a":[],"b":["a","a"]}))
+  assert dag.get_execution_layers()==[["a"],["b"]]
+
+
+class TestReadyQueue:
+ @pytest.mark.asyncio
+ async def test_starts_tasks_when_own_dependencies_finish(self):
+  dag=TaskDAG(_tasks(SLOW_LAYER))
+  log=[]
+  results=await execute_dag_ready_queue(dag,_sleeper(SLOW_DURATIONS,log))
+  assert log.index(("start","after_fast"))<log.index(("end","slow"))
+  order=[tid for tid,_ in results]
+  assert set(order[:2])=={"slow","fast"}
+  assert set(order[2:])=={"after_fast","after_slow"}
+
+ @pytest.mark.asyncio
+ async def test_makespan_beats_layered(self):
+  dag=TaskDAG(_tasks(SLOW_LAYER))
+  layered=DagTimeline("layered")
+  await execute_dag_parallel(dag,_sleeper(SLOW_DURATIONS),timeline=layered)
+  ready=DagTimeline("ready_queue")
+  await execute_dag_ready_queue(dag,_sleeper(SLOW_DURATIONS),timeline=ready)
+  assert ready.makespan_ms<layered.makespan_ms-100
+  assert {t["taskId"] for t in ready.to_dict()["tasks"]}==set(SLOW_LAYER)
+
+ @pytest.mark.asyncio
+ async def test_max_parallel_and_critical_path_priority(self):
+  dag=TaskDAG(_tasks({"leaf1":[],"leaf2":[],"head":[],"mid":["head"],"tail":["mid"]}))
+  log=[]
+  timeline=DagTimeline("ready_queue")
+  await execute_dag_ready_queue(dag,_sleeper({},log),max_parallel=1,timeline=timeline)
+  starts=[tid for kind,tid in log if kind=="start"]
+  assert starts[0]=="head"
+  assert timeline.max_concurrency()==1
+
+ @pytest.mark.asyncio
+ async def test_failures_do_not_block_dependents(self):
+  async def run(task):
+   if task["id"]=="a":
+    raise RuntimeError("boom")
+   return task["id"]
+  results=dict(await execute_dag_ready_queue(TaskDAG(_tasks({"a":[],"b":["a"]})),run))
+  assert isinstance(results["a"],RuntimeError)
+  assert results["b"]=="b"
+
+ @pytest.mark.asyncio
+ async def test_cycle_falls_back_to_running_remaining(self):
+  dag=TaskDAG(_tasks({"a":["b"],"b":["a"],"c":[]}))
+  results=dict(await execute_dag(dag,_sleeper({})))
+  assert set(results)=={"a","b","c"}
@@ -2,6 +2,7 @@ import pytest
 import asyncio
 import os
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import MagicMock,patch
 
@@ -10,6 +11,9 @@ sys.path.insert(0,str(Path(__file__).parent.parent.parent.parent))
 
 from cache.content_cache import ProjectFileCache,FileEntry,DirEntry
 from cache.config import FileCacheConfig
+from cache.trigram_index import TrigramIndex
+from cache.eviction import ContentBudget
+from cache.watcher import FileWatcher,collapse_event_type
 
 
 @pytest.fixture
@@ -320,3 +324,384 @@ class TestProjectFileCacheListDir:
         cache._loaded=True
         items=cache.list_dir("nonexistent")
         assert items==[]
+
+
+class TestTrigramIndex:
+    def test_literal_candidates(self):
+        index=TrigramIndex()
+        index.add("a.py","def hello_world():\n    pass")
+        index.add("b.py","def goodbye():\n    pass")
+        assert index.candidates("hello_world")=={"a.py"}
+        assert index.candidates("goodbye")=={"b.py"}
+
+    def test_short_pattern_returns_none(self):
+        index=TrigramIndex()
+        index.add("a.py","ab")
+        assert index.candidates("ab") is None
+        assert index.candidates(".*") is None
+
+    def test_regex_requires_all_literals(self):
+        index=TrigramIndex()
+        index.add("a.py","class Player:\n    def update(self):")
+        index.add("b.py","class Enemy:\n    def update(self):")
+        assert index.candidates(r"class\s+Player")=={"a.py"}
+        assert index.candidates(r"def\s+update")=={"a.py","b.py"}
+
+    def test_top_level_alternation_unions(self):
+        index=TrigramIndex()
+        index.add("a.py","player")
+        index.add("b.py","enemy")
+        index.add("c.py","other")
+        assert index.candidates("player|enemy")=={"a.py","b.py"}
+
+    def test_case_insensitive_folding(self):
+        index=TrigramIndex()
+        index.add("a.py","HELLO World")
+        assert index.candidates("hello")=={"a.py"}
+        assert index.candidates("WORLD")=={"a.py"}
+
+    def test_remove_drops_postings(self):
+        index=TrigramIndex()
+        index.add("a.py","unique_token")
+        index.remove("a.py")
+        assert index.candidates("unique_token")==set()
+        assert index.get_stats()["trigrams"]==0
+
+    def test_readd_replaces_content(self):
+        index=TrigramIndex()
+        index.add("a.py","alpha")
+        index.add("a.py","bravo")
+        assert index.candidates("alpha")==set()
+        assert index.candidates("bravo")=={"a.py"}
+
+
+class TestProjectFileCacheSearchIndex:
+    def test_index_matches_after_put_file(self,cache):
+        cache.put_file("a.py","needle here")
+        assert len(cache.search_content("needle"))==1
+        cache.put_file("b.py","another needle")
+        assert len(cache.search_content("needle"))==2
+
+    def test_index_updated_on_overwrite(self,cache):
+        cache.put_file("a.py","old_marker")
+        cache.search_content("old_marker")
+        cache.put_file("a.py","new_marker")
+        assert cache.search_content("old_marker")==[]
+        assert len(cache.search_content("new_marker"))==1
+
+    def test_index_updated_on_remove(self,cache):
+        cache.put_file("a.py","marker_value")
+        cache.search_content("marker_value")
+        cache.remove_file("a.py")
+        assert cache.search_content("marker_value")==[]
+
+    def test_index_updated_from_disk(self,cache,temp_dir):
+        file_path=os.path.join(temp_dir,"test.py")
+        with open(file_path,"w") as f:
+            f.write("first_version")
+        cache.load_all()
+        assert len(cache.search_content("first_version"))==1
+        with open(file_path,"w") as f:
+            f.write("second_version")
+        cache.update_file_from_disk("test.py")
+        assert cache.search_content("first_version")==[]
+        assert len(cache.search_content("second_version"))==1
+
+    def test_index_updated_on_remove_dir(self,cache,temp_dir):
+        os.makedirs(os.path.join(temp_dir,"sub"))
+        with open(os.path.join(temp_dir,"sub","x.py"),"w") as f:
+            f.write("nested_marker")
+        cache.load_all()
+        assert len(cache.search_content("nested_marker"))==1
+        cache.remove_dir("sub")
+        assert cache.search_content("nested_marker")==[]
+
+    def test_regex_and_case_insensitive_results(self,cache):
+        cache.put_file("a.py","class PlayerController:\n    pass")
+        cache.put_file("b.py","class EnemyController:\n    pass")
+        results=cache.search_content(r"class\s+Player\w+")
+        assert [r["file"] for r in results]==["a.py"]
+        results=cache.search_content("playercontroller",case_sensitive=False)
+        assert [r["file"] for r in results]==["a.py"]
+
+    def test_invalid_regex_falls_back_to_literal(self,cache):
+        cache.put_file("a.py","call(foo")
+        results=cache.search_content("call(foo")
+        assert len(results)==1
+
+    def test_stats_report_index(self,cache):
+        cache.put_file("a.py","needle")
+        cache.search_content("needle")
+        assert cache.wait_for_index(timeout=5)
+        cache.search_content("needle")
+        cache.search_content(".*")
+        index_stats=cache.get_stats()["search_index"]
+        assert index_stats["built"]
+        assert index_stats["files"]==1
+        assert index_stats["searches"]==3
+        assert index_stats["indexed_searches"]==1
+
+    def test_search_scans_until_index_ready(self,cache,temp_dir):
+        for i in range(3):
+            with open(os.path.join(temp_dir,f"f{i}.py"),"w") as f:
+                f.write(f"token_{i}")
+        cache.scan_tree()
+        with patch.object(cache,"_build_index"):
+            assert [r["file"] for r in cache.search_content("token_1")]==["f1.py"]
+            assert cache.get_stats()["search_index"]["state"]=="building"
+            assert cache.get_stats()["search_index"]["indexed_searches"]==0
+
+    def test_index_built_off_lock_from_disk(self,cache,temp_dir):
+        for i in range(3):
+            with open(os.path.join(temp_dir,f"f{i}.py"),"w") as f:
+                f.write(f"token_{i}")
+        cache.scan_tree()
+        reads=[]
+        original=cache._read_disk_text
+
+        def read(path):
+            reads.append(cache._lock._is_owned())
+            return original(path)
+        cache._read_disk_text=read
+        assert cache.wait_for_index(timeout=5)
+        assert reads==[False,False,False]
+        assert cache.get_stats()["search_index"]["files"]==3
+        assert [r["file"] for r in cache.search_content("token_2")]==["f2.py"]
+
+    def test_preload_populates_index(self,cache,temp_dir):
+        with open(os.path.join(temp_dir,"a.py"),"w") as f:
+            f.write("preloaded_marker")
+        cache.scan_tree()
+        cache.start_preload(max_workers=1)
+        assert cache.wait_for_preload(timeout=5)
+        assert"a.py" in cache._index
+
+
+@pytest.fixture
+def budget_config(mock_config):
+    mock_config.content_max_size_bytes=20
+    mock_config.eviction_policy="lru"
+    return mock_config
+
+
+class TestProjectFileCacheEviction:
+    def _write(self,temp_dir,name,content):
+        with open(os.path.join(temp_dir,name),"w") as f:
+            f.write(content)
+
+    def test_put_file_evicts_least_recently_used(self,budget_config,temp_dir):
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        self._write(temp_dir,"a.txt","a"*10)
+        cache.put_file("a.txt","a"*10)
+        cache.put_file("b.txt","b"*10)
+        cache.get_file_content("a.txt")
+        cache.put_file("c.txt","c"*10)
+        stats=cache.get_stats()
+        assert stats["size_bytes"]<=20
+        assert stats["evictions"]==1
+        assert cache.get_file("b.txt").evicted
+        assert not cache.get_file("a.txt").evicted
+
+    def test_evicted_content_reloaded_from_disk(self,budget_config,temp_dir):
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        self._write(temp_dir,"a.txt","a"*10)
+        cache.put_file("a.txt","a"*10)
+        cache.put_file("b.txt","b"*15)
+        assert cache.get_all_files()["a.txt"].evicted
+        assert cache.get_file_content("a.txt")=="a"*10
+        stats=cache.get_stats()
+        assert stats["reloads"]==1
+        assert stats["size_bytes"]<=20
+        assert cache.get_all_files()["b.txt"].evicted
+
+    def test_metadata_kept_after_eviction(self,budget_config,temp_dir):
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        cache.put_file("a.txt","a"*10)
+        cache.put_file("b.txt","b"*15)
+        entry=cache.get_all_files()["a.txt"]
+        assert entry.evicted
+        assert entry.content is None
+        assert entry.size==10
+        assert cache.get_stats()["files"]==2
+
+    def test_lfu_policy_keeps_frequently_used(self,budget_config,temp_dir):
+        budget_config.eviction_policy="lfu"
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        cache.put_file("hot.txt","h"*10)
+        for _ in range(5):
+            cache.get_file_content("hot.txt")
+        cache.put_file("cold.txt","c"*5)
+        cache.put_file("new.txt","n"*10)
+        assert not cache.get_all_files()["hot.txt"].evicted
+        assert cache.get_all_files()["cold.txt"].evicted
+
+    def test_load_all_defers_content_over_budget(self,budget_config,temp_dir):
+        for name in ["a.txt","b.txt","c.txt"]:
+            self._write(temp_dir,name,name[0]*10)
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        stats=cache.load_all()
+        assert stats["files"]==3
+        assert stats["deferred"]==1
+        assert cache.get_stats()["size_bytes"]<=20
+        for name in ["a.txt","b.txt","c.txt"]:
+            assert cache.get_file_content(name)==name[0]*10
+
+    def test_search_content_reads_evicted_files(self,budget_config,temp_dir):
+        for name in ["a.txt","b.txt","c.txt"]:
+            self._write(temp_dir,name,f"needle_{name[0]}xxxx")
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        cache.load_all()
+        results=cache.search_content("needle_")
+        assert len(results)==3
+
+    def test_reloaded_content_replaces_index_entry(self,budget_config,temp_dir):
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        self._write(temp_dir,"a.txt","old_mark")
+        cache.put_file("a.txt","old_mark")
+        cache.search_content("old_mark")
+        cache.put_file("b.txt","b"*15)
+        assert cache.get_all_files()["a.txt"].evicted
+        self._write(temp_dir,"a.txt","new_mark")
+        assert cache.get_file_content("a.txt")=="new_mark"
+        assert cache.search_content("old_mark")==[]
+        assert len(cache.search_content("new_mark"))==1
+
+    def test_global_budget_evicts_across_projects(self,mock_config,temp_dir):
+        budget=ContentBudget(25)
+        first=ProjectFileCache(mock_config,"p1",temp_dir,budget=budget)
+        second=ProjectFileCache(mock_config,"p2",temp_dir,budget=budget)
+        first.put_file("a.txt","a"*15)
+        second.put_file("b.txt","b"*15)
+        assert budget.total_bytes()<=25
+        assert first.get_all_files()["a.txt"].evicted
+        assert not second.get_all_files()["b.txt"].evicted
+        assert budget.get_stats()["evictions"]==1
+
+
+class TestProjectFileCacheLazyLoad:
+    def _populate(self,temp_dir):
+        os.makedirs(os.path.join(temp_dir,"src","nested"))
+        os.makedirs(os.path.join(temp_dir,"node_modules"))
+        with open(os.path.join(temp_dir,"README.md"),"w") as f:
+            f.write("readme")
+        with open(os.path.join(temp_dir,"src","main.py"),"w") as f:
+            f.write("print('main')")
+        with open(os.path.join(temp_dir,"src","nested","util.py"),"w") as f:
+            f.write("def util():\n    pass")
+        with open(os.path.join(temp_dir,"src","logo.png"),"wb") as f:
+            f.write(b'\x89PNG\r\n\x1a\n\x00\x00')
+        with open(os.path.join(temp_dir,"node_modules","dep.js"),"w") as f:
+            f.write("ignored")
+
+    def test_scan_tree_indexes_metadata_only(self,cache,temp_dir):
+        self._populate(temp_dir)
+        stats=cache.scan_tree()
+        assert cache.is_loaded
+        assert stats["files"]==4
+        assert stats["deferred"]==3
+        assert stats["binary"]==1
+        assert cache.get_stats()["size_bytes"]==0
+        assert"node_modules/dep.js" not in cache.get_all_files()
+        names=[i["name"] for i in cache.list_dir("src")]
+        assert set(names)=={"nested","main.py","logo.png"}
+
+    def test_scan_tree_matches_load_all_tree(self,mock_config,temp_dir):
+        self._populate(temp_dir)
+        eager=ProjectFileCache(mock_config,"eager",temp_dir,budget=ContentBudget(1024*1024))
+        eager.load_all()
+        lazy=ProjectFileCache(mock_config,"lazy",temp_dir,budget=ContentBudget(1024*1024))
+        lazy.scan_tree()
+        assert set(eager.get_all_files())==set(lazy.get_all_files())
+        assert {k:sorted(v.children) for k,v in eager.get_all_dirs().items()}=={k:sorted(v.children) for k,v in lazy.get_all_dirs().items()}
+
+    def test_first_read_loads_content_on_demand(self,cache,temp_dir):
+        self._populate(temp_dir)
+        cache.scan_tree()
+        assert cache.get_file_content("src/main.py")=="print('main')"
+        assert not cache.get_all_files()["src/main.py"].evicted
+        assert cache.get_all_files()["README.md"].evicted
+
+    def test_preload_loads_all_contents(self,cache,temp_dir):
+        self._populate(temp_dir)
+        cache.scan_tree()
+        assert cache.start_preload(max_workers=2)==3
+        assert cache.wait_for_preload(timeout=5)
+        load=cache.get_stats()["load"]
+        assert load["mode"]=="lazy"
+        assert load["preload_state"]=="done"
+        assert load["preload_done"]==3
+        assert load["preload_progress"]==1.0
+        assert cache.get_stats()["evicted_files"]==0
+
+    def test_preload_stops_at_budget(self,budget_config,temp_dir):
+        for i in range(5):
+            with open(os.path.join(temp_dir,f"f{i}.txt"),"w") as f:
+                f.write("x"*10)
+        cache=ProjectFileCache(budget_config,"p",temp_dir,budget=ContentBudget(1024))
+        cache.scan_tree()
+        cache.start_preload(max_workers=1)
+        assert cache.wait_for_preload(timeout=5)
+        assert cache.get_stats()["load"]["preload_state"]=="budget_limited"
+        assert cache.get_stats()["size_bytes"]<=20
+
+    def test_wait_for_preload_blocks_without_polling(self,cache,temp_dir):
+        self._populate(temp_dir)
+        cache.scan_tree()
+        with patch.object(cache,"_preload_worker"),patch("cache.content_cache.time.sleep",side_effect=AssertionError):
+            cache.start_preload(max_workers=1)
+            assert not cache.wait_for_preload(timeout=0.05)
+            cache.clear()
+            assert cache.wait_for_preload(timeout=1)
+
+    def test_clear_cancels_preload(self,cache,temp_dir):
+        self._populate(temp_dir)
+        cache.scan_tree()
+        cache.start_preload(max_workers=1)
+        cache.clear()
+        assert cache.get_stats()["load"]["preload_state"] in ("cancelled","done")
+        assert cache.get_stats()["files"]==0
+
+
+class TestFileWatcherCoalescing:
+    @pytest.fixture
+    def watcher_config(self):
+        config=MagicMock(spec=FileCacheConfig)
+        config.watcher_debounce_ms=10
+        config.watcher_max_batch_ms=50
+        return config
+
+    def test_collapse_rules(self):
+        assert collapse_event_type("created","modified")=="created"
+        assert collapse_event_type("created","deleted")=="deleted"
+        assert collapse_event_type("deleted","created")=="modified"
+        assert collapse_event_type("modified","deleted")=="deleted"
+        assert collapse_event_type("modified","modified")=="modified"
+
+    def test_batch_delivered_once_with_collapsed_events(self,watcher_config):
+        batches=[]
+        watcher=FileWatcher(watcher_config,MagicMock(),batches.append)
+        watcher._handle_event("/w/new.txt","created",False)
+        watcher._handle_event("/w/new.txt","modified",False)
+        watcher._handle_event("/w/tmp.txt","created",False)
+        watcher._handle_event("/w/tmp.txt","deleted",False)
+        watcher._handle_event("/w/old.txt","deleted",False)
+        watcher._handle_event("/w/old.txt","created",False)
+        watcher._debounce_timer.cancel()
+        watcher._flush_events()
+        assert batches==[[("/w/new.txt","created",False),("/w/tmp.txt","deleted",False),("/w/old.txt","modified",False)]]
+        stats=watcher.get_stats()
+        assert stats["received"]==6
+        assert stats["collapsed"]==3
+        assert stats["delivered"]==3
+
+    def test_continuous_events_flush_within_max_window(self,watcher_config):
+        batches=[]
+        watcher=FileWatcher(watcher_config,MagicMock(),batches.append)
+        deadline=time.time()+2
+        i=0
+        while not batches and time.time()<deadline:
+            watcher._handle_event(f"/w/f{i}.txt","modified",False)
+            i+=1
+            time.sleep(0.002)
+        watcher.stop()
+        assert batches
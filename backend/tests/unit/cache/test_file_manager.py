@@ -16,10 +16,12 @@ def clear_global_caches():
     fm_module._project_caches.clear()
     fm_module._project_watchers.clear()
     fm_module._project_metadata_stores.clear()
+    fm_module._project_change_stats.clear()
     yield
     fm_module._project_caches.clear()
     fm_module._project_watchers.clear()
     fm_module._project_metadata_stores.clear()
+    fm_module._project_change_stats.clear()
 
 
 @pytest.fixture
@@ -255,3 +257,68 @@ class TestFileManagerInitialize:
             fm=FileManager("test-project",temp_dir)
             result=fm.initialize()
             assert result=={"enabled":False}
+
+    @pytest.mark.asyncio
+    async def test_initialize_lazy_mode_serves_reads(self,temp_dir,mock_config):
+        mock_config.load_mode="lazy"
+        mock_config.preload_workers=2
+        with patch("cache.file_manager.get_file_cache_config",return_value=mock_config):
+            from cache.file_manager import FileManager
+            fm=FileManager("test-project",temp_dir)
+            with open(os.path.join(temp_dir,"test.txt"),"w") as f:
+                f.write("lazy content")
+            stats=fm.initialize()
+            assert stats["deferred"]==1
+            result=await fm.read_file("test.txt")
+            assert result["from_cache"]
+            assert result["content"]=="lazy content"
+            cache=fm._get_cache()
+            assert cache.wait_for_preload(timeout=5)
+            assert cache.get_stats()["load"]["mode"]=="lazy"
+
+
+class TestFileManagerBatchedChanges:
+    def test_watcher_batch_applies_in_one_transaction(self,temp_dir,mock_config):
+        mock_config.watcher_reload_workers=2
+        with patch("cache.file_manager.get_file_cache_config",return_value=mock_config):
+            from cache.file_manager import FileManager
+            fm=FileManager("test-project",temp_dir)
+            for name in ("a.py","b.py","gone.py"):
+                with open(os.path.join(temp_dir,name),"w") as f:
+                    f.write(f"# {name}\n")
+            fm.initialize()
+            with open(os.path.join(temp_dir,"a.py"),"w") as f:
+                f.write("print('changed')\n")
+            os.remove(os.path.join(temp_dir,"gone.py"))
+            store=MagicMock()
+            with patch.object(fm,"_get_metadata_store",return_value=store):
+                fm._on_files_changed([
+                    (os.path.join(temp_dir,"a.py"),"modified",False),
+                    (os.path.join(temp_dir,"b.py"),"modified",False),
+                    (os.path.join(temp_dir,"gone.py"),"deleted",False),
+                ])
+            store.upsert.assert_not_called()
+            store.delete.assert_not_called()
+            upserts,deletes=store.apply_changes.call_args.args
+            assert [m["path"] for m in upserts]==[os.path.join(temp_dir,"a.py"),os.path.join(temp_dir,"b.py")]
+            assert deletes==[os.path.join(temp_dir,"gone.py")]
+            cache=fm._get_cache()
+            assert cache.get_file_content("a.py")=="print('changed')\n"
+            assert cache.get_file("gone.py") is None
+            stats=fm.get_change_stats()
+            assert stats["batches"]==1
+            assert stats["lastBatchSize"]==3
+            assert stats["files"]==2
+
+    def test_vanished_file_removed_from_cache(self,temp_dir,mock_config):
+        mock_config.watcher_reload_workers=1
+        with patch("cache.file_manager.get_file_cache_config",return_value=mock_config):
+            from cache.file_manager import FileManager
+            fm=FileManager("test-project",temp_dir)
+            with open(os.path.join(temp_dir,"a.py"),"w") as f:
+                f.write("x\n")
+            fm.initialize()
+            os.remove(os.path.join(temp_dir,"a.py"))
+            with patch.object(fm,"_get_metadata_store",return_value=MagicMock()):
+                fm._on_files_changed([(os.path.join(temp_dir,"a.py"),"modified",False)])
+            assert fm._get_cache().get_file("a.py") is None
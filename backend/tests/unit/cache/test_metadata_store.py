@@ -0,0 +1,117 @@
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy import event
+
+from cache.metadata_store import FileMetadataStore
+from models.tables import FileMetadata
+
+
+@pytest.fixture
+def scopes(db_session):
+    opened=[]
+
+    @contextmanager
+    def scope():
+        opened.append(1)
+        yield db_session
+        db_session.flush()
+    with patch("models.database.session_scope",scope):
+        yield opened
+
+
+@pytest.fixture
+def store(scopes):
+    store=FileMetadataStore("proj-1",flush_interval=0)
+    yield store
+    store.close()
+
+
+def _row(db_session,path):
+    db_session.expire_all()
+    return db_session.query(FileMetadata).filter_by(project_id="proj-1",path=path).first()
+
+
+class TestAccessBatching:
+    def test_record_access_stays_in_memory(self,store,scopes):
+        store.upsert({"path":"/p/a.py"})
+        opened=len(scopes)
+        for _ in range(50):
+            store.record_access("/p/a.py")
+        assert len(scopes)==opened
+        assert store.get_access_stats()["pending"]==1
+
+    def test_flush_writes_one_batched_update(self,store,scopes,db_session):
+        store.upsert_many([{"path":"/p/a.py"},{"path":"/p/b.py"}])
+        for path in ("/p/a.py","/p/a.py","/p/b.py","/p/missing.py"):
+            store.record_access(path)
+        updates=[]
+
+        def capture(conn,cursor,statement,parameters,context,executemany):
+            if statement.lstrip().upper().startswith("UPDATE"):
+                updates.append(executemany)
+        event.listen(db_session.bind,"before_cursor_execute",capture)
+        try:
+            assert store.flush_access()==3
+        finally:
+            event.remove(db_session.bind,"before_cursor_execute",capture)
+        assert updates==[True]
+        assert _row(db_session,"/p/a.py").access_count==2
+        assert _row(db_session,"/p/b.py").access_count==1
+        assert store.flush_access()==0
+
+    def test_reads_see_pending_counts(self,store):
+        store.upsert({"path":"/p/a.py"})
+        store.record_access("/p/a.py")
+        assert store.get("/p/a.py")["access_count"]==1
+        assert store.get_most_accessed()[0]["path"]=="/p/a.py"
+
+    def test_timer_flushes_in_background(self,scopes,db_session):
+        store=FileMetadataStore("proj-1",flush_interval=0.05)
+        store.upsert({"path":"/p/a.py"})
+        store.record_access("/p/a.py")
+        timer=store._flush_timer
+        timer.join(timeout=2)
+        assert store.get_access_stats()["flushes"]==1
+        assert _row(db_session,"/p/a.py").access_count==1
+
+    def test_failed_flush_keeps_pending_counts(self,store,db_session):
+        store.upsert({"path":"/p/a.py"})
+        store.record_access("/p/a.py")
+        store.record_access("/p/a.py")
+
+        @contextmanager
+        def failing_scope():
+            raise RuntimeError("database is locked")
+            yield
+        with patch("models.database.session_scope",failing_scope):
+            assert store.flush_access()==0
+        stats=store.get_access_stats()
+        assert (stats["flushErrors"],stats["pending"])==(1,1)
+        store.record_access("/p/a.py")
+        assert store.flush_access()==1
+        assert _row(db_session,"/p/a.py").access_count==3
+
+
+class TestBulkUpsert:
+    def test_upsert_many_inserts_and_updates_in_one_scope(self,store,scopes,db_session):
+        store.upsert({"path":"/p/a.py","size":1,"description":"keep"})
+        opened=len(scopes)
+        count=store.upsert_many([
+            {"path":"/p/a.py","size":10,"hash":"h1"},
+            {"path":"/p/b.py","size":20,"language":"python"},
+            {"path":"/p/b.py","size":30,"language":"python"},
+            {"size":99},
+        ])
+        assert count==2
+        assert len(scopes)==opened+1
+        a=_row(db_session,"/p/a.py")
+        assert (a.size,a.hash,a.description)==(10,"h1","keep")
+        b=_row(db_session,"/p/b.py")
+        assert (b.size,b.language,b.access_count)==(30,"python",0)
+
+    def test_delete_many(self,store,db_session):
+        store.upsert_many([{"path":"/p/a.py"},{"path":"/p/b.py"},{"path":"/p/c.py"}])
+        assert store.delete_many(["/p/a.py","/p/c.py","/p/a.py"])==2
+        assert _row(db_session,"/p/a.py") is None
+        assert _row(db_session,"/p/b.py") is not None
@@ -0,0 +1,203 @@
+import pytest
+import threading
+import time
+from dataclasses import dataclass
+
+from events.event_bus import (
+    EventBus,
+    DISPATCH_ASYNC,
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_COALESCE,
+)
+
+
+@dataclass
+class Tick:
+    key:str
+    value:int
+
+
+@dataclass
+class Done:
+    key:str
+
+
+@pytest.fixture
+def bus():
+    bus=EventBus()
+    yield bus
+    bus.clear()
+
+
+class Gate:
+    def __init__(self):
+        self.open=threading.Event()
+        self.entered=threading.Event()
+        self.seen=[]
+
+    def __call__(self,event):
+        self.entered.set()
+        self.open.wait(5)
+        self.seen.append(event)
+
+
+class TestEventBusSync:
+    def test_sync_handler_runs_inline(self,bus):
+        seen=[]
+        bus.subscribe(Tick,lambda e:seen.append(threading.current_thread()))
+        bus.publish(Tick("a",1))
+        assert seen==[threading.current_thread()]
+
+    def test_handler_error_does_not_stop_others(self,bus):
+        seen=[]
+
+        def bad(event):
+            raise RuntimeError("boom")
+        bus.subscribe(Tick,bad)
+        bus.subscribe(Tick,seen.append)
+        bus.publish(Tick("a",1))
+        assert len(seen)==1
+
+
+class TestEventBusAsync:
+    def test_publish_does_not_wait_for_slow_subscriber(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="slow")
+        started=time.perf_counter()
+        bus.publish(Tick("a",1))
+        assert time.perf_counter()-started<0.5
+        assert gate.entered.wait(2)
+        gate.open.set()
+        assert bus.wait_idle(2)
+        assert len(gate.seen)==1
+
+    def test_order_preserved_across_event_types(self,bus):
+        seen=[]
+        bus.subscribe(Tick,lambda e:seen.append(("tick",e.value)),dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.subscribe(Done,lambda e:seen.append(("done",e.key)),dispatch=DISPATCH_ASYNC,subscriber="s")
+        for i in range(50):
+            bus.publish(Tick("a",i))
+        bus.publish(Done("a"))
+        assert bus.wait_idle(2)
+        assert seen==[("tick",i) for i in range(50)]+[("done","a")]
+
+    def test_subscribers_isolated(self,bus):
+        gate=Gate()
+        fast=[]
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="slow")
+        bus.subscribe(Tick,fast.append,dispatch=DISPATCH_ASYNC,subscriber="fast")
+        bus.publish(Tick("a",1))
+        deadline=time.time()+2
+        while not fast and time.time()<deadline:
+            time.sleep(0.01)
+        assert len(fast)==1
+        assert gate.seen==[]
+        gate.open.set()
+        assert bus.wait_idle(2)
+
+    def test_drop_oldest_overflow(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="s",overflow=OVERFLOW_DROP_OLDEST,max_queue=2)
+        bus.publish(Tick("a",0))
+        assert gate.entered.wait(2)
+        for i in range(1,5):
+            bus.publish(Tick("a",i))
+        gate.open.set()
+        assert bus.wait_idle(2)
+        assert [e.value for e in gate.seen]==[0,3,4]
+        stats=bus.get_stats()["s"]
+        assert stats["dropped"]==2
+        assert stats["maxDepth"]==2
+
+    def test_coalesce_latest_wins_per_key(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="s",overflow=OVERFLOW_COALESCE,coalesce_key=lambda e:e.key)
+        bus.subscribe(Done,gate,dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.publish(Done("first"))
+        assert gate.entered.wait(2)
+        bus.publish(Tick("a",1))
+        bus.publish(Tick("b",1))
+        bus.publish(Done("mid"))
+        bus.publish(Tick("a",2))
+        gate.open.set()
+        assert bus.wait_idle(2)
+        seen=[(type(e).__name__,e.key,getattr(e,"value",None)) for e in gate.seen]
+        assert seen==[("Done","first",None),("Tick","b",1),("Done","mid",None),("Tick","a",2)]
+        assert bus.get_stats()["s"]["coalesced"]==1
+
+    def test_coalesce_overflow_evicts_only_coalescible(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="s",overflow=OVERFLOW_COALESCE,max_queue=2,coalesce_key=lambda e:e.key)
+        bus.subscribe(Done,gate,dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.publish(Done("first"))
+        assert gate.entered.wait(2)
+        bus.publish(Tick("a",1))
+        bus.publish(Done("mid"))
+        bus.publish(Done("last"))
+        gate.open.set()
+        assert bus.wait_idle(2)
+        seen=[(type(e).__name__,e.key) for e in gate.seen]
+        assert seen==[("Done","first"),("Done","mid"),("Done","last")]
+        assert bus.get_stats()["s"]["dropped"]==1
+
+    def test_coalesce_overflow_blocks_for_non_coalescible(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="s",overflow=OVERFLOW_COALESCE,max_queue=1,coalesce_key=lambda e:e.key)
+        bus.subscribe(Done,gate,dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.publish(Done("first"))
+        assert gate.entered.wait(2)
+        bus.publish(Done("queued"))
+        publisher=threading.Thread(target=bus.publish,args=(Done("blocked"),))
+        publisher.start()
+        publisher.join(0.1)
+        assert publisher.is_alive()
+        gate.open.set()
+        publisher.join(2)
+        assert not publisher.is_alive()
+        assert bus.wait_idle(2)
+        assert [e.key for e in gate.seen]==["first","queued","blocked"]
+        assert bus.get_stats()["s"]["dropped"]==0
+
+    def test_block_overflow_waits_for_space(self,bus):
+        gate=Gate()
+        bus.subscribe(Tick,gate,dispatch=DISPATCH_ASYNC,subscriber="s",overflow=OVERFLOW_BLOCK,max_queue=1)
+        bus.publish(Tick("a",0))
+        assert gate.entered.wait(2)
+        bus.publish(Tick("a",1))
+        publisher=threading.Thread(target=bus.publish,args=(Tick("a",2),))
+        publisher.start()
+        publisher.join(0.1)
+        assert publisher.is_alive()
+        gate.open.set()
+        publisher.join(2)
+        assert not publisher.is_alive()
+        assert bus.wait_idle(2)
+        assert [e.value for e in gate.seen]==[0,1,2]
+        assert bus.get_stats()["s"]["dropped"]==0
+
+    def test_stats_record_handler_time_and_errors(self,bus):
+        def handler(event):
+            time.sleep(0.01)
+            if event.value<0:
+                raise ValueError("negative")
+        bus.subscribe(Tick,handler,dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.publish(Tick("a",1))
+        bus.publish(Tick("a",-1))
+        assert bus.wait_idle(2)
+        stats=bus.get_stats()["s"]
+        assert stats["processed"]==2
+        assert stats["errors"]==1
+        assert stats["handlerMaxMs"]>=10
+
+    def test_unknown_overflow_rejected(self,bus):
+        with pytest.raises(ValueError):
+            bus.subscribe(Tick,print,dispatch=DISPATCH_ASYNC,overflow="spill")
+
+    def test_unsubscribe_stops_empty_queue(self,bus):
+        seen=[]
+        bus.subscribe(Tick,seen.append,dispatch=DISPATCH_ASYNC,subscriber="s")
+        bus.unsubscribe(Tick,seen.append)
+        bus.publish(Tick("a",1))
+        assert bus.get_stats()=={}
+        assert seen==[]
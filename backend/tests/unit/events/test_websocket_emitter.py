@@ -0,0 +1,252 @@
+import pytest
+import threading
+import time
+from unittest.mock import ANY,MagicMock
+
+from events.event_bus import EventBus
+from events.events import AgentProgress,AgentCompleted,MetricsUpdated,CheckpointCreated
+from events.websocket_emitter import WebSocketEmitter
+
+
+@pytest.fixture
+def bus():
+    bus=EventBus()
+    yield bus
+    bus.clear()
+
+
+@pytest.fixture
+def sio():
+    return MagicMock()
+
+
+@pytest.fixture
+def emitter(bus,sio):
+    emitter=WebSocketEmitter(bus,flush_interval=60.0)
+    emitter._sio=sio
+    emitter._running=True
+    yield emitter
+    emitter._running=False
+
+
+def _progress(agent_id,progress,project_id="p1"):
+    return AgentProgress(project_id=project_id,agent_id=agent_id,progress=progress,current_task="t")
+
+
+def _batch_events(sio):
+    frames=[]
+    for call in sio.emit.call_args_list:
+        event,data=call.args[0],call.args[1]
+        if event=="events:batch":
+            frames.append([(e["event"],e["data"]) for e in data["events"]])
+        else:
+            frames.append([(event,data)])
+    return frames
+
+
+class TestWebSocketEmitterBatching:
+    def test_progress_coalesced_latest_wins(self,emitter,bus,sio):
+        for p in (10,20,30):
+            bus.publish(_progress("a1",p))
+        bus.publish(_progress("a2",5))
+        bus.wait_idle()
+        assert sio.emit.call_count==0
+        emitter.flush()
+        frames=_batch_events(sio)
+        assert len(frames)==1
+        assert [(e,d["agentId"],d["progress"]) for e,d in frames[0]]==[("agent:progress","a1",30),("agent:progress","a2",5)]
+        stats=emitter.get_stats()
+        assert stats["coalesced"]+bus.get_stats()["websocket_emitter"]["coalesced"]==2
+        assert stats["emitted"]==2
+        assert stats["frames"]==1
+
+    def test_superseded_event_moves_after_intermediate_events(self,emitter,bus,sio):
+        bus.publish(_progress("a1",50))
+        bus.publish(AgentCompleted(project_id="p1",agent_id="a1"))
+        bus.publish(_progress("a1",100))
+        bus.wait_idle()
+        emitter.flush()
+        frames=_batch_events(sio)
+        assert [e for e,_ in frames[0]]==["agent:completed","agent:progress"]
+
+    def test_state_events_never_coalesced(self,emitter,bus,sio):
+        for i in range(3):
+            bus.publish(CheckpointCreated(project_id="p1",checkpoint_id=f"c{i}",agent_id="a1",checkpoint={}))
+        bus.wait_idle()
+        emitter.flush()
+        frames=_batch_events(sio)
+        assert [d["checkpointId"] for _,d in frames[0]]==["c0","c1","c2"]
+
+    def test_single_event_sent_unwrapped(self,emitter,bus,sio):
+        bus.publish(MetricsUpdated(project_id="p1",metrics={"progressPercent":1}))
+        bus.publish(MetricsUpdated(project_id="p1",metrics={"progressPercent":2}))
+        bus.wait_idle()
+        emitter.flush()
+        sio.emit.assert_called_once_with("metrics:update",{"projectId":"p1","metrics":{"progressPercent":2},"seq":ANY},room="project:p1")
+
+    def test_rooms_flushed_separately(self,emitter,bus,sio):
+        bus.publish(_progress("a1",1,project_id="p1"))
+        bus.publish(_progress("a2",1,project_id="p2"))
+        bus.wait_idle()
+        emitter.flush()
+        rooms=sorted(call.kwargs["room"] for call in sio.emit.call_args_list)
+        assert rooms==["project:p1","project:p2"]
+
+    def test_batches_split_by_max_size(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=60.0,max_batch_size=2)
+        emitter._sio=sio
+        emitter._running=True
+        for i in range(5):
+            bus.publish(CheckpointCreated(project_id="p1",checkpoint_id=f"c{i}",agent_id="a1",checkpoint={}))
+        bus.wait_idle()
+        emitter.flush()
+        assert [len(f) for f in _batch_events(sio)]==[2,2,1]
+
+    def test_overflow_drops_oldest_coalescible(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=60.0,max_pending=2)
+        emitter._sio=sio
+        emitter._running=True
+        bus.publish(_progress("a1",1))
+        bus.publish(AgentCompleted(project_id="p1",agent_id="a2"))
+        bus.publish(AgentCompleted(project_id="p1",agent_id="a3"))
+        bus.wait_idle()
+        emitter.flush()
+        assert [d["agentId"] for _,d in _batch_events(sio)[0]]==["a2","a3"]
+        assert emitter.get_stats()["dropped"]==1
+
+    def test_overflow_without_coalescible_flushes_early(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=60.0,max_pending=2)
+        emitter._sio=sio
+        emitter._running=True
+        for i in range(3):
+            bus.publish(AgentCompleted(project_id="p1",agent_id=f"a{i}"))
+        bus.wait_idle()
+        assert [[d["agentId"] for _,d in f] for f in _batch_events(sio)]==[["a0","a1"]]
+        assert emitter.get_stats()["pending"]==1
+        emitter.flush()
+        assert [[d["agentId"] for _,d in f] for f in _batch_events(sio)]==[["a0","a1"],["a2"]]
+        stats=emitter.get_stats()
+        assert stats["overflowFlushes"]==1
+        assert stats["dropped"]==0
+
+    def test_emit_error_counted(self,emitter,bus,sio):
+        sio.emit.side_effect=RuntimeError("closed")
+        bus.publish(_progress("a1",1))
+        bus.wait_idle()
+        emitter.flush()
+        stats=emitter.get_stats()
+        assert stats["errors"]==1
+        assert stats["dropped"]==1
+
+    def test_without_flusher_emits_directly(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=0)
+        emitter.set_sio(sio)
+        bus.publish(_progress("a1",1))
+        bus.wait_idle()
+        assert sio.emit.call_count==1
+
+    def test_background_flush(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=0.01)
+        emitter.set_sio(sio)
+        try:
+            bus.publish(_progress("a1",1))
+            deadline=time.time()+2
+            while sio.emit.call_count==0 and time.time()<deadline:
+                time.sleep(0.01)
+            assert sio.emit.call_count==1
+            assert emitter.get_stats()["flushLatencyMaxMs"]>0
+        finally:
+            emitter.stop()
+
+
+class TestWebSocketEmitterReplay:
+    def _publish(self,bus,count,project_id="p1"):
+        for i in range(count):
+            bus.publish(CheckpointCreated(project_id=project_id,checkpoint_id=f"c{i}",agent_id="a1",checkpoint={}))
+        bus.wait_idle()
+
+    def test_sequence_per_project(self,emitter,bus,sio):
+        self._publish(bus,2,"p1")
+        self._publish(bus,1,"p2")
+        emitter.flush()
+        seqs=[(call.kwargs["room"],d["seq"]) for call in sio.emit.call_args_list for _,d in _batch_events_from(call)]
+        assert seqs==[("project:p1",1),("project:p1",2),("project:p2",1)]
+        assert emitter.get_sequence("p1")==2
+        assert emitter.get_sequence("missing")==0
+
+    def test_events_since_returns_missed_deltas(self,emitter,bus):
+        self._publish(bus,5)
+        emitter.flush()
+        seq,events=emitter.get_events_since("p1",3,emitter.epoch)
+        assert seq==5
+        assert [(e["data"]["seq"],e["data"]["checkpointId"]) for e in events]==[(4,"c3"),(5,"c4")]
+        assert emitter.get_events_since("p1",5)==(5,[])
+
+    def test_events_since_compacts_coalescible_events(self,emitter,bus):
+        bus.publish(_progress("a1",10))
+        bus.publish(AgentCompleted(project_id="p1",agent_id="a2"))
+        bus.publish(_progress("a1",20))
+        bus.wait_idle()
+        emitter.flush()
+        _,events=emitter.get_events_since("p1",0)
+        assert [(e["event"],e["data"].get("progress")) for e in events]==[("agent:completed",None),("agent:progress",20)]
+        assert events[0]["data"]["seq"]<events[1]["data"]["seq"]
+
+    def test_gap_beyond_buffer_requires_snapshot(self,bus,sio):
+        emitter=WebSocketEmitter(bus,flush_interval=60.0,replay_size=3)
+        emitter._sio=sio
+        emitter._running=True
+        self._publish(bus,5)
+        emitter.flush()
+        assert emitter.get_events_since("p1",1) is None
+        assert [e["data"]["seq"] for e in emitter.get_events_since("p1",2)[1]]==[3,4,5]
+        assert emitter.get_stats()["replayMisses"]==1
+
+    def test_unknown_epoch_or_future_seq_requires_snapshot(self,emitter,bus):
+        self._publish(bus,2)
+        assert emitter.get_events_since("p1",1,"other-epoch") is None
+        assert emitter.get_events_since("p1",9) is None
+        assert emitter.get_events_since("p2",0)==(0,[])
+
+    def test_direct_emits_are_sequenced_for_replay(self,emitter,bus,sio):
+        self._publish(bus,1)
+        emitter.emit("agent:log",{"agentId":"a1","entry":{"message":"hi"}},"p1")
+        emitter.flush()
+        assert [d["seq"] for f in _batch_events(sio) for _,d in f]==[1,2]
+        seq,events=emitter.get_events_since("p1",0)
+        assert seq==2
+        assert [(e["event"],e["data"]["seq"]) for e in events]==[("checkpoint:created",1),("agent:log",2)]
+
+    def test_buffered_events_delivered_once_after_replay(self,emitter,bus,sio):
+        self._publish(bus,1)
+        emitter.flush()
+        self._publish(bus,1)
+        assert emitter.get_events_since("p1",0)==(1,[{"event":"checkpoint:created","data":ANY}])
+        assert emitter.get_events_since("p1",1)==(1,[])
+        emitter.flush()
+        assert [d["seq"] for f in _batch_events(sio) for _,d in f]==[1,2]
+        assert [e["data"]["seq"] for e in emitter.get_events_since("p1",1)[1]]==[2]
+
+    def test_snapshot_seq_ahead_of_delivery_waits_for_flush(self,emitter,bus):
+        self._publish(bus,2)
+        assert emitter.get_sequence("p1")==2
+        assert emitter.get_events_since("p1",2)==(2,[])
+        assert emitter.get_events_since("p1",3) is None
+
+    def test_hold_delivery_defers_flush(self,emitter,bus,sio):
+        self._publish(bus,1)
+        with emitter.hold_delivery():
+            flusher=threading.Thread(target=emitter.flush)
+            flusher.start()
+            flusher.join(0.1)
+            assert flusher.is_alive()
+            assert sio.emit.call_count==0
+        flusher.join(5)
+        assert sio.emit.call_count==1
+
+
+def _batch_events_from(call):
+    event,data=call.args[0],call.args[1]
+    if event=="events:batch":
+        return [(e["event"],e["data"]) for e in data["events"]]
+    return [(event,data)]
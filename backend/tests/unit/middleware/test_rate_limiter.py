@@ -0,0 +1,99 @@
+import pytest
+import sqlite3
+from unittest.mock import patch
+from flask import Flask
+
+from middleware.rate_limiter import RateLimiter,MemoryRateStore,SqliteRateStore,gcra,rate_limit,create_limiter
+
+
+@pytest.fixture(params=["memory","sqlite"])
+def store(request,tmp_path):
+ if request.param=="memory":
+  return MemoryRateStore()
+ return SqliteRateStore(str(tmp_path/"rate_limits.db"))
+
+
+class TestGcra:
+ def test_burst_then_steady_rate(self):
+  tat=None
+  results=[]
+  for _ in range(4):
+   allowed,new_tat,remaining,retry_after=gcra(tat,100.0,3,60)
+   if allowed:
+    tat=new_tat
+   results.append((allowed,remaining,retry_after))
+  assert results==[(True,2,0.0),(True,1,0.0),(True,0,0.0),(False,0,20.0)]
+  allowed,_,remaining,_=gcra(tat,120.0,3,60)
+  assert (allowed,remaining)==(True,0)
+
+ def test_idle_key_fully_replenishes(self):
+  allowed,_,remaining,_=gcra(50.0,1000.0,3,60)
+  assert (allowed,remaining)==(True,2)
+
+
+class TestRateLimiter:
+ def test_limits_per_client_and_endpoint(self,store):
+  limiter=RateLimiter(2,60,store=store)
+  limiter.set_limit("/a",1,60)
+  with patch("middleware.rate_limiter.time.time",return_value=1000.0):
+   assert limiter.check("c1","/a")[0]
+   allowed,info=limiter.check("c1","/a")
+   assert not allowed
+   assert info=={"limit":1,"remaining":0,"retry_after":60}
+   assert limiter.check("c2","/a")[0]
+   assert limiter.check("c1","/b")==(True,{"limit":2,"remaining":1,"retry_after":0})
+  stats=limiter.get_stats()
+  assert (stats["store"],stats["checks"],stats["rejected"],stats["total_clients"])==(store.name,4,1,3)
+
+ def test_cleanup_drops_replenished_keys(self,store):
+  limiter=RateLimiter(2,60,store=store)
+  with patch("middleware.rate_limiter.time.time",return_value=1000.0):
+   limiter.check("c1","/a")
+  with patch("middleware.rate_limiter.time.time",return_value=1031.0):
+   assert limiter._global_cleanup()==1
+  assert len(store)==0
+
+ def test_sqlite_state_shared_between_instances(self,tmp_path):
+  path=str(tmp_path/"shared.db")
+  first=RateLimiter(1,60,store=SqliteRateStore(path))
+  second=RateLimiter(1,60,store=SqliteRateStore(path))
+  assert first.check("c1","/a")[0]
+  assert not second.check("c1","/a")[0]
+
+ def test_locked_sqlite_store_fails_open(self,tmp_path):
+  path=str(tmp_path/"locked.db")
+  limiter=RateLimiter(1,60,store=SqliteRateStore(path,timeout=0.05))
+  blocker=sqlite3.connect(path,isolation_level=None)
+  blocker.execute("BEGIN IMMEDIATE")
+  try:
+   allowed,info=limiter.check("c1","/a")
+  finally:
+   blocker.execute("ROLLBACK")
+   blocker.close()
+  assert allowed and info["retry_after"]==0
+  assert limiter.get_stats()["storeErrors"]==1
+  assert limiter.check("c1","/a")[0]
+  assert not limiter.check("c1","/a")[0]
+
+
+class TestRateLimitDecorator:
+ @pytest.fixture(autouse=True)
+ def reset_limiter(self):
+  yield
+  import middleware.rate_limiter as rate_limiter
+  rate_limiter._limiter=None
+
+ def test_returns_429_with_headers(self):
+  app=Flask(__name__)
+  create_limiter(60,60)
+
+  @app.route("/limited")
+  @rate_limit(limit=1,window=60)
+  def limited():
+   return"ok"
+  client=app.test_client()
+  assert client.get("/limited").status_code==200
+  response=client.get("/limited")
+  assert response.status_code==429
+  assert response.headers["X-RateLimit-Remaining"]=="0"
+  assert int(response.headers["Retry-After"])>=1
@@ -1,6 +1,9 @@
 import pytest
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from unittest.mock import patch
 from providers.health_monitor import ProviderHealthMonitor,get_health_monitor
 from providers.base import HealthCheckResult
 
@@ -67,3 +70,159 @@ class TestProviderHealthMonitor:
   assert monitor._check_interval==30
   monitor.set_check_interval(3)
   assert monitor._check_interval==5
+
+
+class _FakeProvider:
+ def __init__(self,delay:float=0.0,available:bool=True,latency_ms=None):
+  self.delay=delay
+  self.available=available
+  self.latency_ms=latency_ms
+  self.calls=0
+
+ def validate_config(self):
+  return True
+
+ def health_check(self):
+  self.calls+=1
+  time.sleep(self.delay)
+  return HealthCheckResult(available=self.available,latency_ms=self.latency_ms,error=None if self.available else"down",checked_at=datetime.now())
+
+
+def _fresh_monitor():
+ monitor=ProviderHealthMonitor.__new__(ProviderHealthMonitor)
+ monitor._initialized=False
+ monitor.__init__()
+ return monitor
+
+
+@pytest.fixture
+def providers():
+ registry={}
+ with patch("providers.health_monitor.ProviderRegistry.is_registered",side_effect=lambda pid:pid in registry),\
+  patch("providers.health_monitor.ProviderRegistry.get_fresh",side_effect=lambda pid,config=None:registry.get(pid)):
+  yield registry
+
+
+class TestConcurrentChecks:
+ def test_slow_provider_does_not_block_others(self,providers):
+  providers["slow"]=_FakeProvider(delay=0.5)
+  providers["fast"]=_FakeProvider(latency_ms=12)
+  monitor=_fresh_monitor()
+  monitor._executor=ThreadPoolExecutor(max_workers=4)
+  try:
+   with patch.object(monitor,"_get_active_provider_ids",return_value={"slow","fast"}):
+    started=time.monotonic()
+    monitor._check_all_providers()
+    assert time.monotonic()-started<0.4
+    deadline=time.time()+2
+    while monitor.get_health_status("fast") is None and time.time()<deadline:
+     time.sleep(0.01)
+    assert monitor.get_health_status("fast").available
+    assert monitor.get_health_status("slow") is None
+  finally:
+   monitor._executor.shutdown(wait=True)
+
+ def test_timeout_marks_unavailable_then_records_late_result(self,providers):
+  providers["slow"]=_FakeProvider(delay=0.3)
+  monitor=_fresh_monitor()
+  monitor._check_timeout=0.05
+  monitor._executor=ThreadPoolExecutor(max_workers=2)
+  try:
+   with patch.object(monitor,"_get_active_provider_ids",return_value={"slow"}):
+    monitor._check_all_providers()
+    time.sleep(0.1)
+    monitor._check_all_providers()
+    status=monitor.get_health_status("slow")
+    assert not status.available
+    assert"タイムアウト" in status.error
+  finally:
+   monitor._executor.shutdown(wait=True)
+  assert monitor.get_health_status("slow").available
+  stats=monitor.get_latency_stats()["slow"]
+  assert stats["timeouts"]==1
+  assert not stats["checking"]
+
+ def test_late_result_ignored_after_newer_probe(self,providers):
+  providers["slow"]=_FakeProvider(delay=0.3)
+  monitor=_fresh_monitor()
+  monitor._check_timeout=0.05
+  monitor._executor=ThreadPoolExecutor(max_workers=2)
+  try:
+   with patch.object(monitor,"_get_active_provider_ids",return_value={"slow"}):
+    monitor._check_all_providers()
+    time.sleep(0.1)
+    monitor._check_all_providers()
+    providers["slow"]=_FakeProvider(available=False)
+    assert not monitor.check_provider_now("slow").available
+  finally:
+   monitor._executor.shutdown(wait=True)
+  assert monitor.get_health_status("slow").error=="down"
+
+ def test_health_change_emitted_outside_state_lock(self):
+  monitor=_fresh_monitor()
+  acquired=[]
+
+  def on_change(provider_id,result):
+   probe=threading.Thread(target=lambda:acquired.append(monitor._state_lock.acquire(timeout=1) and monitor._state_lock.release() is None))
+   probe.start()
+   probe.join()
+  monitor.set_health_change_callback(on_change)
+  monitor.record_job_outcome("p",True,5.0)
+  assert acquired==[True]
+
+
+class TestAdaptiveIntervals:
+ def test_backs_off_when_stable_and_probes_fast_after_failure(self,providers):
+  provider=_FakeProvider(latency_ms=20)
+  providers["p"]=provider
+  monitor=_fresh_monitor()
+  intervals=[]
+  for _ in range(5):
+   monitor.check_provider_now("p")
+   intervals.append(monitor.get_latency_stats()["p"]["checkIntervalSec"])
+  assert intervals==[10,20,40,80,120]
+  provider.available=False
+  monitor.check_provider_now("p")
+  assert monitor.get_latency_stats()["p"]["checkIntervalSec"]==5
+  provider.available=True
+  monitor.check_provider_now("p")
+  assert monitor.get_latency_stats()["p"]["checkIntervalSec"]==10
+
+ def test_recent_job_success_skips_active_probe(self,providers):
+  provider=_FakeProvider()
+  providers["p"]=provider
+  monitor=_fresh_monitor()
+  with patch.object(monitor,"_get_active_provider_ids",return_value={"p"}):
+   monitor.record_job_outcome("p",True,150.0)
+   monitor._states["p"].next_check=0
+   monitor._check_all_providers()
+  assert provider.calls==0
+  assert monitor.get_latency_stats()["p"]["skipped"]==1
+
+ def test_reset_provider_drops_cached_probe_client(self,providers):
+  providers["p"]=_FakeProvider()
+  monitor=_fresh_monitor()
+  with patch.object(monitor,"_get_active_provider_ids",return_value={"p"}):
+   monitor._check_all_providers()
+   assert monitor.get_health_status("p").available
+   providers["p"]=_FakeProvider(available=False)
+   monitor.reset_provider("p")
+   monitor._check_all_providers()
+  assert not monitor.get_health_status("p").available
+
+
+class TestPassiveHealth:
+ def test_job_outcomes_drive_health_and_percentiles(self):
+  monitor=_fresh_monitor()
+  for latency in range(1,101):
+   monitor.record_job_outcome("p",True,float(latency))
+  assert monitor.get_health_status("p").available
+  job=monitor.get_latency_stats()["p"]["jobLatency"]
+  assert (job["count"],job["p50Ms"],job["p95Ms"],job["p99Ms"])==(100,51.0,96.0,100.0)
+  for _ in range(3):
+   monitor.record_job_outcome("p",False,error="boom")
+  status=monitor.get_health_status("p")
+  assert not status.available
+  assert"boom" in status.error
+  monitor.record_job_outcome("p",True,10.0)
+  assert monitor.get_health_status("p").available
@@ -0,0 +1,56 @@
+import pytest
+from repositories.llm_job import LlmJobRepository
+from models.tables import LlmJob,ProjectTokenUsage
+
+
+def _complete(repo,project_id,tokens_input,tokens_output):
+ job=repo.create_job(project_id=project_id,agent_id="agent-1",provider_id="mock",model="m",prompt="hi")
+ repo.complete_job(job["id"],"ok",tokens_input,tokens_output)
+ return job
+
+
+class TestProjectTokenUsage:
+ def test_usage_seeded_from_existing_jobs(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  db_session.add(LlmJob(id="legacy-1",project_id=sample_project.id,agent_id="agent-1",provider_id="mock",model="m",prompt="p",status="completed",tokens_input=40,tokens_output=60))
+  db_session.flush()
+  assert repo.get_project_token_usage(sample_project.id)==100
+  assert db_session.get(ProjectTokenUsage,sample_project.id).tokens_used==100
+
+ def test_complete_job_increments_counter(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  assert repo.get_project_token_usage(sample_project.id)==0
+  _complete(repo,sample_project.id,10,5)
+  _complete(repo,sample_project.id,20,1)
+  assert repo.get_project_token_usage(sample_project.id)==36
+  assert repo.get_project_token_usage(sample_project.id)==repo.compute_project_token_usage(sample_project.id)
+
+ def test_first_completion_without_counter_row(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  _complete(repo,sample_project.id,7,3)
+  assert db_session.get(ProjectTokenUsage,sample_project.id).tokens_used==10
+
+ def test_recompleting_job_applies_delta(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  job=_complete(repo,sample_project.id,10,10)
+  repo.complete_job(job["id"],"again",5,5)
+  assert repo.get_project_token_usage(sample_project.id)==10
+
+ def test_failed_jobs_not_counted(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  job=repo.create_job(project_id=sample_project.id,agent_id="agent-1",provider_id="mock",model="m",prompt="hi")
+  repo.fail_job(job["id"],"boom")
+  assert repo.get_project_token_usage(sample_project.id)==0
+
+ def test_reconcile_reports_and_fixes_drift(self,db_session,sample_project):
+  repo=LlmJobRepository(db_session)
+  _complete(repo,sample_project.id,10,5)
+  assert repo.reconcile_token_usage()==[]
+  db_session.get(ProjectTokenUsage,sample_project.id).tokens_used=999
+  db_session.flush()
+  mismatches=repo.reconcile_token_usage(project_id=sample_project.id)
+  assert mismatches==[{"projectId":sample_project.id,"cached":999,"actual":15,"difference":984}]
+  assert repo.get_project_token_usage(sample_project.id)==999
+  repo.reconcile_token_usage(fix=True)
+  assert repo.get_project_token_usage(sample_project.id)==15
+  assert repo.reconcile_token_usage()==[]
@@ -0,0 +1,116 @@
+import re
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import create_engine,event
+from sqlalchemy.orm import sessionmaker
+
+from models.database import MIGRATIONS,_run_migrations
+from models.tables import Base
+from repositories import (
+ AgentRepository,
+ AgentLogRepository,
+ SystemLogRepository,
+ AgentTraceRepository,
+ LlmJobRepository,
+ CheckpointRepository,
+ AssetRepository,
+ InterventionRepository,
+)
+
+HOT_TABLES={"agents","agent_logs","system_logs","agent_traces","llm_jobs","checkpoints","assets","interventions"}
+SCAN_RE=re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+ engine=create_engine("sqlite:///:memory:",connect_args={"check_same_thread":False})
+ Base.metadata.create_all(engine)
+ _run_migrations(engine)
+ yield engine
+ engine.dispose()
+
+
+@pytest.fixture
+def plan_session(plan_engine):
+ session=sessionmaker(bind=plan_engine)()
+ try:
+  yield session
+ finally:
+  session.rollback()
+  session.close()
+
+
+@contextmanager
+def _capture(engine):
+ statements=[]
+ def before(conn,cursor,statement,parameters,context,executemany):
+  if statement.lstrip().upper().startswith("SELECT"):
+   statements.append((statement,parameters))
+ event.listen(engine,"before_cursor_execute",before)
+ try:
+  yield statements
+ finally:
+  event.remove(engine,"before_cursor_execute",before)
+
+
+def _plans(session,statements):
+ conn=session.connection()
+ return [(sql,[row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN "+sql,params).fetchall()]) for sql,params in statements]
+
+
+def _full_scans(details):
+ scans=[]
+ for detail in details:
+  match=SCAN_RE.match(detail)
+  if match and match.group(1) in HOT_TABLES and"COVERING INDEX" not in match.group(2):
+   scans.append(detail)
+ return scans
+
+
+HOT_QUERIES={
+ "agents.get_by_project":lambda s:AgentRepository(s).get_by_project("p"),
+ "agents.get_leaders_only":lambda s:AgentRepository(s).get_leaders_only("p"),
+ "agents.get_workers_by_parent":lambda s:AgentRepository(s).get_workers_by_parent("a"),
+ "agents.get_summary_rows":lambda s:AgentRepository(s).get_summary_rows("p"),
+ "agent_logs.get_by_agent":lambda s:AgentLogRepository(s).get_by_agent("a"),
+ "system_logs.get_by_project":lambda s:SystemLogRepository(s).get_by_project("p"),
+ "agent_traces.get_by_project":lambda s:AgentTraceRepository(s).get_by_project("p"),
+ "agent_traces.get_by_agent":lambda s:AgentTraceRepository(s).get_by_agent("a"),
+ "llm_jobs.get_pending_jobs":lambda s:LlmJobRepository(s).get_pending_jobs(),
+ "llm_jobs.get_pending_counts_by_provider":lambda s:LlmJobRepository(s).get_pending_counts_by_provider(),
+ "llm_jobs.get_running_count":lambda s:LlmJobRepository(s).get_running_count(),
+ "llm_jobs.get_by_agent":lambda s:LlmJobRepository(s).get_by_agent("a"),
+ "llm_jobs.get_by_external_id":lambda s:LlmJobRepository(s).get_by_external_id("x"),
+ "llm_jobs.compute_project_token_usage":lambda s:LlmJobRepository(s).compute_project_token_usage("p"),
+ "llm_jobs.cleanup_project_jobs":lambda s:LlmJobRepository(s).cleanup_project_jobs("p"),
+ "llm_jobs.get_by_provider":lambda s:LlmJobRepository(s).get_by_provider("mock"),
+ "checkpoints.get_by_project":lambda s:CheckpointRepository(s).get_by_project("p"),
+ "checkpoints.get_by_agent":lambda s:CheckpointRepository(s).get_by_agent("a"),
+ "checkpoints.get_pending_by_agent":lambda s:CheckpointRepository(s).get_pending_by_agent("a"),
+ "assets.get_by_project":lambda s:AssetRepository(s).get_by_project("p"),
+ "assets.get_pending_by_agent":lambda s:AssetRepository(s).get_pending_by_agent("a"),
+ "interventions.get_by_project":lambda s:InterventionRepository(s).get_by_project("p"),
+}
+
+
+class TestQueryPlans:
+ @pytest.mark.parametrize("name",sorted(HOT_QUERIES))
+ def test_hot_query_uses_index(self,plan_engine,plan_session,name):
+  with _capture(plan_engine) as statements:
+   HOT_QUERIES[name](plan_session)
+  assert statements,f"{name} issued no SELECT"
+  for sql,details in _plans(plan_session,statements):
+   assert not _full_scans(details),f"{name} scans a hot table:\n{sql}\n{details}"
+
+ def test_pending_jobs_need_no_sort(self,plan_engine,plan_session):
+  with _capture(plan_engine) as statements:
+   LlmJobRepository(plan_session).get_pending_jobs()
+  for _,details in _plans(plan_session,statements):
+   assert not any("TEMP B-TREE" in d for d in details),details
+
+ def test_index_migrations_are_idempotent(self,plan_engine):
+  names={m[2] for m in MIGRATIONS if m[3].upper().startswith("CREATE INDEX")}
+  with plan_engine.connect() as conn:
+   existing={row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type='index'")}
+  assert names<=existing
+  _run_migrations(plan_engine)
@@ -0,0 +1,27 @@
+from datetime import datetime,timedelta
+from repositories.summary_cache import SummaryCacheRepository
+from models.tables import SummaryCacheEntry
+
+
+class TestSummaryCacheRepository:
+ def test_get_counts_hits_and_expires(self,db_session):
+  repo=SummaryCacheRepository(db_session)
+  repo.put("k1","summary",agent_type="writer",model="m")
+  assert repo.get("k1",ttl_seconds=60).summary=="summary"
+  assert db_session.get(SummaryCacheEntry,"k1").hit_count==1
+  db_session.get(SummaryCacheEntry,"k1").created_at=datetime.now()-timedelta(seconds=120)
+  db_session.flush()
+  assert repo.get("k1",ttl_seconds=60) is None
+  assert db_session.get(SummaryCacheEntry,"k1") is None
+
+ def test_evict_keeps_most_recently_used(self,db_session):
+  repo=SummaryCacheRepository(db_session)
+  now=datetime.now()
+  for i in range(5):
+   entry=repo.put(f"k{i}","x"*100)
+   entry.last_accessed_at=now-timedelta(minutes=10-i)
+  db_session.flush()
+  assert repo.evict(max_entries=3)==2
+  assert {e.cache_key for e in db_session.query(SummaryCacheEntry).all()}=={"k2","k3","k4"}
+  assert repo.evict(max_bytes=150)==2
+  assert repo.get_stats()=={"entries":1,"sizeBytes":100}
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+from events.event_bus import EventBus
+from events.events import AgentCompleted,AgentCreated,AgentFailed,AgentProgress,AgentStarted,ProjectInitialized
+from models.tables import Agent
+from repositories import AgentRepository
+from services.agent.read_model import AgentReadModel
+
+
+def _agent(agent_id,status="pending",progress=0,input_tokens=0,output_tokens=0,agent_type="code_worker"):
+    return {"id":agent_id,"type":agent_type,"status":status,"progress":progress,"inputTokens":input_tokens,"outputTokens":output_tokens,"startedAt":None}
+
+
+class _Loader:
+    def __init__(self,rows):
+        self.rows=rows
+        self.calls=0
+
+    def __call__(self,project_id):
+        self.calls+=1
+        return [dict(r) for r in self.rows]
+
+
+class TestAgentReadModel:
+    def test_events_update_counts_without_reloading(self):
+        bus=EventBus()
+        loader=_Loader([_agent("a1"),_agent("a2",status="completed",progress=100,input_tokens=10,output_tokens=5)])
+        model=AgentReadModel(bus,loader=loader)
+        summary=model.get_summary("p1")
+        assert summary["total"]==2
+        assert summary["statusCounts"]=={"pending":1,"completed":1}
+        bus.publish(AgentStarted(project_id="p1",agent_id="a1",agent=_agent("a1",status="running",progress=5)))
+        bus.publish(AgentProgress(project_id="p1",agent_id="a1",progress=40,current_task="build"))
+        bus.publish(AgentCreated(project_id="p1",agent_id="w1",agent=_agent("w1")))
+        summary=model.get_summary("p1")
+        assert summary["statusCounts"]=={"running":1,"completed":1,"pending":1}
+        assert summary["firstRunning"]["id"]=="a1"
+        assert summary["progressPercent"]==(40+100)//3
+        bus.publish(AgentCompleted(project_id="p1",agent_id="a1",agent=_agent("a1",status="completed",progress=100,input_tokens=3,output_tokens=7)))
+        bus.publish(AgentFailed(project_id="p1",agent_id="w1",reason="boom"))
+        summary=model.get_summary("p1")
+        assert summary["statusCounts"]=={"completed":2,"failed":1}
+        assert (summary["inputTokens"],summary["outputTokens"])==(13,12)
+        assert summary["firstRunning"] is None
+        assert loader.calls==1
+
+    def test_progress_tokens_update_totals(self):
+        bus=EventBus()
+        loader=_Loader([_agent("a1",status="running",input_tokens=3,output_tokens=7)])
+        model=AgentReadModel(bus,loader=loader)
+        assert model.get_summary("p1")["tokensUsed"]==0
+        bus.publish(AgentProgress(project_id="p1",agent_id="a1",progress=10,current_task="build",tokens_used=40))
+        bus.publish(AgentProgress(project_id="p1",agent_id="a1",progress=20,current_task="build"))
+        summary=model.get_summary("p1")
+        assert (summary["tokensUsed"],summary["progressPercent"])==(40,20)
+        assert loader.calls==1
+
+    def test_reconciles_when_stale_or_reset(self):
+        bus=EventBus()
+        loader=_Loader([_agent("a1")])
+        model=AgentReadModel(bus,loader=loader)
+        model.get_summary("p1")
+        bus.publish(AgentFailed(project_id="p1",agent_id="unknown"))
+        loader.rows.append(_agent("unknown",status="failed"))
+        assert model.get_summary("p1")["statusCounts"]=={"pending":1,"failed":1}
+        assert loader.calls==2
+        bus.publish(ProjectInitialized(project_id="p1"))
+        model.get_summary("p1")
+        assert loader.calls==3
+        expiring=AgentReadModel(EventBus(),reconcile_interval=0,loader=loader)
+        expiring.get_summary("p1")
+        expiring.get_summary("p1")
+        assert loader.calls==5
+
+    def test_changes_during_reconcile_are_replayed(self):
+        bus=EventBus()
+        loader=_Loader([_agent("a1")])
+
+        def racing_loader(project_id):
+            rows=loader(project_id)
+            if loader.calls==2:
+                bus.publish(AgentProgress(project_id="p1",agent_id="a1",progress=70,current_task="build"))
+            return rows
+        model=AgentReadModel(bus,loader=racing_loader)
+        model.get_summary("p1")
+        assert model.reconcile("p1")["progressPercent"]==70
+        assert model.get_summary("p1")["progressPercent"]==70
+        assert loader.calls==2
+
+    def test_invalidate_during_reconcile_marks_view_stale(self):
+        bus=EventBus()
+        loader=_Loader([_agent("a1")])
+
+        def racing_loader(project_id):
+            rows=loader(project_id)
+            if loader.calls==1:
+                bus.publish(ProjectInitialized(project_id="p1"))
+            return rows
+        model=AgentReadModel(bus,loader=racing_loader)
+        model.get_summary("p1")
+        model.get_summary("p1")
+        assert loader.calls==2
+
+    def test_loads_rows_from_repository(self,db_session,sample_project):
+        db_session.add(Agent(id="rm-1",project_id=sample_project.id,type="code_worker",status="running",progress=30,input_tokens=4,output_tokens=6,started_at=datetime.now()))
+        db_session.add(Agent(id="rm-2",project_id=sample_project.id,type="code_worker",status="pending",progress=0))
+        db_session.flush()
+        repo=AgentRepository(db_session)
+        model=AgentReadModel(EventBus(),loader=repo.get_summary_rows)
+        summary=model.get_summary(sample_project.id)
+        expected=repo.get_by_project(sample_project.id)
+        assert summary["total"]==len(expected)
+        assert summary["statusCounts"].get("running")==len([a for a in expected if a["status"]=="running"])
+        assert summary["inputTokens"]==sum(a["inputTokens"] for a in expected)
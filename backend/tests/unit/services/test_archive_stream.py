@@ -0,0 +1,93 @@
+import io
+import json
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from models.tables import AgentLog,AgentTrace
+from services.archive import ZipArchiver,iter_json_array,iter_zip
+from services.archive_service import ArchiveService
+
+
+def _unzip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+class TestIterZip:
+    def test_roundtrip_files_and_generated_entries(self,tmp_path):
+        (tmp_path/"main.py").write_text("print('hi')\n"*1000)
+        (tmp_path/"sprite.png").write_bytes(b"\x89PNG"+bytes(range(256))*64)
+        entries=[
+            ("src/main.py",tmp_path/"main.py"),
+            ("assets/sprite.png",tmp_path/"sprite.png"),
+            ("notes.txt",b"hello"),
+            ("rows.json",iter([b"[1,",b"2]"])),
+        ]
+        chunks=list(iter_zip(entries,chunk_size=1024))
+        assert len(chunks)>2
+        zf=_unzip(chunks)
+        assert zf.testzip() is None
+        assert zf.read("src/main.py")==(tmp_path/"main.py").read_bytes()
+        assert zf.read("assets/sprite.png")==(tmp_path/"sprite.png").read_bytes()
+        assert zf.read("notes.txt")==b"hello"
+        assert json.loads(zf.read("rows.json"))==[1,2]
+        assert zf.getinfo("assets/sprite.png").compress_type==zipfile.ZIP_STORED
+        assert zf.getinfo("src/main.py").compress_type==zipfile.ZIP_DEFLATED
+
+    def test_generated_entries_use_zip64(self):
+        with patch("zipfile.ZIP64_LIMIT",1024):
+            zf=_unzip(iter_zip([("trace.json",iter([b"x"*4096]))]))
+            assert zf.read("trace.json")==b"x"*4096
+
+    def test_generated_entries_use_archive_compresslevel(self):
+        data=bytes(range(256))*64
+        stored=_unzip(iter_zip([("a.bin",iter([data]))],compresslevel=0)).getinfo("a.bin")
+        packed=_unzip(iter_zip([("a.bin",iter([data]))],compresslevel=9)).getinfo("a.bin")
+        assert stored.compress_size>=stored.file_size
+        assert packed.compress_size<stored.compress_size
+
+    def test_yields_before_archive_is_complete(self,tmp_path):
+        (tmp_path/"big.txt").write_bytes(b"a"*(512*1024))
+        stream=iter_zip([("big.txt",tmp_path/"big.txt"),("later.txt",iter(()))],chunk_size=4096)
+        first=next(stream)
+        assert first.startswith(b"PK\x03\x04")
+        stream.close()
+
+
+class TestIterJsonArray:
+    def test_produces_valid_json(self):
+        assert json.loads(b"".join(iter_json_array([])))==[]
+        rows=[{"id":i,"text":"日本語"} for i in range(250)]
+        assert json.loads(b"".join(iter_json_array(iter(rows),batch_size=7)))==rows
+
+    def test_applies_serializer(self):
+        assert json.loads(b"".join(iter_json_array(range(3),lambda n:n*2)))==[0,2,4]
+
+
+class TestArchiveExport:
+    def test_export_streams_traces_and_logs(self,db_session,sample_project,tmp_path):
+        for i in range(3):
+            db_session.add(AgentTrace(id=f"trace-{i}",project_id=sample_project.id,agent_id="agent-1",agent_type="coder",status="completed"))
+            db_session.add(AgentLog(id=f"log-{i}",agent_id="agent-1",level="info",message=f"step {i}"))
+        db_session.add(AgentLog(id="log-other",agent_id="agent-2",level="info",message="unrelated"))
+        db_session.flush()
+
+        @contextmanager
+        def scope():
+            yield db_session
+
+        service=ArchiveService(archiver=ZipArchiver(str(tmp_path)))
+        with patch("services.archive_service.session_scope",scope):
+            zip_path=service.export_traces_to_zip(sample_project.id)
+            assert service.export_traces_to_zip("missing-project") is None
+
+        zf=zipfile.ZipFile(zip_path)
+        traces=json.loads(zf.read("traces.json"))
+        logs=json.loads(zf.read("agent_logs.json"))
+        metadata=json.loads(zf.read("metadata.json"))
+        assert sorted(t["id"] for t in traces)==["trace-0","trace-1","trace-2"]
+        assert sorted(log["id"] for log in logs)==["log-0","log-1","log-2"]
+        assert metadata["traceCount"]==3
+        assert metadata["logCount"]==3
+        assert not list(Path(tmp_path).glob("*.tmp"))
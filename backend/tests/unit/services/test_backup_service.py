@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import pytest
+
+from services.backup_service import BackupService,MODE_INCREMENTAL
+
+
+@pytest.fixture
+def live_db(tmp_path):
+    db_path=str(tmp_path/"live.db")
+    conn=sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA wal_autocheckpoint=0")
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY,payload TEXT)")
+    conn.executemany("INSERT INTO items (payload) VALUES (?)",[("x"*500,) for _ in range(200)])
+    conn.commit()
+    yield db_path,conn
+    conn.close()
+
+
+def _count(db_path):
+    conn=sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _restore_into(service,backup_path,target):
+    path,temporary=service._materialize(backup_path)
+    service._online_copy(path,target)
+    if temporary:
+        os.remove(path)
+    return _count(target)
+
+
+class TestFullBackup:
+    def test_captures_uncheckpointed_wal(self,live_db,tmp_path):
+        db_path,_=live_db
+        assert os.path.getsize(db_path+"-wal")>0
+        service=BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode="full",compress=False)
+        backup_path=service.create_backup()
+        assert backup_path.endswith(".db")
+        assert _count(backup_path)==200
+        metrics=service.get_backup_info()["last_backup_metrics"]
+        assert metrics["pages"]>0
+        assert metrics["pages_written"]==metrics["pages"]
+        assert metrics["duration_ms"]>=0
+
+    def test_compressed_roundtrip(self,live_db,tmp_path):
+        db_path,_=live_db
+        service=BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode="full",compress=True)
+        backup_path=service.create_backup()
+        assert backup_path.endswith(".db.gz")
+        assert os.path.getsize(backup_path)<os.path.getsize(db_path)+os.path.getsize(db_path+"-wal")
+        assert _restore_into(service,backup_path,str(tmp_path/"restored.db"))==200
+
+    def test_restore_replaces_live_database(self,live_db,tmp_path):
+        db_path,conn=live_db
+        service=BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode="full",compress=False)
+        backup_path=service.create_backup()
+        conn.execute("DELETE FROM items")
+        conn.commit()
+        assert _count(db_path)==0
+        assert service.restore_backup(os.path.basename(backup_path))
+        assert _count(db_path)==200
+        assert any("pre_restore" in b["name"] for b in service.list_backups())
+
+
+class TestIncrementalBackup:
+    def test_second_snapshot_writes_only_changed_pages(self,live_db,tmp_path):
+        db_path,conn=live_db
+        service=BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode=MODE_INCREMENTAL,compress=False)
+        first=service.create_backup()
+        first_metrics=service.get_backup_info()["last_backup_metrics"]
+        conn.execute("UPDATE items SET payload='y' WHERE id=1")
+        conn.commit()
+        second=service.create_backup(tag="second")
+        second_metrics=service.get_backup_info()["last_backup_metrics"]
+        assert first.endswith(".manifest") and second.endswith(".manifest")
+        assert first_metrics["pages_written"]==first_metrics["pages"]
+        assert 0<second_metrics["pages_written"]<second_metrics["pages"]//2
+        assert _restore_into(service,second,str(tmp_path/"restored.db"))==200
+
+    def test_delete_collects_unreferenced_pages(self,live_db,tmp_path):
+        db_path,conn=live_db
+        service=BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode=MODE_INCREMENTAL,compress=True)
+        first=service.create_backup()
+        conn.execute("DELETE FROM items WHERE id>100")
+        conn.commit()
+        second=service.create_backup(tag="second")
+        before=service.get_backup_info()["page_store_bytes"]
+        assert service.delete_backup(os.path.basename(first))
+        assert service.get_backup_info()["page_store_bytes"]<before
+        assert _restore_into(service,second,str(tmp_path/"restored.db"))==100
+
+    def test_unknown_mode_rejected(self,live_db,tmp_path):
+        db_path,_=live_db
+        with pytest.raises(ValueError):
+            BackupService(db_path,backup_dir=str(tmp_path/"backups"),mode="bogus")
@@ -0,0 +1,133 @@
+import io
+import os
+import random
+import hashlib
+import threading
+import pytest
+from unittest.mock import patch
+
+from services.chunked_upload_service import ChunkedUploadService,UploadError,MIN_UPLOAD_CHUNK_SIZE
+
+CHUNK=MIN_UPLOAD_CHUNK_SIZE
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def payload():
+    return random.Random(7).randbytes(CHUNK*3+123)
+
+
+def _init(service,payload,**kwargs):
+    return service.init_upload("proj",original_filename="clip.mp4",stored_filename="abc.mp4",size=len(payload),chunk_size=CHUNK,**kwargs)
+
+
+def _put(service,upload_id,payload,offset):
+    chunk=payload[offset:offset+CHUNK]
+    return service.write_chunk(upload_id,offset,io.BytesIO(chunk),len(chunk),checksum=_sha(chunk))
+
+
+class TestChunkedUpload:
+    def test_parallel_chunks_then_complete(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        upload=_init(service,payload,checksum=_sha(payload),metadata={"description":"demo"})
+        assert upload["totalChunks"]==4
+        threads=[threading.Thread(target=_put,args=(service,upload["uploadId"],payload,offset)) for offset in reversed(upload["missingOffsets"])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        status=service.get_upload(upload["uploadId"])
+        assert status["missingOffsets"]==[]
+        assert status["receivedBytes"]==len(payload)
+        registered=[]
+        result=service.complete_upload(upload["uploadId"],lambda state:registered.append(state) or"row")
+        assert result=="row"
+        assert registered[0]["storedFilename"]=="abc.mp4"
+        assert registered[0]["metadata"]=={"description":"demo"}
+        assert (tmp_path/"proj"/"abc.mp4").read_bytes()==payload
+        assert not (tmp_path/"proj"/"abc.mp4.part").exists()
+        assert service.get_upload(upload["uploadId"]) is None
+
+    def test_resume_after_restart(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        upload=_init(service,payload)
+        _put(service,upload["uploadId"],payload,0)
+        _put(service,upload["uploadId"],payload,CHUNK*2)
+        resumed=ChunkedUploadService(str(tmp_path))
+        status=resumed.get_upload(upload["uploadId"])
+        assert status["missingOffsets"]==[CHUNK,CHUNK*3]
+        for offset in status["missingOffsets"]:
+            _put(resumed,upload["uploadId"],payload,offset)
+        resumed.complete_upload(upload["uploadId"],lambda state:None)
+        assert (tmp_path/"proj"/"abc.mp4").read_bytes()==payload
+
+    def test_rejects_bad_chunks(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        upload=_init(service,payload)
+        upload_id=upload["uploadId"]
+        with pytest.raises(UploadError) as e:
+            service.write_chunk(upload_id,0,io.BytesIO(payload[:CHUNK]),CHUNK,checksum="0"*64)
+        assert e.value.status_code==422
+        with pytest.raises(UploadError):
+            service.write_chunk(upload_id,5,io.BytesIO(b"x"),1)
+        with pytest.raises(UploadError):
+            service.write_chunk(upload_id,0,io.BytesIO(payload[:10]),CHUNK)
+        assert service.get_upload(upload_id)["receivedChunks"]==[]
+        with pytest.raises(UploadError) as e:
+            service.complete_upload(upload_id,lambda state:None)
+        assert e.value.status_code==409
+
+    def test_register_failure_removes_file(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        upload=_init(service,payload)
+        for offset in upload["missingOffsets"]:
+            _put(service,upload["uploadId"],payload,offset)
+
+        def fail(state):
+            raise RuntimeError("db down")
+        with pytest.raises(RuntimeError):
+            service.complete_upload(upload["uploadId"],fail)
+        assert os.listdir(tmp_path/"proj")==[]
+
+    def test_abort_and_expiry(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path),session_ttl=0)
+        first=_init(service,payload)
+        assert service.abort_upload(first["uploadId"])
+        assert not service.abort_upload(first["uploadId"])
+        _init(service,payload)
+        assert service.cleanup_expired()==1
+        assert os.listdir(tmp_path/"proj")==[]
+
+    def test_rejects_non_integer_chunk_size(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        for chunk_size in ("65536",65536.0,True):
+            with pytest.raises(UploadError) as e:
+                service.init_upload("proj",original_filename="clip.mp4",stored_filename="abc.mp4",size=len(payload),chunk_size=chunk_size)
+            assert e.value.status_code==400
+
+    def test_chunks_after_complete_or_abort_are_client_errors(self,tmp_path,payload):
+        service=ChunkedUploadService(str(tmp_path))
+        upload=_init(service,payload)
+        for offset in upload["missingOffsets"]:
+            _put(service,upload["uploadId"],payload,offset)
+        statuses=[]
+
+        def register(state):
+            with pytest.raises(UploadError) as e:
+                _put(service,upload["uploadId"],payload,0)
+            statuses.append(e.value.status_code)
+        service.complete_upload(upload["uploadId"],register)
+        with pytest.raises(UploadError) as e:
+            _put(service,upload["uploadId"],payload,0)
+        statuses.append(e.value.status_code)
+        aborted=_init(service,payload)
+        session=service._get_session(aborted["uploadId"])
+        service.abort_upload(aborted["uploadId"])
+        with patch.object(service,"_get_session",return_value=session),pytest.raises(UploadError) as e:
+            service.write_chunk(aborted["uploadId"],0,io.BytesIO(payload[:CHUNK]),CHUNK)
+        statuses.append(e.value.status_code)
+        assert statuses==[409,404,404]
+
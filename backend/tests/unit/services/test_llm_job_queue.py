@@ -0,0 +1,186 @@
+import pytest
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock,patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.tables import Base,LlmJob
+from repositories.llm_job import LlmJobRepository
+from services.llm_job_queue import LlmJobQueue
+
+
+@pytest.fixture
+def job_db():
+    with tempfile.TemporaryDirectory() as d:
+        engine=create_engine(f"sqlite:///{os.path.join(d,'jobs.db')}",connect_args={"check_same_thread":False})
+        Base.metadata.create_all(engine)
+        SessionLocal=sessionmaker(bind=engine)
+
+        @contextmanager
+        def scope():
+            session=SessionLocal()
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+        with patch("services.llm_job_queue.session_scope",scope):
+            yield scope
+        engine.dispose()
+
+
+@pytest.fixture
+def concurrency():
+    controller=MagicMock()
+    controller.can_start_job.return_value=True
+    controller.get_max_concurrent.return_value=2
+    return controller
+
+
+@pytest.fixture
+def job_queue(job_db,concurrency):
+    queue=LlmJobQueue(concurrency_controller=concurrency,token_validator=MagicMock(),_skip_singleton=True)
+    yield queue
+    queue.stop()
+
+
+@pytest.fixture
+def fake_execution():
+    executor=MagicMock()
+    executor.return_value.execute_stream.return_value=("done",3,5,[])
+    with patch("services.llm_job_queue.get_provider",return_value=MagicMock()),patch("services.llm_job_queue.LlmStreamExecutor",executor):
+        yield executor
+
+
+def _submit(queue):
+    return queue.submit_job(project_id="p1",agent_id="a1",provider_id="mock",model="m",prompt="hi")
+
+
+class TestLlmJobQueueWakeup:
+    def test_submit_wakes_dispatcher_without_polling(self,job_queue,fake_execution):
+        job_queue._poll_interval=30.0
+        job_queue.start()
+        time.sleep(0.05)
+        job=_submit(job_queue)
+        result=job_queue.wait_for_job(job["id"],timeout=5)
+        assert result is not None
+        assert result["status"]=="completed"
+        assert result["responseContent"]=="done"
+        stats=job_queue.get_latency_stats()
+        assert stats["submit_to_start"]["count"]==1
+        assert stats["submit_to_start"]["maxMs"]<1000
+
+    def test_wait_for_job_wakes_on_completion(self,job_queue,fake_execution):
+        job_queue._wait_fallback_interval=30.0
+        job_queue.start()
+        job=_submit(job_queue)
+        started=time.monotonic()
+        result=job_queue.wait_for_job(job["id"],timeout=10)
+        assert result["status"]=="completed"
+        assert time.monotonic()-started<5
+        assert job_queue.get_latency_stats()["complete_to_wake"]["count"]==1
+
+    @pytest.mark.asyncio
+    async def test_wait_for_job_async_wakes_on_completion(self,job_queue,fake_execution):
+        job_queue._wait_fallback_interval=30.0
+        job_queue.start()
+        job=_submit(job_queue)
+        result=await asyncio.wait_for(job_queue.wait_for_job_async(job["id"],timeout=10),timeout=5)
+        assert result["status"]=="completed"
+
+    def test_wait_for_finished_job_returns_immediately(self,job_queue,job_db):
+        job=_submit(job_queue)
+        with job_db() as session:
+            LlmJobRepository(session).complete_job(job["id"],"cached",1,1)
+        result=job_queue.wait_for_job(job["id"],timeout=1)
+        assert result["status"]=="completed"
+
+    def test_wait_for_job_timeout(self,job_queue):
+        job=_submit(job_queue)
+        job_queue._wait_fallback_interval=0.05
+        assert job_queue.wait_for_job(job["id"],timeout=0.2) is None
+        assert job_queue._job_waiters=={}
+
+    def test_callback_sees_committed_status(self,job_queue,fake_execution):
+        seen=[]
+        done=threading.Event()
+
+        def callback(job):
+            seen.append(job["status"])
+            done.set()
+        job_queue.start()
+        job_queue.submit_job(project_id="p1",agent_id="a1",provider_id="mock",model="m",prompt="hi",callback=callback)
+        assert done.wait(5)
+        assert seen==["completed"]
+
+    def test_failed_job_wakes_waiter(self,job_queue,fake_execution,job_db):
+        fake_execution.return_value.execute_stream.side_effect=RuntimeError("boom")
+        fake_execution.return_value.execute_fallback.side_effect=RuntimeError("boom")
+        job_queue._wait_fallback_interval=30.0
+        job=_submit(job_queue)
+        with job_db() as session:
+            session.query(LlmJob).filter_by(id=job["id"]).update({"retry_count":3})
+        job_queue.start()
+        result=job_queue.wait_for_job(job["id"],timeout=5)
+        assert result["status"]=="failed"
+
+
+class TestLlmJobQueueWorkerPool:
+    def test_provider_instance_reused_across_jobs(self,job_queue,fake_execution):
+        with patch("services.llm_job_queue.get_provider",return_value=MagicMock()) as factory:
+            job_queue.start()
+            jobs=[_submit(job_queue) for _ in range(3)]
+            for job in jobs:
+                assert job_queue.wait_for_job(job["id"],timeout=5)["status"]=="completed"
+        assert factory.call_count==1
+
+    def test_missing_provider_fails_job(self,job_queue,fake_execution):
+        with patch("services.llm_job_queue.get_provider",return_value=None):
+            job_queue.start()
+            job=_submit(job_queue)
+            result=job_queue.wait_for_job(job["id"],timeout=5)
+        assert result["status"]=="failed"
+        assert"Provider not found" in result["errorMessage"]
+        deadline=time.time()+2
+        while job_queue._pool.get_stats()["mock"]["failed"]==0 and time.time()<deadline:
+            time.sleep(0.01)
+        assert job_queue._pool.get_stats()["mock"]["failed"]==1
+        assert job_queue._pool.get_stats()["mock"]["completed"]==0
+
+    def test_reset_providers_drops_cached_instances(self,job_queue,fake_execution):
+        with patch("services.llm_job_queue.get_provider",return_value=MagicMock()) as factory:
+            job_queue.start()
+            job=_submit(job_queue)
+            assert job_queue.wait_for_job(job["id"],timeout=5)["status"]=="completed"
+            job_queue.reset_providers("mock")
+            job=_submit(job_queue)
+            assert job_queue.wait_for_job(job["id"],timeout=5)["status"]=="completed"
+        assert factory.call_count==2
+
+    def test_job_outcomes_reported_to_health_monitor(self,job_queue,fake_execution):
+        monitor=MagicMock()
+        with patch("services.llm_job_queue.get_health_monitor",return_value=monitor):
+            job_queue.start()
+            job=_submit(job_queue)
+            assert job_queue.wait_for_job(job["id"],timeout=5)["status"]=="completed"
+            deadline=time.time()+2
+            while not monitor.record_job_outcome.called and time.time()<deadline:
+                time.sleep(0.01)
+        provider_id,success,latency_ms,error=monitor.record_job_outcome.call_args.args
+        assert (provider_id,success,error)==("mock",True,None)
+        assert latency_ms>=0
+
+    def test_pool_stats_include_pending_jobs(self,job_queue):
+        _submit(job_queue)
+        _submit(job_queue)
+        stats=job_queue.get_pool_stats()
+        assert stats["mock"]["pending"]==2
+        assert stats["mock"]["maxWorkers"]==2
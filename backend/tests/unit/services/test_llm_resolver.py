@@ -0,0 +1,65 @@
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from repositories.project_ai_config import ProjectAiConfigRepository
+from services import llm_resolver
+from services.llm_resolver import get_llm_resolution_stats,invalidate_llm_resolution,resolve_llm_for_project
+
+DEFAULT={"provider":"default-provider","model":"default-model"}
+
+
+@pytest.fixture
+def resolver(db_session):
+    calls=[]
+    real_get=ProjectAiConfigRepository.get
+
+    def counting_get(self,project_id,usage_category):
+        calls.append((project_id,usage_category))
+        return real_get(self,project_id,usage_category)
+
+    @contextmanager
+    def scope():
+        yield db_session
+    invalidate_llm_resolution()
+    with patch("models.database.session_scope",scope),\
+         patch.object(ProjectAiConfigRepository,"get",counting_get),\
+         patch.object(llm_resolver,"_get_usage_category_default",side_effect=lambda cat:dict(DEFAULT)):
+        yield calls
+    invalidate_llm_resolution()
+
+
+class TestResolutionCache:
+    def test_repeat_lookups_skip_database(self,resolver,db_session,sample_project):
+        ProjectAiConfigRepository(db_session).save(sample_project.id,"llm_high","anthropic","claude-x")
+        resolver.clear()
+        hits=get_llm_resolution_stats()["hits"]
+        for _ in range(5):
+            assert resolve_llm_for_project(sample_project.id,"llm_high")=={"provider":"anthropic","model":"claude-x"}
+        assert resolve_llm_for_project(sample_project.id,"llm_low")==DEFAULT
+        assert resolve_llm_for_project(sample_project.id,"llm_low")==DEFAULT
+        assert len(resolver)==2
+        assert get_llm_resolution_stats()["hits"]-hits==5
+
+    def test_invalidation_picks_up_changes(self,resolver,db_session,sample_project):
+        repo=ProjectAiConfigRepository(db_session)
+        repo.save(sample_project.id,"llm_high","anthropic","claude-x")
+        resolve_llm_for_project(sample_project.id,"llm_high")
+        repo.save(sample_project.id,"llm_high","openai","gpt-x")
+        assert resolve_llm_for_project(sample_project.id,"llm_high")["model"]=="claude-x"
+        invalidate_llm_resolution(sample_project.id)
+        assert resolve_llm_for_project(sample_project.id,"llm_high")["model"]=="gpt-x"
+        repo.delete(sample_project.id,"llm_high")
+        invalidate_llm_resolution(sample_project.id)
+        assert resolve_llm_for_project(sample_project.id,"llm_high")==DEFAULT
+
+    def test_returned_dict_is_a_copy(self,resolver):
+        resolved=resolve_llm_for_project(None,"llm_low")
+        resolved["model"]="mutated"
+        assert resolve_llm_for_project(None,"llm_low")==DEFAULT
+
+    def test_lookup_errors_are_not_cached(self,resolver,sample_project):
+        with patch.object(ProjectAiConfigRepository,"get",side_effect=RuntimeError("db locked")):
+            assert resolve_llm_for_project(sample_project.id,"llm_high")==DEFAULT
+        resolve_llm_for_project(sample_project.id,"llm_high")
+        assert resolver==[(sample_project.id,"llm_high")]
@@ -0,0 +1,152 @@
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+
+from services.llm_worker_pool import LlmWorkerPool
+
+
+class Recorder:
+    def __init__(self,hold:float=0.0):
+        self.hold=hold
+        self.lock=threading.Lock()
+        self.active=0
+        self.peak=0
+        self.done=[]
+        self.providers=[]
+
+    def __call__(self,job_id,provider_id,provider):
+        with self.lock:
+            self.active+=1
+            self.peak=max(self.peak,self.active)
+            self.providers.append(provider)
+        time.sleep(self.hold)
+        with self.lock:
+            self.active-=1
+            self.done.append(job_id)
+        return True
+
+
+def _wait_until(predicate,timeout=5.0):
+    deadline=time.time()+timeout
+    while time.time()<deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def make_pool():
+    pools=[]
+
+    def factory(execute,max_workers=2,provider_factory=None,idle_timeout=60.0):
+        pool=LlmWorkerPool(execute,provider_factory or (lambda pid:MagicMock(name=pid)),lambda pid:max_workers,idle_timeout=idle_timeout)
+        pools.append(pool)
+        return pool
+    yield factory
+    for pool in pools:
+        pool.stop()
+
+
+class TestLlmWorkerPool:
+    def test_concurrency_bounded_by_max_workers(self,make_pool):
+        recorder=Recorder(hold=0.05)
+        pool=make_pool(recorder,max_workers=2)
+        for i in range(8):
+            pool.submit("mock",f"job-{i}")
+        assert _wait_until(lambda:len(recorder.done)==8)
+        assert recorder.peak==2
+        assert pool.get_stats()["mock"]["workers"]<=2
+
+    def test_provider_created_once_per_provider(self,make_pool):
+        recorder=Recorder()
+        created=[]
+
+        def provider_factory(pid):
+            created.append(pid)
+            return MagicMock(name=pid)
+        pool=make_pool(recorder,provider_factory=provider_factory)
+        for i in range(5):
+            pool.submit("a",f"a-{i}")
+            pool.submit("b",f"b-{i}")
+        assert _wait_until(lambda:len(recorder.done)==10)
+        assert sorted(created)==["a","b"]
+        assert len({id(p) for p in recorder.providers})==2
+
+    def test_reset_providers_recreates_instance(self,make_pool):
+        recorder=Recorder()
+        factory=MagicMock(side_effect=lambda pid:MagicMock())
+        pool=make_pool(recorder,provider_factory=factory)
+        pool.submit("mock","j1")
+        assert _wait_until(lambda:len(recorder.done)==1)
+        pool.reset_providers("mock")
+        pool.submit("mock","j2")
+        assert _wait_until(lambda:len(recorder.done)==2)
+        assert factory.call_count==2
+
+    def test_missing_provider_is_retried(self,make_pool):
+        recorder=Recorder()
+        factory=MagicMock(side_effect=[None,MagicMock()])
+        pool=make_pool(recorder,provider_factory=factory)
+        pool.submit("mock","j1")
+        assert _wait_until(lambda:len(recorder.done)==1)
+        pool.submit("mock","j2")
+        assert _wait_until(lambda:len(recorder.done)==2)
+        assert recorder.providers[0] is None
+        assert recorder.providers[1] is not None
+
+    def test_execute_error_counts_failure_and_keeps_worker(self,make_pool):
+        calls=[]
+
+        def execute(job_id,provider_id,provider):
+            calls.append(job_id)
+            if job_id=="bad":
+                raise RuntimeError("boom")
+            return True
+        pool=make_pool(execute,max_workers=1)
+        pool.submit("mock","bad")
+        pool.submit("mock","good")
+        assert _wait_until(lambda:pool.get_stats()["mock"]["completed"]==1)
+        stats=pool.get_stats()["mock"]
+        assert stats["failed"]==1
+        assert calls==["bad","good"]
+
+    def test_unsuccessful_execute_counts_failure(self,make_pool):
+        pool=make_pool(lambda job_id,provider_id,provider:job_id=="good",max_workers=1)
+        pool.submit("mock","bad")
+        pool.submit("mock","good")
+        assert _wait_until(lambda:pool.get_stats()["mock"]["completed"]==1)
+        assert pool.get_stats()["mock"]["failed"]==1
+
+    def test_reset_providers_refreshes_limits(self):
+        limits={"mock":1}
+        pool=LlmWorkerPool(Recorder(),lambda pid:MagicMock(),lambda pid:limits[pid])
+        pool.submit("mock","j1")
+        limits["mock"]=4
+        pool.reset_providers()
+        assert pool.get_stats()["mock"]["maxWorkers"]==4
+        pool.stop()
+
+    def test_idle_workers_exit(self,make_pool):
+        recorder=Recorder()
+        pool=make_pool(recorder,idle_timeout=0.05)
+        pool.submit("mock","j1")
+        assert _wait_until(lambda:len(recorder.done)==1)
+        assert _wait_until(lambda:pool.get_stats()["mock"]["workers"]==0)
+
+    def test_stats_report_queue_depth_and_wait(self,make_pool):
+        gate=threading.Event()
+
+        def execute(job_id,provider_id,provider):
+            return gate.wait(5)
+        pool=make_pool(execute,max_workers=1)
+        for i in range(3):
+            pool.submit("mock",f"j{i}")
+        assert _wait_until(lambda:pool.get_stats()["mock"]["activeWorkers"]==1)
+        stats=pool.get_stats()["mock"]
+        assert stats["queueDepth"]==2
+        assert stats["maxWorkers"]==1
+        gate.set()
+        assert _wait_until(lambda:pool.get_stats()["mock"]["completed"]==3)
+        assert pool.get_stats()["mock"]["waitMaxMs"]>0
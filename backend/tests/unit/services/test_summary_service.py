@@ -0,0 +1,93 @@
+import threading
+import time
+import pytest
+from contextlib import contextmanager
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.tables import Base
+from services.summary_service import SummaryService
+
+SETTINGS={"llm_summary":{"enabled":True,"min_content_length":10,"cache":{"enabled":True,"ttl_seconds":60}}}
+
+
+@pytest.fixture
+def service(tmp_path):
+    engine=create_engine(f"sqlite:///{tmp_path/'cache.db'}",connect_args={"check_same_thread":False})
+    Base.metadata.create_all(engine)
+    SessionLocal=sessionmaker(bind=engine)
+
+    @contextmanager
+    def scope():
+        session=SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    SummaryService._instance=None
+    svc=SummaryService()
+    with patch("services.summary_service.session_scope",scope),\
+         patch("services.summary_service.get_context_policy_settings",return_value=SETTINGS),\
+         patch("services.summary_service.get_summary_directive",return_value="keep names"),\
+         patch.object(SummaryService,"_resolve_summary_llm",return_value=("mock","model-a")):
+        yield svc
+    SummaryService._instance=None
+    engine.dispose()
+
+
+class SlowLlm:
+    def __init__(self,delay=0.0):
+        self.delay=delay
+        self.calls=0
+        self.lock=threading.Lock()
+
+    def __call__(self,content,agent_type,llm_cfg,provider_id,model,focus=None):
+        with self.lock:
+            self.calls+=1
+        time.sleep(self.delay)
+        return f"summary:{focus or ''}:{content[:5]}"
+
+
+class TestSummaryCache:
+    def test_repeat_requests_hit_cache(self,service):
+        llm=SlowLlm()
+        with patch.object(service,"_call_llm_summary",llm):
+            first=service.generate_summary("a long agent output","writer")
+            second=service.generate_summary("a long agent output","writer")
+            focused=service.generate_focused_extraction("a long agent output","writer","names")
+        assert first==second
+        assert focused!=first
+        assert llm.calls==2
+        stats=service.get_cache_stats()
+        assert stats["hits"]==1
+        assert stats["misses"]==2
+        assert stats["entries"]==2
+
+    def test_concurrent_identical_requests_share_one_call(self,service):
+        llm=SlowLlm(delay=0.2)
+        results=[]
+        with patch.object(service,"_call_llm_summary",llm):
+            threads=[threading.Thread(target=lambda:results.append(service.generate_summary("same content here","writer"))) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert llm.calls==1
+        assert len(set(results))==1 and len(results)==5
+        assert service.get_cache_stats()["inFlight"]==0
+
+    def test_failures_are_not_cached(self,service):
+        def fail(*args,**kwargs):
+            raise RuntimeError("provider down")
+        with patch.object(service,"_call_llm_summary",fail):
+            assert service.generate_summary("a long agent output","writer",fallback_func=lambda c:"fallback")=="fallback"
+        llm=SlowLlm()
+        with patch.object(service,"_call_llm_summary",llm):
+            service.generate_summary("a long agent output","writer")
+        assert llm.calls==1
+        assert service.get_cache_stats()["errors"]==1
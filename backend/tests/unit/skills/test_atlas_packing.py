@@ -0,0 +1,97 @@
+import json
+import random
+import pytest
+
+from skills.atlas_packing import MaxRectsBin,next_power_of_two,pack_rects,previous_power_of_two
+from skills.base import SkillContext
+from skills.game_skills import SpriteSheetSkill
+
+
+def _overlaps(a,b):
+ return not (a.x>=b.x+b.width or b.x>=a.x+a.width or a.y>=b.y+b.height or b.y>=a.y+a.height)
+
+
+class TestPackRects:
+ def test_places_mixed_sizes_without_overlap(self):
+  rng=random.Random(3)
+  sizes=[(f"f{i}",rng.randint(4,120),rng.randint(4,120)) for i in range(80)]
+  pages=pack_rects(sizes,512,512,padding=2)
+  placements=[p for page in pages for p in page.placements]
+  assert sorted(p.key for p in placements)==sorted(s[0] for s in sizes)
+  for page in pages:
+   for i,a in enumerate(page.placements):
+    assert a.x+a.width<=page.width<=512
+    assert a.y+a.height<=page.height<=512
+    for b in page.placements[i+1:]:
+     assert not _overlaps(a,b)
+
+ def test_denser_than_uniform_grid(self):
+  sizes=[("big",256,256)]+[(f"s{i}",32,32) for i in range(48)]
+  pages=pack_rects(sizes,1024,1024)
+  assert len(pages)==1
+  grid_area=256*256*len(sizes)
+  assert pages[0].width*pages[0].height<grid_area/4
+
+ def test_multi_page_rotation_and_power_of_two(self):
+  pages=pack_rects([(f"f{i}",100,60) for i in range(6)],128,128,power_of_two=True)
+  assert len(pages)==3
+  assert all((page.width,page.height)==(128,128) for page in pages)
+  rotated=pack_rects([("tall",30,100)],100,40,allow_rotation=True)
+  assert rotated[0].placements[0].rotated
+  assert (rotated[0].width,rotated[0].height)==(100,30)
+  with pytest.raises(ValueError):
+   pack_rects([("huge",300,10)],128,128)
+
+ def test_power_of_two_pages_stay_within_max_size(self):
+  pages=pack_rects([("a",1500,10),("b",900,900)],3000,3000,power_of_two=True)
+  assert all(page.width<=2048 and page.height<=2048 for page in pages)
+  with pytest.raises(ValueError):
+   pack_rects([("a",2100,10)],3000,3000,0,False,True)
+  assert previous_power_of_two(3000)==2048
+  assert previous_power_of_two(2048)==2048
+
+ def test_bin_rejects_when_full(self):
+  bin_=MaxRectsBin(64,64)
+  assert bin_.insert(64,32)==(0,0,64,32,False)
+  assert bin_.insert(64,32)==(0,32,64,32,False)
+  assert bin_.insert(1,1) is None
+  assert next_power_of_two(65)==128
+
+
+class TestSpriteSheetAtlas:
+ @pytest.mark.asyncio
+ async def test_packs_trimmed_frames_with_frame_map(self,tmp_path):
+  Image=pytest.importorskip("PIL.Image")
+  frames_dir=tmp_path/"frames"
+  frames_dir.mkdir()
+  for i,(w,h) in enumerate([(64,64),(32,48),(16,16)]):
+   img=Image.new("RGBA",(w,h),(0,0,0,0))
+   img.paste((255,0,0,255),(4,4,w-4,h-4))
+   img.save(frames_dir/f"frame_{i}.png")
+  context=SkillContext(project_id="p",agent_id="a",working_dir=str(tmp_path))
+  result=await SpriteSheetSkill().execute(context,operation="pack",input_dir="frames",path="out/atlas.png",layout="maxrects",trim=True,power_of_two=True)
+  assert result.success,result.error
+  frame_map=json.loads((tmp_path/"out"/"atlas.json").read_text())
+  frame=frame_map["frames"]["frame_0.png"]
+  assert frame["trimmed"]
+  assert frame["spriteSourceSize"]=={"x":4,"y":4,"w":56,"h":56}
+  assert frame["sourceSize"]=={"w":64,"h":64}
+  assert frame_map["meta"]["pages"][0]["image"]=="atlas.png"
+  assert Image.open(tmp_path/"out"/"atlas.png").size==(64,128)
+
+ @pytest.mark.asyncio
+ async def test_rotated_frame_reports_unrotated_size(self,tmp_path):
+  Image=pytest.importorskip("PIL.Image")
+  frames_dir=tmp_path/"frames"
+  frames_dir.mkdir()
+  Image.new("RGBA",(32,64),(255,0,0,255)).save(frames_dir/"tall.png")
+  Image.new("RGBA",(64,32),(0,255,0,255)).save(frames_dir/"wide.png")
+  context=SkillContext(project_id="p",agent_id="a",working_dir=str(tmp_path))
+  result=await SpriteSheetSkill().execute(context,operation="pack",input_dir="frames",path="out/atlas.png",layout="maxrects",allow_rotation=True,max_size=64)
+  assert result.success,result.error
+  frame=json.loads((tmp_path/"out"/"atlas.json").read_text())["frames"]["tall.png"]
+  assert frame["rotated"]
+  assert (frame["frame"]["w"],frame["frame"]["h"])==(32,64)
+  atlas=Image.open(tmp_path/"out"/"atlas.png")
+  x,y=frame["frame"]["x"],frame["frame"]["y"]
+  assert atlas.getpixel((x+63,y+31))==(255,0,0,255)
@@ -0,0 +1,149 @@
+import os
+import pytest
+from unittest.mock import patch
+
+from skills.base import SkillContext
+from skills.analysis_skills import DependencyGraphSkill,DependencyIndex,clear_dependency_indexes,get_dependency_index,_on_file_changed,_graph_indexes
+
+
+def _write(root,rel,content):
+ path=root/rel
+ path.parent.mkdir(parents=True,exist_ok=True)
+ path.write_text(content)
+ return path
+
+
+@pytest.fixture
+def project(tmp_path):
+ root=tmp_path/"proj"
+ _write(root,"app/__init__.py","")
+ _write(root,"app/main.py","import app.core.engine\nimport app.utils\n")
+ _write(root,"app/core/__init__.py","")
+ _write(root,"app/core/engine.py","from app.utils import helpers\n")
+ _write(root,"app/utils.py","import os\n")
+ _write(root,"node_modules/app/utils.py","")
+ return root
+
+
+@pytest.fixture(autouse=True)
+def isolated_indexes(tmp_path):
+ clear_dependency_indexes()
+ with patch("skills.analysis_skills._graph_cache_dir",return_value=str(tmp_path/"graphs")):
+  yield
+ clear_dependency_indexes()
+
+
+def _edges(index):
+ return {(e["source"],e["target"]) for e in index.edges()}
+
+
+class TestDependencyIndex:
+ def test_resolves_python_modules_by_suffix(self,project):
+  index=DependencyIndex(str(project),"python")
+  index.refresh()
+  assert _edges(index)=={
+   ("app/main.py","app/core/engine.py"),
+   ("app/main.py","app/utils.py"),
+   ("app/core/engine.py","app/utils.py"),
+  }
+  assert index.dependents("app/utils.py")==["app/core/engine.py","app/main.py"]
+  assert index.impacted("app/utils.py")==["app/core/engine.py","app/main.py"]
+
+ def test_resolves_js_relative_and_index_imports(self,tmp_path):
+  _write(tmp_path,"src/app.js","import a from './lib/a'\nconst w=require('./widgets')\nimport x from 'react'\n")
+  _write(tmp_path,"src/lib/a.js","")
+  _write(tmp_path,"src/widgets/index.js","import a from '../lib/a'\n")
+  index=DependencyIndex(str(tmp_path),"javascript")
+  index.refresh()
+  assert _edges(index)=={
+   ("src/app.js","src/lib/a.js"),
+   ("src/app.js","src/widgets/index.js"),
+   ("src/widgets/index.js","src/lib/a.js"),
+  }
+
+ def test_incremental_refresh_reparses_only_changed_files(self,project):
+  index=DependencyIndex(str(project),"python")
+  index.refresh()
+  parsed=index.stats["parsedFiles"]
+  _write(project,"app/core/engine.py","import os\n")
+  os.utime(project/"app/core/engine.py",(1,1))
+  index.refresh()
+  assert index.stats["parsedFiles"]==parsed+1
+  assert index.dependents("app/utils.py")==["app/main.py"]
+  _write(project,"app/extra.py","import app.core.engine\n")
+  (project/"app/utils.py").unlink()
+  index.refresh()
+  assert index.stats["parsedFiles"]==parsed+2
+  assert not index.has_file("app/utils.py")
+  assert index.dependents("app/core/engine.py")==["app/extra.py","app/main.py"]
+
+ def test_watched_refresh_uses_change_events(self,project):
+  index=DependencyIndex(str(project),"python")
+  index.refresh()
+  scans=index.stats["scans"]
+  _write(project,"app/utils.py","import app.main\n")
+  index.refresh(watched=True)
+  assert index.dependencies("app/utils.py")==[]
+  index.mark_dirty(str(project/"app/utils.py"))
+  index.refresh(watched=True)
+  assert index.dependencies("app/utils.py")==["app/main.py"]
+  assert index.stats["scans"]==scans
+
+ def test_persisted_graph_skips_unchanged_files(self,project,tmp_path):
+  DependencyIndex(str(project),"python",str(tmp_path/"graphs")).refresh()
+  reloaded=DependencyIndex(str(project),"python",str(tmp_path/"graphs"))
+  reloaded.refresh()
+  assert reloaded.stats["parsedFiles"]==0
+  assert reloaded.dependents("app/utils.py")==["app/core/engine.py","app/main.py"]
+
+
+class TestDependencyIndexCache:
+ def test_in_memory_indexes_are_bounded(self,tmp_path):
+  roots=[]
+  for i in range(3):
+   _write(tmp_path,f"p{i}/m.py","import os\n")
+   roots.append(os.path.normpath(str(tmp_path/f"p{i}")))
+  with patch("skills.analysis_skills.MAX_GRAPH_INDEXES",2):
+   get_dependency_index(roots[0],"python")
+   get_dependency_index(roots[1],"python")
+   get_dependency_index(roots[0],"python")
+   get_dependency_index(roots[2],"python")
+  assert list(_graph_indexes)==[(roots[0],"python"),(roots[2],"python")]
+
+ def test_persisted_graphs_are_pruned(self,tmp_path):
+  graphs=tmp_path/"graphs"
+  for i in range(4):
+   _write(tmp_path,f"p{i}/m.py","import os\n")
+  with patch("skills.analysis_skills.MAX_PERSISTED_GRAPHS",2):
+   for i in range(4):
+    index=DependencyIndex(str(tmp_path/f"p{i}"),"python",str(graphs))
+    index.refresh()
+  assert len(list(graphs.glob("*.json")))==2
+  assert os.path.exists(index._persist_path)
+
+
+class TestDependencyGraphSkill:
+ @pytest.fixture
+ def context(self,project):
+  return SkillContext(project_id="p",agent_id="a",working_dir=str(project))
+
+ @pytest.mark.asyncio
+ async def test_impact_analysis_for_file(self,project,context):
+  skill=DependencyGraphSkill()
+  result=await skill.execute(context,operation="impact_analysis",path="app/utils.py")
+  assert result.success
+  assert result.output["file"]=="app/utils.py"
+  assert result.output["impactedFiles"]==["app/core/engine.py","app/main.py"]
+  assert result.output["directDependents"]==["app/core/engine.py","app/main.py"]
+
+ @pytest.mark.asyncio
+ async def test_detect_cycles_after_change_notification(self,project,context):
+  skill=DependencyGraphSkill()
+  result=await skill.execute(context,operation="detect_cycles")
+  assert not result.output["hasCycles"]
+  path=_write(project,"app/utils.py","import app.main\n")
+  _on_file_changed(str(path),"modified",False)
+  with patch("skills.analysis_skills.is_path_watched",return_value=True):
+   result=await skill.execute(context,operation="detect_cycles")
+  assert result.output["hasCycles"]
+  assert all("app/utils.py" in cycle for cycle in result.output["cycles"])
@@ -1158,6 +1158,8 @@ export interface ToolExecutionLimits{
 
 export interface DagExecutionSettings{
  enabled:boolean
+ scheduler?:'ready_queue'|'layered'
+ max_parallel?:number
 }
 
 export interface TokenBudgetSettings{
@@ -1639,6 +1641,10 @@ export interface ProviderMonitorInfo{
  lastChecked:string|null
  latency:number|null
  errorMessage:string|null
+ queueDepth:number
+ activeWorkers:number
+ maxWorkers:number
+ queueWaitMs:number
 }
 
 export interface ProviderLogEntry{
@@ -47,7 +47,10 @@ interface ServerToClientEvents{
   interventions?:Intervention[]
   metrics?:ProjectMetrics
   logs?:ApiSystemLog[]
+  epoch?:string|null
+  seq?:number|null
  })=>void
+ 'connection:delta_sync':(data:{projectId:string;project?:Project;epoch:string;seq:number;events:{event:string;data:unknown}[]})=>void
  'agent:started':(data:{agent:Agent;agentId:string;projectId:string})=>void
  'agent:created':(data:{agent:Agent;agentId:string;projectId:string;parentAgentId?:string})=>void
  'agent:running':(data:{agent:Agent;agentId:string;projectId:string})=>void
@@ -78,10 +81,11 @@ interface ServerToClientEvents{
  'agent:speech':(data:{agentId:string;projectId:string;message:string;source:'llm'|'pool';timestamp:string})=>void
  'system_log:created':(data:{projectId:string;log:ApiSystemLog})=>void
  'budget_warning':(data:{type:string;status:BudgetWarningStatus})=>void
+ 'events:batch':(data:{events:{event:string;data:unknown}[]})=>void
 }
 
 interface ClientToServerEvents{
- 'subscribe:project':(projectId:string)=>void
+ 'subscribe:project':(data:string|{projectId:string;lastSeq:number;epoch:string|null})=>void
  'unsubscribe:project':(projectId:string)=>void
  'checkpoint:resolve':(data:{checkpointId:string;resolution:string;feedback?:string})=>void
 }
@@ -105,6 +109,9 @@ class WebSocketService{
  }
  private pendingProjectId:string|null=null
  private currentProjectId:string|null=null
+ private syncProjectId:string|null=null
+ private lastSeq:number|null=null
+ private epoch:string|null=null
 
  connect(backendUrl:string,config?:WebSocketConfig):void{
   if(this.socket?.connected){
@@ -160,6 +167,20 @@ class WebSocketService{
    useConnectionStore.getState().setError(error.message)
   })as()=>void)
 
+  this.socket.onAny((event:string,data:unknown)=>{
+   if(!event.startsWith('connection:')&&!this.hasListeners(event))this.trackSeq(data)
+  })
+
+  this.socket.on('connection:delta_sync',(data)=>{
+   console.log('[WS] Delta sync received:',{events:data.events.length,seq:data.seq})
+   if(data.projectId!==this.syncProjectId)return
+   for(const{event,data:payload}of data.events){
+    this.dispatch(event,payload)
+   }
+   this.lastSeq=Math.max(this.lastSeq??0,data.seq)
+   this.epoch=data.epoch
+  })
+
   this.socket.on('connection:state_sync',(data)=>{
    console.log('[WS] State sync received:',{
     hasAgents:data.agents?.length||0,
@@ -170,6 +191,11 @@ class WebSocketService{
     status:data.status
    })
 
+   if(typeof data.seq==='number'){
+    this.lastSeq=data.seq
+    this.epoch=data.epoch??null
+   }
+
    if(data.agents&&data.agents.length>0){
     console.log('[WS] Setting agents from state sync:',data.agents.length)
     useAgentStore.getState().setAgents(data.agents)
@@ -190,7 +216,7 @@ class WebSocketService{
    }
   })
 
-  this.socket.on('agent:started',(data)=>{
+  this.on('agent:started',(data)=>{
    console.log('[WS] Agent started:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -201,7 +227,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_started',name,`${name} が開始しました`,data.agentId)
   })
 
-  this.socket.on('agent:created',(data)=>{
+  this.on('agent:created',(data)=>{
    console.log('[WS] Agent created:',data.agentId,'parent:',data.parentAgentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -209,7 +235,7 @@ class WebSocketService{
    }
   })
 
-  this.socket.on('agent:running',(data)=>{
+  this.on('agent:running',(data)=>{
    console.log('[WS] Agent running:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -218,7 +244,7 @@ class WebSocketService{
    agentStore.updateAgentStatus(data.agentId,'running')
   })
 
-  this.socket.on('agent:waiting_provider',(data)=>{
+  this.on('agent:waiting_provider',(data)=>{
    console.log('[WS] Agent waiting provider:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -230,7 +256,13 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_waiting_provider',name,`${name} がプロバイダ待機中`,data.agentId)
   })
 
-  this.socket.on('agent:progress',(data)=>{
+  this.socket.on('events:batch',({events})=>{
+   for(const{event,data}of events){
+    this.dispatch(event,data)
+   }
+  })
+
+  this.on('agent:progress',(data)=>{
    console.log('[WS] Agent progress:',data.agentId,data.progress+'%')
    const agentStore=useAgentStore.getState()
    agentStore.updateAgent(data.agentId,{
@@ -240,11 +272,11 @@ class WebSocketService{
    })
   })
 
-  this.socket.on('agent:log',({agentId,entry})=>{
+  this.on('agent:log',({agentId,entry})=>{
    useAgentStore.getState().addLogEntry(agentId,entry)
   })
 
-  this.socket.on('agent:completed',(data)=>{
+  this.on('agent:completed',(data)=>{
    console.log('[WS] Agent completed:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -259,7 +291,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_completed',name,`${name} が完了しました`,data.agentId)
   })
 
-  this.socket.on('agent:failed',(data)=>{
+  this.on('agent:failed',(data)=>{
    console.error('[WS] Agent failed:',data.agentId,data.error)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -278,7 +310,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_failed',name,`${name} がエラーで停止: ${data.error}`,data.agentId)
   })
 
-  this.socket.on('agent:paused',(data)=>{
+  this.on('agent:paused',(data)=>{
    console.log('[WS] Agent paused:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -289,7 +321,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_paused',name,`${name} が一時停止しました`,data.agentId)
   })
 
-  this.socket.on('agent:resumed',(data)=>{
+  this.on('agent:resumed',(data)=>{
    console.log('[WS] Agent resumed:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -300,7 +332,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_resumed',name,`${name} が再開しました`,data.agentId)
   })
 
-  this.socket.on('agent:retry',(data)=>{
+  this.on('agent:retry',(data)=>{
    console.log('[WS] Agent retry:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -311,7 +343,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_retry',name,`${name} が再試行待ちに設定されました`,data.agentId)
   })
 
-  this.socket.on('agent:activated',(data)=>{
+  this.on('agent:activated',(data)=>{
    console.log('[WS] Agent activated:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -320,7 +352,7 @@ class WebSocketService{
    agentStore.updateAgentStatus(data.agentId,'running')
   })
 
-  this.socket.on('agent:waiting_response',(data)=>{
+  this.on('agent:waiting_response',(data)=>{
    console.log('[WS] Agent waiting response:',data.agentId)
    const agentStore=useAgentStore.getState()
    if(data.agent){
@@ -332,7 +364,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('agent_waiting_response',name,`${name} がオペレーターの返答を待っています`,data.agentId)
   })
 
-  this.socket.on('checkpoint:created',(data)=>{
+  this.on('checkpoint:created',(data)=>{
    console.log('[WS] Checkpoint created:',data.checkpointId)
    if(data.checkpoint){
     useCheckpointStore.getState().addCheckpoint(data.checkpoint)
@@ -346,7 +378,7 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('checkpoint_created',name,`${name} が承認を待っています`,data.agentId)
   })
 
-  this.socket.on('checkpoint:resolved',(data)=>{
+  this.on('checkpoint:resolved',(data)=>{
    console.log('[WS] Checkpoint resolved:',data.checkpoint?.id||data.checkpointId)
    if(data.checkpoint){
     useCheckpointStore.getState().updateCheckpoint(data.checkpoint.id,data.checkpoint)
@@ -361,47 +393,47 @@ class WebSocketService{
    }
   })
 
-  this.socket.on('asset:created',(data)=>{
+  this.on('asset:created',(data)=>{
    console.log('[WS] Asset created:',data.asset?.id)
    if(data.asset){
     useAssetStore.getState().addOrUpdateAsset(data.asset)
    }
   })
 
-  this.socket.on('asset:updated',(data)=>{
+  this.on('asset:updated',(data)=>{
    console.log('[WS] Asset updated:',data.asset?.id)
    if(data.asset){
     useAssetStore.getState().addOrUpdateAsset(data.asset)
    }
   })
 
-  this.socket.on('intervention:created',(data)=>{
+  this.on('intervention:created',(data)=>{
    console.log('[WS] Intervention created:',data.interventionId)
    if(data.intervention){
     useInterventionStore.getState().addIntervention(data.intervention)
    }
   })
 
-  this.socket.on('intervention:acknowledged',(data)=>{
+  this.on('intervention:acknowledged',(data)=>{
    console.log('[WS] Intervention acknowledged:',data.interventionId)
    if(data.intervention){
     useInterventionStore.getState().updateIntervention(data.interventionId,data.intervention)
    }
   })
 
-  this.socket.on('intervention:processed',(data)=>{
+  this.on('intervention:processed',(data)=>{
    console.log('[WS] Intervention processed:',data.interventionId)
    if(data.intervention){
     useInterventionStore.getState().updateIntervention(data.interventionId,data.intervention)
    }
   })
 
-  this.socket.on('intervention:deleted',(data)=>{
+  this.on('intervention:deleted',(data)=>{
    console.log('[WS] Intervention deleted:',data.interventionId)
    useInterventionStore.getState().removeIntervention(data.interventionId)
   })
 
-  this.socket.on('intervention:response_added',(data)=>{
+  this.on('intervention:response_added',(data)=>{
    console.log('[WS] Intervention response added:',data.interventionId,'sender:',data.sender)
    if(data.intervention){
     useInterventionStore.getState().updateIntervention(data.interventionId,data.intervention)
@@ -414,24 +446,24 @@ class WebSocketService{
    }
   })
 
-  this.socket.on('project:updated',({projectId,updates})=>{
+  this.on('project:updated',({projectId,updates})=>{
    console.log('[WS] Project updated:',projectId)
    useProjectStore.getState().updateProject(projectId,updates)
   })
 
-  this.socket.on('phase:changed',({projectId,phase,phaseName})=>{
+  this.on('phase:changed',({projectId,phase,phaseName})=>{
    console.log('[WS] Phase changed:',projectId,phase,phaseName)
    useProjectStore.getState().updateProject(projectId,{currentPhase:phase})
    useToastStore.getState().addToast('info',`PHASE ${phase} - ${phaseName} に移行しました`)
    useActivityFeedStore.getState().addEvent('phase_changed','System',`PHASE ${phase} - ${phaseName} に移行しました`)
   })
 
-  this.socket.on('metrics:update',({projectId,metrics})=>{
+  this.on('metrics:update',({projectId,metrics})=>{
    console.log('[WS] Metrics updated:',projectId,'Progress:',metrics.progressPercent+'%')
    useMetricsStore.getState().setProjectMetrics(metrics)
   })
 
-  this.socket.on('agent:snapshot_restored',(data)=>{
+  this.on('agent:snapshot_restored',(data)=>{
    console.log('[WS] Agent snapshot restored:',data.agentId,data.snapshotId)
    const agent=useAgentStore.getState().agents.find(a=>a.id===data.agentId)
    const name=getAgentDisplayName(agent)
@@ -439,23 +471,23 @@ class WebSocketService{
    useActivityFeedStore.getState().addEvent('snapshot_restored',name,`${name} のスナップショットが復元されました`,data.agentId)
   })
 
-  this.socket.on('agent:speech',(data)=>{
+  this.on('agent:speech',(data)=>{
    useSpeechStore.getState().addSpeech(data.agentId,data.message,data.source)
   })
 
-  this.socket.on('navigator:message',({speaker,text,priority})=>{
+  this.on('navigator:message',({speaker,text,priority})=>{
    console.log('[WS] Navigator message received:',speaker,text.substring(0,50)+'...')
    useNavigatorStore.getState().showServerMessage(speaker,text,priority)
   })
 
-  this.socket.on('system_log:created',(data)=>{
+  this.on('system_log:created',(data)=>{
    console.log('[WS] System log created:',data.log?.level,data.log?.source)
    if(data.log){
     useLogStore.getState().addLog(data.log)
    }
   })
 
-  this.socket.on('budget_warning',(data)=>{
+  this.on('budget_warning',(data)=>{
    console.log('[WS] Budget warning received:',data.type)
    if(data.type==='budget_exceeded'){
     useToastStore.getState().addToast('error',`予算を超過しました (${data.status.current_usage.toFixed(2)}/${data.status.monthly_limit.toFixed(2)})`)
@@ -471,11 +503,52 @@ class WebSocketService{
    console.warn('[WS] Cannot subscribe: No socket')
    return
   }
-  console.log('[WS] Emitting subscribe:project for:',projectId)
-  this.socket.emit('subscribe:project',projectId)
+  if(this.syncProjectId===projectId&&this.lastSeq!==null){
+   console.log('[WS] Emitting subscribe:project for:',projectId,'since seq:',this.lastSeq)
+   this.socket.emit('subscribe:project',{projectId,lastSeq:this.lastSeq,epoch:this.epoch})
+  }else{
+   console.log('[WS] Emitting subscribe:project for:',projectId)
+   this.resetSync(projectId)
+   this.socket.emit('subscribe:project',projectId)
+  }
   this.currentProjectId=projectId
  }
 
+ private resetSync(projectId:string|null):void{
+  this.syncProjectId=projectId
+  this.lastSeq=null
+  this.epoch=null
+ }
+
+ private trackSeq(data:unknown):boolean{
+  const seq=(data as{seq?:unknown}|null)?.seq
+  if(typeof seq!=='number'||this.lastSeq===null)return true
+  if(seq<=this.lastSeq)return false
+  this.lastSeq=seq
+  return true
+ }
+
+ private on<E extends keyof ServerToClientEvents>(event:E,handler:ServerToClientEvents[E]):void{
+  const socket=this.socket as unknown as Socket|null
+  socket?.on(event,(data:unknown)=>{
+   if(this.trackSeq(data))(handler as(payload:unknown)=>void)(data)
+  })
+ }
+
+ private hasListeners(event:string):boolean{
+  return(this.socket?.listeners(event as keyof ServerToClientEvents).length??0)>0
+ }
+
+ private dispatch(event:string,data:unknown):void{
+  if(!this.hasListeners(event)){
+   this.trackSeq(data)
+   return
+  }
+  for(const listener of this.socket?.listeners(event as keyof ServerToClientEvents)??[]){
+   (listener as(payload:unknown)=>void)(data)
+  }
+ }
+
  subscribeToProject(projectId:string):void{
   console.log('[WS] subscribeToProject called:',projectId,'Connected:',this.socket?.connected)
   this.pendingProjectId=projectId
@@ -513,6 +586,9 @@ class WebSocketService{
    this.doUnsubscribe(projectId)
    this.currentProjectId=null
   }
+  if(this.syncProjectId===projectId){
+   this.resetSync(null)
+  }
  }
 
  resolveCheckpoint(checkpointId:string,resolution:string,feedback?:string):void{
@@ -532,6 +608,7 @@ class WebSocketService{
   }
   this.pendingProjectId=null
   this.currentProjectId=null
+  this.resetSync(null)
   useConnectionStore.getState().setStatus('disconnected')
  }
 